@@ -602,8 +602,7 @@ const BuildYourself: React.FC = () => {
   // Загрузка сохраненных сборок
   const loadSavedBuilds = async () => {
     try {
-      const response = await configurationAPI.getMyBuilds();
-      setSavedBuilds(response.data);
+      setSavedBuilds(await configurationAPI.getAllMyBuilds());
     } catch (error) {
       console.error('Ошибка загрузки сборок:', error);
     }
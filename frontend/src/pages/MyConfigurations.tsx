@@ -20,8 +20,7 @@ const MyConfigurations: React.FC = () => {
 
   const loadConfigurations = async () => {
     try {
-      const response = await configurationAPI.getConfigurations();
-      setConfigurations(response.data.results);
+      setConfigurations(await configurationAPI.getAllConfigurations());
     } catch (error) {
       console.error('Ошибка загрузки конфигураций:', error);
     } finally {
@@ -204,22 +203,22 @@ const MyConfigurations: React.FC = () => {
 
               {/* Components */}
               <div className="space-y-2 text-sm mb-4">
-                {config.cpu && (
+                {config.components?.cpu && (
                   <div className="flex items-center gap-2 text-gray-400">
                     {React.createElement(FiCpu as any, { className: "text-primary flex-shrink-0" })}
-                    <span className="truncate">{typeof config.cpu === 'object' ? config.cpu.name : ''}</span>
+                    <span className="truncate">{config.components.cpu.name}</span>
                   </div>
                 )}
-                {config.gpu && (
+                {config.components?.gpu && (
                   <div className="flex items-center gap-2 text-gray-400">
                     {React.createElement(FiMonitor as any, { className: "text-primary flex-shrink-0" })}
-                    <span className="truncate">{typeof config.gpu === 'object' ? config.gpu.name : ''}</span>
+                    <span className="truncate">{config.components.gpu.name}</span>
                   </div>
                 )}
-                {config.ram && (
+                {config.components?.ram && (
                   <div className="flex items-center gap-2 text-gray-400">
                     {React.createElement(FiDatabase as any, { className: "text-primary flex-shrink-0" })}
-                    <span className="truncate">{typeof config.ram === 'object' ? config.ram.name : ''}</span>
+                    <span className="truncate">{config.components.ram.name}</span>
                   </div>
                 )}
               </div>
@@ -153,7 +153,7 @@ const Profile: React.FC = () => {
       const [userRes, profileRes, configsRes] = await Promise.all([
         userAPI.getCurrentUser(),
         userAPI.getMyProfile().catch(() => null),
-        configurationAPI.getConfigurations().catch(() => ({ data: { results: [] } })),
+        configurationAPI.getAllConfigurations({ expand: 'all' }).catch(() => [] as PCConfiguration[]),
       ]);
 
       setUser(userRes.data);
@@ -173,7 +173,7 @@ const Profile: React.FC = () => {
         });
       }
 
-      const configs = (configsRes.data.results || []) as PCConfiguration[];
+      const configs = configsRes;
       setConfigurations(configs);
 
       const total = configs.reduce((acc: number, curr: PCConfiguration) => acc + Number(curr.total_price || 0), 0);
@@ -30,6 +30,7 @@ import type {
   PCConfiguration,
   ConfigurationRequest,
   PaginatedResponse,
+  CursorPage,
 } from '../types';
 
 // Увеличен таймаут для AI генерации (5 минут)
@@ -173,10 +174,29 @@ export const peripheralAPI = {
     api.get<PaginatedResponse<HeadphoneStand>>('/peripherals/headphone-stands/', { params }),
 };
 
+// Проходит курсорную пагинацию по ссылкам next и собирает все страницы
+const fetchAllPages = async <T>(url: string, params?: Record<string, any>): Promise<T[]> => {
+  const results: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const response: { data: CursorPage<T> } = await api.get<CursorPage<T>>(url, {
+      params: cursor ? { ...params, cursor } : params,
+    });
+    results.push(...response.data.results);
+    cursor = response.data.next
+      ? new URL(response.data.next, window.location.origin).searchParams.get('cursor')
+      : null;
+  } while (cursor);
+  return results;
+};
+
 // API методы для конфигураций
 export const configurationAPI = {
   getConfigurations: (params?: Record<string, any>) =>
-    api.get<PaginatedResponse<PCConfiguration>>('/recommendations/configurations/', { params }),
+    api.get<CursorPage<PCConfiguration>>('/recommendations/configurations/', { params }),
+
+  getAllConfigurations: (params?: Record<string, any>) =>
+    fetchAllPages<PCConfiguration>('/recommendations/configurations/', { page_size: 100, ...params }),
 
   getConfiguration: (id: number) =>
     api.get<PCConfiguration>(`/recommendations/configurations/${id}/`),
@@ -209,7 +229,12 @@ export const configurationAPI = {
     api.get<PCConfiguration>(`/recommendations/configurations/public/${shareCode}/`),
 
   getMyBuilds: () =>
-    api.get<PCConfiguration[]>('/recommendations/configurations/my_builds/'),
+    api.get<CursorPage<PCConfiguration>>('/recommendations/configurations/my_builds/', {
+      params: { expand: 'all', page_size: 100 },
+    }),
+
+  getAllMyBuilds: () =>
+    fetchAllPages<PCConfiguration>('/recommendations/configurations/my_builds/', { expand: 'all', page_size: 100 }),
 
   compareBuilds: (ids: number[]) =>
     api.get<PCConfiguration[]>('/recommendations/configurations/compare/', {
@@ -415,6 +415,12 @@ export interface WorkspaceSetup {
 }
 
 // Типы для конфигураций
+export interface ComponentSummary {
+  id: number;
+  name: string;
+  price: string;
+}
+
 export interface PCConfiguration {
   id: number;
   user: number;
@@ -441,6 +447,7 @@ export interface PCConfiguration {
   cooling?: Cooling | number;
   cooling_detail?: Cooling;
   workspace?: WorkspaceSetup;
+  components?: Record<string, ComponentSummary | null>;
   total_price: string | number;
   compatibility_check?: boolean;
   is_compatible?: boolean;
@@ -546,3 +553,9 @@ export interface PaginatedResponse<T> {
   previous: string | null;
   results: T[];
 }
+
+export interface CursorPage<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
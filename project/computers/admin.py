@@ -4,15 +4,15 @@ from .models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
 
 @admin.register(CPU)
 class CPUAdmin(admin.ModelAdmin):
-    list_display = ['name', 'manufacturer', 'cores', 'threads', 'price', 'performance_score']
-    list_filter = ['manufacturer', 'socket']
+    list_display = ['name', 'manufacturer', 'cores', 'threads', 'price', 'performance_score', 'benchmark_key', 'benchmark_confidence']
+    list_filter = ['manufacturer', 'socket', 'benchmark_version']
     search_fields = ['name', 'manufacturer']
 
 
 @admin.register(GPU)
 class GPUAdmin(admin.ModelAdmin):
-    list_display = ['name', 'manufacturer', 'memory', 'price', 'performance_score']
-    list_filter = ['manufacturer', 'memory']
+    list_display = ['name', 'manufacturer', 'memory', 'price', 'performance_score', 'benchmark_key', 'benchmark_confidence']
+    list_filter = ['manufacturer', 'memory', 'benchmark_version']
     search_fields = ['name', 'manufacturer', 'chipset']
 
 
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ComputersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'computers'
+
+    def ready(self):
+        from .caching import register_catalog_models
+        from .models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
+        
+        register_catalog_models(CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling)
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import time
+
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+logger = logging.getLogger(__name__)
+
+
+CATALOG_CACHE_ALIAS = 'components'
+CATALOG_CACHE_TTL = 60 * 60 * 24
+
+
+def catalog_cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def catalog_label(model) -> str:
+    return model._meta.label_lower
+
+
+def _version_key(model) -> str:
+    return f'catalog_version:{catalog_label(model)}'
+
+
+def catalog_version(model) -> int:
+
+    # Versions are millisecond timestamps, so they double as Last-Modified
+    cache = catalog_cache()
+    version = cache.get(_version_key(model))
+    if version is None:
+        cache.add(_version_key(model), int(time.time() * 1000), None)
+        version = cache.get(_version_key(model))
+    return version
+
+
+def bump_catalog_version(model) -> int:
+
+    version = max(int(time.time() * 1000), (catalog_cache().get(_version_key(model)) or 0) + 1)
+    catalog_cache().set(_version_key(model), version, None)
+    return version
+
+
+def _on_catalog_change(sender, **kwargs):
+    bump_catalog_version(sender)
+
+
+def register_catalog_models(*models):
+
+    for model in models:
+        label = catalog_label(model)
+        post_save.connect(_on_catalog_change, sender=model, dispatch_uid=f'catalog_version_save:{label}')
+        post_delete.connect(_on_catalog_change, sender=model, dispatch_uid=f'catalog_version_delete:{label}')
+
+
+class CatalogCacheMixin:
+
+    catalog_cache_ttl = CATALOG_CACHE_TTL
+    catalog_export = True
+    
+    def catalog_cache_key(self, request, version) -> str:
+
+        params = '&'.join(
+            f'{name}={value}'
+            for name, values in sorted(request.query_params.lists())
+            for value in sorted(values)
+        )
+        digest = hashlib.md5(
+            f'{self.action}|{self.kwargs.get(self.lookup_url_kwarg or self.lookup_field, "")}|'
+            f'{request.accepted_renderer.format}|{params}'.encode()
+        ).hexdigest()
+        return f'catalog:{catalog_label(self.queryset.model)}:{version}:{digest}'
+    
+    def cached_response(self, request, build):
+
+        version = catalog_version(self.queryset.model)
+        last_modified = version / 1000
+        key = self.catalog_cache_key(request, version)
+        cache = catalog_cache()
+        
+        cached = cache.get(key)
+        if cached is None:
+            response = build()
+            if response.status_code != 200:
+                return response
+            
+            response = self.finalize_response(request, response)
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            }
+            cache.set(key, cached, self.catalog_cache_ttl)
+        
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        response['ETag'] = cached['etag']
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return get_conditional_response(
+            request,
+            etag=cached['etag'],
+            last_modified=int(last_modified),
+            response=response,
+        )
+    
+    def export_response(self, request):
+
+        from .catalog_export import get_snapshot, query_etag, query_snapshot
+        
+        model = self.queryset.model
+        snapshot = get_snapshot(model, self.get_serializer_class(), self.get_queryset())
+        etag = query_etag(snapshot, request.META.get('QUERY_STRING', ''))
+        last_modified = snapshot.version / 1000
+        
+        not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified))
+        if not_modified is not None:
+            return not_modified
+        
+        body, whole_catalog = query_snapshot(snapshot, request.query_params, self)
+        
+        encoding = None
+        if whole_catalog:
+            accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+            encoding = next((name for name in ('br', 'gzip') if name in snapshot.encoded and name in accepted), None)
+        
+        response = HttpResponse(snapshot.encoded[encoding] if encoding else body, content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+    
+    def list(self, request, *args, **kwargs):
+
+        if self.catalog_export and request.accepted_renderer.format == 'json':
+            from .catalog_export import UnsupportedQuery
+            
+            try:
+                return self.export_response(request)
+            except UnsupportedQuery as e:
+                logger.debug(f"Catalog export fallback for {catalog_label(self.queryset.model)}: {e}")
+        
+        return self.cached_response(request, lambda: super(CatalogCacheMixin, self).list(request, *args, **kwargs))
+    
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CatalogCacheMixin, self).retrieve(request, *args, **kwargs))
@@ -0,0 +1,204 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from functools import cmp_to_key
+from typing import Any, Dict, List, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from rest_framework.utils.encoders import JSONEncoder
+
+from .caching import catalog_cache, catalog_label, catalog_version
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+EXPORT_CACHE_TTL = 60 * 60 * 24
+MAX_PAGE_SIZE = 1000
+
+PAGINATION_PARAMS = {'limit', 'cursor'}
+IGNORED_PARAMS = {'format'}
+
+
+class UnsupportedQuery(Exception):
+    pass
+
+
+def dumps(value) -> bytes:
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class CatalogSnapshot:
+
+    def __init__(self, model, version: int, payloads: List[bytes]):
+        self.model = model
+        self.label = catalog_label(model)
+        self.version = version
+        self.payloads = payloads
+        self.rows = [json.loads(payload) for payload in payloads]
+        self.body = b'[' + b','.join(payloads) + b']'
+        self.encoded = {'gzip': gzip.compress(self.body, compresslevel=6)}
+        if brotli is not None:
+            self.encoded['br'] = brotli.compress(self.body)
+        self._normalized: Dict[str, List[Any]] = {}
+        self._haystacks: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+    
+    def normalize(self, field: str, value):
+
+        try:
+            return self.model._meta.get_field(field).to_python(value)
+        except (FieldDoesNotExist, ValidationError):
+            raise UnsupportedQuery(field)
+    
+    def column(self, field: str) -> List[Any]:
+
+        if field not in self._normalized:
+            if self.rows and field not in self.rows[0]:
+                raise UnsupportedQuery(field)
+            with self._lock:
+                self._normalized[field] = [self.normalize(field, row.get(field)) for row in self.rows]
+        return self._normalized[field]
+    
+    def haystack(self, field: str) -> List[str]:
+
+        if field not in self._haystacks:
+            with self._lock:
+                self._haystacks[field] = [str(row.get(field) or '').casefold() for row in self.rows]
+        return self._haystacks[field]
+
+
+_snapshots: Dict[str, CatalogSnapshot] = {}
+
+
+def get_snapshot(model, serializer_class, queryset) -> CatalogSnapshot:
+
+    version = catalog_version(model)
+    label = catalog_label(model)
+    
+    snapshot = _snapshots.get(label)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    
+    key = f'catalog_export:{label}:{version}'
+    payloads = catalog_cache().get(key)
+    if payloads is None:
+        payloads = [dumps(row) for row in serializer_class(queryset, many=True).data]
+        catalog_cache().set(key, payloads, EXPORT_CACHE_TTL)
+        logger.info(f"Catalog export built for {label}: {len(payloads)} rows, version {version}")
+    
+    snapshot = CatalogSnapshot(model, version, payloads)
+    _snapshots[label] = snapshot
+    return snapshot
+
+
+def encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(dumps(values)).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise UnsupportedQuery('cursor')
+
+
+def _compare(left: Tuple, right: Tuple, descending: List[bool]) -> int:
+
+    for a, b, desc in zip(left, right, descending):
+        if a == b:
+            continue
+        # None sorts last in either direction
+        if a is None or b is None:
+            return 1 if a is None else -1
+        result = -1 if a < b else 1
+        return -result if desc else result
+    return 0
+
+
+def _sort(snapshot: CatalogSnapshot, positions: List[int], ordering: List[str]) -> Dict[int, Tuple]:
+
+    if not ordering:
+        return {}
+    
+    columns = [snapshot.column(field.lstrip('-')) for field in ordering]
+    descending = [field.startswith('-') for field in ordering]
+    keys = {i: tuple(column[i] for column in columns) for i in positions}
+    positions.sort(key=cmp_to_key(lambda a, b: _compare(keys[a], keys[b], descending)))
+    return keys
+
+
+def query_snapshot(snapshot: CatalogSnapshot, params, viewset) -> Tuple[bytes, bool]:
+
+    filter_fields = set(getattr(viewset, 'filterset_fields', None) or [])
+    search_fields = list(getattr(viewset, 'search_fields', None) or [])
+    ordering_fields = set(getattr(viewset, 'ordering_fields', None) or [])
+    
+    unknown = set(params) - filter_fields - PAGINATION_PARAMS - IGNORED_PARAMS - {'search', 'ordering'}
+    if unknown:
+        raise UnsupportedQuery(', '.join(sorted(unknown)))
+    
+    positions = list(range(len(snapshot.rows)))
+    
+    for field in filter_fields & set(params):
+        wanted = {snapshot.normalize(field, value) for value in params.getlist(field)}
+        column = snapshot.column(field)
+        positions = [i for i in positions if column[i] in wanted]
+    
+    terms = params.get('search', '').replace(',', ' ').split()
+    for term in terms:
+        term = term.casefold()
+        haystacks = [snapshot.haystack(field) for field in search_fields]
+        positions = [i for i in positions if any(term in haystack[i] for haystack in haystacks)]
+    
+    ordering = [field for field in params.get('ordering', '').split(',') if field]
+    if any(field.lstrip('-') not in ordering_fields for field in ordering):
+        raise UnsupportedQuery('ordering')
+    
+    limit = params.get('limit')
+    if limit is None:
+        _sort(snapshot, positions, ordering)
+        body = b'[' + b','.join(snapshot.payloads[i] for i in positions) + b']'
+        return body, not (filter_fields & set(params) or terms or ordering)
+    
+    try:
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    except ValueError:
+        raise UnsupportedQuery('limit')
+    
+
+    # Keyset pagination always ends on the primary key so the order is total
+    ordering = ordering + ['id']
+    keys = _sort(snapshot, positions, ordering)
+    fields = [field.lstrip('-') for field in ordering]
+    descending = [field.startswith('-') for field in ordering]
+    
+    cursor = params.get('cursor')
+    if cursor:
+        after = tuple(snapshot.normalize(field, value) for field, value in zip(fields, decode_cursor(cursor)))
+        positions = [i for i in positions if _compare(keys[i], after, descending) > 0]
+    
+    page = positions[:limit]
+    next_cursor = None
+    if len(positions) > limit:
+        next_cursor = encode_cursor([snapshot.rows[page[-1]].get(field) for field in fields])
+    
+    body = (
+        b'{"next":' + dumps(next_cursor) + b',"results":['
+        + b','.join(snapshot.payloads[i] for i in page) + b']}'
+    )
+    return body, False
+
+
+def query_etag(snapshot: CatalogSnapshot, query_string: str) -> str:
+
+    digest = hashlib.md5(f'{snapshot.version}|{query_string}'.encode()).hexdigest()
+    return f'"{snapshot.label}-{digest}"'
@@ -0,0 +1,43 @@
+# Generated by Django 5.0.1 on 2026-10-19 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computers', '0003_case_ai_confidence_case_ai_generation_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cpu',
+            name='benchmark_confidence',
+            field=models.FloatField(blank=True, null=True, verbose_name='Уверенность сопоставления (0-1)'),
+        ),
+        migrations.AddField(
+            model_name='cpu',
+            name='benchmark_key',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Ключ в базе бенчмарков'),
+        ),
+        migrations.AddField(
+            model_name='cpu',
+            name='benchmark_version',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50, verbose_name='Версия базы бенчмарков'),
+        ),
+        migrations.AddField(
+            model_name='gpu',
+            name='benchmark_confidence',
+            field=models.FloatField(blank=True, null=True, verbose_name='Уверенность сопоставления (0-1)'),
+        ),
+        migrations.AddField(
+            model_name='gpu',
+            name='benchmark_key',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Ключ в базе бенчмарков'),
+        ),
+        migrations.AddField(
+            model_name='gpu',
+            name='benchmark_version',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50, verbose_name='Версия базы бенчмарков'),
+        ),
+    ]
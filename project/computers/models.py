@@ -19,6 +19,10 @@ class CPU(models.Model):
     ai_generation_date = models.DateTimeField(null=True, blank=True, verbose_name='Дата генерации AI')
     ai_confidence = models.FloatField(null=True, blank=True, verbose_name='Уверенность AI (0-1)')
     
+    benchmark_key = models.CharField(max_length=255, blank=True, default='', verbose_name='Ключ в базе бенчмарков')
+    benchmark_confidence = models.FloatField(null=True, blank=True, verbose_name='Уверенность сопоставления (0-1)')
+    benchmark_version = models.CharField(max_length=50, blank=True, default='', db_index=True, verbose_name='Версия базы бенчмарков')
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -56,6 +60,10 @@ class GPU(models.Model):
     ai_generation_date = models.DateTimeField(null=True, blank=True, verbose_name='Дата генерации AI')
     ai_confidence = models.FloatField(null=True, blank=True, verbose_name='Уверенность AI (0-1)')
     
+    benchmark_key = models.CharField(max_length=255, blank=True, default='', verbose_name='Ключ в базе бенчмарков')
+    benchmark_confidence = models.FloatField(null=True, blank=True, verbose_name='Уверенность сопоставления (0-1)')
+    benchmark_version = models.CharField(max_length=50, blank=True, default='', db_index=True, verbose_name='Версия базы бенчмарков')
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -1,17 +1,22 @@
 from rest_framework import serializers
 from .models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
 
+# Maintained by the benchmark linker, never by API clients
+BENCHMARK_LINK_FIELDS = ('benchmark_key', 'benchmark_confidence', 'benchmark_version')
+
 
 class CPUSerializer(serializers.ModelSerializer):
     class Meta:
         model = CPU
         fields = '__all__'
+        read_only_fields = BENCHMARK_LINK_FIELDS
 
 
 class GPUSerializer(serializers.ModelSerializer):
     class Meta:
         model = GPU
         fields = '__all__'
+        read_only_fields = BENCHMARK_LINK_FIELDS
 
 
 class MotherboardSerializer(serializers.ModelSerializer):
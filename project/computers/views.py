@@ -1,9 +1,7 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAdminUser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
-from django.views.decorators.vary import vary_on_headers
+from .caching import CatalogCacheMixin
 from .models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
 from .serializers import (
     CPUSerializer, GPUSerializer, MotherboardSerializer, RAMSerializer,
@@ -11,9 +9,6 @@ from .serializers import (
 )
 
 
-CACHE_TTL = 60 * 15
-
-
 class ReadOnlyOrAdminPermission(IsAuthenticatedOrReadOnly):
     
     def has_permission(self, request, view):
@@ -22,19 +17,9 @@ class ReadOnlyOrAdminPermission(IsAuthenticatedOrReadOnly):
         return request.user and request.user.is_staff
 
 
-class CachedModelViewSet(viewsets.ModelViewSet):
+class CachedModelViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
     
     pagination_class = None
-    
-    @method_decorator(cache_page(CACHE_TTL))
-    @method_decorator(vary_on_headers('Authorization'))
-    def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
-    
-    @method_decorator(cache_page(CACHE_TTL))
-    @method_decorator(vary_on_headers('Authorization'))
-    def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
 
 
 class CPUViewSet(CachedModelViewSet):
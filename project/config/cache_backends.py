@@ -0,0 +1,255 @@
+import json
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+
+SERIALIZERS = {
+    'pickle': (b'p', lambda value: pickle.dumps(value, pickle.HIGHEST_PROTOCOL), pickle.loads),
+    'json': (b'j', lambda value: json.dumps(value, ensure_ascii=False).encode(), lambda data: json.loads(data)),
+}
+LOADERS = {code: loads for code, _, loads in SERIALIZERS.values()}
+
+COMPRESSED = b'z'
+PLAIN = b'-'
+
+
+# Process-wide state per cache LOCATION; Django builds one backend instance per thread
+_local_stores = {}
+_local_stats = {}
+_registry_lock = threading.Lock()
+
+
+class LocalStore:
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None:
+                return None
+            expires, payload = entry
+            if expires is not None and expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return payload
+    
+    def set(self, key, payload, ttl):
+        with self.lock:
+            self.data[key] = (time.monotonic() + ttl if ttl is not None else None, payload)
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_entries:
+                self.data.popitem(last=False)
+    
+    def delete(self, key):
+        with self.lock:
+            self.data.pop(key, None)
+    
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+
+class TieredCache(BaseCache):
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        
+        self.name = location
+        self.serializer = options.get('SERIALIZER', 'pickle')
+        self.dumps = SERIALIZERS[self.serializer][1]
+        self.compress_min_size = options.get('COMPRESS_MIN_SIZE')
+        self.compress_level = options.get('COMPRESS_LEVEL', 6)
+        self.local_timeout = options.get('LOCAL_TIMEOUT', 30)
+        
+        shared = dict(options['SHARED'])
+        shared.setdefault('TIMEOUT', params.get('TIMEOUT', 300))
+        self.shared = import_string(shared.pop('BACKEND'))(shared.pop('LOCATION', ''), shared)
+        
+        with _registry_lock:
+            if location not in _local_stores:
+                _local_stores[location] = LocalStore(options.get('LOCAL_MAX_ENTRIES', 1000))
+                _local_stats[location] = {'local_hits': 0, 'shared_hits': 0, 'misses': 0, 'sets': 0}
+            self.local = _local_stores[location]
+            self.counters = _local_stats[location]
+    
+    def _encode(self, value):
+
+        # Integers are stored as-is so the shared backend can increment them atomically
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        
+        data = self.dumps(value)
+        if self.compress_min_size is not None and len(data) >= self.compress_min_size:
+            return SERIALIZERS[self.serializer][0] + COMPRESSED + zlib.compress(data, self.compress_level)
+        return SERIALIZERS[self.serializer][0] + PLAIN + data
+    
+    def _decode(self, payload):
+
+        # Integers, and values written before the tiered layer, are not wrapped
+        if not isinstance(payload, bytes):
+            return payload
+        
+        data = payload[2:]
+        if payload[1:2] == COMPRESSED:
+            data = zlib.decompress(data)
+        return LOADERS[payload[:1]](data)
+    
+    def _shared_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+    
+    def _local_ttl(self, timeout):
+
+        timeout = self._shared_timeout(timeout)
+        if timeout is None:
+            return self.local_timeout
+        return min(self.local_timeout, timeout)
+    
+    def _remember(self, key, payload, timeout):
+
+        # Raw integers are counters and version stamps; they must be read from the shared tier
+        ttl = self._local_ttl(timeout)
+        if ttl > 0 and isinstance(payload, bytes):
+            self.local.set(key, payload, ttl)
+    
+    def get(self, key, default=None, version=None):
+
+        key = self.make_and_validate_key(key, version=version)
+        payload = self.local.get(key)
+        if payload is not None:
+            self.counters['local_hits'] += 1
+            return self._decode(payload)
+        
+        payload = self.shared.get(key)
+        if payload is None:
+            self.counters['misses'] += 1
+            return default
+        
+        self.counters['shared_hits'] += 1
+        self._remember(key, payload, DEFAULT_TIMEOUT)
+        return self._decode(payload)
+    
+    def get_many(self, keys, version=None):
+
+        keys = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = {}
+        missing = []
+        for key, original in keys.items():
+            payload = self.local.get(key)
+            if payload is None:
+                missing.append(key)
+            else:
+                self.counters['local_hits'] += 1
+                found[original] = self._decode(payload)
+        
+        if missing:
+            shared = self.shared.get_many(missing)
+            self.counters['shared_hits'] += len(shared)
+            self.counters['misses'] += len(missing) - len(shared)
+            for key, payload in shared.items():
+                self._remember(key, payload, DEFAULT_TIMEOUT)
+                found[keys[key]] = self._decode(payload)
+        return found
+    
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+
+        key = self.make_and_validate_key(key, version=version)
+        payload = self._encode(value)
+        self.shared.set(key, payload, self._shared_timeout(timeout))
+        self.counters['sets'] += 1
+        self._remember(key, payload, timeout)
+    
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+
+        payloads = {self.make_and_validate_key(key, version=version): self._encode(value) for key, value in data.items()}
+        failed = self.shared.set_many(payloads, self._shared_timeout(timeout))
+        self.counters['sets'] += len(payloads)
+        for key, payload in payloads.items():
+            self._remember(key, payload, timeout)
+        return failed
+    
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+
+        key = self.make_and_validate_key(key, version=version)
+        self.local.delete(key)
+        return self.shared.add(key, self._encode(value), self._shared_timeout(timeout))
+    
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+
+        key = self.make_and_validate_key(key, version=version)
+        self.local.delete(key)
+        return self.shared.touch(key, self._shared_timeout(timeout))
+    
+    def delete(self, key, version=None):
+
+        key = self.make_and_validate_key(key, version=version)
+        self.local.delete(key)
+        return self.shared.delete(key)
+    
+    def delete_many(self, keys, version=None):
+
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        for key in keys:
+            self.local.delete(key)
+        self.shared.delete_many(keys)
+    
+    def has_key(self, key, version=None):
+
+        key = self.make_and_validate_key(key, version=version)
+        return self.local.get(key) is not None or self.shared.has_key(key)
+    
+    def incr(self, key, delta=1, version=None):
+
+        # Counters (rate limits) live in the shared tier only, so they stay atomic there
+        key = self.make_and_validate_key(key, version=version)
+        self.local.delete(key)
+        return self.shared.incr(key, delta)
+    
+    def clear(self):
+
+        self.local.clear()
+        self.shared.clear()
+    
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+    
+    def stats(self):
+
+        counters = dict(self.counters)
+        lookups = counters['local_hits'] + counters['shared_hits'] + counters['misses']
+        hits = counters['local_hits'] + counters['shared_hits']
+        return {
+            **counters,
+            'hit_ratio': round(hits / lookups, 4) if lookups else None,
+            'local_hit_ratio': round(counters['local_hits'] / lookups, 4) if lookups else None,
+            'local_entries': len(self.local.data),
+            'serializer': self.serializer,
+            'shared_backend': type(self.shared).__name__,
+        }
+
+
+def cache_stats():
+
+    return {
+        alias: caches[alias].stats()
+        for alias in caches.settings
+        if isinstance(caches[alias], TieredCache)
+    }
+
+
+def clear_local_caches():
+
+    for store in _local_stores.values():
+        store.clear()
@@ -23,13 +23,41 @@ app.conf.beat_schedule = {
     },
     
 
-    'check-price-alerts': {
-        'task': 'recommendations.tasks.check_price_alerts',
-        'schedule': crontab(minute=0),  
+    'snapshot-catalog-prices': {
+        'task': 'recommendations.tasks.snapshot_catalog_prices',
+        'schedule': crontab(hour=23, minute=50),  
+        'options': {'queue': 'prices'}
+    },
+    
+
+    'compact-price-history': {
+        'task': 'recommendations.tasks.compact_price_history',
+        'schedule': crontab(hour=4, minute=0),  
+        'options': {'queue': 'maintenance'}
+    },
+    
+
+    'process-price-changes': {
+        'task': 'recommendations.tasks.process_price_changes',
+        'schedule': crontab(minute='*/5'),  
         'options': {'queue': 'notifications'}
     },
     
 
+    'link-catalog-benchmarks': {
+        'task': 'recommendations.tasks.link_catalog_benchmarks',
+        'schedule': crontab(minute=30),  
+        'options': {'queue': 'maintenance'}
+    },
+    
+
+    'warm-performance-cache': {
+        'task': 'recommendations.tasks.warm_performance_cache',
+        'schedule': crontab(minute=45),  
+        'options': {'queue': 'maintenance'}
+    },
+    
+
     'cleanup-old-ai-logs': {
         'task': 'recommendations.tasks.cleanup_old_logs',
         'schedule': crontab(hour=3, minute=0, day_of_week=0),  
@@ -49,8 +77,13 @@ app.conf.task_routes = {
     'recommendations.tasks.generate_ai_configuration': {'queue': 'ai'},
     'recommendations.tasks.update_all_prices': {'queue': 'prices'},
     'recommendations.tasks.update_component_price': {'queue': 'prices'},
+    'recommendations.tasks.update_price_chunk': {'queue': 'prices'},
+    'recommendations.tasks.finish_price_update': {'queue': 'prices'},
+    'recommendations.tasks.resume_price_update': {'queue': 'prices'},
     'recommendations.tasks.check_price_alerts': {'queue': 'notifications'},
+    'recommendations.tasks.process_price_changes': {'queue': 'notifications'},
     'recommendations.tasks.send_price_alert_email': {'queue': 'notifications'},
+    'recommendations.tasks.send_price_alert_digest': {'queue': 'notifications'},
     'recommendations.tasks.cleanup_old_logs': {'queue': 'maintenance'},
     'recommendations.tasks.generate_ai_analytics_report': {'queue': 'analytics'},
 }
@@ -302,39 +302,97 @@ RATELIMIT_USE_CACHE = 'default'
 RATELIMIT_VIEW = 'config.middleware.RateLimitMiddleware'  
 
 
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'django_cache_table',
-        'TIMEOUT': 300,  
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
-        }
-    },
+# Every alias is a per-process LRU in front of a shared backend:
+# CACHE_SHARED_BACKEND = redis (CACHE_REDIS_URL), memcached (CACHE_MEMCACHED_LOCATION), file or db.
+CACHE_SHARED_BACKEND = config('CACHE_SHARED_BACKEND', default='redis' if config('CACHE_REDIS_URL', default='') else 'db')
+CACHE_LOCAL_TIMEOUT = config('CACHE_LOCAL_TIMEOUT', default=30, cast=int)
 
-    'components': {
-        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'components_cache_table',
-        'TIMEOUT': 3600,  
-        'OPTIONS': {
-            'MAX_ENTRIES': 500,
-        }
-    },
+
+def shared_cache(name, max_entries):
     
-    'ai_responses': {
+    if CACHE_SHARED_BACKEND == 'redis':
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': config('CACHE_REDIS_URL'),
+        }
+    if CACHE_SHARED_BACKEND == 'memcached':
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': config('CACHE_MEMCACHED_LOCATION', default='127.0.0.1:11211'),
+        }
+    if CACHE_SHARED_BACKEND == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(BASE_DIR / 'cache' / name),
+            'OPTIONS': {'MAX_ENTRIES': max_entries},
+        }
+    return {
         'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
-        'LOCATION': 'ai_cache_table',
-        'TIMEOUT': 1800,  
+        'LOCATION': f'{name}_cache_table' if name != 'default' else 'django_cache_table',
+        'OPTIONS': {'MAX_ENTRIES': max_entries},
+    }
+
+
+def tiered_cache(name, timeout, max_entries, local_entries, serializer='pickle', compress_min_size=None):
+    
+    return {
+        'BACKEND': 'config.cache_backends.TieredCache',
+        'LOCATION': name,
+        'TIMEOUT': timeout,
         'OPTIONS': {
-            'MAX_ENTRIES': 200,
+            'SHARED': shared_cache(name, max_entries),
+            'SERIALIZER': serializer,
+            'COMPRESS_MIN_SIZE': compress_min_size,
+            'LOCAL_TIMEOUT': CACHE_LOCAL_TIMEOUT,
+            'LOCAL_MAX_ENTRIES': local_entries,
         }
     }
+
+
+CACHES = {
+    'default': tiered_cache('default', 300, 1000, 1000),
+    'components': tiered_cache('components', 3600, 500, 500, compress_min_size=4096),
+    'ai_responses': tiered_cache('ai', 1800, 200, 200, serializer='json', compress_min_size=2048),
+    'benchmarks': tiered_cache('benchmarks', 86400, 5000, 2000, compress_min_size=4096),
 }
 
 
 CACHE_KEY_PREFIX = 'pckonfai'
 
 
+BENCHMARK_DATA_PATH = config('BENCHMARK_DATA_PATH', default=str(BASE_DIR / 'recommendations' / 'data' / 'benchmarks.json'))
+BENCHMARK_RELOAD_INTERVAL = config('BENCHMARK_RELOAD_INTERVAL', default=30, cast=int)
+BENCHMARK_WARMUP_PAIRS = config('BENCHMARK_WARMUP_PAIRS', default=200, cast=int)
+
+
+# Partner price APIs: GET <url> with {query} -> {"price": ..., "in_stock": ..., "url": ...}.
+# Shops without a URL are skipped by the price ingestion engine.
+PRICE_SHOP_APIS = {
+    shop: {
+        'url': config(f'PRICE_{shop.upper()}_API_URL', default=''),
+        'api_key': config(f'PRICE_{shop.upper()}_API_KEY', default=''),
+        'rate': config(f'PRICE_{shop.upper()}_RATE', default=5, cast=float),
+        'burst': config(f'PRICE_{shop.upper()}_BURST', default=10, cast=int),
+        'connections': config(f'PRICE_{shop.upper()}_CONNECTIONS', default=4, cast=int),
+        'retry_budget': config(f'PRICE_{shop.upper()}_RETRY_BUDGET', default=20, cast=int),
+        'delivery_fee': config(f'PRICE_{shop.upper()}_DELIVERY_FEE', default=0, cast=float),
+    }
+    for shop in ('dns', 'citilink', 'regard')
+}
+PRICE_INGESTION_CONCURRENCY = config('PRICE_INGESTION_CONCURRENCY', default=32, cast=int)
+PRICE_PIPELINE_CHUNK_SIZE = config('PRICE_PIPELINE_CHUNK_SIZE', default=200, cast=int)
+PRICE_PIPELINE_WORKERS = config('PRICE_PIPELINE_WORKERS', default=4, cast=int)
+PRICE_HISTORY_DAILY_DAYS = config('PRICE_HISTORY_DAILY_DAYS', default=90, cast=int)
+PRICE_HISTORY_RETENTION_DAYS = config('PRICE_HISTORY_RETENTION_DAYS', default=730, cast=int)
+
+
+STORE_SEARCH_TIMEOUT = config('STORE_SEARCH_TIMEOUT', default=10, cast=float)
+STORE_SEARCH_CONNECTIONS = config('STORE_SEARCH_CONNECTIONS', default=50, cast=int)
+STORE_SEARCH_CACHE_TIMEOUT = config('STORE_SEARCH_CACHE_TIMEOUT', default=900, cast=int)
+STORE_SEARCH_LOCAL_CACHE_SIZE = config('STORE_SEARCH_LOCAL_CACHE_SIZE', default=256, cast=int)
+STORE_SEARCH_LOCAL_CACHE_TTL = config('STORE_SEARCH_LOCAL_CACHE_TTL', default=60, cast=int)
+
+
 CELERY_BROKER_URL = config('CELERY_BROKER_URL', default='redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = 'django-db'  
 
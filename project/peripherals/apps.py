@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class PeripheralsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'peripherals'
+
+    def ready(self):
+        from computers.caching import register_catalog_models
+        
+        register_catalog_models(*self.get_models())
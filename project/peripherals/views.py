@@ -1,6 +1,7 @@
 from rest_framework import viewsets, filters
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django_filters.rest_framework import DjangoFilterBackend
+from computers.caching import CatalogCacheMixin
 from .models import (
     Monitor, Keyboard, Mouse, Headset, Webcam, Microphone, Desk, Chair,
     Speakers, Mousepad, MonitorArm, USBHub, DeskLighting, StreamDeck,
@@ -23,7 +24,7 @@ class ReadOnlyOrAdminPermission(IsAuthenticatedOrReadOnly):
         return request.user and request.user.is_staff
 
 
-class PeripheralViewSet(viewsets.ModelViewSet):
+class PeripheralViewSet(CatalogCacheMixin, viewsets.ModelViewSet):
 
     pagination_class = None
 
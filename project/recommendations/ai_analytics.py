@@ -0,0 +1,378 @@
+import hashlib
+import logging
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STATUSES = ('success', 'validation_failed', 'fallback_used', 'error')
+
+# Statuses whose validation_errors are counted, as get_common_errors always did
+ERROR_STATUSES = ('validation_failed', 'fallback_used')
+
+# Upper bounds of the stage latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS_MS = (
+    50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000, 30000, 60000, 120000, 180000, 300000, 600000,
+)
+PERCENTILES = (50, 95, 99)
+
+
+class AILogRollup(models.Model):
+
+    hour = models.DateTimeField(verbose_name='Час')
+    status = models.CharField(max_length=30, verbose_name='Статус')
+    requests = models.PositiveIntegerField(default=0, verbose_name='Запросов')
+    timed_requests = models.PositiveIntegerField(default=0, verbose_name='Запросов со временем ответа')
+    response_time_total_ms = models.BigIntegerField(default=0, verbose_name='Суммарное время ответа (мс)')
+    
+    class Meta:
+        app_label = 'recommendations'
+        verbose_name = 'Сводка AI за час'
+        verbose_name_plural = 'Сводки AI по часам'
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'status'], name='unique_ai_rollup_hour_status'),
+        ]
+
+
+class AIErrorCount(models.Model):
+
+    day = models.DateField(verbose_name='День')
+    message_hash = models.CharField(max_length=40, verbose_name='Хеш ошибки')
+    message = models.TextField(verbose_name='Ошибка')
+    occurrences = models.PositiveIntegerField(default=0, verbose_name='Количество')
+    
+    class Meta:
+        app_label = 'recommendations'
+        verbose_name = 'Частота ошибки AI'
+        verbose_name_plural = 'Частота ошибок AI'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'message_hash'], name='unique_ai_error_day_message'),
+        ]
+
+
+class AIStageRollup(models.Model):
+
+    hour = models.DateTimeField(verbose_name='Час')
+    stage = models.CharField(max_length=30, verbose_name='Этап')
+    bucket = models.PositiveSmallIntegerField(verbose_name='Корзина гистограммы')
+    samples = models.PositiveIntegerField(default=0, verbose_name='Замеров')
+    total_ms = models.BigIntegerField(default=0, verbose_name='Суммарное время (мс)')
+    
+    class Meta:
+        app_label = 'recommendations'
+        verbose_name = 'Гистограмма этапа AI'
+        verbose_name_plural = 'Гистограммы этапов AI'
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'stage', 'bucket'], name='unique_ai_stage_hour_bucket'),
+        ]
+
+
+class AITokenRollup(models.Model):
+
+    hour = models.DateTimeField(unique=True, verbose_name='Час')
+    generations = models.PositiveIntegerField(default=0, verbose_name='Генераций')
+    eval_tokens = models.BigIntegerField(default=0, verbose_name='Сгенерировано токенов')
+    eval_ms = models.BigIntegerField(default=0, verbose_name='Время генерации токенов (мс)')
+    prompt_tokens = models.BigIntegerField(default=0, verbose_name='Токенов промпта')
+    
+    class Meta:
+        app_label = 'recommendations'
+        verbose_name = 'Токены AI за час'
+        verbose_name_plural = 'Токены AI по часам'
+
+
+def hour_of(moment: datetime) -> datetime:
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def message_hash(message: str) -> str:
+    return hashlib.sha1(message.encode('utf-8')).hexdigest()
+
+
+def _increment(model, lookup: Dict, increments: Dict[str, int], defaults: Dict = None) -> None:
+
+    # UPDATE ... SET n = n + k first; the INSERT only happens for a new key,
+    # and a concurrent insert of the same key falls back to the UPDATE
+    changes = {name: F(name) + value for name, value in increments.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **(defaults or {}), **increments)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**changes)
+
+
+def record_log(log) -> None:
+
+    timed = log.response_time_ms is not None
+    _increment(
+        AILogRollup,
+        {'hour': hour_of(log.created_at), 'status': log.status},
+        {
+            'requests': 1,
+            'timed_requests': int(timed),
+            'response_time_total_ms': log.response_time_ms if timed else 0,
+        },
+    )
+    
+    if log.status in ERROR_STATUSES:
+        day = timezone.localdate(log.created_at)
+        for message, count in _count_errors([log.validation_errors]).items():
+            _increment(
+                AIErrorCount,
+                {'day': day, 'message_hash': message_hash(message)},
+                {'occurrences': count},
+                defaults={'message': message},
+            )
+
+
+def bucket_of(ms: float) -> int:
+    return bisect_left(LATENCY_BUCKETS_MS, ms)
+
+
+def record_trace(trace) -> None:
+
+    hour = hour_of(timezone.now())
+    for stage, ms in trace.stages.items():
+        _increment(
+            AIStageRollup,
+            {'hour': hour, 'stage': stage, 'bucket': bucket_of(ms)},
+            {'samples': 1, 'total_ms': round(ms)},
+        )
+    
+    if trace.eval_count:
+        _increment(
+            AITokenRollup,
+            {'hour': hour},
+            {
+                'generations': 1,
+                'eval_tokens': trace.eval_count,
+                'eval_ms': round(trace.eval_duration_ms),
+                'prompt_tokens': trace.prompt_eval_count or 0,
+            },
+        )
+
+
+def _count_errors(error_lists: Iterable) -> Dict[str, int]:
+
+    counts: Dict[str, int] = {}
+    for errors in error_lists:
+        for error in errors or []:
+            message = str(error)
+            counts[message] = counts.get(message, 0) + 1
+    return counts
+
+
+def window_start(days: int) -> datetime:
+    return hour_of(timezone.now() - timedelta(days=days))
+
+
+def status_breakdown(since: datetime, until: Optional[datetime] = None) -> Dict:
+
+    rows = AILogRollup.objects.filter(hour__gte=since)
+    if until is not None:
+        rows = rows.filter(hour__lt=until)
+    rows = rows.values('status').annotate(
+        requests=Sum('requests'),
+        timed=Sum('timed_requests'),
+        time_total=Sum('response_time_total_ms'),
+    ).order_by()
+    
+    by_status = dict.fromkeys(STATUSES, 0)
+    timed = time_total = 0
+    for row in rows:
+        by_status[row['status']] = row['requests']
+        timed += row['timed']
+        time_total += row['time_total']
+    
+    total = sum(by_status.values())
+    return {
+        'total_requests': total,
+        'by_status': by_status,
+        'success_rate': round(by_status['success'] / total * 100, 2) if total else None,
+        'avg_response_time_ms': round(time_total / timed, 2) if timed else None,
+    }
+
+
+def common_errors(since: datetime, limit: int = 10) -> List[Tuple[str, int]]:
+
+    rows = (
+        AIErrorCount.objects.filter(day__gte=timezone.localdate(since))
+        .values('message_hash')
+        .annotate(total=Sum('occurrences'), message=models.Min('message'))
+        .order_by('-total', 'message')[:limit]
+    )
+    return [(row['message'], row['total']) for row in rows]
+
+
+def histogram_percentile(counts: List[int], q: float) -> Optional[float]:
+
+    # Linear interpolation inside the bucket holding the q-th sample, as
+    # Prometheus' histogram_quantile() does; +Inf answers its lower bound
+    total = sum(counts)
+    if not total:
+        return None
+    
+    rank = q * total
+    seen = 0
+    for bucket, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS_MS[bucket - 1] if bucket else 0
+            if bucket == len(LATENCY_BUCKETS_MS):
+                return float(lower)
+            return round(lower + (LATENCY_BUCKETS_MS[bucket] - lower) * (rank - seen) / count, 1)
+        seen += count
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+def _stage_histograms(since: Optional[datetime] = None) -> Dict[str, Dict]:
+
+    rows = AIStageRollup.objects.all()
+    if since is not None:
+        rows = rows.filter(hour__gte=since)
+    
+    histograms: Dict[str, Dict] = {}
+    for row in rows.values('stage', 'bucket').annotate(samples=Sum('samples'), total_ms=Sum('total_ms')).order_by():
+        histogram = histograms.setdefault(
+            row['stage'], {'counts': [0] * (len(LATENCY_BUCKETS_MS) + 1), 'total_ms': 0}
+        )
+        histogram['counts'][row['bucket']] += row['samples']
+        histogram['total_ms'] += row['total_ms']
+    return histograms
+
+
+def _token_totals(since: Optional[datetime] = None) -> Dict:
+
+    rows = AITokenRollup.objects.all()
+    if since is not None:
+        rows = rows.filter(hour__gte=since)
+    totals = rows.aggregate(
+        generations=Sum('generations'), eval_tokens=Sum('eval_tokens'), eval_ms=Sum('eval_ms'),
+        prompt_tokens=Sum('prompt_tokens'),
+    )
+    return {name: value or 0 for name, value in totals.items()}
+
+
+def latency_summary(since: datetime) -> Dict:
+
+    stages = {}
+    for stage, histogram in _stage_histograms(since).items():
+        count = sum(histogram['counts'])
+        stages[stage] = {
+            'count': count,
+            'avg_ms': round(histogram['total_ms'] / count, 1),
+            **{f'p{p}_ms': histogram_percentile(histogram['counts'], p / 100) for p in PERCENTILES},
+        }
+    
+    tokens = _token_totals(since)
+    return {
+        'stages': stages,
+        'tokens': {
+            **tokens,
+            'tokens_per_second': round(tokens['eval_tokens'] / (tokens['eval_ms'] / 1000), 2) if tokens['eval_ms'] else None,
+        },
+    }
+
+
+def _seconds(ms: float) -> str:
+    return f'{ms / 1000:g}'
+
+
+def prometheus_text() -> str:
+
+    # Totals since the rollups began, so every series only grows, as
+    # Prometheus counters and histograms must
+    lines = [
+        '# HELP ai_generation_stage_seconds Time spent in each AI generation stage.',
+        '# TYPE ai_generation_stage_seconds histogram',
+    ]
+    for stage, histogram in sorted(_stage_histograms().items()):
+        cumulative = 0
+        for bucket, count in enumerate(histogram['counts']):
+            cumulative += count
+            le = _seconds(LATENCY_BUCKETS_MS[bucket]) if bucket < len(LATENCY_BUCKETS_MS) else '+Inf'
+            lines.append(f'ai_generation_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+        lines.append(f'ai_generation_stage_seconds_sum{{stage="{stage}"}} {_seconds(histogram["total_ms"])}')
+        lines.append(f'ai_generation_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+    
+    lines += ['# HELP ai_requests_total AI generation requests by outcome.', '# TYPE ai_requests_total counter']
+    requests = AILogRollup.objects.values('status').annotate(requests=Sum('requests')).order_by('status')
+    for row in requests:
+        lines.append(f'ai_requests_total{{status="{row["status"]}"}} {row["requests"]}')
+    
+    tokens = _token_totals()
+    lines += [
+        '# HELP ai_ollama_eval_tokens_total Tokens generated by Ollama.',
+        '# TYPE ai_ollama_eval_tokens_total counter',
+        f'ai_ollama_eval_tokens_total {tokens["eval_tokens"]}',
+        '# HELP ai_ollama_eval_seconds_total Time Ollama spent generating tokens.',
+        '# TYPE ai_ollama_eval_seconds_total counter',
+        f'ai_ollama_eval_seconds_total {_seconds(tokens["eval_ms"])}',
+        '# HELP ai_ollama_prompt_tokens_total Prompt tokens evaluated by Ollama.',
+        '# TYPE ai_ollama_prompt_tokens_total counter',
+        f'ai_ollama_prompt_tokens_total {tokens["prompt_tokens"]}',
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+def rebuild_rollups(since: Optional[datetime] = None) -> int:
+
+    # Recomputes the rollups from raw logs, e.g. after deploying these tables
+    # or fixing a writer that bypassed save(). Rollups older than the raw logs
+    # kept by cleanup_old_ai_logs are left alone.
+    from .models import AILog
+    
+    since = since or AILog.objects.order_by('created_at').values_list('created_at', flat=True).first()
+    if since is None:
+        return 0
+    
+    # Error counters are daily, so rebuild whole days
+    since = timezone.localtime(since).replace(hour=0, minute=0, second=0, microsecond=0)
+    logs = AILog.objects.filter(created_at__gte=since)
+    
+    rollups = [
+        AILogRollup(
+            hour=row['hour'],
+            status=row['status'],
+            requests=row['requests'],
+            timed_requests=row['timed'],
+            response_time_total_ms=row['time_total'] or 0,
+        )
+        for row in logs.annotate(hour=TruncHour('created_at', tzinfo=dt_timezone.utc)).values('hour', 'status').annotate(
+            requests=models.Count('id'),
+            timed=models.Count('response_time_ms'),
+            time_total=Sum('response_time_ms'),
+        ).order_by()
+    ]
+    
+    errors: Dict[Tuple, int] = {}
+    messages: Dict[str, str] = {}
+    failed = logs.filter(status__in=ERROR_STATUSES).values_list('created_at', 'validation_errors')
+    for created_at, validation_errors in failed.iterator():
+        day = timezone.localdate(created_at)
+        for message, count in _count_errors([validation_errors]).items():
+            key = (day, message_hash(message))
+            messages[key[1]] = message
+            errors[key] = errors.get(key, 0) + count
+    
+    with transaction.atomic():
+        AILogRollup.objects.filter(hour__gte=since).delete()
+        AIErrorCount.objects.filter(day__gte=since.date()).delete()
+        AILogRollup.objects.bulk_create(rollups, batch_size=500)
+        AIErrorCount.objects.bulk_create(
+            [
+                AIErrorCount(day=day, message_hash=digest, message=messages[digest], occurrences=count)
+                for (day, digest), count in errors.items()
+            ],
+            batch_size=500,
+        )
+    
+    logger.info(f"AI analytics rebuilt: {len(rollups)} hourly rollups, {len(errors)} error counters")
+    return len(rollups)
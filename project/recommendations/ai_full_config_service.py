@@ -9,6 +9,8 @@ from typing import Dict, Any, Optional, List, Tuple
 from django.utils import timezone
 from django.db.models import Q
 
+from .ai_timing import generation_trace, record_ollama, stage
+
 logger = logging.getLogger(__name__)
 
 
@@ -405,86 +407,89 @@ class AIFullConfigService:
     
     def _call_ai_model(self, prompt: str) -> Optional[str]:
         
-        try:
-            logger.info("Trying AI server at localhost:5050...")
-            payload = {
-                "prompt": prompt,
-                "use_learning": True
-            }
-            
-            response = requests.post(AI_SERVER_URL, json=payload, timeout=120)
-            
-            if response.status_code == 200:
-                data = response.json()
-                ai_response = data.get("response", "")
-                if ai_response and len(ai_response) > 100:
-                    logger.info(f"AI server responded with {len(ai_response)} characters")
-                    return ai_response
-                    
-        except requests.exceptions.ConnectionError:
-            logger.warning("AI server not available, trying Ollama directly...")
-        except Exception as e:
-            logger.warning(f"AI server error: {e}, trying Ollama directly...")
-        
-        
-        try:
-            payload = {
-                "model": MODEL_NAME,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.4,
-                    "top_p": 0.9,
-                    "num_predict": 8192,
+        with stage('ai_server'):
+            try:
+                logger.info("Trying AI server at localhost:5050...")
+                payload = {
+                    "prompt": prompt,
+                    "use_learning": True
                 }
-            }
-            
-            logger.info(f"Calling Ollama directly with model: {MODEL_NAME}")
-            
-            response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
+                
+                response = requests.post(AI_SERVER_URL, json=payload, timeout=120)
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    ai_response = data.get("response", "")
+                    if ai_response and len(ai_response) > 100:
+                        logger.info(f"AI server responded with {len(ai_response)} characters")
+                        return ai_response
+            
+            except requests.exceptions.ConnectionError:
+                logger.warning("AI server not available, trying Ollama directly...")
+            except Exception as e:
+                logger.warning(f"AI server error: {e}, trying Ollama directly...")
+        
+        
+        with stage('ollama'):
+            try:
+                payload = {
+                    "model": MODEL_NAME,
+                    "prompt": prompt,
+                    "stream": False,
+                    "options": {
+                        "temperature": 0.4,
+                        "top_p": 0.9,
+                        "num_predict": 8192,
+                    }
+                }
+                
+                logger.info(f"Calling Ollama directly with model: {MODEL_NAME}")
+                
+                response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    record_ollama(data)
+                    ai_response = data.get("response", "")
+                    logger.info(f"Ollama responded with {len(ai_response)} characters")
+                    return ai_response
+                else:
+                    logger.error(f"Ollama error: {response.status_code} - {response.text}")
+                    return None
             
-            if response.status_code == 200:
-                data = response.json()
-                ai_response = data.get("response", "")
-                logger.info(f"Ollama responded with {len(ai_response)} characters")
-                return ai_response
-            else:
-                logger.error(f"Ollama error: {response.status_code} - {response.text}")
+            except requests.exceptions.ConnectionError:
+                logger.error("Cannot connect to Ollama. Is it running?")
+                return None
+            except requests.exceptions.Timeout:
+                logger.error("Ollama request timed out")
+                return None
+            except Exception as e:
+                logger.error(f"Error calling Ollama: {e}")
                 return None
                 
-        except requests.exceptions.ConnectionError:
-            logger.error("Cannot connect to Ollama. Is it running?")
-            return None
-        except requests.exceptions.Timeout:
-            logger.error("Ollama request timed out")
-            return None
-        except Exception as e:
-            logger.error(f"Error calling Ollama: {e}")
-            return None
-            
-            logger.info(f"Calling AI model: {MODEL_NAME}")
-            logger.debug(f"Prompt length: {len(prompt)} characters")
-            
-            response = requests.post(OLLAMA_API_URL, json=payload, timeout=600)
+                logger.info(f"Calling AI model: {MODEL_NAME}")
+                logger.debug(f"Prompt length: {len(prompt)} characters")
+                
+                response = requests.post(OLLAMA_API_URL, json=payload, timeout=600)
+                
+                if response.status_code == 200:
+                    data = response.json()
+                    ai_response = data.get("response", "")
+                    logger.info(f"AI responded with {len(ai_response)} characters")
+                    return ai_response
+                else:
+                    logger.error(f"AI model error: {response.status_code} - {response.text}")
+                    return None
             
-            if response.status_code == 200:
-                data = response.json()
-                ai_response = data.get("response", "")
-                logger.info(f"AI responded with {len(ai_response)} characters")
-                return ai_response
-            else:
-                logger.error(f"AI model error: {response.status_code} - {response.text}")
+            except requests.exceptions.ConnectionError:
+                logger.error("Cannot connect to Ollama. Is it running?")
+                return None
+            except requests.exceptions.Timeout:
+                logger.error("AI request timed out (600s)")
+                return None
+            except Exception as e:
+                logger.error(f"Error calling AI model: {e}")
                 return None
-                
-        except requests.exceptions.ConnectionError:
-            logger.error("Cannot connect to Ollama. Is it running?")
-            return None
-        except requests.exceptions.Timeout:
-            logger.error("AI request timed out (600s)")
-            return None
-        except Exception as e:
-            logger.error(f"Error calling AI model: {e}")
-            return None
     
     def _parse_ai_response(self, response: str) -> Optional[Dict[str, Any]]:
         
@@ -934,6 +939,16 @@ class AIFullConfigService:
     
     def generate_full_configuration(self, user) -> Tuple[Optional[Any], Optional[Any], Dict]:
     
+        with generation_trace() as trace:
+            configuration, workspace, info = self._generate_full_configuration(user)
+        
+        info['stage_timings_ms'] = trace.timings()
+        if trace.tokens_per_second:
+            info['tokens_per_second'] = trace.tokens_per_second
+        return configuration, workspace, info
+    
+    def _generate_full_configuration(self, user) -> Tuple[Optional[Any], Optional[Any], Dict]:
+
         from recommendations.models import PCConfiguration, Recommendation, WorkspaceSetup
         from peripherals.models import Monitor, Keyboard, Mouse, Headset, Mousepad, Webcam, Microphone, Speakers, Desk, Chair
         from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
@@ -943,25 +958,29 @@ class AIFullConfigService:
         logger.info(f"Include peripherals: {self.include_peripherals}, Include workspace: {self.include_workspace}")
         
         
-        prompt = self._build_full_prompt()
+        with stage('prompt_build'):
+            prompt = self._build_full_prompt()
         ai_response = self._call_ai_model(prompt)
         
         
         parsed = {}
         if ai_response:
-            parsed = self._parse_ai_response(ai_response) or {}
+            with stage('json_parse'):
+                parsed = self._parse_ai_response(ai_response) or {}
         
        
         if not parsed:
             logger.warning("AI response empty or failed to parse, generating from trained data")
-            parsed = self._generate_from_trained_data()
+            with stage('fallback'):
+                parsed = self._generate_from_trained_data()
         
         confidence = parsed.get('confidence', 0.85) if parsed else 0.7
         
         
         is_compatible, compat_issues = True, []
         if parsed:
-            is_compatible, compat_issues = self._check_compatibility(parsed)
+            with stage('validation'):
+                is_compatible, compat_issues = self._check_compatibility(parsed)
             if not is_compatible:
                 logger.warning(f"Compatibility issues: {compat_issues}")
         
@@ -982,9 +1001,11 @@ class AIFullConfigService:
             for spec_key, model_class, component_key in pc_mapping:
                 if spec_key in parsed and parsed[spec_key]:
                     spec = parsed[spec_key].copy()
-                    is_valid, _ = self._validate_component_spec(spec_key, spec)
+                    with stage('validation'):
+                        is_valid, _ = self._validate_component_spec(spec_key, spec)
                     if is_valid:
-                        component = self._create_component_from_spec(model_class, spec, confidence)
+                        with stage('component_creation'):
+                            component = self._create_component_from_spec(model_class, spec, confidence)
                         if component:
                             pc_components[component_key] = component
             
@@ -995,7 +1016,8 @@ class AIFullConfigService:
             if missing:
                 logger.warning(f"Missing required components: {missing}")
                 
-                default_specs = self._generate_from_trained_data()
+                with stage('fallback'):
+                    default_specs = self._generate_from_trained_data()
                 
                 
                 pc_mapping_dict = {ck: (sk, mc) for sk, mc, ck in pc_mapping}
@@ -1006,7 +1028,8 @@ class AIFullConfigService:
                         
                         if spec_key in default_specs and default_specs[spec_key]:
                             spec = default_specs[spec_key].copy()
-                            component = self._create_component_from_spec(model_class, spec, confidence)
+                            with stage('component_creation'):
+                                component = self._create_component_from_spec(model_class, spec, confidence)
                             if component:
                                 pc_components[component_key] = component
                                 logger.info(f"Generated missing {component_key} from trained data")
@@ -1020,38 +1043,41 @@ class AIFullConfigService:
             optional = ['gpu', 'psu', 'case', 'cooling']
             for component_key in optional:
                 if component_key not in pc_components:
-                    default_specs = self._generate_from_trained_data()
+                    with stage('fallback'):
+                        default_specs = self._generate_from_trained_data()
                     if component_key in default_specs and default_specs[component_key]:
                         spec = default_specs[component_key].copy()
                         for sk, mc, ck in pc_mapping:
                             if ck == component_key:
-                                component = self._create_component_from_spec(mc, spec, confidence)
+                                with stage('component_creation'):
+                                    component = self._create_component_from_spec(mc, spec, confidence)
                                 if component:
                                     pc_components[component_key] = component
                                 break
             
             
-            config = PCConfiguration.objects.create(
-                user=user,
-                name=f"AI-сборка для {self.user_type}",
-                **pc_components
-            )
-            config.calculate_total_price()
-            config.compatibility_check = is_compatible
-            config.compatibility_notes = "\n".join(compat_issues) if compat_issues else "[OK] Все компоненты совместимы"
-            config.save()
-            
-            
-            reasoning = parsed.get('reasoning', {})
-            for component_type, reason in reasoning.items():
-                if component_type in pc_components:
-                    component = pc_components[component_type]
-                    Recommendation.objects.create(
-                        configuration=config,
-                        component_type=component_type,
-                        component_id=component.id,
-                        reason=str(reason)
-                    )
+            with stage('persistence'):
+                config = PCConfiguration.objects.create(
+                    user=user,
+                    name=f"AI-сборка для {self.user_type}",
+                    **pc_components
+                )
+                config.calculate_total_price()
+                config.compatibility_check = is_compatible
+                config.compatibility_notes = "\n".join(compat_issues) if compat_issues else "[OK] Все компоненты совместимы"
+                config.save()
+                
+
+                reasoning = parsed.get('reasoning', {})
+                for component_type, reason in reasoning.items():
+                    if component_type in pc_components:
+                        component = pc_components[component_type]
+                        Recommendation.objects.create(
+                            configuration=config,
+                            component_type=component_type,
+                            component_id=component.id,
+                            reason=str(reason)
+                        )
             
             
             peripherals = {}
@@ -1072,16 +1098,19 @@ class AIFullConfigService:
                 for spec_key, model_class in peripherals_mapping:
                     if spec_key in parsed and parsed[spec_key]:
                         spec = parsed[spec_key].copy()
-                        is_valid, _ = self._validate_component_spec(spec_key, spec)
+                        with stage('validation'):
+                            is_valid, _ = self._validate_component_spec(spec_key, spec)
                         if is_valid:
-                            component = self._create_component_from_spec(model_class, spec, confidence)
+                            with stage('component_creation'):
+                                component = self._create_component_from_spec(model_class, spec, confidence)
                             if component:
                                 peripherals[spec_key] = component
                 
                 
                 if not peripherals:
                     logger.info("No peripherals from AI, generating from knowledge base")
-                    peripherals = self._generate_default_peripherals()
+                    with stage('component_creation'):
+                        peripherals = self._generate_default_peripherals()
             
             
             workspace_components = {}
@@ -1094,16 +1123,19 @@ class AIFullConfigService:
                 for spec_key, model_class in workspace_mapping:
                     if spec_key in parsed and parsed[spec_key]:
                         spec = parsed[spec_key].copy()
-                        is_valid, _ = self._validate_component_spec(spec_key, spec)
+                        with stage('validation'):
+                            is_valid, _ = self._validate_component_spec(spec_key, spec)
                         if is_valid:
-                            component = self._create_component_from_spec(model_class, spec, confidence)
+                            with stage('component_creation'):
+                                component = self._create_component_from_spec(model_class, spec, confidence)
                             if component:
                                 workspace_components[spec_key] = component
                 
                 
                 if not workspace_components:
                     logger.info("No workspace from AI, generating from knowledge base")
-                    workspace_components = self._generate_default_workspace()
+                    with stage('component_creation'):
+                        workspace_components = self._generate_default_workspace()
             
             
             if peripherals or workspace_components:
@@ -1137,8 +1169,9 @@ class AIFullConfigService:
                 if 'chair' in workspace_components:
                     workspace_data['chair'] = workspace_components['chair']
                 
-                workspace_setup = WorkspaceSetup.objects.create(**workspace_data)
-                workspace_setup.calculate_total_price()
+                with stage('persistence'):
+                    workspace_setup = WorkspaceSetup.objects.create(**workspace_data)
+                    workspace_setup.calculate_total_price()
                 logger.info(f"[OK] Created WorkspaceSetup: {workspace_setup.name}")
             
             
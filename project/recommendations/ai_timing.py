@@ -0,0 +1,119 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from django.db import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+STAGES = (
+    'prompt_build', 'ai_server', 'ollama', 'json_parse', 'fallback',
+    'validation', 'component_creation', 'persistence', 'total',
+)
+
+
+class GenerationTrace:
+
+    # Wall-clock time per stage of one AI generation. A stage entered more
+    # than once (validation of every component, say) accumulates.
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.eval_count: Optional[int] = None
+        self.eval_duration_ms: Optional[float] = None
+        self.prompt_eval_count: Optional[int] = None
+    
+    @contextmanager
+    def stage(self, name: str):
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - started) * 1000
+    
+    def record_ollama(self, data: Dict) -> None:
+
+        # Ollama reports durations in nanoseconds
+        eval_count, eval_duration = data.get('eval_count'), data.get('eval_duration')
+        if eval_count and eval_duration:
+            self.eval_count = (self.eval_count or 0) + int(eval_count)
+            self.eval_duration_ms = (self.eval_duration_ms or 0.0) + eval_duration / 1e6
+        if data.get('prompt_eval_count'):
+            self.prompt_eval_count = (self.prompt_eval_count or 0) + int(data['prompt_eval_count'])
+    
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+
+        if not self.eval_count or not self.eval_duration_ms:
+            return None
+        return round(self.eval_count / (self.eval_duration_ms / 1000), 2)
+    
+    @property
+    def total_ms(self) -> float:
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+    
+    def finish(self) -> None:
+
+        if self.finished is None:
+            self.finished = time.perf_counter()
+            self.stages['total'] = self.total_ms
+    
+    def timings(self) -> Dict[str, int]:
+
+        timings = {name: round(ms) for name, ms in self.stages.items()}
+        timings.setdefault('total', round(self.total_ms))
+        return timings
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar('ai_generation_trace', default=None)
+
+
+def current_trace() -> Optional[GenerationTrace]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    with trace.stage(name):
+        yield
+
+
+def record_ollama(data: Dict) -> None:
+
+    trace = _current.get()
+    if trace is not None:
+        trace.record_ollama(data)
+
+
+@contextmanager
+def generation_trace():
+
+    # Nested calls (the Celery task around the service) share the outer
+    # trace; only the outermost one is written to the stage histograms
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    
+    trace = GenerationTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        trace.finish()
+        try:
+            from .ai_analytics import record_trace
+            record_trace(trace)
+        except DatabaseError as e:
+            logger.warning(f"AI stage timings not recorded: {e}")
@@ -0,0 +1,355 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_DATA_PATH = Path(__file__).resolve().parent / 'data' / 'benchmarks.json'
+
+REQUIRED_FIELDS = {
+    'cpu': ('single', 'multi'),
+    'gpu': ('timespy', 'firestrike', 'port_royal'),
+    'games': ('1080p', '1440p', '4k'),
+}
+
+
+class BenchmarkDataError(Exception):
+    pass
+
+
+MODEL_PATTERNS = [
+    re.compile(r'(RTX\s*\d{4}(?:\s*Ti)?(?:\s*Super)?)', re.IGNORECASE),
+    re.compile(r'(RX\s*\d{4}\s*(?:XTX|XT|GRE)?)', re.IGNORECASE),
+    re.compile(r'(Arc\s*A\d{3})', re.IGNORECASE),
+    re.compile(r'(i[3579]-\d{4,5}[A-Z]*)', re.IGNORECASE),
+    re.compile(r'(Ryzen\s*[3579]\s*\d{4}[A-Z0-9]*)', re.IGNORECASE),
+]
+
+
+MATCH_CONFIDENCE = {
+    'exact': 1.0,
+    'model': 0.9,
+    'substring': 0.6,
+}
+
+
+def extract_model(name: str) -> Optional[str]:
+
+    for pattern in MODEL_PATTERNS:
+        match = pattern.search(name)
+        if match:
+            return match.group(1)
+    return None
+
+
+def normalize_model_key(model: str) -> str:
+
+    return re.sub(r'[\s\-]+', '', model.lower())
+
+
+class BenchmarkIndex:
+
+    PERCENTILE_FIELDS = {
+        'cpu_single': ('cpu', 'single'),
+        'cpu_multi': ('cpu', 'multi'),
+        'gpu_timespy': ('gpu', 'timespy'),
+        'gpu_firestrike': ('gpu', 'firestrike'),
+        'gpu_rt': ('gpu', 'port_royal'),
+    }
+    
+    NAME_CACHE_SIZE = 4096
+    
+    def __init__(self, cpu_benchmarks: Dict[str, Dict], gpu_benchmarks: Dict[str, Dict]):
+        self.databases = {'cpu': cpu_benchmarks, 'gpu': gpu_benchmarks}
+        
+
+        self._exact = {
+            kind: {name.lower(): name for name in database}
+            for kind, database in self.databases.items()
+        }
+        
+
+        self._models = {}
+        for kind, database in self.databases.items():
+            models_index = {}
+            for name in database:
+                model = extract_model(name)
+                if model:
+                    models_index.setdefault(normalize_model_key(model), name)
+            self._models[kind] = models_index
+        
+
+        self._sorted_scores = {
+            category: sorted(entry[field] for entry in self.databases[kind].values())
+            for category, (kind, field) in self.PERCENTILE_FIELDS.items()
+        }
+        
+        self.resolve = lru_cache(maxsize=self.NAME_CACHE_SIZE)(self._resolve)
+    
+    def find_match(self, kind: str, name: str) -> Optional[str]:
+
+        return self.resolve(kind, name)[0]
+    
+    def _resolve(self, kind: str, name: str) -> Tuple[Optional[str], float]:
+
+        if not name or kind not in self.databases:
+            return None, 0.0
+        
+        exact = self._exact[kind].get(name.lower())
+        if exact:
+            return exact, MATCH_CONFIDENCE['exact']
+        
+        models_index = self._models[kind]
+        model = extract_model(name)
+        if model:
+            matched = models_index.get(normalize_model_key(model))
+            if matched:
+                return matched, MATCH_CONFIDENCE['model']
+        
+
+        # Vendor suffixes ("i9-14900KF", "RTX 4070 OC") miss the exact key -
+        # fall back to a substring scan; the LRU keeps this off the hot path.
+        normalized_name = normalize_model_key(name)
+        for key, db_name in models_index.items():
+            if key in normalized_name:
+                return db_name, MATCH_CONFIDENCE['substring']
+        
+        return None, 0.0
+    
+    def percentile(self, score: float, category: str) -> float:
+
+        scores = self._sorted_scores.get(category)
+        if not scores:
+            return 50.0
+        
+        below = bisect_left(scores, score)
+        return round((below / len(scores)) * 100, 1)
+    
+    def cache_info(self):
+        return self.resolve.cache_info()
+
+
+@dataclass(frozen=True)
+class GameCoefficientMatrix:
+
+    games: Tuple[str, ...]
+    resolutions: Tuple[str, ...]
+    base_fps: np.ndarray  # shape: games x resolutions
+    rt_penalty: np.ndarray
+    cpu_bound: np.ndarray
+    stability_factor: np.ndarray
+    resolution_cpu_modifier: np.ndarray  # shape: resolutions
+    
+    RESOLUTIONS = ('1080p', '1440p', '4k')
+    RESOLUTION_CPU_MODIFIER = {'1080p': 1.0, '1440p': 0.75, '4k': 0.5}
+    # Games without an rt_penalty have no ray tracing
+    DEFAULT_RT_PENALTY = 1.0
+    
+    @classmethod
+    def from_games(cls, games: Dict[str, Dict]) -> 'GameCoefficientMatrix':
+
+        names = tuple(games.keys())
+        base_fps = np.array([
+            [data.get(res, data.get('1080p', 60)) for res in cls.RESOLUTIONS]
+            for data in games.values()
+        ], dtype=np.float64).reshape(len(names), len(cls.RESOLUTIONS))
+        
+        return cls(
+            games=names,
+            resolutions=cls.RESOLUTIONS,
+            base_fps=base_fps,
+            rt_penalty=np.array([d.get('rt_penalty', cls.DEFAULT_RT_PENALTY) for d in games.values()], dtype=np.float64),
+            cpu_bound=np.array([d.get('cpu_bound', 0.35) for d in games.values()], dtype=np.float64),
+            stability_factor=np.array([d.get('stability_factor', 0.75) for d in games.values()], dtype=np.float64),
+            resolution_cpu_modifier=np.array(
+                [cls.RESOLUTION_CPU_MODIFIER[res] for res in cls.RESOLUTIONS], dtype=np.float64
+            ),
+        )
+
+
+@dataclass
+class BenchmarkDataset:
+
+    version: str
+    cpu: Dict[str, Dict]
+    gpu: Dict[str, Dict]
+    games: Dict[str, Dict]
+    reference: Dict[str, float] = field(default_factory=dict)
+    source: Optional[str] = None
+    
+    def __post_init__(self):
+        self.index = BenchmarkIndex(self.cpu, self.gpu)
+        self.game_matrix = GameCoefficientMatrix.from_games(self.games)
+    
+    @property
+    def reference_gpu_score(self) -> float:
+        return self.reference.get('gpu_timespy', 36500)
+    
+    @property
+    def reference_cpu_score(self) -> float:
+        return self.reference.get('cpu_single', 2320)
+    
+    @classmethod
+    def from_dict(cls, data: Dict, source: Optional[str] = None) -> 'BenchmarkDataset':
+
+        if not isinstance(data, dict):
+            raise BenchmarkDataError('Benchmark data must be a JSON object')
+        
+        version = data.get('version')
+        if not version:
+            raise BenchmarkDataError('Benchmark data has no version')
+        
+        for section, fields in REQUIRED_FIELDS.items():
+            entries = data.get(section)
+            if not entries or not isinstance(entries, dict):
+                raise BenchmarkDataError(f'Section "{section}" is missing or empty')
+            for name, entry in entries.items():
+                missing = [f for f in fields if f not in entry]
+                if missing:
+                    raise BenchmarkDataError(f'{section} "{name}": missing {", ".join(missing)}')
+        
+        return cls(
+            version=str(version),
+            cpu=data['cpu'],
+            gpu=data['gpu'],
+            games=data['games'],
+            reference=data.get('reference', {}),
+            source=source,
+        )
+    
+    @classmethod
+    def load(cls, path) -> 'BenchmarkDataset':
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            raise BenchmarkDataError(f'Cannot read benchmark data {path}: {e}') from e
+        return cls.from_dict(data, source=str(path))
+    
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.version,
+            'reference': self.reference,
+            'cpu': self.cpu,
+            'gpu': self.gpu,
+            'games': self.games,
+        }
+    
+    def save(self, path) -> None:
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+                f.write('\n')
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class BenchmarkDatasetRegistry:
+
+    def __init__(self, path=None, check_interval: Optional[float] = None):
+        self._path = path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._dataset: Optional[BenchmarkDataset] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+    
+    @property
+    def path(self) -> Path:
+        path = Path(self._path or getattr(settings, 'BENCHMARK_DATA_PATH', DEFAULT_DATA_PATH))
+        if not path.is_absolute():
+            path = Path(settings.BASE_DIR) / path
+        return path
+    
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is not None:
+            return self._check_interval
+        return getattr(settings, 'BENCHMARK_RELOAD_INTERVAL', 30)
+    
+    def get(self) -> BenchmarkDataset:
+
+        now = time.monotonic()
+        if self._dataset is not None and now - self._checked_at < self.check_interval:
+            return self._dataset
+        
+        with self._lock:
+            if self._dataset is None or now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                self._reload_if_changed()
+        return self._dataset
+    
+    def reload(self) -> BenchmarkDataset:
+
+        with self._lock:
+            self._checked_at = time.monotonic()
+            self._mtime = None
+            self._reload_if_changed()
+        return self._dataset
+    
+    def _reload_if_changed(self) -> None:
+        path = self.path
+        try:
+            mtime = path.stat().st_mtime
+        except OSError as e:
+            if self._dataset is None:
+                raise BenchmarkDataError(f'Benchmark data not found: {path}') from e
+            logger.error(f"Benchmark data disappeared, keeping version {self._dataset.version}: {e}")
+            return
+        
+        if self._dataset is not None and mtime == self._mtime:
+            return
+        
+        try:
+            dataset = BenchmarkDataset.load(path)
+        except BenchmarkDataError as e:
+            if self._dataset is None:
+                raise
+            logger.error(f"Benchmark data reload failed, keeping version {self._dataset.version}: {e}")
+            return
+        
+        if self._dataset is not None and self._dataset.version != dataset.version:
+            logger.info(f"Benchmark data reloaded: {self._dataset.version} -> {dataset.version}")
+        
+        self._dataset = dataset
+        self._mtime = mtime
+
+
+registry = BenchmarkDatasetRegistry()
+
+
+def get_benchmark_dataset() -> BenchmarkDataset:
+
+    return registry.get()
+
+
+def get_benchmark_index() -> 'BenchmarkIndex':
+
+    return registry.get().index
+
+
+def get_game_matrix() -> 'GameCoefficientMatrix':
+
+    return registry.get().game_matrix
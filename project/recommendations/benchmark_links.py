@@ -0,0 +1,80 @@
+import logging
+from typing import Dict, Optional
+
+from django.db.models import Q
+
+from computers.caching import bump_catalog_version
+from computers.models import CPU, GPU
+from .benchmark_data import BenchmarkDataset, get_benchmark_dataset
+
+logger = logging.getLogger(__name__)
+
+
+LINKED_MODELS = {
+    'cpu': CPU,
+    'gpu': GPU,
+}
+
+BATCH_SIZE = 500
+
+
+def link_component(component, kind: str, dataset: Optional[BenchmarkDataset] = None) -> bool:
+
+    dataset = dataset or get_benchmark_dataset()
+    key, confidence = dataset.index.resolve(kind, component.name)
+    
+    changed = (
+        component.benchmark_key != (key or '')
+        or component.benchmark_confidence != confidence
+        or component.benchmark_version != dataset.version
+    )
+    component.benchmark_key = key or ''
+    component.benchmark_confidence = confidence
+    component.benchmark_version = dataset.version
+    return changed
+
+
+def link_components(kind: str, force: bool = False, dataset: Optional[BenchmarkDataset] = None) -> Dict[str, int]:
+
+    dataset = dataset or get_benchmark_dataset()
+    model = LINKED_MODELS[kind]
+    
+    queryset = model.objects.only('id', 'name', 'benchmark_key', 'benchmark_confidence', 'benchmark_version')
+    if not force:
+        # Only rows added since the last run or linked against an older dataset
+        queryset = queryset.filter(~Q(benchmark_version=dataset.version))
+    
+    stats = {'checked': 0, 'updated': 0, 'matched': 0, 'unmatched': 0}
+    batch = []
+    
+    for component in queryset.iterator(chunk_size=BATCH_SIZE):
+        stats['checked'] += 1
+        if link_component(component, kind, dataset):
+            batch.append(component)
+        stats['matched' if component.benchmark_key else 'unmatched'] += 1
+        
+        if len(batch) >= BATCH_SIZE:
+            model.objects.bulk_update(batch, ['benchmark_key', 'benchmark_confidence', 'benchmark_version'])
+            stats['updated'] += len(batch)
+            batch = []
+    
+    if batch:
+        model.objects.bulk_update(batch, ['benchmark_key', 'benchmark_confidence', 'benchmark_version'])
+        stats['updated'] += len(batch)
+    
+    # bulk_update sends no post_save, so cached catalog responses and
+    # snapshots would keep serving the old links
+    if stats['updated']:
+        bump_catalog_version(model)
+    
+    logger.info(
+        f"Linked {kind.upper()} catalog to benchmarks {dataset.version}: "
+        f"{stats['checked']} checked, {stats['updated']} updated, {stats['unmatched']} unmatched"
+    )
+    return stats
+
+
+def link_catalog(force: bool = False) -> Dict[str, Dict[str, int]]:
+
+    dataset = get_benchmark_dataset()
+    return {kind: link_components(kind, force=force, dataset=dataset) for kind in LINKED_MODELS}
@@ -3,17 +3,27 @@ import hashlib
 import json
 import logging
 import re
+import threading
+from collections import Counter
 from dataclasses import dataclass, asdict
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 from enum import Enum
 
-from django.core.cache import cache
+import numpy as np
+
+from django.core.cache import caches
 from django.conf import settings
 
+from .benchmark_data import BenchmarkDataset, GameCoefficientMatrix, get_benchmark_dataset
+
 logger = logging.getLogger(__name__)
 
 
+# Component name or a catalog CPU/GPU row linked to the benchmark dataset
+ComponentRef = Any
+
+
 class BenchmarkType(Enum):
     CINEBENCH_R23_SINGLE = "cinebench_r23_single"
     CINEBENCH_R23_MULTI = "cinebench_r23_multi"
@@ -60,226 +70,119 @@ class GameFPSPrediction:
         return asdict(self)
 
 
-class BenchmarkDatabase:
+@dataclass
+class FPSGrid:
+
+    games: List[str]
+    resolutions: List[str]
+    ray_tracing: List[bool]
+    upscaling: List[Optional[str]]
+    predicted_fps: np.ndarray  # shape: games x resolutions x ray_tracing x upscaling
+    fps_1_low: np.ndarray
+    confidence: np.ndarray  # shape: ray_tracing x upscaling
+    rt_supported: np.ndarray  # shape: games
+    
+    def get(
+        self,
+        game: str,
+        resolution: str,
+        ray_tracing: bool = False,
+        dlss_fsr: Optional[str] = None
+    ) -> Optional[GameFPSPrediction]:
 
-    CPU_BENCHMARKS = {
+        try:
+            g = self.games.index(game)
+            r = self.resolutions.index(resolution)
+            t = self.ray_tracing.index(ray_tracing)
+            u = self.upscaling.index(dlss_fsr)
+        except ValueError:
+            return None
+        return self._prediction(g, r, t, u)
+    
+    def to_predictions(
+        self,
+        resolution: str,
+        ray_tracing: Optional[bool] = False,
+        dlss_fsr: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[GameFPSPrediction]:
 
-        "AMD Ryzen 9 9950X": {"single": 2280, "multi": 42000},
-        "AMD Ryzen 9 9900X": {"single": 2200, "multi": 32000},
-        "AMD Ryzen 7 9700X": {"single": 2150, "multi": 20000},
-        "AMD Ryzen 5 9600X": {"single": 2100, "multi": 14500},
+        if resolution not in self.resolutions or dlss_fsr not in self.upscaling:
+            return []
         
-
-        "AMD Ryzen 9 7950X": {"single": 2050, "multi": 38500},
-        "AMD Ryzen 9 7950X3D": {"single": 2000, "multi": 37000},
-        "AMD Ryzen 9 7900X": {"single": 2020, "multi": 29500},
-        "AMD Ryzen 9 7900X3D": {"single": 1980, "multi": 28500},
-        "AMD Ryzen 7 7800X3D": {"single": 1950, "multi": 18000},
-        "AMD Ryzen 7 7700X": {"single": 1980, "multi": 19500},
-        "AMD Ryzen 5 7600X": {"single": 1970, "multi": 15000},
-        "AMD Ryzen 5 7600": {"single": 1900, "multi": 14000},
+        r = self.resolutions.index(resolution)
+        u = self.upscaling.index(dlss_fsr)
         
 
-        "Intel Core i9-14900K": {"single": 2320, "multi": 41000},
-        "Intel Core i9-14900KS": {"single": 2400, "multi": 42500},
-        "Intel Core i7-14700K": {"single": 2200, "multi": 35000},
-        "Intel Core i5-14600K": {"single": 2100, "multi": 24000},
-        "Intel Core i5-14400": {"single": 1850, "multi": 17000},
+        rt_indices = [
+            t for t, rt in enumerate(self.ray_tracing)
+            if ray_tracing is None or rt == ray_tracing
+        ]
         
-
-        "Intel Core i9-13900K": {"single": 2250, "multi": 40000},
-        "Intel Core i7-13700K": {"single": 2100, "multi": 30000},
-        "Intel Core i5-13600K": {"single": 2000, "multi": 24500},
-
-        "Intel Core i9-12900K": {"single": 2050, "multi": 27500},
-        "Intel Core i7-12700K": {"single": 1950, "multi": 22500},
-        "Intel Core i5-12600K": {"single": 1900, "multi": 17500},
-    }
+        predictions = []
+        for g in range(len(self.games[:limit])):
+            for t in rt_indices:
+                if self.ray_tracing[t] and not self.rt_supported[g]:
+                    continue
+                predictions.append(self._prediction(g, r, t, u))
+        return predictions
     
+    def _prediction(self, g: int, r: int, t: int, u: int) -> GameFPSPrediction:
+        return GameFPSPrediction(
+            game_name=self.games[g],
+            resolution=self.resolutions[r],
+            quality_preset="Ultra",
+            predicted_fps=round(float(self.predicted_fps[g, r, t, u]), 1),
+            fps_1_low=round(float(self.fps_1_low[g, r, t, u]), 1),
+            confidence=round(float(self.confidence[t, u]), 1),
+            ray_tracing=self.ray_tracing[t],
+            dlss_fsr=self.upscaling[u]
+        )
+    
+    def to_dict(self) -> Dict:
 
-    GPU_BENCHMARKS = {
-
-        "NVIDIA GeForce RTX 5090": {"timespy": 48000, "firestrike": 85000, "port_royal": 32000},
-        "NVIDIA GeForce RTX 5080": {"timespy": 38000, "firestrike": 70000, "port_royal": 25000},
-        "NVIDIA GeForce RTX 5070 Ti": {"timespy": 32000, "firestrike": 58000, "port_royal": 20000},
-        "NVIDIA GeForce RTX 5070": {"timespy": 28000, "firestrike": 50000, "port_royal": 17000},
+        grid = {}
+        for u, mode in enumerate(self.upscaling):
+            mode_key = mode or 'native'
+            grid[mode_key] = {}
+            for t, rt in enumerate(self.ray_tracing):
+                rt_key = 'rt' if rt else 'raster'
+                grid[mode_key][rt_key] = {
+                    resolution: [p.to_dict() for p in self.to_predictions(resolution, rt, mode)]
+                    for resolution in self.resolutions
+                }
         
+        return {
+            'games': self.games,
+            'resolutions': self.resolutions,
+            'upscaling': self.upscaling,
+            'grid': grid,
+        }
 
-        "NVIDIA GeForce RTX 4090": {"timespy": 36500, "firestrike": 65000, "port_royal": 26000},
-        "NVIDIA GeForce RTX 4080 Super": {"timespy": 29000, "firestrike": 52000, "port_royal": 20500},
-        "NVIDIA GeForce RTX 4080": {"timespy": 28000, "firestrike": 50000, "port_royal": 19500},
-        "NVIDIA GeForce RTX 4070 Ti Super": {"timespy": 24500, "firestrike": 44000, "port_royal": 16500},
-        "NVIDIA GeForce RTX 4070 Ti": {"timespy": 22500, "firestrike": 41000, "port_royal": 15000},
-        "NVIDIA GeForce RTX 4070 Super": {"timespy": 21000, "firestrike": 38000, "port_royal": 13500},
-        "NVIDIA GeForce RTX 4070": {"timespy": 18000, "firestrike": 33000, "port_royal": 11000},
-        "NVIDIA GeForce RTX 4060 Ti": {"timespy": 13500, "firestrike": 26000, "port_royal": 8500},
-        "NVIDIA GeForce RTX 4060": {"timespy": 10500, "firestrike": 21000, "port_royal": 6500},
-        
 
-        "NVIDIA GeForce RTX 3090 Ti": {"timespy": 21500, "firestrike": 42000, "port_royal": 14500},
-        "NVIDIA GeForce RTX 3090": {"timespy": 19500, "firestrike": 39000, "port_royal": 13500},
-        "NVIDIA GeForce RTX 3080 Ti": {"timespy": 19000, "firestrike": 38000, "port_royal": 13000},
-        "NVIDIA GeForce RTX 3080": {"timespy": 17500, "firestrike": 35000, "port_royal": 12000},
-        "NVIDIA GeForce RTX 3070 Ti": {"timespy": 14500, "firestrike": 30000, "port_royal": 9500},
-        "NVIDIA GeForce RTX 3070": {"timespy": 13500, "firestrike": 28000, "port_royal": 8500},
-        "NVIDIA GeForce RTX 3060 Ti": {"timespy": 11500, "firestrike": 25000, "port_royal": 7000},
-        "NVIDIA GeForce RTX 3060": {"timespy": 8500, "firestrike": 20000, "port_royal": 5000},
-        
+class BenchmarkDatabase:
 
-        "AMD Radeon RX 9070 XT": {"timespy": 26000, "firestrike": 48000, "port_royal": 15000},
-        "AMD Radeon RX 9070": {"timespy": 22000, "firestrike": 42000, "port_royal": 12000},
-        
-        "AMD Radeon RX 7900 XTX": {"timespy": 24000, "firestrike": 47000, "port_royal": 14000},
-        "AMD Radeon RX 7900 XT": {"timespy": 21000, "firestrike": 42000, "port_royal": 12000},
-        "AMD Radeon RX 7900 GRE": {"timespy": 18000, "firestrike": 36000, "port_royal": 10000},
-        "AMD Radeon RX 7800 XT": {"timespy": 15000, "firestrike": 31000, "port_royal": 8000},
-        "AMD Radeon RX 7700 XT": {"timespy": 13000, "firestrike": 27000, "port_royal": 7000},
-        "AMD Radeon RX 7600 XT": {"timespy": 10000, "firestrike": 22000, "port_royal": 5000},
-        "AMD Radeon RX 7600": {"timespy": 9000, "firestrike": 20000, "port_royal": 4500},
+    def __init__(self, dataset: Optional[BenchmarkDataset] = None):
+        self.dataset = dataset or get_benchmark_dataset()
+        self.version = self.dataset.version
         
-
-        "Intel Arc A770": {"timespy": 12000, "firestrike": 24000, "port_royal": 6000},
-        "Intel Arc A750": {"timespy": 10500, "firestrike": 21000, "port_royal": 5000},
-    }
-    
-
-    GAME_BASE_FPS = {
-        "Cyberpunk 2077": {
-            "1080p": 145, "1440p": 105, "4k": 58,
-            "rt_penalty": 0.45, "cpu_bound": 0.35, "stability_factor": 0.72,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Hogwarts Legacy": {
-            "1080p": 130, "1440p": 95, "4k": 52,
-            "rt_penalty": 0.50, "cpu_bound": 0.30, "stability_factor": 0.70,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "The Last of Us Part I": {
-            "1080p": 120, "1440p": 88, "4k": 48,
-            "rt_penalty": 0.55, "cpu_bound": 0.40, "stability_factor": 0.68,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Red Dead Redemption 2": {
-            "1080p": 155, "1440p": 115, "4k": 65,
-            "rt_penalty": 0.60, "cpu_bound": 0.45, "stability_factor": 0.75,
-            "vram_req": {"1080p": 6, "1440p": 8, "4k": 10}
-        },
-        "Alan Wake 2": {
-            "1080p": 95, "1440p": 65, "4k": 35,
-            "rt_penalty": 0.35, "cpu_bound": 0.25, "stability_factor": 0.65,
-            "vram_req": {"1080p": 10, "1440p": 12, "4k": 16}
-        },
-        "Starfield": {
-            "1080p": 110, "1440p": 80, "4k": 45,
-            "rt_penalty": 0.70, "cpu_bound": 0.50, "stability_factor": 0.68,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Baldur's Gate 3": {
-            "1080p": 140, "1440p": 105, "4k": 60,
-            "rt_penalty": 0.80, "cpu_bound": 0.55, "stability_factor": 0.78,
-            "vram_req": {"1080p": 6, "1440p": 8, "4k": 10}
-        },
-        "Call of Duty: Modern Warfare III": {
-            "1080p": 195, "1440p": 155, "4k": 95,
-            "rt_penalty": 0.55, "cpu_bound": 0.40, "stability_factor": 0.80,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Forza Horizon 5": {
-            "1080p": 175, "1440p": 140, "4k": 90,
-            "rt_penalty": 0.60, "cpu_bound": 0.35, "stability_factor": 0.82,
-            "vram_req": {"1080p": 6, "1440p": 8, "4k": 10}
-        },
-        "Elden Ring": {
-            "1080p": 60, "1440p": 60, "4k": 60,  # Locked 60 FPS
-            "rt_penalty": 1.0, "cpu_bound": 0.30, "stability_factor": 0.85,
-            "vram_req": {"1080p": 4, "1440p": 6, "4k": 8}
-        },
-        "Counter-Strike 2": {
-            "1080p": 450, "1440p": 350, "4k": 200,
-            "rt_penalty": 1.0, "cpu_bound": 0.75, "stability_factor": 0.80,
-            "vram_req": {"1080p": 4, "1440p": 6, "4k": 8}
-        },
-        "Valorant": {
-            "1080p": 550, "1440p": 420, "4k": 250,
-            "rt_penalty": 1.0, "cpu_bound": 0.80, "stability_factor": 0.85,
-            "vram_req": {"1080p": 2, "1440p": 4, "4k": 6}
-        },
-        "Apex Legends": {
-            "1080p": 280, "1440p": 210, "4k": 125,
-            "rt_penalty": 1.0, "cpu_bound": 0.55, "stability_factor": 0.78,
-            "vram_req": {"1080p": 6, "1440p": 8, "4k": 10}
-        },
-        "GTA V": {
-            "1080p": 185, "1440p": 145, "4k": 85,
-            "rt_penalty": 1.0, "cpu_bound": 0.50, "stability_factor": 0.80,
-            "vram_req": {"1080p": 4, "1440p": 6, "4k": 8}
-        },
-        "Minecraft (Shaders)": {
-            "1080p": 200, "1440p": 150, "4k": 80,
-            "rt_penalty": 0.40, "cpu_bound": 0.60, "stability_factor": 0.70,
-            "vram_req": {"1080p": 6, "1440p": 8, "4k": 12}
-        },
-        "Microsoft Flight Simulator": {
-            "1080p": 85, "1440p": 65, "4k": 38,
-            "rt_penalty": 0.85, "cpu_bound": 0.65, "stability_factor": 0.72,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Avatar: Frontiers of Pandora": {
-            "1080p": 90, "1440p": 62, "4k": 32,
-            "rt_penalty": 0.40, "cpu_bound": 0.25, "stability_factor": 0.68,
-            "vram_req": {"1080p": 10, "1440p": 12, "4k": 16}
-        },
-        "Black Myth: Wukong": {
-            "1080p": 85, "1440p": 58, "4k": 30,
-            "rt_penalty": 0.45, "cpu_bound": 0.30, "stability_factor": 0.70,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-
-        "S.T.A.L.K.E.R. 2": {
-            "1080p": 75, "1440p": 52, "4k": 28,
-            "rt_penalty": 0.50, "cpu_bound": 0.45, "stability_factor": 0.65,
-            "vram_req": {"1080p": 10, "1440p": 12, "4k": 16}
-        },
-        "Indiana Jones and the Great Circle": {
-            "1080p": 95, "1440p": 68, "4k": 38,
-            "rt_penalty": 0.45, "cpu_bound": 0.35, "stability_factor": 0.72,
-            "vram_req": {"1080p": 10, "1440p": 12, "4k": 14}
-        },
-        "Dragon Age: The Veilguard": {
-            "1080p": 110, "1440p": 78, "4k": 42,
-            "rt_penalty": 0.55, "cpu_bound": 0.40, "stability_factor": 0.75,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Warhammer 40K: Space Marine 2": {
-            "1080p": 105, "1440p": 75, "4k": 40,
-            "rt_penalty": 0.60, "cpu_bound": 0.35, "stability_factor": 0.78,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Silent Hill 2 Remake": {
-            "1080p": 115, "1440p": 82, "4k": 45,
-            "rt_penalty": 0.50, "cpu_bound": 0.30, "stability_factor": 0.75,
-            "vram_req": {"1080p": 8, "1440p": 10, "4k": 12}
-        },
-        "Path of Exile 2": {
-            "1080p": 140, "1440p": 100, "4k": 55,
-            "rt_penalty": 0.70, "cpu_bound": 0.50, "stability_factor": 0.72,
-            "vram_req": {"1080p": 6, "1440p": 8, "4k": 10}
-        },
-    }
+        self.CPU_BENCHMARKS = self.dataset.cpu
+        self.GPU_BENCHMARKS = self.dataset.gpu
+        self.GAME_BASE_FPS = self.dataset.games
 
 
 class BenchmarkService:
 
     
-    def __init__(self):
-        self.db = BenchmarkDatabase()
+    def __init__(self, db: Optional[BenchmarkDatabase] = None):
+        self.db = db or BenchmarkDatabase()
     
-    def get_cpu_benchmarks(self, cpu_name: str) -> Dict[str, BenchmarkResult]:
+    def get_cpu_benchmarks(self, cpu: ComponentRef) -> Dict[str, BenchmarkResult]:
 
         benchmarks = {}
         
 
-        matched_name = self._find_component_match(cpu_name, self.db.CPU_BENCHMARKS)
+        matched_name = self._find_component_match(cpu, 'cpu')
         
         if matched_name:
             data = self.db.CPU_BENCHMARKS[matched_name]
@@ -302,11 +205,11 @@ class BenchmarkService:
         
         return benchmarks
     
-    def get_gpu_benchmarks(self, gpu_name: str) -> Dict[str, BenchmarkResult]:
+    def get_gpu_benchmarks(self, gpu: ComponentRef) -> Dict[str, BenchmarkResult]:
 
         benchmarks = {}
         
-        matched_name = self._find_component_match(gpu_name, self.db.GPU_BENCHMARKS)
+        matched_name = self._find_component_match(gpu, 'gpu')
         
         if matched_name:
             data = self.db.GPU_BENCHMARKS[matched_name]
@@ -337,83 +240,48 @@ class BenchmarkService:
         
         return benchmarks
     
-    def _find_component_match(self, name: str, database: Dict) -> Optional[str]:
+    def _find_component_match(self, component: ComponentRef, kind: str) -> Optional[str]:
 
-        name_lower = name.lower()
+        if component is None or isinstance(component, str):
+            return self.db.dataset.index.find_match(kind, component)
         
 
-        for db_name in database:
-            if db_name.lower() == name_lower:
-                return db_name
+        # Catalog rows carry the key resolved at import time; names are only
+        # re-matched when the row was linked against another dataset version.
+        if getattr(component, 'benchmark_version', None) == self.db.version:
+            key = component.benchmark_key
+            return key if key in self.db.dataset.index.databases[kind] else None
         
-
-        for db_name in database:
-
-            db_model = self._extract_model(db_name)
-            if db_model and db_model.lower() in name_lower:
-                return db_name
-        
-        return None
-    
-    def _extract_model(self, name: str) -> Optional[str]:
-
-        patterns = [
-            r'(RTX\s*\d{4}(?:\s*Ti)?(?:\s*Super)?)',
-            r'(RX\s*\d{4}\s*(?:XT|XTX|GRE)?)',
-            r'(Arc\s*A\d{3})',
-            r'(i[3579]-\d{4,5}[A-Z]*)',
-            r'(Ryzen\s*[3579]\s*\d{4}[A-Z0-9]*)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, name, re.IGNORECASE)
-            if match:
-                return match.group(1)
-        
-        return None
+        return self.db.dataset.index.find_match(kind, component.name)
     
     def _calculate_percentile(self, score: float, category: str) -> float:
 
-        if category == 'cpu_single':
-            all_scores = [v['single'] for v in self.db.CPU_BENCHMARKS.values()]
-        elif category == 'cpu_multi':
-            all_scores = [v['multi'] for v in self.db.CPU_BENCHMARKS.values()]
-        elif category == 'gpu_timespy':
-            all_scores = [v['timespy'] for v in self.db.GPU_BENCHMARKS.values()]
-        elif category == 'gpu_firestrike':
-            all_scores = [v['firestrike'] for v in self.db.GPU_BENCHMARKS.values()]
-        elif category == 'gpu_rt':
-            all_scores = [v['port_royal'] for v in self.db.GPU_BENCHMARKS.values()]
-        else:
-            return 50.0
-        
-        below = sum(1 for s in all_scores if s < score)
-        return round((below / len(all_scores)) * 100, 1)
+        return self.db.dataset.index.percentile(score, category)
 
 
 class FPSPredictionService:
 
     
-    def __init__(self):
-        self.db = BenchmarkDatabase()
-        self.benchmark_service = BenchmarkService()
+    def __init__(self, db: Optional[BenchmarkDatabase] = None):
+        self.db = db or BenchmarkDatabase()
+        self.benchmark_service = BenchmarkService(self.db)
         
       
-        self.reference_gpu_score = 36500  
-        self.reference_cpu_score = 2320   
+        self.reference_gpu_score = self.db.dataset.reference_gpu_score
+        self.reference_cpu_score = self.db.dataset.reference_cpu_score
     
     def predict_fps(
         self,
-        gpu_name: str,
-        cpu_name: str,
+        gpu: ComponentRef,
+        cpu: ComponentRef,
         game: str,
         resolution: str = "1080p",
         ray_tracing: bool = False,
         dlss_fsr: Optional[str] = None
     ) -> Optional[GameFPSPrediction]:
 
-        gpu_benchmarks = self.benchmark_service.get_gpu_benchmarks(gpu_name)
-        cpu_benchmarks = self.benchmark_service.get_cpu_benchmarks(cpu_name)
+        gpu_benchmarks = self.benchmark_service.get_gpu_benchmarks(gpu)
+        cpu_benchmarks = self.benchmark_service.get_cpu_benchmarks(cpu)
         
         if not gpu_benchmarks or 'timespy' not in gpu_benchmarks:
             return None
@@ -457,51 +325,15 @@ class FPSPredictionService:
         
 
         if ray_tracing:
-            rt_penalty = base_fps_data.get('rt_penalty', 0.5)
+            rt_penalty = base_fps_data.get('rt_penalty', GameCoefficientMatrix.DEFAULT_RT_PENALTY)
             combined_ratio *= rt_penalty
             
 
-            if 'NVIDIA' not in gpu_name and 'GeForce' not in gpu_name:
+            if 'NVIDIA' not in gpu_benchmarks['timespy'].component_name:
                 combined_ratio *= 0.80  
         
 
-        upscaling_boost = 1.0
-        if dlss_fsr:
-            dlss_lower = dlss_fsr.lower()
-            if 'dlss' in dlss_lower:
-
-                if 'quality' in dlss_lower:
-                    upscaling_boost = 1.5
-                elif 'balanced' in dlss_lower:
-                    upscaling_boost = 1.8
-                elif 'performance' in dlss_lower:
-                    upscaling_boost = 2.2
-                elif 'ultra' in dlss_lower:
-                    upscaling_boost = 2.8
-                else:
-                    upscaling_boost = 1.6  
-            elif 'fsr' in dlss_lower:
-              
-                if 'quality' in dlss_lower:
-                    upscaling_boost = 1.35
-                elif 'balanced' in dlss_lower:
-                    upscaling_boost = 1.55
-                elif 'performance' in dlss_lower:
-                    upscaling_boost = 1.85
-                elif 'ultra' in dlss_lower:
-                    upscaling_boost = 2.4
-                else:
-                    upscaling_boost = 1.45 
-            elif 'xess' in dlss_lower:
-               
-                if 'quality' in dlss_lower:
-                    upscaling_boost = 1.4
-                elif 'balanced' in dlss_lower:
-                    upscaling_boost = 1.6
-                elif 'performance' in dlss_lower:
-                    upscaling_boost = 1.9
-                else:
-                    upscaling_boost = 1.5
+        upscaling_boost = self._get_upscaling_boost(dlss_fsr)
         
 
         predicted_fps = base_fps * combined_ratio * upscaling_boost
@@ -550,28 +382,140 @@ class FPSPredictionService:
             dlss_fsr=dlss_fsr
         )
     
-    def predict_all_games(
+    def predict_fps_grid(
         self,
-        gpu_name: str,
-        cpu_name: str,
-        resolution: str = "1080p"
-    ) -> List[GameFPSPrediction]:
+        gpu: ComponentRef,
+        cpu: ComponentRef,
+        resolutions: Optional[Sequence[str]] = None,
+        ray_tracing: Sequence[bool] = (False, True),
+        upscaling: Sequence[Optional[str]] = (None,)
+    ) -> Optional[FPSGrid]:
 
-        predictions = []
+        gpu_benchmarks = self.benchmark_service.get_gpu_benchmarks(gpu)
+        cpu_benchmarks = self.benchmark_service.get_cpu_benchmarks(cpu)
+        
+        if not gpu_benchmarks or 'timespy' not in gpu_benchmarks:
+            return None
+        
+        matrix = self.db.dataset.game_matrix
+        
+        res_idx = [
+            matrix.resolutions.index(r)
+            for r in (resolutions or matrix.resolutions)
+            if r in matrix.resolutions
+        ]
+        resolutions = [matrix.resolutions[i] for i in res_idx]
+        base_fps = matrix.base_fps[:, res_idx]  # G x R
         
-        for game in self.db.GAME_BASE_FPS.keys():
 
-            pred = self.predict_fps(gpu_name, cpu_name, game, resolution, False)
-            if pred:
-                predictions.append(pred)
-            
+        gpu_score = gpu_benchmarks['timespy'].score
+        gpu_ratio = gpu_score / self.reference_gpu_score
+        
+        has_cpu = bool(cpu_benchmarks and 'cinebench_single' in cpu_benchmarks)
+        if has_cpu:
+            cpu_ratio = cpu_benchmarks['cinebench_single'].score / self.reference_cpu_score
+        else:
+            cpu_ratio = 0.85
+        
 
-            if self.db.GAME_BASE_FPS[game].get('rt_penalty', 1.0) < 1.0:
-                pred_rt = self.predict_fps(gpu_name, cpu_name, game, resolution, True)
-                if pred_rt:
-                    predictions.append(pred_rt)
+        cpu_weight = np.minimum(
+            0.50, matrix.cpu_bound[:, None] * matrix.resolution_cpu_modifier[res_idx][None, :]
+        )
+        gpu_weight = 1 - cpu_weight
+        combined = (gpu_ratio * gpu_weight) + (cpu_ratio * cpu_weight)  # G x R
         
-        return predictions
+
+        rt_flags = np.array(ray_tracing, dtype=bool)
+        rt_multiplier = np.where(rt_flags[None, :], matrix.rt_penalty[:, None], 1.0)  # G x T
+        if 'NVIDIA' not in gpu_benchmarks['timespy'].component_name:
+            rt_multiplier = np.where(rt_flags[None, :], rt_multiplier * 0.80, rt_multiplier)
+        combined = combined[:, :, None] * rt_multiplier[:, None, :]  # G x R x T
+        
+        boosts = np.array([self._get_upscaling_boost(mode) for mode in upscaling], dtype=np.float64)
+        predicted = base_fps[:, :, None, None] * combined[:, :, :, None] * boosts[None, None, None, :]
+        
+
+        stability_modifier = np.where(rt_flags, 0.95, 1.0)
+        if has_cpu and cpu_ratio / gpu_ratio < 0.7:
+            stability_modifier = stability_modifier * 0.92
+        final_stability = matrix.stability_factor[:, None] * stability_modifier[None, :]  # G x T
+        fps_1_low = predicted * final_stability[:, None, :, None]
+        
+
+        confidence = np.full((len(rt_flags), len(boosts)), 88.0)
+        if not cpu_benchmarks:
+            confidence -= 12
+        confidence -= np.where(rt_flags, 5, 0)[:, None]
+        confidence -= np.array([3 if mode else 0 for mode in upscaling])[None, :]
+        if gpu_score > 20000:
+            confidence += 3
+        confidence = np.clip(confidence, 50.0, 95.0)
+        
+        return FPSGrid(
+            games=list(matrix.games),
+            resolutions=resolutions,
+            ray_tracing=[bool(rt) for rt in rt_flags],
+            upscaling=list(upscaling),
+            predicted_fps=predicted,
+            fps_1_low=fps_1_low,
+            confidence=confidence,
+            rt_supported=matrix.rt_penalty < 1.0,
+        )
+    
+    def _get_upscaling_boost(self, dlss_fsr: Optional[str]) -> float:
+
+        upscaling_boost = 1.0
+        if dlss_fsr:
+            dlss_lower = dlss_fsr.lower()
+            if 'dlss' in dlss_lower:
+
+                if 'quality' in dlss_lower:
+                    upscaling_boost = 1.5
+                elif 'balanced' in dlss_lower:
+                    upscaling_boost = 1.8
+                elif 'performance' in dlss_lower:
+                    upscaling_boost = 2.2
+                elif 'ultra' in dlss_lower:
+                    upscaling_boost = 2.8
+                else:
+                    upscaling_boost = 1.6  
+            elif 'fsr' in dlss_lower:
+              
+                if 'quality' in dlss_lower:
+                    upscaling_boost = 1.35
+                elif 'balanced' in dlss_lower:
+                    upscaling_boost = 1.55
+                elif 'performance' in dlss_lower:
+                    upscaling_boost = 1.85
+                elif 'ultra' in dlss_lower:
+                    upscaling_boost = 2.4
+                else:
+                    upscaling_boost = 1.45 
+            elif 'xess' in dlss_lower:
+               
+                if 'quality' in dlss_lower:
+                    upscaling_boost = 1.4
+                elif 'balanced' in dlss_lower:
+                    upscaling_boost = 1.6
+                elif 'performance' in dlss_lower:
+                    upscaling_boost = 1.9
+                else:
+                    upscaling_boost = 1.5
+        
+        return upscaling_boost
+    
+    def predict_all_games(
+        self,
+        gpu: ComponentRef,
+        cpu: ComponentRef,
+        resolution: str = "1080p"
+    ) -> List[GameFPSPrediction]:
+
+        grid = self.predict_fps_grid(gpu, cpu, resolutions=[resolution])
+        if not grid:
+            return []
+        
+        return grid.to_predictions(resolution, ray_tracing=None)
     
     def _find_game(self, game_query: str) -> Optional[Tuple[str, Dict]]:
 
@@ -594,16 +538,17 @@ class FPSPredictionService:
     
     def get_resolution_recommendation(
         self,
-        gpu_name: str,
-        cpu_name: str,
+        gpu: ComponentRef,
+        cpu: ComponentRef,
         target_fps: int = 60
     ) -> Dict[str, str]:
 
         recommendations = {}
+        grid = self.predict_fps_grid(gpu, cpu, ray_tracing=(False,))
         
         for game in self.db.GAME_BASE_FPS.keys():
             for resolution in ['4k', '1440p', '1080p']:
-                pred = self.predict_fps(gpu_name, cpu_name, game, resolution)
+                pred = grid.get(game, resolution) if grid else None
                 if pred and pred.predicted_fps >= target_fps:
                     recommendations[game] = resolution
                     break
@@ -616,13 +561,18 @@ class FPSPredictionService:
 class ConfigurationPerformanceAnalyzer:
 
     
-    def __init__(self):
-        self.benchmark_service = BenchmarkService()
-        self.fps_service = FPSPredictionService()
+    def __init__(self, db: Optional[BenchmarkDatabase] = None):
+        self.fps_service = FPSPredictionService(db)
+        self.benchmark_service = self.fps_service.benchmark_service
     
     def analyze_configuration(self, configuration) -> Dict:
 
+        return self.analyze_components(configuration.cpu, configuration.gpu)
+    
+    def analyze_components(self, cpu: ComponentRef, gpu: ComponentRef) -> Dict:
+
         result = {
+            'benchmark_version': self.fps_service.db.version,
             'cpu_benchmarks': {},
             'gpu_benchmarks': {},
             'gaming_performance': {},
@@ -630,47 +580,40 @@ class ConfigurationPerformanceAnalyzer:
             'recommendations': []
         }
         
-        cpu_name = configuration.cpu.name if configuration.cpu else None
-        gpu_name = configuration.gpu.name if configuration.gpu else None
-        
-
-        if cpu_name:
+        if cpu:
             result['cpu_benchmarks'] = {
                 k: v.to_dict() 
-                for k, v in self.benchmark_service.get_cpu_benchmarks(cpu_name).items()
+                for k, v in self.benchmark_service.get_cpu_benchmarks(cpu).items()
             }
         
 
-        if gpu_name:
+        if gpu:
             result['gpu_benchmarks'] = {
                 k: v.to_dict() 
-                for k, v in self.benchmark_service.get_gpu_benchmarks(gpu_name).items()
+                for k, v in self.benchmark_service.get_gpu_benchmarks(gpu).items()
             }
         
  
-        if cpu_name and gpu_name:
+        if cpu and gpu:
+            grid = self.fps_service.predict_fps_grid(gpu, cpu, ray_tracing=(False,))
             for resolution in ['1080p', '1440p', '4k']:
-                predictions = []
-                for game in self.fps_service.get_game_list()[:10]:  
-                    pred = self.fps_service.predict_fps(gpu_name, cpu_name, game, resolution)
-                    if pred:
-                        predictions.append(pred.to_dict())
-                result['gaming_performance'][resolution] = predictions
+                predictions = grid.to_predictions(resolution, limit=10) if grid else []
+                result['gaming_performance'][resolution] = [p.to_dict() for p in predictions]
             
 
-            result['bottleneck_analysis'] = self._analyze_bottleneck(cpu_name, gpu_name)
+            result['bottleneck_analysis'] = self._analyze_bottleneck(cpu, gpu)
             
 
             result['recommendations'] = self._get_recommendations(
-                cpu_name, gpu_name, result['bottleneck_analysis']
+                cpu, gpu, result['bottleneck_analysis']
             )
         
         return result
     
-    def _analyze_bottleneck(self, cpu_name: str, gpu_name: str) -> Dict:
+    def _analyze_bottleneck(self, cpu: ComponentRef, gpu: ComponentRef) -> Dict:
 
-        cpu_benchmarks = self.benchmark_service.get_cpu_benchmarks(cpu_name)
-        gpu_benchmarks = self.benchmark_service.get_gpu_benchmarks(gpu_name)
+        cpu_benchmarks = self.benchmark_service.get_cpu_benchmarks(cpu)
+        gpu_benchmarks = self.benchmark_service.get_gpu_benchmarks(gpu)
         
         if not cpu_benchmarks or not gpu_benchmarks:
             return {'status': 'unknown', 'message': 'Недостаточно данных'}
@@ -712,8 +655,8 @@ class ConfigurationPerformanceAnalyzer:
     
     def _get_recommendations(
         self, 
-        cpu_name: str, 
-        gpu_name: str, 
+        cpu: ComponentRef, 
+        gpu: ComponentRef, 
         bottleneck: Dict
     ) -> List[str]:
 
@@ -740,23 +683,199 @@ class ConfigurationPerformanceAnalyzer:
         return recommendations
 
 
-def get_benchmarks_for_cpu(cpu_name: str) -> Dict:
+class PerformanceCache:
+
+    
+    KINDS = ('analysis', 'fps', 'cpu', 'gpu')
+    STATS_FLUSH_EVERY = 25
+    
+    def __init__(self, alias: str = 'benchmarks'):
+        self.alias = alias
+        self._pending = Counter()
+        self._lock = threading.Lock()
+    
+    @property
+    def backend(self):
+        return caches[self.alias]
+    
+    @staticmethod
+    def _component_token(component: ComponentRef, version: str) -> str:
+
+        if component is None:
+            return '0'
+        
+        if isinstance(component, str):
+            return 'n' + hashlib.md5(component.encode()).hexdigest()[:10]
+        
+
+        # The id keeps the key readable; the digest of what the component is
+        # matched by drops stale entries when a row is renamed or relinked.
+        linked = component.benchmark_key if component.benchmark_version == version else component.name
+        return f"{component.pk}-{hashlib.md5(linked.encode()).hexdigest()[:8]}"
+    
+    def make_key(self, kind: str, version: str, cpu: ComponentRef = None, gpu: ComponentRef = None) -> str:
+        return (
+            f"perf:{kind}:{version}:"
+            f"{self._component_token(cpu, version)}:{self._component_token(gpu, version)}"
+        )
+    
+    def get_or_compute(
+        self,
+        kind: str,
+        version: str,
+        compute,
+        cpu: ComponentRef = None,
+        gpu: ComponentRef = None,
+        record: bool = True
+    ):
+
+        key = self.make_key(kind, version, cpu, gpu)
+        result = self.backend.get(key)
+        hit = result is not None
+        
+        if not hit:
+            result = compute()
+            self.backend.set(key, result)
+        
+        if record:
+            self._record(kind, hit)
+        return result
+    
+    def _record(self, kind: str, hit: bool) -> None:
+
+        with self._lock:
+            self._pending[(kind, 'hits' if hit else 'misses')] += 1
+            if sum(self._pending.values()) < self.STATS_FLUSH_EVERY:
+                return
+            pending, self._pending = self._pending, Counter()
+        
+        self._flush(pending)
+    
+    def _flush(self, pending: Counter) -> None:
+
+        backend = self.backend
+        for (kind, field), count in pending.items():
+            key = f"perf:stats:{kind}:{field}"
+            backend.add(key, 0, timeout=None)
+            try:
+                backend.incr(key, count)
+            except ValueError:
+                backend.set(key, count, timeout=None)
+    
+    def flush_stats(self) -> None:
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        self._flush(pending)
+    
+    def stats(self) -> Dict[str, Dict]:
+
+        self.flush_stats()
+        
+        keys = [f"perf:stats:{kind}:{field}" for kind in self.KINDS for field in ('hits', 'misses')]
+        values = self.backend.get_many(keys)
+        
+        result = {}
+        for kind in self.KINDS:
+            hits = values.get(f"perf:stats:{kind}:hits", 0)
+            misses = values.get(f"perf:stats:{kind}:misses", 0)
+            total = hits + misses
+            result[kind] = {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / total * 100, 1) if total else None,
+            }
+        return result
+    
+    def reset_stats(self) -> None:
+
+        with self._lock:
+            self._pending = Counter()
+        self.backend.delete_many(
+            [f"perf:stats:{kind}:{field}" for kind in self.KINDS for field in ('hits', 'misses')]
+        )
+
+
+performance_cache = PerformanceCache()
+
+
+def get_benchmarks_for_cpu(cpu: ComponentRef, record: bool = True) -> Dict:
 
     service = BenchmarkService()
-    return {k: v.to_dict() for k, v in service.get_cpu_benchmarks(cpu_name).items()}
+    return performance_cache.get_or_compute(
+        'cpu', service.db.version,
+        lambda: {k: v.to_dict() for k, v in service.get_cpu_benchmarks(cpu).items()},
+        cpu=cpu, record=record
+    )
 
 
-def get_benchmarks_for_gpu(gpu_name: str) -> Dict:
+def get_benchmarks_for_gpu(gpu: ComponentRef, record: bool = True) -> Dict:
 
     service = BenchmarkService()
-    return {k: v.to_dict() for k, v in service.get_gpu_benchmarks(gpu_name).items()}
+    return performance_cache.get_or_compute(
+        'gpu', service.db.version,
+        lambda: {k: v.to_dict() for k, v in service.get_gpu_benchmarks(gpu).items()},
+        gpu=gpu, record=record
+    )
+
 
+def predict_game_fps(
+    gpu: ComponentRef,
+    cpu: ComponentRef,
+    game: str,
+    resolution: str = "1080p",
+    ray_tracing: bool = False
+) -> Optional[Dict]:
 
-def predict_game_fps(gpu_name: str, cpu_name: str, game: str, resolution: str = "1080p") -> Optional[Dict]:
+    service = FPSPredictionService()
+    table = predict_fps_table(gpu, cpu, ray_tracing=ray_tracing)
+    
+    # Resolutions outside the dataset fall back to the 1080p base, which the table does not hold
+    if resolution not in table:
+        result = service.predict_fps(gpu, cpu, game, resolution, ray_tracing)
+        return result.to_dict() if result else None
+    
+    match = service._find_game(game)
+    if not match:
+        return None
+    return next((p for p in table[resolution] if p['game_name'] == match[0]), None)
+
+
+def predict_fps_grid(
+    gpu: ComponentRef,
+    cpu: ComponentRef,
+    resolutions: Optional[Sequence[str]] = None,
+    upscaling: Sequence[Optional[str]] = (None,)
+) -> Optional[FPSGrid]:
 
     service = FPSPredictionService()
-    result = service.predict_fps(gpu_name, cpu_name, game, resolution)
-    return result.to_dict() if result else None
+    return service.predict_fps_grid(gpu, cpu, resolutions=resolutions, upscaling=upscaling)
+
+
+def predict_fps_table(
+    gpu: ComponentRef,
+    cpu: ComponentRef,
+    record: bool = True,
+    ray_tracing: Optional[bool] = False
+) -> Dict[str, List[Dict]]:
+
+    service = FPSPredictionService()
+    
+    def compute():
+        grid = service.predict_fps_grid(gpu, cpu)
+        return {
+            resolution: [p.to_dict() for p in grid.to_predictions(resolution, ray_tracing=None)] if grid else []
+            for resolution in service.db.dataset.game_matrix.resolutions
+        }
+    
+    # One entry per pair holds both ray tracing modes; None returns them all
+    table = performance_cache.get_or_compute('fps', service.db.version, compute, cpu=cpu, gpu=gpu, record=record)
+    if ray_tracing is None:
+        return table
+    return {
+        resolution: [p for p in predictions if p['ray_tracing'] == ray_tracing]
+        for resolution, predictions in table.items()
+    }
 
 
 def get_available_games() -> List[str]:
@@ -767,5 +886,26 @@ def get_available_games() -> List[str]:
 
 def analyze_configuration_performance(configuration) -> Dict:
     
-    analyzer = ConfigurationPerformanceAnalyzer()
-    return analyzer.analyze_configuration(configuration)
+    return analyze_components_performance(configuration.cpu, configuration.gpu)
+
+
+def analyze_components_performance(cpu: ComponentRef, gpu: ComponentRef, record: bool = True) -> Dict:
+
+    db = BenchmarkDatabase()
+    return performance_cache.get_or_compute(
+        'analysis', db.version,
+        lambda: ConfigurationPerformanceAnalyzer(db).analyze_components(cpu, gpu),
+        cpu=cpu, gpu=gpu, record=record
+    )
+
+
+def warm_performance_cache(pairs) -> int:
+
+    warmed = 0
+    for cpu, gpu in pairs:
+        analyze_components_performance(cpu, gpu, record=False)
+        predict_fps_table(gpu, cpu, record=False)
+        get_benchmarks_for_cpu(cpu, record=False)
+        get_benchmarks_for_gpu(gpu, record=False)
+        warmed += 1
+    return warmed
@@ -0,0 +1,251 @@
+import hashlib
+import logging
+from statistics import mean
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.core.cache import cache
+
+from .component_resolver import CONFIGURATION_SLOTS
+from .models import PCConfiguration
+
+try:
+    from .benchmark_service import BenchmarkDatabase, analyze_components_performance, predict_fps_table
+    BENCHMARKS_AVAILABLE = True
+except ImportError:
+    BENCHMARKS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+MAX_BUILDS = 5
+COMPARISON_CACHE_TTL = 60 * 60
+
+RESOLUTIONS = ('1080p', '1440p', '4k')
+
+# Metric name -> whether a higher value wins
+METRICS = {
+    'total_price': False,
+    'cpu_cores': True,
+    'cpu_threads': True,
+    'cpu_boost_clock': True,
+    'gpu_memory': True,
+    'ram_capacity': True,
+    'storage_capacity': True,
+    'cpu_single': True,
+    'cpu_multi': True,
+    'gpu_timespy': True,
+    'cpu_score': True,
+    'gpu_score': True,
+    'fps_1080p': True,
+    'fps_1440p': True,
+    'fps_4k': True,
+    'fps_per_1000_rub': True,
+    'score_per_1000_rub': True,
+}
+
+DECIMAL_FIELDS = {'base_clock', 'boost_clock', 'price'}
+
+COMPONENT_FIELDS = {
+    'cpu': ('name', 'cores', 'threads', 'base_clock', 'boost_clock', 'price', 'performance_score'),
+    'gpu': ('name', 'memory', 'memory_type', 'price', 'performance_score'),
+    'ram': ('name', 'capacity', 'speed', 'price'),
+    'storage_primary': ('name', 'capacity', 'storage_type', 'price'),
+}
+
+
+def load_builds(ids: Iterable[int]) -> List[PCConfiguration]:
+
+    ids = list(ids)
+    builds = {
+        build.id: build
+        for build in PCConfiguration.objects.filter(id__in=ids).select_related(*CONFIGURATION_SLOTS)
+    }
+    return [builds[build_id] for build_id in ids if build_id in builds]
+
+
+def comparison_key(builds: List[PCConfiguration]) -> str:
+
+    stamps = ','.join(f'{build.id}@{build.updated_at.timestamp()}' for build in sorted(builds, key=lambda b: b.id))
+    version = BenchmarkDatabase().version if BENCHMARKS_AVAILABLE else '-'
+    return f"compare:{version}:{hashlib.md5(stamps.encode()).hexdigest()}"
+
+
+def _number(value) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def component_summary(build: PCConfiguration) -> Dict[str, Optional[Dict]]:
+
+    summary = {}
+    for slot, fields in COMPONENT_FIELDS.items():
+        component = getattr(build, slot)
+        if component is None:
+            summary[slot] = None
+            continue
+        summary[slot] = {}
+        for field in fields:
+            value = getattr(component, field, None)
+            summary[slot][field] = _number(value) if field in DECIMAL_FIELDS else value
+    return summary
+
+
+def build_performance(build: PCConfiguration) -> Dict[str, Any]:
+
+    if not BENCHMARKS_AVAILABLE or not (build.cpu or build.gpu):
+        return {'analysis': {}, 'fps': {}}
+    
+    analysis = analyze_components_performance(build.cpu, build.gpu)
+    fps = predict_fps_table(build.gpu, build.cpu) if build.cpu and build.gpu else {}
+    return {'analysis': analysis, 'fps': fps}
+
+
+def _score(benchmarks: Dict, name: str) -> Optional[float]:
+
+    result = benchmarks.get(name)
+    return _number(result['score']) if result else None
+
+
+def _average_fps(predictions: List[Dict]) -> Optional[float]:
+
+    return round(mean(p['predicted_fps'] for p in predictions), 1) if predictions else None
+
+
+def build_metrics(build: PCConfiguration, performance: Dict[str, Any]) -> Dict[str, Optional[float]]:
+
+    analysis = performance['analysis']
+    cpu, gpu, ram, storage = build.cpu, build.gpu, build.ram, build.storage_primary
+    price = _number(build.total_price) or 0
+    
+    metrics = {
+        'total_price': price,
+        'cpu_cores': cpu.cores if cpu else None,
+        'cpu_threads': cpu.threads if cpu else None,
+        'cpu_boost_clock': _number(cpu.boost_clock) if cpu else None,
+        'gpu_memory': gpu.memory if gpu else None,
+        'ram_capacity': ram.capacity if ram else None,
+        'storage_capacity': storage.capacity if storage else None,
+        'cpu_single': _score(analysis.get('cpu_benchmarks', {}), 'cinebench_single'),
+        'cpu_multi': _score(analysis.get('cpu_benchmarks', {}), 'cinebench_multi'),
+        'gpu_timespy': _score(analysis.get('gpu_benchmarks', {}), 'timespy'),
+        'cpu_score': cpu.performance_score if cpu else None,
+        'gpu_score': gpu.performance_score if gpu else None,
+    }
+    for resolution in RESOLUTIONS:
+        metrics[f'fps_{resolution}'] = _average_fps(performance['fps'].get(resolution, []))
+    
+    score = (metrics['cpu_score'] or 0) + (metrics['gpu_score'] or 0)
+    metrics['fps_per_1000_rub'] = round(metrics['fps_1080p'] / price * 1000, 3) if price and metrics['fps_1080p'] else None
+    metrics['score_per_1000_rub'] = round(score / price * 1000, 3) if price and score else None
+    return metrics
+
+
+def rank_metric(values: Dict[int, Optional[float]], higher_is_better: bool) -> Dict[str, Any]:
+
+    known = {build_id: value for build_id, value in values.items() if value is not None}
+    ranking = sorted(known, key=lambda build_id: known[build_id], reverse=higher_is_better)
+    
+    if not known:
+        return {'values': values, 'ranking': [], 'best': [], 'ranks': {}, 'deltas': {}}
+    
+    best_value = known[ranking[0]]
+    ranks = {}
+    for position, build_id in enumerate(ranking):
+        previous = ranking[position - 1] if position else None
+        ranks[build_id] = ranks[previous] if previous is not None and known[previous] == known[build_id] else position + 1
+    
+    deltas = {
+        build_id: {
+            'absolute': round(value - best_value, 3),
+            'percent': round((value - best_value) / best_value * 100, 1) if best_value else None,
+        }
+        for build_id, value in known.items()
+    }
+    return {
+        'values': values,
+        'ranking': ranking,
+        'best': [build_id for build_id in ranking if known[build_id] == best_value],
+        'ranks': ranks,
+        'deltas': deltas,
+    }
+
+
+def compare_games(builds: List[PCConfiguration], performances: Dict[int, Dict]) -> Dict[str, Dict]:
+
+    games = {}
+    for resolution in RESOLUTIONS:
+        per_build = {
+            build.id: {p['game_name']: p['predicted_fps'] for p in performances[build.id]['fps'].get(resolution, [])}
+            for build in builds
+        }
+        common = set.intersection(*(set(fps) for fps in per_build.values())) if per_build else set()
+        games[resolution] = {
+            game: {build_id: fps[game] for build_id, fps in per_build.items()}
+            for game in sorted(common)
+        }
+    return games
+
+
+def compare_builds(builds: List[PCConfiguration]) -> Dict[str, Any]:
+
+    performances = {build.id: build_performance(build) for build in builds}
+    metrics = {build.id: build_metrics(build, performances[build.id]) for build in builds}
+    
+    ranked = {
+        name: rank_metric({build.id: metrics[build.id][name] for build in builds}, higher_is_better)
+        for name, higher_is_better in METRICS.items()
+    }
+    
+    summaries = []
+    for build in builds:
+        components = component_summary(build)
+        summaries.append({
+            'id': build.id,
+            'name': build.name,
+            'total_price': metrics[build.id]['total_price'],
+            'performance_score': (metrics[build.id]['cpu_score'] or 0) + (metrics[build.id]['gpu_score'] or 0),
+            'components': components,
+            'metrics': metrics[build.id],
+            'bottleneck': performances[build.id]['analysis'].get('bottleneck_analysis', {}),
+        })
+    
+    by_id = {summary['id']: summary for summary in summaries}
+    
+    def best(metric):
+        leaders = ranked[metric]['best']
+        return by_id[leaders[0]] if leaders else None
+    
+    prices = [summary['total_price'] for summary in summaries]
+    return {
+        'builds': summaries,
+        'metrics': ranked,
+        'games': compare_games(builds, performances),
+        'summary': {
+            'cheapest': best('total_price')['name'] if summaries else None,
+            'most_expensive': max(summaries, key=lambda s: s['total_price'])['name'] if summaries else None,
+            'price_difference': max(prices) - min(prices) if prices else 0,
+            'best_cpu_performance': best('cpu_multi') or best('cpu_score'),
+            'best_gpu_performance': best('gpu_timespy') or best('gpu_score'),
+            'best_value': (best('fps_per_1000_rub') or best('score_per_1000_rub') or {}).get('name'),
+        },
+        'criteria': {
+            criterion: {summary['name']: summary['metrics'][metric] for summary in summaries}
+            for criterion, metric in (
+                ('cpu_cores', 'cpu_cores'),
+                ('gpu_memory', 'gpu_memory'),
+                ('ram_capacity', 'ram_capacity'),
+                ('storage_capacity', 'storage_capacity'),
+                ('total_price', 'total_price'),
+            )
+        },
+    }
+
+
+def get_comparison(builds: List[PCConfiguration]) -> Dict[str, Any]:
+
+    # updated_at is part of the key, so editing any build starts a fresh entry
+    key = comparison_key(builds)
+    result = cache.get(key)
+    if result is None:
+        result = compare_builds(builds)
+        cache.set(key, result, COMPARISON_CACHE_TTL)
+    return result
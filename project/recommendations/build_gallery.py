@@ -0,0 +1,56 @@
+from decimal import Decimal, InvalidOperation
+
+from rest_framework.exceptions import ValidationError
+
+from computers.models import CPU, GPU
+
+# Upper bounds are exclusive
+PRICE_BANDS = {
+    'budget': (None, Decimal('60000')),
+    'mid': (Decimal('60000'), Decimal('120000')),
+    'high': (Decimal('120000'), Decimal('250000')),
+    'enthusiast': (Decimal('250000'), None),
+}
+
+
+def _price(params, name):
+
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: 'Некорректная цена'})
+
+
+def filter_gallery(queryset, params):
+
+    band = params.get('price_band')
+    if band:
+        if band not in PRICE_BANDS:
+            raise ValidationError({'price_band': f"Допустимые значения: {', '.join(PRICE_BANDS)}"})
+        low, high = PRICE_BANDS[band]
+        if low is not None:
+            queryset = queryset.filter(total_price__gte=low)
+        if high is not None:
+            queryset = queryset.filter(total_price__lt=high)
+    
+    min_price = _price(params, 'min_price')
+    if min_price is not None:
+        queryset = queryset.filter(total_price__gte=min_price)
+    max_price = _price(params, 'max_price')
+    if max_price is not None:
+        queryset = queryset.filter(total_price__lte=max_price)
+    
+    if params.get('user_type'):
+        queryset = queryset.filter(user__user_type=params['user_type'])
+    
+    # Families are resolved against the small catalog tables so the build
+    # table is only probed through its component foreign key indexes
+    if params.get('cpu_family'):
+        queryset = queryset.filter(cpu__in=CPU.objects.filter(name__icontains=params['cpu_family']).values('id'))
+    if params.get('gpu_family'):
+        queryset = queryset.filter(gpu__in=GPU.objects.filter(name__icontains=params['gpu_family']).values('id'))
+    
+    return queryset
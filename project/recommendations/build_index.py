@@ -0,0 +1,265 @@
+import logging
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ('AM4', 'AM5', 'LGA1200', 'LGA1700', 'LGA1851')
+
+# Numeric features are log-scaled so a distance of 1 means "about e times
+# more", whatever the unit; the weights say how much each one matters
+NUMERIC_FEATURES = (
+    ('total_price', 'total_price', 2.0),
+    ('cpu_score', 'cpu__performance_score', 1.5),
+    ('gpu_score', 'gpu__performance_score', 1.5),
+    ('ram_capacity', 'ram__capacity', 0.75),
+    ('storage_capacity', 'storage_primary__capacity', 0.5),
+)
+PLATFORM_WEIGHT = 0.75
+
+FEATURE_NAMES = tuple(name for name, _, _ in NUMERIC_FEATURES) + tuple(f'platform_{p}' for p in PLATFORMS) + (
+    'platform_other',
+)
+WEIGHTS = np.array(
+    [weight for _, _, weight in NUMERIC_FEATURES] + [PLATFORM_WEIGHT] * (len(PLATFORMS) + 1), dtype=np.float32
+)
+PRICE_ONLY = np.array([1.0] + [0.0] * (len(FEATURE_NAMES) - 1), dtype=np.float32)
+
+ROW_FIELDS = ('id', 'user_id', 'user__user_type', 'is_public', 'cpu__socket') + tuple(
+    lookup for _, lookup, _ in NUMERIC_FEATURES
+)
+
+
+def encode(row: Dict) -> np.ndarray:
+
+    vector = np.zeros(len(FEATURE_NAMES), dtype=np.float32)
+    for i, (_, lookup, _) in enumerate(NUMERIC_FEATURES):
+        vector[i] = math.log1p(max(float(row.get(lookup) or 0), 0.0))
+    
+    socket = (row.get('cpu__socket') or '').upper().replace(' ', '')
+    if socket:
+        platform = PLATFORMS.index(socket) if socket in PLATFORMS else len(PLATFORMS)
+        vector[len(NUMERIC_FEATURES) + platform] = 1.0
+    return vector * WEIGHTS
+
+
+def encode_budget(budget: float) -> np.ndarray:
+
+    return encode({'total_price': budget})
+
+
+class BuildEmbeddingIndex:
+
+    # Public builds as rows of a float32 matrix. Saves and deletes only mark
+    # rows; the next query re-reads just those ids, and a periodic sync picks
+    # up changes made by other processes.
+    
+    def __init__(self, sync_interval: Optional[float] = None):
+        self._sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._reset()
+    
+    def _reset(self) -> None:
+        self._matrix = np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._owners = np.zeros(0, dtype=np.int64)
+        self._user_types = np.zeros(0, dtype=object)
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+        self._pending: set = set()
+        self._synced_at = 0.0
+        self._watermark = None
+    
+    @property
+    def sync_interval(self) -> float:
+        if self._sync_interval is not None:
+            return self._sync_interval
+        return getattr(settings, 'BUILD_INDEX_SYNC_INTERVAL', 300)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def reset(self) -> None:
+
+        with self._lock:
+            self._loaded = False
+            self._reset()
+    
+    def mark_changed(self, configuration_id: int) -> None:
+
+        # Cheap enough to call from signals; an index that was never loaded
+        # has nothing to refresh
+        if self._loaded:
+            with self._lock:
+                self._pending.add(configuration_id)
+    
+    def discard(self, configuration_id: int) -> None:
+
+        if self._loaded:
+            with self._lock:
+                self._remove(configuration_id)
+                self._pending.discard(configuration_id)
+    
+    def load(self) -> None:
+
+        from .models import PCConfiguration
+        
+        started = time.monotonic()
+        rows = list(PCConfiguration.objects.filter(is_public=True).values(*ROW_FIELDS, 'updated_at'))
+        with self._lock:
+            self._reset()
+            self._upsert_rows(rows)
+            self._watermark = max((row['updated_at'] for row in rows), default=None)
+            self._synced_at = time.monotonic()
+            self._loaded = True
+        logger.info(f"Build index loaded: {len(rows)} builds in {(time.monotonic() - started) * 1000:.0f}ms")
+    
+    def refresh(self) -> None:
+
+        from .models import PCConfiguration
+        
+        if not self._loaded:
+            self.load()
+            return
+        
+        if time.monotonic() - self._synced_at >= self.sync_interval:
+            self._sync(PCConfiguration)
+        
+        with self._lock:
+            pending, self._pending = self._pending, set()
+        if pending:
+            rows = PCConfiguration.objects.filter(id__in=pending).values(*ROW_FIELDS)
+            with self._lock:
+                found = self._upsert_rows(rows)
+                for configuration_id in pending - found:
+                    self._remove(configuration_id)
+    
+    def _sync(self, model) -> None:
+
+        queryset = model.objects.all()
+        if self._watermark is not None:
+            queryset = queryset.filter(updated_at__gte=self._watermark)
+        rows = list(queryset.values(*ROW_FIELDS, 'updated_at'))
+        public_count = model.objects.filter(is_public=True).count()
+        
+        with self._lock:
+            self._upsert_rows(rows)
+            self._watermark = max((row['updated_at'] for row in rows), default=self._watermark)
+            self._synced_at = time.monotonic()
+            stale = public_count != self._size
+        
+        # Deletions leave no trace to sync from; a size mismatch means some
+        # happened elsewhere, and only a full load can find them
+        if stale:
+            self.load()
+    
+    def _upsert_rows(self, rows: Iterable[Dict]) -> set:
+
+        found = set()
+        for row in rows:
+            found.add(row['id'])
+            if not row['is_public']:
+                self._remove(row['id'])
+                continue
+            
+            position = self._positions.get(row['id'])
+            if position is None:
+                position = self._append()
+                self._positions[row['id']] = position
+                self._ids[position] = row['id']
+            self._matrix[position] = encode(row)
+            self._owners[position] = row['user_id']
+            self._user_types[position] = row['user__user_type']
+        return found
+    
+    def _append(self) -> int:
+
+        if self._size == len(self._ids):
+            capacity = max(64, len(self._ids) * 2)
+            self._matrix = np.resize(self._matrix, (capacity, len(FEATURE_NAMES)))
+            self._ids = np.resize(self._ids, capacity)
+            self._owners = np.resize(self._owners, capacity)
+            self._user_types = np.resize(self._user_types, capacity)
+        self._size += 1
+        return self._size - 1
+    
+    def _remove(self, configuration_id: int) -> None:
+
+        position = self._positions.pop(configuration_id, None)
+        if position is None:
+            return
+        
+        # Keep rows dense by moving the last row into the hole
+        last = self._size - 1
+        if position != last:
+            moved = int(self._ids[last])
+            self._matrix[position] = self._matrix[last]
+            self._ids[position] = moved
+            self._owners[position] = self._owners[last]
+            self._user_types[position] = self._user_types[last]
+            self._positions[moved] = position
+        self._size = last
+    
+    def vector_for(self, configuration_id: int) -> Optional[np.ndarray]:
+
+        from .models import PCConfiguration
+        
+        position = self._positions.get(configuration_id)
+        if position is not None and configuration_id not in self._pending:
+            return self._matrix[position].copy()
+        
+        row = PCConfiguration.objects.filter(id=configuration_id).values(*ROW_FIELDS).first()
+        return encode(row) if row else None
+    
+    def nearest(
+        self,
+        vector: np.ndarray,
+        limit: int = 10,
+        exclude_ids: Sequence[int] = (),
+        exclude_owner: Optional[int] = None,
+        user_type: Optional[str] = None,
+        mask: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+    
+        self.refresh()
+        
+        with self._lock:
+            size = self._size
+            matrix = self._matrix[:size]
+            ids = self._ids[:size].copy()
+            allowed = np.ones(size, dtype=bool)
+            if exclude_owner is not None:
+                allowed &= self._owners[:size] != exclude_owner
+            if user_type:
+                allowed &= self._user_types[:size] == user_type
+            if exclude_ids:
+                allowed &= ~np.isin(ids, np.asarray(exclude_ids, dtype=np.int64))
+            
+            diff = matrix - vector
+            if mask is not None:
+                diff = diff * mask
+            distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+        
+        candidates = np.flatnonzero(allowed)
+        if not len(candidates) or limit <= 0:
+            return []
+        
+        if len(candidates) > limit:
+            top = np.argpartition(distances[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        candidates = candidates[np.lexsort((-ids[candidates], distances[candidates]))]
+        return [(int(ids[i]), float(np.exp(-distances[i]))) for i in candidates]
+
+
+build_index = BuildEmbeddingIndex()
+
+
+def get_build_index() -> BuildEmbeddingIndex:
+
+    return build_index
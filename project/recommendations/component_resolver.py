@@ -0,0 +1,101 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from .models import PCConfiguration, WorkspaceSetup
+
+logger = logging.getLogger(__name__)
+
+
+CONFIGURATION_SLOTS = [
+    'cpu', 'gpu', 'motherboard', 'ram', 'storage_primary', 'storage_secondary', 'psu', 'case', 'cooling',
+]
+
+WORKSPACE_SLOTS = [
+    'monitor_primary', 'monitor_secondary', 'keyboard', 'mouse', 'headset', 'webcam', 'microphone',
+    'desk', 'chair', 'speakers', 'mousepad', 'monitor_arm', 'usb_hub', 'lighting', 'stream_deck',
+    'capture_card', 'gamepad', 'headphone_stand',
+]
+
+
+class ComponentResolutionError(Exception):
+
+    def __init__(self, missing: Dict[str, int]):
+        self.missing = missing
+        super().__init__(', '.join(f'{slot}={component_id}' for slot, component_id in missing.items()))
+
+
+def slot_models() -> Dict[str, type]:
+
+    models = {}
+    for owner, slots in ((PCConfiguration, CONFIGURATION_SLOTS), (WorkspaceSetup, WORKSPACE_SLOTS)):
+        for slot in slots:
+            models[slot] = owner._meta.get_field(slot).related_model
+    return models
+
+
+def resolve_components(ids: Dict[str, Optional[int]], strict: bool = True) -> Dict[str, object]:
+
+    # One in_bulk per catalog model, however many slots point at it
+    models = slot_models()
+    wanted = {slot: component_id for slot, component_id in ids.items() if component_id}
+    
+    unknown = set(wanted) - set(models)
+    if unknown:
+        raise ValueError(f"Unknown component slots: {', '.join(sorted(unknown))}")
+    
+    by_model = defaultdict(set)
+    for slot, component_id in wanted.items():
+        by_model[models[slot]].add(component_id)
+    
+    fetched = {model: model.objects.in_bulk(component_ids) for model, component_ids in by_model.items()}
+    
+    resolved = {}
+    missing = {}
+    for slot, component_id in wanted.items():
+        component = fetched[models[slot]].get(component_id)
+        if component is None:
+            missing[slot] = component_id
+        else:
+            resolved[slot] = component
+    
+    if missing:
+        if strict:
+            raise ComponentResolutionError(missing)
+        logger.warning(f"Skipping missing components: {missing}")
+    return resolved
+
+
+def compatibility_issues(components: Dict[str, object]) -> List[str]:
+
+    cpu = components.get('cpu')
+    gpu = components.get('gpu')
+    motherboard = components.get('motherboard')
+    ram = components.get('ram')
+    psu = components.get('psu')
+    cooling = components.get('cooling')
+    issues = []
+    
+    if cpu and motherboard and cpu.socket != motherboard.socket:
+        issues.append(f"Процессор (сокет {cpu.socket}) не совместим с материнской платой (сокет {motherboard.socket})")
+    
+    if psu and cpu and gpu:
+        total_tdp = cpu.tdp + gpu.tdp
+        if psu.wattage < total_tdp * 1.3:
+            issues.append(f"Мощность БП ({psu.wattage}Вт) может быть недостаточной для системы (рекомендуется {int(total_tdp * 1.5)}Вт)")
+    
+    if cooling and cpu and cooling.max_tdp < cpu.tdp:
+        issues.append(f"Система охлаждения может не справиться с TDP процессора ({cpu.tdp}Вт)")
+    
+    if ram and motherboard and ram.memory_type != motherboard.memory_type:
+        issues.append(f"Тип оперативной памяти ({ram.memory_type}) не совместим с материнской платой ({motherboard.memory_type})")
+    
+    return issues
+
+
+def apply_compatibility(configuration: PCConfiguration) -> List[str]:
+
+    issues = compatibility_issues({slot: getattr(configuration, slot) for slot in CONFIGURATION_SLOTS})
+    configuration.compatibility_check = not issues
+    configuration.compatibility_notes = "\n".join(issues) if issues else "Все компоненты совместимы"
+    return issues
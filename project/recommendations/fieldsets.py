@@ -0,0 +1,79 @@
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional
+
+from rest_framework.serializers import ListSerializer
+
+EXPAND_ALL = 'all'
+
+
+def _names(value: Optional[str]) -> FrozenSet[str]:
+    return frozenset(name.strip() for name in (value or '').split(',') if name.strip())
+
+
+@dataclass(frozen=True)
+class Fieldset:
+
+    serializer_class: type
+    fields: FrozenSet[str] = field(default_factory=frozenset)
+    expand: FrozenSet[str] = field(default_factory=frozenset)
+    compact: bool = False
+    
+    @classmethod
+    def from_request(cls, request, serializer_class, compact: bool = False) -> 'Fieldset':
+
+        params = request.query_params if request is not None else {}
+        return cls(
+            serializer_class=serializer_class,
+            fields=_names(params.get('fields')),
+            expand=_names(params.get('expand')),
+            compact=compact,
+        )
+    
+    def select(self, available, compact_fields) -> Optional[FrozenSet[str]]:
+
+        if self.fields:
+            wanted = self.fields | self.expand
+        elif self.compact and EXPAND_ALL not in self.expand:
+            wanted = frozenset(compact_fields) | self.expand
+        else:
+            return None
+        return frozenset(name for name in available if name in wanted or name == 'id')
+
+
+class SparseFieldsetMixin:
+
+    # Trims a serializer to ?fields= / ?expand= when the view put a Fieldset
+    # for this serializer class into the context. Nested uses are left alone.
+    
+    def get_fields(self):
+
+        fields = super().get_fields()
+        fieldset = self.context.get('fieldset')
+        root = self.parent is None or (self.parent.parent is None and isinstance(self.parent, ListSerializer))
+        if not fieldset or not root or type(self) is not fieldset.serializer_class:
+            return fields
+        
+        wanted = fieldset.select(fields, getattr(self.Meta, 'compact_fields', ()))
+        if wanted is None:
+            return fields
+        return {name: value for name, value in fields.items() if name in wanted}
+
+
+class SparseFieldsetViewMixin:
+
+    compact_actions = ('list',)
+    
+    def get_fieldset(self) -> Fieldset:
+        return Fieldset.from_request(
+            self.request, self.get_serializer_class(), compact=self.action in self.compact_actions
+        )
+    
+    def get_serializer_context(self):
+
+        context = super().get_serializer_context()
+        context['fieldset'] = self.get_fieldset()
+        return context
+    
+    def get_planning_serializer(self):
+        return self.get_serializer_class()(context=self.get_serializer_context())
+
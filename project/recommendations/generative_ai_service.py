@@ -8,6 +8,7 @@ from datetime import datetime
 from django.utils import timezone
 from typing import Optional, Dict, Any, List, Tuple
 from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
+from .ai_timing import generation_trace, record_ollama, stage
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +36,7 @@ PRICE_RANGES = {
 
 class GenerativeAIService:
 
-    
+
     def __init__(self, user_profile_data: dict):
 
         self.user_data = user_profile_data
@@ -156,19 +157,19 @@ class GenerativeAIService:
         motherboard = parsed.get('motherboard', {})
         ram = parsed.get('ram', {})
         
-        
+
         cpu_socket = cpu.get('socket')
         mb_socket = motherboard.get('socket')
         if cpu_socket and mb_socket and cpu_socket != mb_socket:
             issues.append(f"[ERROR] Incompatible sockets: CPU ({cpu_socket}) != MB ({mb_socket})")
         
-        
+
         ram_type = ram.get('memory_type')
         mb_memory_type = motherboard.get('memory_type')
         if ram_type and mb_memory_type and ram_type != mb_memory_type:
             issues.append(f"[ERROR] Incompatible memory: RAM ({ram_type}) != MB ({mb_memory_type})")
         
-        
+
         cpu_tdp = cpu.get('tdp', 0)
         gpu = parsed.get('gpu', {})
         gpu_tdp = gpu.get('tdp', 0) if gpu else 0
@@ -183,13 +184,13 @@ class GenerativeAIService:
         elif psu_wattage > 0 and psu_wattage < recommended_psu:
             issues.append(f"[WARN] Recommended PSU {recommended_psu}W+ (current {psu_wattage}W)")
         
-        
+
         cooling = parsed.get('cooling', {})
         cooling_max_tdp = cooling.get('max_tdp', 0)
         if cooling_max_tdp > 0 and cpu_tdp > 0 and cooling_max_tdp < cpu_tdp:
             issues.append(f"[WARN] Cooling insufficient: {cooling_max_tdp}W < CPU TDP {cpu_tdp}W")
         
-        
+
         total = sum([
             parsed.get('cpu', {}).get('price', 0),
             parsed.get('gpu', {}).get('price', 0) if parsed.get('gpu') else 0,
@@ -227,7 +228,7 @@ class GenerativeAIService:
         
         pref = self.pc_preferences
         
-        
+
         existing_info = ""
         if self.has_existing_components and self.existing_components_description:
             existing_info = f"Учти что у пользователя уже есть: {self.existing_components_description}"
@@ -262,17 +263,17 @@ class GenerativeAIService:
 }}
 
 ВАЖНО: socket CPU = socket MB, тип RAM = тип MB, цена <= {self.max_budget} руб."""
-        
+
         return prompt
     
     def _call_ollama(self, prompt: str) -> Optional[str]:
-        
+
         try:
-            
+        
             full_prompt = f"""[ИНСТРУКЦИЯ] Ты эксперт по сборке компьютеров. Отвечай ТОЛЬКО JSON без текста.
 
 {prompt}"""
-            
+
             payload = {
                 "model": MODEL_NAME,
                 "prompt": full_prompt,
@@ -287,14 +288,16 @@ class GenerativeAIService:
             logger.info("Sending generative request to Ollama...")
             logger.info(f"Prompt length: {len(full_prompt)} characters")
             
-            response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
+            with stage('ollama'):
+                response = requests.post(OLLAMA_API_URL, json=payload, timeout=300)
             
             if response.status_code == 200:
                 data = response.json()
+                record_ollama(data)
                 ai_response = data.get("response", "")
                 logger.info(f"Ollama responded with {len(ai_response)} characters")
                 
-                
+
                 if not ai_response:
                     logger.warning(f"Empty response from Ollama. Full data: {data}")
                     
@@ -305,7 +308,7 @@ class GenerativeAIService:
             else:
                 logger.error(f"Ollama error: {response.status_code} - {response.text}")
                 return None
-                
+        
         except requests.exceptions.ConnectionError:
             logger.error("Cannot connect to Ollama. Is it running?")
             return None
@@ -317,18 +320,18 @@ class GenerativeAIService:
             return None
     
     def _parse_ai_response(self, response: str) -> Optional[Dict[str, Any]]:
-        
+
         try:
-            
+        
             logger.info(f"AI response length: {len(response)} characters")
             
-           
+
             json_match = re.search(r'\{[\s\S]*\}', response)
             if json_match:
                 json_str = json_match.group()
                 parsed = json.loads(json_str)
                 
-                
+
                 found_components = [k for k in ['cpu', 'gpu', 'motherboard', 'ram', 'storage', 'psu', 'case', 'cooling'] if k in parsed]
                 logger.info(f"Parsed AI response. Found components: {found_components}")
                 
@@ -343,31 +346,31 @@ class GenerativeAIService:
             return None
     
     def _get_model_fields(self, model_class) -> set:
-        
+
         return {field.name for field in model_class._meta.get_fields() 
                 if hasattr(field, 'column') and field.column is not None}
     
     def _normalize_ai_spec(self, component_type: str, spec: dict) -> dict:
-       
+
         normalized = spec.copy()
         
-        
+
         if 'price' in normalized:
             price_val = normalized['price']
             if isinstance(price_val, str):
-                
+            
                 price_val = ''.join(c for c in price_val if c.isdigit() or c == '.')
             normalized['price'] = int(float(price_val)) if price_val else 0
         
-        
+
         if component_type == 'gpu':
-            
+        
             if 'memory' in normalized and isinstance(normalized['memory'], str):
                 mem_str = normalized['memory']
                 mem_match = re.search(r'(\d+)', mem_str)
                 normalized['memory'] = int(mem_match.group(1)) if mem_match else 8
             
-            
+
             if 'memory' in spec and isinstance(spec['memory'], str) and 'memory_type' not in normalized:
                 if 'GDDR6X' in spec['memory']:
                     normalized['memory_type'] = 'GDDR6X'
@@ -376,7 +379,7 @@ class GenerativeAIService:
                 elif 'GDDR5' in spec['memory']:
                     normalized['memory_type'] = 'GDDR5'
             
-            
+
             for field in ['core_clock', 'boost_clock']:
                 if field in normalized:
                     val = normalized[field]
@@ -386,7 +389,7 @@ class GenerativeAIService:
                         normalized[field] = int(val)
         
         elif component_type == 'ram':
-            
+        
             if 'capacity' in normalized:
                 cap_val = normalized['capacity']
                 if isinstance(cap_val, str):
@@ -396,7 +399,7 @@ class GenerativeAIService:
                     normalized['capacity'] = cap_val // 1024
         
         elif component_type == 'storage':
-            
+        
             if 'capacity' in normalized:
                 cap_val = normalized['capacity']
                 if isinstance(cap_val, str):
@@ -407,7 +410,7 @@ class GenerativeAIService:
                         cap_match = re.search(r'(\d+)', cap_val)
                         normalized['capacity'] = int(cap_match.group(1)) if cap_match else 512
             
-            
+
             if 'type' in normalized and 'storage_type' not in normalized:
                 type_val = normalized['type'].lower()
                 if 'nvme' in type_val or 'm.2' in type_val:
@@ -420,7 +423,7 @@ class GenerativeAIService:
                     normalized['storage_type'] = 'ssd_nvme'
         
         elif component_type == 'psu':
-            
+        
             if 'power' in normalized and 'wattage' not in normalized:
                 normalized['wattage'] = int(normalized['power'])
             if 'wattage' in normalized:
@@ -430,11 +433,11 @@ class GenerativeAIService:
                     normalized['wattage'] = int(watt_match.group(1)) if watt_match else 500
         
         elif component_type == 'cooling':
-           
+        
             if 'max_tdp' not in normalized:
                 normalized['max_tdp'] = 150  
             
-            
+
             if 'type' in normalized and 'cooling_type' not in normalized:
                 type_val = str(normalized['type']).lower()
                 if 'water' in type_val or 'liquid' in type_val or 'aio' in type_val:
@@ -443,38 +446,38 @@ class GenerativeAIService:
                     normalized['cooling_type'] = 'air'
         
         return normalized
-
+    
     def _create_component_from_spec(self, model_class, spec: dict, ai_confidence: float):
-        
+
         try:
-            
+        
             valid_fields = self._get_model_fields(model_class)
             logger.debug(f"{model_class.__name__} valid fields: {valid_fields}")
             
-            
+
             filtered_spec = {k: v for k, v in spec.items() if k in valid_fields}
             
-            
+
             removed_fields = set(spec.keys()) - set(filtered_spec.keys())
             if removed_fields:
                 logger.info(f"Filtered out unknown fields for {model_class.__name__}: {removed_fields}")
             
-            
+
             filtered_spec['is_ai_generated'] = True
             filtered_spec['ai_generation_date'] = timezone.now()
             filtered_spec['ai_confidence'] = ai_confidence
             
-            
+
             if 'price' in filtered_spec and not isinstance(filtered_spec['price'], Decimal):
                 filtered_spec['price'] = Decimal(str(filtered_spec['price']))
             
             logger.info(f"Creating {model_class.__name__} with fields: {list(filtered_spec.keys())}")
             
-            
+
             component = model_class.objects.create(**filtered_spec)
             logger.info(f"[OK] Created AI-generated {model_class.__name__}: {component.name} (price: {component.price})")
             return component
-            
+        
         except Exception as e:
             logger.error(f"[ERROR] Failed to create {model_class.__name__}: {e}")
             logger.error(f"Spec was: {spec}")
@@ -485,14 +488,25 @@ class GenerativeAIService:
     
     def generate_configuration(self, user) -> tuple:
 
+        with generation_trace() as trace:
+            configuration, info = self._generate_configuration(user)
+        
+        info['stage_timings_ms'] = trace.timings()
+        if trace.tokens_per_second:
+            info['tokens_per_second'] = trace.tokens_per_second
+        return configuration, info
+    
+    def _generate_configuration(self, user) -> tuple:
+
         from recommendations.models import PCConfiguration, Recommendation
         
         logger.info(f"Starting generative configuration for user: {user.username}")
         logger.info(f"User profile: type={self.user_type}, budget={self.min_budget}-{self.max_budget}, priority={self.priority}")
         logger.info(f"PC preferences: {self.pc_preferences}")
         
-        
-        prompt = self._build_generative_prompt()
+
+        with stage('prompt_build'):
+            prompt = self._build_generative_prompt()
         logger.debug(f"Generated prompt length: {len(prompt)} characters")
         
         ai_response = self._call_ollama(prompt)
@@ -501,25 +515,27 @@ class GenerativeAIService:
             logger.error("AI did not respond or is unavailable")
             return None, {"error": "AI is unavailable or did not respond"}
         
-       
-        parsed = self._parse_ai_response(ai_response)
+
+        with stage('json_parse'):
+            parsed = self._parse_ai_response(ai_response)
         if not parsed:
             logger.error("Failed to parse AI response")
             return None, {"error": "Failed to parse AI response"}
         
-        
+
         confidence = parsed.get('confidence', 0.8)
         logger.info(f"AI confidence: {confidence}")
         
-        
-        is_compatible, compat_issues = self._check_compatibility(parsed)
+
+        with stage('validation'):
+            is_compatible, compat_issues = self._check_compatibility(parsed)
         if not is_compatible:
             logger.warning(f"AI generated incompatible components: {compat_issues}")
         else:
             logger.info("All components are compatible")
         
         try:
-            
+        
             components = {}
             validation_warnings = []
             creation_errors = []
@@ -540,18 +556,20 @@ class GenerativeAIService:
                     spec = parsed[spec_key].copy()
                     logger.info(f"Processing {spec_key}: {spec.get('name', 'unknown')}")
                     
-                    
+
                     spec = self._normalize_ai_spec(spec_key, spec)
                     logger.debug(f"Normalized {spec_key}: {spec}")
                     
-                    
-                    is_valid, issues = self._validate_component_spec(spec_key, spec)
+
+                    with stage('validation'):
+                        is_valid, issues = self._validate_component_spec(spec_key, spec)
                     if issues:
                         validation_warnings.extend([f"{spec_key}: {issue}" for issue in issues])
                         logger.warning(f"Validation issues for {spec_key}: {issues}")
                     
                     if is_valid:
-                        component = self._create_component_from_spec(model_class, spec, confidence)
+                        with stage('component_creation'):
+                            component = self._create_component_from_spec(model_class, spec, confidence)
                         if component:
                             components[component_key] = component
                         else:
@@ -563,12 +581,12 @@ class GenerativeAIService:
                 else:
                     logger.warning(f"No spec found for {spec_key}")
             
-            
+
             logger.info(f"Created components: {list(components.keys())}")
             if creation_errors:
                 logger.error(f"Creation errors: {creation_errors}")
             
-            
+
             required_components = ['cpu', 'motherboard', 'ram', 'storage_primary']
             missing = [c for c in required_components if c not in components or not components[c]]
             if missing:
@@ -578,32 +596,33 @@ class GenerativeAIService:
                     error_msg += f". Details: {'; '.join(creation_errors)}"
                 return None, {"error": error_msg}
             
-            
+
             logger.info("Creating PCConfiguration...")
-            config = PCConfiguration.objects.create(
-                user=user,
-                name=f"AI-build for {self.user_type}",
-                **components
-            )
-            
-            config.calculate_total_price()
-            
-            
-            config.compatibility_check = is_compatible
-            config.compatibility_notes = "\n".join(compat_issues) if compat_issues else "[OK] All components are compatible"
-            config.save()
-            
-            
-            reasoning = parsed.get('reasoning', {})
-            for component_type, reason in reasoning.items():
-                component = components.get(component_type)
-                if component:
-                    Recommendation.objects.create(
-                        configuration=config,
-                        component_type=component_type,
-                        component_id=component.id,
-                        reason=reason
-                    )
+            with stage('persistence'):
+                config = PCConfiguration.objects.create(
+                    user=user,
+                    name=f"AI-build for {self.user_type}",
+                    **components
+                )
+                
+                config.calculate_total_price()
+                
+
+                config.compatibility_check = is_compatible
+                config.compatibility_notes = "\n".join(compat_issues) if compat_issues else "[OK] All components are compatible"
+                config.save()
+                
+
+                reasoning = parsed.get('reasoning', {})
+                for component_type, reason in reasoning.items():
+                    component = components.get(component_type)
+                    if component:
+                        Recommendation.objects.create(
+                            configuration=config,
+                            component_type=component_type,
+                            component_id=component.id,
+                            reason=reason
+                        )
             
             logger.info(f"[OK] AI-generated configuration created: {config.name} (total: {config.total_price} RUB)")
             
@@ -620,7 +639,7 @@ class GenerativeAIService:
                 "components_created": list(components.keys()),
                 "summary": f"Configuration generated by AI with {int(confidence * 100)}% confidence"
             }
-            
+        
         except Exception as e:
             import traceback
             logger.error(f"Error creating AI-generated configuration: {e}")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import User
+from recommendations.personalization_service import rebuild_preference_profiles
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает профили предпочтений пользователей по их сборкам'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько пользователей пересчитывать за один проход',
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        
+        for start in range(0, len(user_ids), batch_size):
+            rebuild_preference_profiles(user_ids[start:start + batch_size])
+        
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(user_ids)} preference profiles'))
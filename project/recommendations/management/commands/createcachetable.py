@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import BaseDatabaseCache
+from django.core.management.commands.createcachetable import Command as CreateCacheTableCommand
+
+from config.cache_backends import TieredCache
+
+
+class Command(CreateCacheTableCommand):
+    help = 'Создаёт таблицы кэша, включая общий уровень многоуровневых кэшей'
+
+    def handle(self, *tablenames, **options):
+        super().handle(*tablenames, **options)
+        if tablenames:
+            return
+
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            if isinstance(cache, TieredCache) and isinstance(cache.shared, BaseDatabaseCache):
+                self.create_table(options['database'], cache.shared._table, options['dry_run'])
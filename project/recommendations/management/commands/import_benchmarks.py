@@ -0,0 +1,91 @@
+import json
+import shutil
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from recommendations.benchmark_data import BenchmarkDataset, BenchmarkDataError, registry
+from recommendations.benchmark_links import link_catalog
+
+
+class Command(BaseCommand):
+    help = 'Импортирует новую версию базы бенчмарков (CPU, GPU, игры) из JSON-файла'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON-файл с данными бенчмарков')
+        parser.add_argument(
+            '--merge',
+            action='store_true',
+            help='Объединить с текущей версией вместо полной замены',
+        )
+        parser.add_argument(
+            '--set-version',
+            dest='version',
+            help='Версия набора данных (по умолчанию из файла или текущая дата)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только проверить файл, не сохраняя его',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'r', encoding='utf-8') as f:
+                drop = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read {options["path"]}: {e}')
+        
+        current = None
+        try:
+            current = registry.reload()
+        except BenchmarkDataError as e:
+            if options['merge']:
+                raise CommandError(f'Cannot merge, current dataset is unavailable: {e}')
+        
+        if options['merge']:
+            data = current.to_dict()
+            for section in ('cpu', 'gpu', 'games', 'reference'):
+                data[section] = {**data.get(section, {}), **drop.get(section, {})}
+        else:
+            data = drop
+        
+        data['version'] = (
+            options['version']
+            or drop.get('version')
+            or datetime.now().strftime('%Y.%m.%d-%H%M%S')
+        )
+        
+        if current and data['version'] == current.version:
+            raise CommandError(f'Version {data["version"]} is already installed, use --set-version')
+        
+        try:
+            dataset = BenchmarkDataset.from_dict(data)
+        except BenchmarkDataError as e:
+            raise CommandError(f'Invalid benchmark data: {e}')
+        
+        self.stdout.write(
+            f'Version {dataset.version}: {len(dataset.cpu)} CPUs, '
+            f'{len(dataset.gpu)} GPUs, {len(dataset.games)} games'
+        )
+        
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('Dry run: data is valid, nothing saved'))
+            return
+        
+        path = registry.path
+        if current and path.exists():
+            archive = path.with_name(f'{path.stem}-{current.version}{path.suffix}')
+            shutil.copy2(path, archive)
+            self.stdout.write(f'Previous version archived to {archive}')
+        
+        dataset.save(path)
+        registry.reload()
+        
+        for kind, stats in link_catalog().items():
+            self.stdout.write(f"{kind.upper()} links: {stats['updated']} updated, {stats['unmatched']} unmatched")
+        
+        self.stdout.write(self.style.SUCCESS(
+            f'Benchmark data {dataset.version} installed, workers reload it '
+            f'within BENCHMARK_RELOAD_INTERVAL seconds'
+        ))
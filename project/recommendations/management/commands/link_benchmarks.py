@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from recommendations.benchmark_links import link_catalog
+
+
+class Command(BaseCommand):
+    help = 'Сопоставляет процессоры и видеокарты каталога с записями базы бенчмарков'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересопоставить все компоненты, а не только новые и устаревшие',
+        )
+
+    def handle(self, *args, **options):
+        results = link_catalog(force=options['force'])
+        
+        for kind, stats in results.items():
+            self.stdout.write(
+                f"{kind.upper()}: {stats['checked']} checked, {stats['updated']} updated, "
+                f"{stats['matched']} matched, {stats['unmatched']} unmatched"
+            )
+        
+        self.stdout.write(self.style.SUCCESS('Benchmark links are up to date'))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recommendations.ai_analytics import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает почасовые сводки и частоту ошибок AI по сырым логам'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=None,
+            help='Пересчитать только последние N дней (по умолчанию все сохранённые логи)',
+        )
+    
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+        rollups = rebuild_rollups(since)
+        
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rollups} hourly AI rollups'))
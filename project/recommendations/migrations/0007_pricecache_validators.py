@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0006_add_notifications_enabled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pricecache',
+            name='etag',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='pricecache',
+            name='last_modified',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-19 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0007_pricecache_validators'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_type', models.CharField(max_length=50)),
+                ('component_id', models.IntegerField()),
+                ('shop', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('period', models.CharField(choices=[('day', 'День'), ('week', 'Неделя')], default='day', max_length=4)),
+                ('price_open', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('price_min', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('price_max', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('price_close', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('samples', models.PositiveIntegerField(default=1)),
+                ('in_stock', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['component_type', 'component_id', 'day'], name='recommendat_compone_c8aa33_idx'), models.Index(fields=['period', 'day'], name='recommendat_period_abf971_idx')],
+                'unique_together': {('component_type', 'component_id', 'shop', 'day')},
+            },
+        ),
+    ]
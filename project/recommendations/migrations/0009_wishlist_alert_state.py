@@ -0,0 +1,23 @@
+# Generated by Django 5.0.1 on 2026-10-19 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0008_price_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='wishlist',
+            name='last_alert_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Цена последнего уведомления'),
+        ),
+        migrations.AddField(
+            model_name='wishlist',
+            name='last_alerted_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего уведомления'),
+        ),
+    ]
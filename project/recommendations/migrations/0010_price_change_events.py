@@ -0,0 +1,37 @@
+# Generated by Django 5.0.1 on 2026-10-19 08:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0009_wishlist_alert_state'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceChangeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_type', models.CharField(max_length=50)),
+                ('component_id', models.IntegerField()),
+                ('shop', models.CharField(blank=True, max_length=50)),
+                ('old_price', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('new_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('source', models.CharField(choices=[('catalog', 'Каталог'), ('ingestion', 'Парсинг цен')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='wishlist',
+            index=models.Index(fields=['component_type', 'component_id', 'price_alert_threshold'], name='recommendat_compone_481512_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pricechangeevent',
+            index=models.Index(fields=['processed_at', 'created_at'], name='recommendat_process_7d88d1_idx'),
+        ),
+    ]
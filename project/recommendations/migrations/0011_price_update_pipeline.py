@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-19 08:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0010_price_change_events'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceUpdateRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_type', models.CharField(blank=True, max_length=50)),
+                ('status', models.CharField(choices=[('running', 'Выполняется'), ('complete', 'Завершено'), ('partial', 'Завершено с ошибками')], default='running', max_length=20)),
+                ('chunks_total', models.IntegerField(default=0)),
+                ('report', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriceUpdateChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('component_type', models.CharField(max_length=50)),
+                ('start_id', models.IntegerField()),
+                ('end_id', models.IntegerField()),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('done', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=20)),
+                ('attempts', models.IntegerField(default=0)),
+                ('components', models.IntegerField(default=0)),
+                ('saved', models.IntegerField(default=0)),
+                ('errors', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='recommendations.priceupdaterun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'status'], name='recommendat_run_id_ae91e1_idx')],
+            },
+        ),
+    ]
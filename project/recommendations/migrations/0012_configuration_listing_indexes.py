@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-19 09:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('computers', '0004_component_benchmark_link'),
+        ('recommendations', '0011_price_update_pipeline'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='pcconfiguration',
+            index=models.Index(fields=['user', 'created_at'], name='recommendat_user_id_0cd1cf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pcconfiguration',
+            index=models.Index(fields=['is_public', 'created_at'], name='recommendat_is_publ_3ed67b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pcconfiguration',
+            index=models.Index(fields=['is_public', 'total_price'], name='recommendat_is_publ_1f1ef5_idx'),
+        ),
+    ]
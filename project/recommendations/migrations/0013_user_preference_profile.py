@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-19 09:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0012_configuration_listing_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserPreferenceProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('build_count', models.PositiveIntegerField(default=0, verbose_name='Сборок')),
+                ('priced_count', models.PositiveIntegerField(default=0, verbose_name='Сборок с ценой')),
+                ('budget_total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Сумма бюджетов')),
+                ('budget_min', models.DecimalField(decimal_places=2, max_digits=10, null=True, verbose_name='Минимальный бюджет')),
+                ('budget_max', models.DecimalField(decimal_places=2, max_digits=10, null=True, verbose_name='Максимальный бюджет')),
+                ('cpu_manufacturers', models.JSONField(default=dict, verbose_name='Производители CPU')),
+                ('gpu_manufacturers', models.JSONField(default=dict, verbose_name='Производители GPU')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='preference_profile', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Профиль предпочтений',
+                'verbose_name_plural': 'Профили предпочтений',
+            },
+        ),
+    ]
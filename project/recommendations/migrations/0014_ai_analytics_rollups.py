@@ -0,0 +1,50 @@
+# Generated by Django 5.0.1 on 2026-10-19 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0013_user_preference_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIErrorCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='День')),
+                ('message_hash', models.CharField(max_length=40, verbose_name='Хеш ошибки')),
+                ('message', models.TextField(verbose_name='Ошибка')),
+                ('occurrences', models.PositiveIntegerField(default=0, verbose_name='Количество')),
+            ],
+            options={
+                'verbose_name': 'Частота ошибки AI',
+                'verbose_name_plural': 'Частота ошибок AI',
+            },
+        ),
+        migrations.CreateModel(
+            name='AILogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Час')),
+                ('status', models.CharField(max_length=30, verbose_name='Статус')),
+                ('requests', models.PositiveIntegerField(default=0, verbose_name='Запросов')),
+                ('timed_requests', models.PositiveIntegerField(default=0, verbose_name='Запросов со временем ответа')),
+                ('response_time_total_ms', models.BigIntegerField(default=0, verbose_name='Суммарное время ответа (мс)')),
+            ],
+            options={
+                'verbose_name': 'Сводка AI за час',
+                'verbose_name_plural': 'Сводки AI по часам',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='aierrorcount',
+            constraint=models.UniqueConstraint(fields=('day', 'message_hash'), name='unique_ai_error_day_message'),
+        ),
+        migrations.AddConstraint(
+            model_name='ailogrollup',
+            constraint=models.UniqueConstraint(fields=('hour', 'status'), name='unique_ai_rollup_hour_status'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.1 on 2026-10-19 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recommendations', '0014_ai_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIStageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='Час')),
+                ('stage', models.CharField(max_length=30, verbose_name='Этап')),
+                ('bucket', models.PositiveSmallIntegerField(verbose_name='Корзина гистограммы')),
+                ('samples', models.PositiveIntegerField(default=0, verbose_name='Замеров')),
+                ('total_ms', models.BigIntegerField(default=0, verbose_name='Суммарное время (мс)')),
+            ],
+            options={
+                'verbose_name': 'Гистограмма этапа AI',
+                'verbose_name_plural': 'Гистограммы этапов AI',
+            },
+        ),
+        migrations.CreateModel(
+            name='AITokenRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(unique=True, verbose_name='Час')),
+                ('generations', models.PositiveIntegerField(default=0, verbose_name='Генераций')),
+                ('eval_tokens', models.BigIntegerField(default=0, verbose_name='Сгенерировано токенов')),
+                ('eval_ms', models.BigIntegerField(default=0, verbose_name='Время генерации токенов (мс)')),
+                ('prompt_tokens', models.BigIntegerField(default=0, verbose_name='Токенов промпта')),
+            ],
+            options={
+                'verbose_name': 'Токены AI за час',
+                'verbose_name_plural': 'Токены AI по часам',
+            },
+        ),
+        migrations.AddField(
+            model_name='ailog',
+            name='stage_timings',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Время этапов (мс)'),
+        ),
+        migrations.AddField(
+            model_name='ailog',
+            name='tokens_per_second',
+            field=models.FloatField(null=True, verbose_name='Скорость генерации (токенов/с)'),
+        ),
+        migrations.AddConstraint(
+            model_name='aistagerollup',
+            constraint=models.UniqueConstraint(fields=('hour', 'stage', 'bucket'), name='unique_ai_stage_hour_bucket'),
+        ),
+    ]
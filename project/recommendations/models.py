@@ -65,6 +65,11 @@ class PCConfiguration(models.Model):
         verbose_name = 'Конфигурация ПК'
         verbose_name_plural = 'Конфигурации ПК'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['is_public', 'created_at']),
+            models.Index(fields=['is_public', 'total_price']),
+        ]
     
     def __str__(self):
         return f'{self.name} - {self.user.username}'
@@ -265,6 +270,14 @@ class Wishlist(models.Model):
         default=True,
         verbose_name='Уведомления включены'
     )
+    last_alert_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name='Цена последнего уведомления'
+    )
+    last_alerted_at = models.DateTimeField(null=True, blank=True, verbose_name='Дата последнего уведомления')
     
     notes = models.TextField(blank=True, verbose_name='Заметки')
     
@@ -276,16 +289,20 @@ class Wishlist(models.Model):
         verbose_name_plural = 'Избранное'
         unique_together = ['user', 'component_type', 'component_id']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['component_type', 'component_id', 'price_alert_threshold']),
+        ]
     
     def __str__(self):
         return f'{self.user.username} - {self.get_component_type_display()} #{self.component_id}'
     
-    def get_component(self):
+    @staticmethod
+    def component_models():
         
         from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
         from peripherals.models import Monitor, Keyboard, Mouse, Headset
         
-        model_map = {
+        return {
             'cpu': CPU,
             'gpu': GPU,
             'motherboard': Motherboard,
@@ -299,8 +316,10 @@ class Wishlist(models.Model):
             'mouse': Mouse,
             'headset': Headset,
         }
+    
+    def get_component(self):
         
-        model = model_map.get(self.component_type)
+        model = self.component_models().get(self.component_type)
         if model:
             try:
                 return model.objects.get(id=self.component_id)
@@ -357,7 +376,9 @@ class AILog(models.Model):
     
     
     response_time_ms = models.IntegerField(null=True, verbose_name='Время ответа (мс)')
+    stage_timings = models.JSONField(default=dict, blank=True, verbose_name='Время этапов (мс)')
     tokens_used = models.IntegerField(null=True, verbose_name='Использовано токенов')
+    tokens_per_second = models.FloatField(null=True, verbose_name='Скорость генерации (токенов/с)')
     
     
     user_approved = models.BooleanField(null=True, verbose_name='Одобрено пользователем')
@@ -380,7 +401,7 @@ class AILog(models.Model):
     @classmethod
     def log_response(cls, user, prompt, raw_response, parsed_response, 
                      status='success', validation_errors=None, response_time_ms=None,
-                     configuration_id=None, fallback_reason=''):
+                     configuration_id=None, fallback_reason='', trace=None):
         
         return cls.objects.create(
             user=user,
@@ -391,39 +412,23 @@ class AILog(models.Model):
             validation_errors=validation_errors or [],
             response_time_ms=response_time_ms,
             configuration_id=configuration_id,
-            fallback_reason=fallback_reason
+            fallback_reason=fallback_reason,
+            stage_timings=trace.timings() if trace else {},
+            tokens_used=trace.eval_count if trace else None,
+            tokens_per_second=trace.tokens_per_second if trace else None
         )
     
     @classmethod
     def get_success_rate(cls, days=7):
+
+        from .ai_analytics import status_breakdown, window_start
         
-        from datetime import timedelta
-        from django.utils import timezone
-        
-        since = timezone.now() - timedelta(days=days)
-        total = cls.objects.filter(created_at__gte=since).count()
-        if total == 0:
-            return 100.0
-        
-        success = cls.objects.filter(created_at__gte=since, status='success').count()
-        return round((success / total) * 100, 2)
+        success_rate = status_breakdown(window_start(days))['success_rate']
+        return 100.0 if success_rate is None else success_rate
     
     @classmethod
     def get_common_errors(cls, days=7, limit=10):
-       
-        from datetime import timedelta
-        from django.utils import timezone
-        from collections import Counter
-        
-        since = timezone.now() - timedelta(days=days)
-        logs = cls.objects.filter(
-            created_at__gte=since,
-            status__in=['validation_failed', 'fallback_used']
-        )
-        
-        errors = []
-        for log in logs:
-            errors.extend(log.validation_errors)
+
+        from .ai_analytics import common_errors, window_start
         
-        counter = Counter(errors)
-        return counter.most_common(limit)
+        return common_errors(window_start(days), limit)
@@ -0,0 +1,24 @@
+from rest_framework.pagination import CursorPagination
+
+
+class BuildCursorPagination(CursorPagination):
+
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = '-created_at'
+    orderings = ()
+    
+    def get_ordering(self, request, queryset, view):
+
+        # Only orderings backed by an index are allowed, so the view's
+        # OrderingFilter is deliberately not consulted
+        ordering = request.query_params.get('ordering')
+        if ordering not in self.orderings:
+            ordering = self.ordering
+        return (ordering, '-id')
+
+
+class GalleryCursorPagination(BuildCursorPagination):
+
+    orderings = ('-created_at', 'total_price', '-total_price')
@@ -1,10 +1,14 @@
 
 import logging
-from typing import Dict, List, Optional, Any
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Any
 from decimal import Decimal
 from datetime import datetime, timedelta
-from django.db import models
-from django.db.models import Count, Avg, F
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, Avg, F, Max, Min, Q, Sum
+from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -42,215 +46,275 @@ class UserBuildHistory(models.Model):
         ]
 
 
-class PersonalizationService:
-    
+class UserPreferenceProfile(models.Model):
+
+    # Running aggregates over a user's configurations, kept current by the
+    # PCConfiguration signals and rebuilt by `backfill_preference_profiles`
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='preference_profile',
+        verbose_name='Пользователь'
+    )
+    build_count = models.PositiveIntegerField(default=0, verbose_name='Сборок')
+    priced_count = models.PositiveIntegerField(default=0, verbose_name='Сборок с ценой')
+    budget_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name='Сумма бюджетов')
+    budget_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, verbose_name='Минимальный бюджет')
+    budget_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, verbose_name='Максимальный бюджет')
+    cpu_manufacturers = models.JSONField(default=dict, verbose_name='Производители CPU')
+    gpu_manufacturers = models.JSONField(default=dict, verbose_name='Производители GPU')
+    updated_at = models.DateTimeField(auto_now=True)
     
-    def __init__(self, user):
-        self.user = user
+    class Meta:
+        app_label = 'recommendations'
+        verbose_name = 'Профиль предпочтений'
+        verbose_name_plural = 'Профили предпочтений'
     
-    def get_user_preferences(self) -> Dict[str, Any]:
+    def as_preferences(self) -> Dict[str, Any]:
 
-        from .models import PCConfiguration
-        
-        
-        configurations = PCConfiguration.objects.filter(
-            user=self.user
-        ).select_related('cpu', 'gpu', 'motherboard', 'ram')
-        
-        if not configurations.exists():
-            return {
-                'has_history': False,
-                'preferences': None,
-                'recommendation': 'Создайте первую сборку для получения персональных рекомендаций'
-            }
-        
         preferences = {
             'has_history': True,
-            'total_builds': configurations.count(),
+            'total_builds': self.build_count,
             'avg_budget': 0,
-            'preferred_cpu_manufacturer': None,
-            'preferred_gpu_manufacturer': None,
+            'preferred_cpu_manufacturer': _most_common(self.cpu_manufacturers),
+            'preferred_gpu_manufacturer': _most_common(self.gpu_manufacturers),
             'typical_use_cases': [],
             'budget_range': {'min': 0, 'max': 0}
         }
-        
-       
-        budgets = [float(c.total_price) for c in configurations if c.total_price]
-        if budgets:
-            preferences['avg_budget'] = sum(budgets) / len(budgets)
+        if self.priced_count:
+            preferences['avg_budget'] = float(self.budget_total) / self.priced_count
             preferences['budget_range'] = {
-                'min': min(budgets),
-                'max': max(budgets)
+                'min': float(self.budget_min),
+                'max': float(self.budget_max)
             }
+        return preferences
+    
+    def apply(self, old: Optional['BuildState'], new: Optional['BuildState']) -> None:
+
+        from computers.models import CPU, GPU
         
+        self.build_count += (new is not None) - (old is not None)
         
-        cpu_manufacturers = {}
-        for config in configurations:
-            if config.cpu:
-                mfr = config.cpu.manufacturer
-                cpu_manufacturers[mfr] = cpu_manufacturers.get(mfr, 0) + 1
-        
-        if cpu_manufacturers:
-            preferences['preferred_cpu_manufacturer'] = max(cpu_manufacturers, key=cpu_manufacturers.get)
+        stale_bounds = False
+        if old is not None and old.total_price:
+            self.priced_count -= 1
+            self.budget_total -= old.total_price
+            stale_bounds = old.total_price in (self.budget_min, self.budget_max)
+        if new is not None and new.total_price:
+            self.priced_count += 1
+            self.budget_total += new.total_price
+            if not stale_bounds:
+                self.budget_min = min(self.budget_min, new.total_price) if self.budget_min is not None else new.total_price
+                self.budget_max = max(self.budget_max, new.total_price) if self.budget_max is not None else new.total_price
         
+        # Removing the current minimum or maximum cannot be undone from the
+        # aggregates alone, so only that case goes back to the table
+        if stale_bounds:
+            from .models import PCConfiguration
+            
+            bounds = PCConfiguration.objects.filter(user_id=self.user_id, total_price__gt=0).aggregate(
+                low=Min('total_price'), high=Max('total_price')
+            )
+            self.budget_min, self.budget_max = bounds['low'], bounds['high']
         
-        gpu_manufacturers = {}
-        for config in configurations:
-            if config.gpu:
-                mfr = config.gpu.manufacturer
-                gpu_manufacturers[mfr] = gpu_manufacturers.get(mfr, 0) + 1
+        self.cpu_manufacturers = _shift_histogram(
+            self.cpu_manufacturers, CPU, old and old.cpu_id, new and new.cpu_id
+        )
+        self.gpu_manufacturers = _shift_histogram(
+            self.gpu_manufacturers, GPU, old and old.gpu_id, new and new.gpu_id
+        )
+
+
+@dataclass(frozen=True)
+class BuildState:
+
+    user_id: int
+    total_price: Decimal
+    cpu_id: Optional[int]
+    gpu_id: Optional[int]
+    
+    @classmethod
+    def of(cls, configuration) -> Optional['BuildState']:
+
+        # Read from __dict__ so deferred columns never trigger a query; a
+        # partially loaded row has no usable state
+        values = configuration.__dict__
+        if not all(name in values for name in ('user_id', 'total_price', 'cpu_id', 'gpu_id')):
+            return None
+        return cls(values['user_id'], values['total_price'], values['cpu_id'], values['gpu_id'])
+
+
+PROFILE_FIELDS = (
+    'build_count', 'priced_count', 'budget_total', 'budget_min', 'budget_max',
+    'cpu_manufacturers', 'gpu_manufacturers', 'updated_at',
+)
+
+
+def _most_common(histogram: Dict[str, int]) -> Optional[str]:
+    return max(histogram, key=histogram.get) if histogram else None
+
+
+def _shift_histogram(histogram: Dict[str, int], model, old_id, new_id) -> Dict[str, int]:
+
+    if old_id == new_id:
+        return histogram
+    
+    manufacturers = dict(
+        model.objects.filter(pk__in=[pk for pk in (old_id, new_id) if pk]).values_list('id', 'manufacturer')
+    )
+    counts = Counter(histogram)
+    if old_id in manufacturers:
+        counts[manufacturers[old_id]] -= 1
+    if new_id in manufacturers:
+        counts[manufacturers[new_id]] += 1
+    return {name: count for name, count in counts.items() if count > 0}
+
+
+def _group_histograms(queryset, field: str) -> Dict[int, Dict[str, int]]:
+
+    histograms: Dict[int, Dict[str, int]] = {}
+    rows = queryset.filter(**{f'{field}__isnull': False}).values('user_id', f'{field}__manufacturer').annotate(
+        builds=Count('id')
+    )
+    for row in rows:
+        histograms.setdefault(row['user_id'], {})[row[f'{field}__manufacturer']] = row['builds']
+    return histograms
+
+
+def rebuild_preference_profiles(user_ids: Iterable[int], create: bool = True) -> List[UserPreferenceProfile]:
+
+    from .models import PCConfiguration
+    
+    user_ids = list(user_ids)
+    configurations = PCConfiguration.objects.filter(user_id__in=user_ids)
+    totals = {
+        row['user_id']: row
+        for row in configurations.values('user_id').annotate(
+            builds=Count('id'),
+            priced=Count('id', filter=Q(total_price__gt=0)),
+            budget=Sum('total_price', filter=Q(total_price__gt=0)),
+            low=Min('total_price', filter=Q(total_price__gt=0)),
+            high=Max('total_price', filter=Q(total_price__gt=0)),
+        ).order_by()
+    }
+    cpu_histograms = _group_histograms(configurations, 'cpu')
+    gpu_histograms = _group_histograms(configurations, 'gpu')
+    
+    now = timezone.now()
+    with transaction.atomic():
+        existing = {
+            profile.user_id: profile
+            for profile in UserPreferenceProfile.objects.select_for_update().filter(user_id__in=user_ids)
+        }
+        profiles, created = [], []
+        for user_id in user_ids:
+            profile = existing.get(user_id)
+            if profile is None:
+                if not create:
+                    continue
+                profile = UserPreferenceProfile(user_id=user_id)
+                created.append(profile)
+            
+            row = totals.get(user_id, {})
+            profile.build_count = row.get('builds', 0)
+            profile.priced_count = row.get('priced', 0)
+            profile.budget_total = row.get('budget') or 0
+            profile.budget_min = row.get('low')
+            profile.budget_max = row.get('high')
+            profile.cpu_manufacturers = cpu_histograms.get(user_id, {})
+            profile.gpu_manufacturers = gpu_histograms.get(user_id, {})
+            profile.updated_at = now
+            profiles.append(profile)
         
-        if gpu_manufacturers:
-            preferences['preferred_gpu_manufacturer'] = max(gpu_manufacturers, key=gpu_manufacturers.get)
+        if existing:
+            UserPreferenceProfile.objects.bulk_update(existing.values(), PROFILE_FIELDS)
+        UserPreferenceProfile.objects.bulk_create(created)
+    return profiles
+
+
+def record_build_change(old: Optional[BuildState], new: Optional[BuildState], user_id: int) -> None:
+
+    with transaction.atomic():
+        profile = UserPreferenceProfile.objects.select_for_update().filter(user_id=user_id).first()
+        if profile is None:
+            # Deleting builds never creates a profile; it may be the user
+            # that is being deleted
+            if new is not None:
+                rebuild_preference_profiles([user_id])
+            return
         
-        return preferences
+        profile.apply(old, new)
+        profile.save()
+
+
+class PersonalizationService:
+    
+    
+    def __init__(self, user):
+        self.user = user
     
-    def get_upgrade_recommendations(self, current_config_id: int) -> Dict[str, Any]:
+    def get_user_preferences(self) -> Dict[str, Any]:
+
+        profile = UserPreferenceProfile.objects.filter(user_id=self.user.pk).first()
+        if profile is None:
+            profile = rebuild_preference_profiles([self.user.pk])[0]
+        
+        if not profile.build_count:
+            return {
+                'has_history': False,
+                'preferences': None,
+                'recommendation': 'Создайте первую сборку для получения персональных рекомендаций'
+            }
+        return profile.as_preferences()
+        
+    def get_upgrade_recommendations(self, current_config_id: int, budget: Optional[Decimal] = None) -> Dict[str, Any]:
 
         from .models import PCConfiguration
-        from computers.models import CPU, GPU, RAM, Storage
+        from .upgrade_planner import UpgradePlanner
         
         try:
             config = PCConfiguration.objects.select_related(
-                'cpu', 'gpu', 'motherboard', 'ram', 'storage_primary'
+                'motherboard', 'cooling'
             ).get(id=current_config_id, user=self.user)
         except PCConfiguration.DoesNotExist:
             return {'error': 'Configuration not found'}
         
-        upgrades = []
-        
-
-        if config.cpu and config.motherboard:
-            better_cpus = CPU.objects.filter(
-                socket=config.motherboard.socket,
-                performance_score__gt=config.cpu.performance_score,
-                price__gt=config.cpu.price
-            ).order_by('-performance_score')[:3]
-            
-            if better_cpus:
-                upgrades.append({
-                    'component': 'cpu',
-                    'current': str(config.cpu),
-                    'current_score': config.cpu.performance_score,
-                    'recommendations': [
-                        {
-                            'name': cpu.name,
-                            'score': cpu.performance_score,
-                            'price': float(cpu.price),
-                            'improvement': f"+{cpu.performance_score - config.cpu.performance_score} очков"
-                        }
-                        for cpu in better_cpus
-                    ]
-                })
-        
-
-        if config.gpu:
-            better_gpus = GPU.objects.filter(
-                performance_score__gt=config.gpu.performance_score,
-                price__lte=config.gpu.price * 2  
-            ).order_by('-performance_score')[:3]
-            
-            if better_gpus:
-                upgrades.append({
-                    'component': 'gpu',
-                    'current': str(config.gpu),
-                    'current_score': config.gpu.performance_score,
-                    'recommendations': [
-                        {
-                            'name': gpu.name,
-                            'score': gpu.performance_score,
-                            'memory': gpu.memory,
-                            'price': float(gpu.price),
-                            'improvement': f"+{gpu.performance_score - config.gpu.performance_score} очков"
-                        }
-                        for gpu in better_gpus
-                    ]
-                })
-        
-
-        if config.ram and config.motherboard:
-
-            more_ram = RAM.objects.filter(
-                memory_type=config.motherboard.memory_type,
-                capacity__gt=config.ram.capacity
-            ).order_by('capacity')[:3]
-            
-            if more_ram:
-                upgrades.append({
-                    'component': 'ram',
-                    'current': f"{config.ram.capacity}GB",
-                    'recommendations': [
-                        {
-                            'name': ram.name,
-                            'capacity': ram.capacity,
-                            'speed': ram.speed,
-                            'price': float(ram.price)
-                        }
-                        for ram in more_ram
-                    ]
-                })
-        
-        
-        if config.storage_primary:
-            faster_storage = Storage.objects.filter(
-                storage_type='ssd_nvme',
-                capacity__gte=config.storage_primary.capacity
-            ).exclude(id=config.storage_primary.id).order_by('-read_speed')[:3]
-            
-            if faster_storage:
-                upgrades.append({
-                    'component': 'storage',
-                    'current': str(config.storage_primary),
-                    'recommendations': [
-                        {
-                            'name': st.name,
-                            'capacity': st.capacity,
-                            'type': st.storage_type,
-                            'read_speed': st.read_speed,
-                            'price': float(st.price)
-                        }
-                        for st in faster_storage
-                    ]
-                })
+        plan = UpgradePlanner(config).plan(budget)
         
         return {
             'configuration_id': current_config_id,
             'configuration_name': config.name,
             'current_total': float(config.total_price) if config.total_price else 0,
-            'upgrades': upgrades,
-            'total_upgrade_options': len(upgrades)
+            **plan
         }
     
-    def get_similar_builds(self, config_id: int = None, budget: float = None, user_type: str = None) -> List[Dict]:
+    def get_similar_builds(self, config_id: int = None, budget: float = None, user_type: str = None,
+                           limit: int = 10) -> List[Dict]:
 
+        from .build_index import PRICE_ONLY, encode_budget, get_build_index
         from .models import PCConfiguration
         
-
-        queryset = PCConfiguration.objects.filter(
-            is_public=True
-        ).exclude(user=self.user).select_related(
-            'cpu', 'gpu', 'motherboard', 'ram'
-        )
-        
+        index = get_build_index()
+        vector, mask, exclude = None, None, []
 
         if config_id:
-            try:
-                reference = PCConfiguration.objects.get(id=config_id)
-                budget = float(reference.total_price) if reference.total_price else 100000
-            except PCConfiguration.DoesNotExist:
-                pass
+            vector = index.vector_for(config_id)
+            exclude = [config_id]
+        if vector is None and budget:
+            # A bare budget only says something about price
+            vector, mask = encode_budget(budget), PRICE_ONLY
         
-
-        if budget:
-            min_budget = Decimal(str(budget * 0.7))
-            max_budget = Decimal(str(budget * 1.3))
-            queryset = queryset.filter(
-                total_price__gte=min_budget,
-                total_price__lte=max_budget
+        if vector is None:
+            queryset = PCConfiguration.objects.filter(is_public=True).exclude(user=self.user)
+            if user_type:
+                queryset = queryset.filter(user__user_type=user_type)
+            ranked = [(pk, None) for pk in queryset.order_by('-created_at').values_list('id', flat=True)[:limit]]
+        else:
+            ranked = index.nearest(
+                vector, limit=limit, exclude_ids=exclude, exclude_owner=self.user.pk, user_type=user_type, mask=mask
             )
         
-        
-        similar = queryset.order_by('-created_at')[:10]
+        builds = PCConfiguration.objects.select_related('cpu', 'gpu', 'ram').in_bulk([pk for pk, _ in ranked])
         
         return [
             {
@@ -261,7 +325,9 @@ class PersonalizationService:
                 'gpu': str(config.gpu) if config.gpu else None,
                 'ram': f"{config.ram.capacity}GB" if config.ram else None,
                 'share_code': config.share_code,
-                'created_at': config.created_at.isoformat()
+                'created_at': config.created_at.isoformat(),
+                'similarity': round(score, 4) if score is not None else None
             }
-            for config in similar
+            for config, score in ((builds.get(pk), score) for pk, score in ranked)
+            if config is not None
         ]
@@ -0,0 +1,118 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from .models import Wishlist
+from .price_service import PriceCache
+
+logger = logging.getLogger(__name__)
+
+
+def alert_candidates(component_type: str, model, component_ids: Optional[Iterable[int]] = None):
+
+    catalog = model.objects.filter(pk=OuterRef('component_id'))
+    best_shop_price = (
+        PriceCache.objects
+        .filter(
+            component_type=component_type,
+            component_id=OuterRef('component_id'),
+            in_stock=True,
+            price__isnull=False,
+        )
+        .order_by('price')
+        .values('price')[:1]
+    )
+    price_field = DecimalField(max_digits=10, decimal_places=2)
+    
+    queryset = Wishlist.objects.filter(
+        component_type=component_type,
+        price_alert_threshold__isnull=False,
+        notifications_enabled=True,
+    )
+    if component_ids is not None:
+        queryset = queryset.filter(component_id__in=list(component_ids))
+    
+    return (
+        queryset
+        .annotate(
+            catalog_price=Subquery(catalog.values('price')[:1], output_field=price_field),
+            shop_price=Subquery(best_shop_price, output_field=price_field),
+        )
+        .annotate(
+            current_price=Least(
+                'catalog_price',
+                Coalesce('shop_price', 'catalog_price'),
+                output_field=price_field,
+            ),
+            component_name=Subquery(catalog.values('name')[:1]),
+        )
+    )
+
+
+def evaluate_price_alerts(components: Optional[Dict[str, Iterable[int]]] = None) -> Dict[int, List[Dict]]:
+
+    now = timezone.now()
+    digests: Dict[int, List[Dict]] = defaultdict(list)
+    
+    with transaction.atomic():
+        for component_type, model in Wishlist.component_models().items():
+            component_ids = None
+            if components is not None:
+                component_ids = components.get(component_type)
+                if not component_ids:
+                    continue
+            
+            candidates = alert_candidates(component_type, model, component_ids)
+            
+
+            # Re-arm items whose price went back above the threshold, so the
+            # next drop is reported again
+            rearm_ids = list(
+                candidates
+                .filter(last_alert_price__isnull=False, current_price__gt=F('price_alert_threshold'))
+                .values_list('id', flat=True)
+            )
+            if rearm_ids:
+                Wishlist.objects.filter(id__in=rearm_ids).update(last_alert_price=None)
+            
+            hits = list(
+                candidates
+                .filter(current_price__lte=F('price_alert_threshold'))
+                .filter(Q(last_alert_price__isnull=True) | Q(current_price__lt=F('last_alert_price')))
+                .values(
+                    'id', 'user_id', 'component_id', 'component_name',
+                    'current_price', 'price_alert_threshold', 'price_at_add',
+                )
+            )
+            if not hits:
+                continue
+            
+            Wishlist.objects.bulk_update(
+                [
+                    Wishlist(id=hit['id'], last_alert_price=hit['current_price'], last_alerted_at=now)
+                    for hit in hits
+                ],
+                ['last_alert_price', 'last_alerted_at'],
+                batch_size=500,
+            )
+            
+            for hit in hits:
+                digests[hit['user_id']].append({
+                    'wishlist_id': hit['id'],
+                    'component_type': component_type,
+                    'component_id': hit['component_id'],
+                    'component_name': hit['component_name'] or f"{component_type.upper()} #{hit['component_id']}",
+                    'current_price': float(hit['current_price']),
+                    'threshold_price': float(hit['price_alert_threshold']),
+                    'original_price': float(hit['price_at_add']),
+                })
+    
+    logger.info(
+        f"Price alerts evaluated: {sum(len(items) for items in digests.values())} hits for {len(digests)} users"
+    )
+    return dict(digests)
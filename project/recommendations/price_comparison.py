@@ -0,0 +1,243 @@
+import logging
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+
+from .component_resolver import CONFIGURATION_SLOTS, WORKSPACE_SLOTS
+from .price_ingestion import PriceIngestionEngine, PriceTarget
+from .price_service import PriceCache
+
+logger = logging.getLogger(__name__)
+
+
+SLOT_COMPONENT_TYPES = {
+    'storage_primary': 'storage',
+    'storage_secondary': 'storage',
+    'monitor_primary': 'monitor',
+    'monitor_secondary': 'monitor',
+}
+
+CATALOG_SHOP = 'catalog'
+
+# Mixed-shop baskets are solved exactly by enumerating shop subsets
+MAX_EXACT_SHOPS = 10
+
+
+@dataclass
+class BasketItem:
+
+    slot: str
+    component_type: str
+    component_id: int
+    name: str
+    catalog_price: Optional[Decimal]
+    offers: Dict[str, Dict] = field(default_factory=dict)
+    
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.component_type, self.component_id)
+    
+    def best_offer(self, shops=None) -> Optional[Tuple[str, Decimal]]:
+
+        prices = [
+            (offer['price'], shop)
+            for shop, offer in self.offers.items()
+            if shops is None or shop in shops
+        ]
+        if not prices:
+            return None
+        price, shop = min(prices)
+        return shop, price
+    
+    def price_in(self, shops=None) -> Optional[Tuple[str, Decimal]]:
+
+        # Components not listed by any shop are priced from the catalog
+        if not self.offers:
+            return (CATALOG_SHOP, self.catalog_price) if self.catalog_price is not None else None
+        return self.best_offer(shops)
+
+
+def basket_items(configuration=None, workspace=None) -> List[BasketItem]:
+
+    slots = []
+    if configuration is not None:
+        slots.extend((configuration, slot) for slot in CONFIGURATION_SLOTS)
+    if workspace is not None:
+        slots.extend((workspace, slot) for slot in WORKSPACE_SLOTS)
+    
+    items = []
+    for owner, slot in slots:
+        component = getattr(owner, slot, None)
+        if component is None:
+            continue
+        items.append(BasketItem(
+            slot=slot,
+            component_type=SLOT_COMPONENT_TYPES.get(slot, slot),
+            component_id=component.id,
+            name=component.name,
+            catalog_price=component.price,
+        ))
+    return items
+
+
+def load_offers(items: List[BasketItem]) -> None:
+
+    if not items:
+        return
+    
+    ids_by_type: Dict[str, set] = {}
+    for item in items:
+        ids_by_type.setdefault(item.component_type, set()).add(item.component_id)
+    
+    condition = Q()
+    for component_type, ids in ids_by_type.items():
+        condition |= Q(component_type=component_type, component_id__in=ids)
+    
+    offers: Dict[Tuple[str, int], Dict[str, Dict]] = {}
+    rows = PriceCache.objects.filter(condition, in_stock=True, price__isnull=False).values(
+        'component_type', 'component_id', 'shop', 'price', 'url', 'last_updated'
+    )
+    for row in rows:
+        offers.setdefault((row['component_type'], row['component_id']), {})[row['shop']] = {
+            'price': row['price'],
+            'url': row['url'],
+            'updated_at': row['last_updated'].isoformat() if row['last_updated'] else None,
+        }
+    
+    for item in items:
+        item.offers = offers.get(item.key, {})
+
+
+def refresh_offers(items: List[BasketItem], engine: Optional[PriceIngestionEngine] = None) -> Dict[str, Any]:
+
+    engine = engine or PriceIngestionEngine()
+    if not engine.enabled or not items:
+        return {}
+    
+    targets = {item.key: PriceTarget(item.component_type, item.component_id, item.name) for item in items}
+    return engine.run(list(targets.values()))
+
+
+def delivery_fees() -> Dict[str, Decimal]:
+
+    return {
+        shop: Decimal(str(config.get('delivery_fee', 0) or 0))
+        for shop, config in getattr(settings, 'PRICE_SHOP_APIS', {}).items()
+    }
+
+
+def _line(item: BasketItem, shop: str, price: Decimal) -> Dict:
+
+    offer = item.offers.get(shop, {})
+    return {
+        'slot': item.slot,
+        'component_type': item.component_type,
+        'component_id': item.component_id,
+        'name': item.name,
+        'shop': shop,
+        'price': float(price),
+        'url': offer.get('url', ''),
+    }
+
+
+def _basket(lines: List[Dict], fees: Dict[str, Decimal]) -> Dict:
+
+    shops = sorted({line['shop'] for line in lines if line['shop'] != CATALOG_SHOP})
+    delivery = sum((fees.get(shop, Decimal('0')) for shop in shops), Decimal('0'))
+    subtotal = sum((Decimal(str(line['price'])) for line in lines), Decimal('0'))
+    return {
+        'items': lines,
+        'shops': shops,
+        'subtotal': float(subtotal),
+        'delivery': float(delivery),
+        'total': float(subtotal + delivery),
+    }
+
+
+def cheapest_per_component(items: List[BasketItem], fees: Dict[str, Decimal]) -> Dict:
+
+    lines = []
+    for item in items:
+        best = item.price_in()
+        if best:
+            lines.append(_line(item, *best))
+    return _basket(lines, fees)
+
+
+def single_shop_baskets(items: List[BasketItem], fees: Dict[str, Decimal]) -> Tuple[Optional[Dict], Dict[str, Dict]]:
+
+    shops = sorted({shop for item in items for shop in item.offers})
+    summaries = {}
+    best = None
+    
+    for shop in shops:
+        lines = [_line(item, shop, item.offers[shop]['price']) for item in items if shop in item.offers]
+        missing = [item.slot for item in items if shop not in item.offers]
+        basket = _basket(lines, fees)
+        summaries[shop] = {'total': basket['total'], 'covered': len(lines), 'missing': missing}
+        
+        if not missing and (best is None or basket['total'] < best['total']):
+            best = dict(basket, shop=shop)
+    
+    return best, summaries
+
+
+def mixed_shop_optimum(items: List[BasketItem], fees: Dict[str, Decimal]) -> Dict:
+
+    shops = sorted({shop for item in items for shop in item.offers})
+    if len(shops) > MAX_EXACT_SHOPS:
+        # Too many subsets; the per-component basket is a close upper bound
+        return cheapest_per_component(items, fees)
+    
+    best = None
+    best_total = None
+    for size in range(1, len(shops) + 1):
+        for subset in combinations(shops, size):
+            picks = [(item, item.price_in(subset)) for item in items]
+            if any(pick is None and item.offers for item, pick in picks):
+                continue
+            
+            lines = [_line(item, *pick) for item, pick in picks if pick]
+            total = sum((Decimal(str(line['price'])) for line in lines), Decimal('0'))
+            total += sum((fees.get(shop, Decimal('0')) for shop in subset), Decimal('0'))
+            if best_total is None or total < best_total:
+                best, best_total = lines, total
+    
+    if best is None:
+        return cheapest_per_component(items, fees)
+    return _basket(best, fees)
+
+
+def compare_basket(items: List[BasketItem], refresh: bool = True) -> Dict[str, Any]:
+
+    ingestion = refresh_offers(items) if refresh else {}
+    load_offers(items)
+    
+    fees = delivery_fees()
+    single_shop, shops = single_shop_baskets(items, fees)
+    
+    return {
+        'components': [
+            {
+                'slot': item.slot,
+                'component_type': item.component_type,
+                'component_id': item.component_id,
+                'name': item.name,
+                'catalog_price': float(item.catalog_price) if item.catalog_price is not None else None,
+                'offers': {
+                    shop: dict(offer, price=float(offer['price']))
+                    for shop, offer in sorted(item.offers.items(), key=lambda entry: entry[1]['price'])
+                },
+            }
+            for item in items
+        ],
+        'cheapest_per_component': cheapest_per_component(items, fees),
+        'cheapest_single_shop': single_shop,
+        'mixed_optimum': mixed_shop_optimum(items, fees),
+        'shops': shops,
+        'refreshed': bool(ingestion),
+    }
@@ -0,0 +1,110 @@
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .price_service import PriceChangeEvent
+
+logger = logging.getLogger(__name__)
+
+
+# (component_type, component_id, shop, old_price, new_price)
+PriceChange = Tuple[str, int, str, Optional[Decimal], Decimal]
+
+EVENT_RETENTION = timedelta(days=7)
+
+
+def emit_price_changes(changes: Iterable[PriceChange], source: str) -> List[Tuple[str, int]]:
+
+    events = [
+        PriceChangeEvent(
+            component_type=component_type,
+            component_id=component_id,
+            shop=shop or '',
+            old_price=old_price,
+            new_price=new_price,
+            source=source,
+        )
+        for component_type, component_id, shop, old_price, new_price in changes
+        if new_price is not None and old_price != new_price
+    ]
+    if not events:
+        return []
+    
+    PriceChangeEvent.objects.bulk_create(events)
+    
+    # MySQL does not return primary keys from bulk_create, so the task is
+    # handed the changed components rather than the new event ids
+    components = sorted({(event.component_type, event.component_id) for event in events})
+    transaction.on_commit(lambda: _enqueue(components))
+    return components
+
+
+def _enqueue(components: List[Tuple[str, int]]) -> None:
+
+    from .tasks import process_price_changes
+    
+    try:
+        process_price_changes.delay(components=components)
+    except Exception as e:
+        # The periodic sweep picks up events that could not be enqueued
+        logger.warning(f"Price change events for {components[:5]} not enqueued: {e}")
+
+
+def _claim_events(components: Optional[Iterable[Tuple[str, int]]], now) -> List[Tuple[int, str, int]]:
+
+    # Marking the rows processed inside one transaction is the claim: a
+    # concurrent sweep skips the locked rows and finds them processed after
+    # the commit, so every event is evaluated once
+    pending = PriceChangeEvent.objects.filter(processed_at__isnull=True)
+    if components is not None:
+        by_type: Dict[str, Set[int]] = {}
+        for component_type, component_id in components:
+            by_type.setdefault(component_type, set()).add(component_id)
+        if not by_type:
+            return []
+        query = Q()
+        for component_type, component_ids in by_type.items():
+            query |= Q(component_type=component_type, component_id__in=component_ids)
+        pending = pending.filter(query)
+    
+    with transaction.atomic():
+        events = list(
+            pending.select_for_update(skip_locked=True).values_list('id', 'component_type', 'component_id')
+        )
+        if events:
+            PriceChangeEvent.objects.filter(id__in=[event[0] for event in events]).update(processed_at=now)
+    return events
+
+
+def process_price_changes(components: Optional[Iterable[Tuple[str, int]]] = None) -> Dict[int, List[Dict]]:
+
+    from .price_alerts import evaluate_price_alerts
+    
+    now = timezone.now()
+    events = _claim_events(components, now)
+    if not events:
+        return {}
+    
+    changed: Dict[str, Set[int]] = {}
+    for _, component_type, component_id in events:
+        changed.setdefault(component_type, set()).add(component_id)
+    
+    try:
+        digests = evaluate_price_alerts(components=changed)
+    except Exception:
+        # Hand the claimed events back to the next sweep
+        PriceChangeEvent.objects.filter(id__in=[event[0] for event in events]).update(processed_at=None)
+        raise
+    
+    PriceChangeEvent.objects.filter(processed_at__lt=now - EVENT_RETENTION).delete()
+    
+    logger.info(
+        f"Price change events processed: {len(events)} events, "
+        f"{sum(len(ids) for ids in changed.values())} components, {len(digests)} digests"
+    )
+    return digests
@@ -0,0 +1,298 @@
+import logging
+from collections import OrderedDict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Case, F, IntegerField, Max, Min, Q, Value, When, Window
+from django.db.models.functions import Coalesce, FirstValue, LastValue
+from django.db.models.expressions import RowRange
+from django.utils import timezone
+
+from .price_ingestion import upsert_rows
+from .price_service import PriceHistory
+
+logger = logging.getLogger(__name__)
+
+
+# (component_type, component_id, shop, price, in_stock)
+Observation = Tuple[str, int, str, Decimal, bool]
+
+# Pseudo-shop holding the daily catalog list price
+CATALOG_SHOP = 'catalog'
+
+UNIQUE_FIELDS = ['component_type', 'component_id', 'shop', 'day']
+UPDATE_FIELDS = ['price_min', 'price_max', 'price_close', 'samples', 'in_stock', 'updated_at']
+
+
+def record_prices(observations: Iterable[Observation], day: Optional[date] = None) -> int:
+
+    day = day or timezone.localdate()
+    
+    merged: Dict[Tuple[str, int, str], PriceHistory] = OrderedDict()
+    for component_type, component_id, shop, price, in_stock in observations:
+        if price is None:
+            continue
+        
+        price = Decimal(price)
+        key = (component_type, component_id, shop)
+        row = merged.get(key)
+        if row is None:
+            merged[key] = PriceHistory(
+                component_type=component_type, component_id=component_id, shop=shop, day=day,
+                price_open=price, price_min=price, price_max=price, price_close=price,
+                samples=1, in_stock=in_stock,
+            )
+        else:
+            _merge(row, price, in_stock, 1)
+    
+    if not merged:
+        return 0
+    
+
+    # Fold today's observations into rows already written by earlier runs
+    ids_by_type: Dict[str, List[int]] = {}
+    for component_type, component_id, _ in merged:
+        ids_by_type.setdefault(component_type, []).append(component_id)
+    
+    for component_type, ids in ids_by_type.items():
+        existing = PriceHistory.objects.filter(component_type=component_type, component_id__in=ids, day=day)
+        for row in existing:
+            new = merged.get((row.component_type, row.component_id, row.shop))
+            if new is None:
+                continue
+            new.price_open = row.price_open
+            new.price_min = min(new.price_min, row.price_min)
+            new.price_max = max(new.price_max, row.price_max)
+            new.samples += row.samples
+    
+    upsert_rows(PriceHistory, list(merged.values()), unique_fields=UNIQUE_FIELDS, update_fields=UPDATE_FIELDS)
+    return len(merged)
+
+
+def _merge(row: PriceHistory, price: Decimal, in_stock: bool, samples: int) -> None:
+    row.price_min = min(row.price_min, price)
+    row.price_max = max(row.price_max, price)
+    row.price_close = price
+    row.in_stock = in_stock
+    row.samples += samples
+
+
+def snapshot_catalog_prices(day: Optional[date] = None) -> int:
+
+    from .price_ingestion import catalog_models
+    
+    observations = (
+        (component_type, component_id, CATALOG_SHOP, price, True)
+        for component_type, model in catalog_models().items()
+        for component_id, price in model.objects.values_list('id', 'price').iterator()
+    )
+    return record_prices(observations, day)
+
+
+def history_queryset(component_type: str, component_id: int, days: int = 30, shop: Optional[str] = None):
+
+    since = timezone.localdate() - timedelta(days=days)
+    queryset = PriceHistory.objects.filter(
+        component_type=component_type,
+        component_id=component_id,
+        day__gte=since,
+    )
+    if shop:
+        queryset = queryset.filter(shop=shop)
+    return queryset
+
+
+def _shop_prices(aggregate, field: str, window: bool = False):
+
+    # Catalog snapshots are the list price, not a shop quote: they only
+    # count when no shop has been seen in the period
+    shop_only, all_rows = aggregate(field, filter=~Q(shop=CATALOG_SHOP)), aggregate(field)
+    if window:
+        return Coalesce(Window(shop_only), Window(all_rows))
+    return Coalesce(shop_only, all_rows)
+
+
+def _is_shop():
+    return Case(When(shop=CATALOG_SHOP, then=Value(0)), default=Value(1), output_field=IntegerField())
+
+
+def get_price_series(component_type: str, component_id: int, days: int = 30, shop: Optional[str] = None) -> Dict:
+
+    whole_range = RowRange(start=None, end=None)
+    # Shop rows sort ahead of catalog rows at both ends, so first and last
+    # close come from the shops whenever there are any
+    is_shop = _is_shop()
+    rows = list(
+        history_queryset(component_type, component_id, days, shop)
+        .annotate(
+            range_min=_shop_prices(Min, 'price_min', window=True),
+            range_max=_shop_prices(Max, 'price_max', window=True),
+            range_avg=_shop_prices(Avg, 'price_close', window=True),
+            first_close=Window(
+                FirstValue('price_close'),
+                order_by=[is_shop.desc(), F('day').asc(), F('price_close').asc()],
+                frame=whole_range,
+            ),
+            last_close=Window(
+                LastValue('price_close'),
+                order_by=[is_shop.asc(), F('day').asc(), F('price_close').desc()],
+                frame=whole_range,
+            ),
+        )
+        .order_by('day', 'shop')
+    )
+    
+    if not rows:
+        return {'data': [], 'stats': {}}
+    
+    head = rows[0]
+    first_close = float(head.first_close)
+    current = float(head.last_close)
+    
+    return {
+        'data': [
+            {
+                'date': row.day.isoformat(),
+                'price': float(row.price_close),
+                'min_price': float(row.price_min),
+                'max_price': float(row.price_max),
+                'store': row.shop,
+                'in_stock': row.in_stock,
+                'period': row.period,
+            }
+            for row in rows
+        ],
+        'stats': {
+            'min_price': float(head.range_min),
+            'max_price': float(head.range_max),
+            'avg_price': round(float(head.range_avg), 2),
+            'current_price': current,
+            'price_change_30d': round((current - first_close) / first_close * 100, 2) if first_close else 0,
+            'best_time_to_buy': current <= float(head.range_min),
+        }
+    }
+
+
+def get_price_stats(component_type: str, component_id: int, days: int = 30) -> Dict:
+
+    stats = history_queryset(component_type, component_id, days).aggregate(
+        min_price=_shop_prices(Min, 'price_min'),
+        max_price=_shop_prices(Max, 'price_max'),
+        avg_price=_shop_prices(Avg, 'price_close'),
+        first_day=Min('day'),
+        last_day=Max('day'),
+    )
+    if stats['first_day'] is None:
+        return {}
+    
+    return {
+        'min_price': float(stats['min_price']),
+        'max_price': float(stats['max_price']),
+        'avg_price': round(float(stats['avg_price']), 2),
+        'first_day': stats['first_day'].isoformat(),
+        'last_day': stats['last_day'].isoformat(),
+    }
+
+
+def get_current_price(component_type: str, component_id: int) -> Optional[Dict]:
+
+    latest = (
+        PriceHistory.objects
+        .filter(component_type=component_type, component_id=component_id)
+        # The catalog list price only answers when no shop has quoted
+        .order_by(_is_shop().desc(), '-day', 'price_close')
+        .values('day', 'shop', 'price_close', 'in_stock')
+        .first()
+    )
+    if not latest:
+        return None
+    
+    return {
+        'date': latest['day'].isoformat(),
+        'shop': latest['shop'],
+        'price': float(latest['price_close']),
+        'in_stock': latest['in_stock'],
+    }
+
+
+def compact_price_history(
+    daily_days: Optional[int] = None,
+    retention_days: Optional[int] = None,
+    batch_size: int = 2000
+) -> Dict[str, int]:
+
+    daily_days = daily_days or getattr(settings, 'PRICE_HISTORY_DAILY_DAYS', 90)
+    retention_days = retention_days or getattr(settings, 'PRICE_HISTORY_RETENTION_DAYS', 730)
+    today = timezone.localdate()
+    
+
+    # Keep whole weeks only, so a week is never split between daily and weekly rows
+    cutoff = today - timedelta(days=daily_days)
+    cutoff -= timedelta(days=cutoff.weekday())
+    
+    deleted, _ = PriceHistory.objects.filter(day__lt=today - timedelta(days=retention_days)).delete()
+    
+    compacted = 0
+    while True:
+        rows = list(
+            PriceHistory.objects
+            .filter(period='day', day__lt=cutoff)
+            .order_by('component_type', 'component_id', 'shop', 'day')[:batch_size]
+        )
+        if not rows:
+            break
+        
+        weeks: Dict[Tuple, PriceHistory] = OrderedDict()
+        for row in rows:
+            week = row.day - timedelta(days=row.day.weekday())
+            key = (row.component_type, row.component_id, row.shop, week)
+            target = weeks.get(key)
+            if target is None:
+                weeks[key] = PriceHistory(
+                    component_type=row.component_type, component_id=row.component_id, shop=row.shop,
+                    day=week, period='week',
+                    price_open=row.price_open, price_min=row.price_min, price_max=row.price_max,
+                    price_close=row.price_close, samples=row.samples, in_stock=row.in_stock,
+                )
+            else:
+                target.price_min = min(target.price_min, row.price_min)
+                target.price_max = max(target.price_max, row.price_max)
+                target.price_close = row.price_close
+                target.in_stock = row.in_stock
+                target.samples += row.samples
+        
+        with transaction.atomic():
+            PriceHistory.objects.filter(id__in=[row.id for row in rows]).delete()
+            
+
+            # A week cut by the batch boundary is merged into the weekly row
+            # written by the previous batch
+            existing = {
+                (row.component_type, row.component_id, row.shop, row.day): row
+                for row in PriceHistory.objects.filter(
+                    period='week',
+                    day__in={key[3] for key in weeks},
+                    component_id__in={key[1] for key in weeks},
+                )
+            }
+            for key, target in weeks.items():
+                previous = existing.get(key)
+                if previous:
+                    target.price_open = previous.price_open
+                    target.price_min = min(target.price_min, previous.price_min)
+                    target.price_max = max(target.price_max, previous.price_max)
+                    target.samples += previous.samples
+            
+            upsert_rows(
+                PriceHistory,
+                list(weeks.values()),
+                unique_fields=UNIQUE_FIELDS,
+                update_fields=['period', 'price_open'] + UPDATE_FIELDS,
+            )
+        compacted += len(rows)
+    
+    logger.info(f"Price history compacted: {compacted} daily rows folded into weeks, {deleted} expired rows deleted")
+    return {'compacted': compacted, 'deleted': deleted}
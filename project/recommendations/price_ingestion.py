@@ -0,0 +1,451 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field, asdict
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from urllib.parse import quote
+
+import aiohttp
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+METRICS_CACHE_KEY = 'price_ingestion_metrics'
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class PriceTarget:
+
+    component_type: str
+    component_id: int
+    name: str
+    
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.component_type, self.component_id)
+
+
+@dataclass
+class PriceQuote:
+
+    component_type: str
+    component_id: int
+    shop: str
+    price: Optional[Decimal]
+    url: str
+    in_stock: bool
+    etag: str = ''
+    last_modified: str = ''
+    not_modified: bool = False
+
+
+@dataclass
+class ShopMetrics:
+
+    shop: str
+    requests: int = 0
+    succeeded: int = 0
+    not_modified: int = 0
+    not_found: int = 0
+    errors: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    latency_total: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    
+    def to_dict(self) -> Dict:
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        result = asdict(self)
+        result.pop('started_at')
+        result.pop('finished_at')
+        result.pop('latency_total')
+        result['elapsed_seconds'] = round(elapsed, 3)
+        result['throughput_rps'] = round(self.requests / elapsed, 2) if elapsed > 0 else None
+        result['avg_latency_ms'] = round(self.latency_total / self.requests * 1000, 1) if self.requests else None
+        result['error_rate'] = round(self.errors / self.requests * 100, 1) if self.requests else None
+        return result
+
+
+class TokenBucket:
+
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ShopClient:
+
+
+    def __init__(self, shop_id: str, config: Dict, metrics: ShopMetrics):
+        self.shop_id = shop_id
+        self.url = config['url']
+        self.api_key = config.get('api_key')
+        self.bucket = TokenBucket(config.get('rate', 5), config.get('burst'))
+        self.max_attempts = config.get('max_attempts', 3)
+        self.retry_budget = config.get('retry_budget', 20)
+        self.backoff = config.get('backoff', 0.5)
+        self.connections = config.get('connections', 4)
+        self.timeout = config.get('timeout', 15)
+        self.metrics = metrics
+        self.session: Optional[aiohttp.ClientSession] = None
+    
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connections),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={'Authorization': f'Bearer {self.api_key}'} if self.api_key else None,
+        )
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.metrics.finished_at = time.monotonic()
+    
+    async def fetch(self, component: PriceTarget, validators: Optional[Dict] = None) -> Optional[PriceQuote]:
+
+        headers = {}
+        if validators:
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+        
+        url = self.url.format(query=quote(component.name))
+        
+        for attempt in range(1, self.max_attempts + 1):
+            await self.bucket.acquire()
+            
+            self.metrics.requests += 1
+            started = time.monotonic()
+            try:
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304 and validators:
+                        self.metrics.not_modified += 1
+                        return PriceQuote(
+                            component_type=component.component_type,
+                            component_id=component.component_id,
+                            shop=self.shop_id,
+                            price=validators.get('price'),
+                            url=validators.get('url', ''),
+                            in_stock=validators.get('in_stock', True),
+                            etag=validators.get('etag', ''),
+                            last_modified=validators.get('last_modified', ''),
+                            not_modified=True,
+                        )
+                    
+                    if response.status == 404:
+                        self.metrics.not_found += 1
+                        return None
+                    
+                    if response.status in RETRY_STATUSES:
+                        if response.status == 429:
+                            self.metrics.rate_limited += 1
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+                    
+                    self.metrics.succeeded += 1
+                    return self._parse(component, data, response.headers)
+            
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUSES
+                if not retryable or attempt == self.max_attempts or self.retry_budget <= 0:
+                    self.metrics.errors += 1
+                    logger.warning(f"Price fetch failed for {self.shop_id} {component.key}: {e}")
+                    return None
+                
+                self.retry_budget -= 1
+                self.metrics.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            except ValueError as e:
+                self.metrics.errors += 1
+                logger.warning(f"Invalid price payload from {self.shop_id} for {component.key}: {e}")
+                return None
+            finally:
+                self.metrics.latency_total += time.monotonic() - started
+        
+        return None
+    
+    def _parse(self, component: PriceTarget, data: Dict, headers) -> PriceQuote:
+
+        price = data.get('price')
+        try:
+            price = Decimal(str(price)).quantize(Decimal('0.01')) if price is not None else None
+        except InvalidOperation:
+            raise ValueError(f'bad price {price!r}')
+        
+        return PriceQuote(
+            component_type=component.component_type,
+            component_id=component.component_id,
+            shop=self.shop_id,
+            price=price,
+            url=(data.get('url') or '')[:500],
+            in_stock=bool(data.get('in_stock', price is not None)),
+            etag=headers.get('ETag', ''),
+            last_modified=headers.get('Last-Modified', ''),
+        )
+
+
+class PriceIngestionEngine:
+
+
+    def __init__(self, shops: Optional[Dict[str, Dict]] = None, concurrency: Optional[int] = None):
+        shops = shops if shops is not None else getattr(settings, 'PRICE_SHOP_APIS', {})
+        self.shops = {shop_id: config for shop_id, config in shops.items() if config.get('url')}
+        self.concurrency = concurrency or getattr(settings, 'PRICE_INGESTION_CONCURRENCY', 32)
+        self.metrics: Dict[str, ShopMetrics] = {}
+    
+    @property
+    def enabled(self) -> bool:
+        return bool(self.shops)
+    
+    async def fetch(
+        self,
+        components: List[PriceTarget],
+        validators: Optional[Dict[Tuple[str, int, str], Dict]] = None
+    ) -> List[PriceQuote]:
+    
+        validators = validators or {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self.metrics = {shop_id: ShopMetrics(shop=shop_id) for shop_id in self.shops}
+        
+        clients = [ShopClient(shop_id, config, self.metrics[shop_id]) for shop_id, config in self.shops.items()]
+        
+        async def fetch_one(client: ShopClient, component: PriceTarget):
+            async with semaphore:
+                return await client.fetch(
+                    component,
+                    validators.get((component.component_type, component.component_id, client.shop_id))
+                )
+        
+        async with AsyncExitStack() as stack:
+            for client in clients:
+                await stack.enter_async_context(client)
+            
+            results = await asyncio.gather(*[
+                fetch_one(client, component)
+                for component in components
+                for client in clients
+            ])
+        
+        return [quote for quote in results if quote is not None]
+    
+    def run(self, components: List[PriceTarget]) -> Dict[str, Any]:
+
+        if not self.enabled or not components:
+            return {'quotes': 0, 'saved': 0, 'shops': {}}
+        
+        from .price_events import emit_price_changes
+        from .price_history import record_prices
+        
+        validators = load_validators(components, self.shops.keys())
+        quotes = asyncio.run(self.fetch(components, validators))
+        saved = save_quotes(quotes)
+        record_prices(
+            (q.component_type, q.component_id, q.shop, q.price, q.in_stock)
+            for q in quotes
+        )
+        emit_price_changes(
+            (
+                (q.component_type, q.component_id, q.shop, previous.get('price'), q.price)
+                for q in quotes
+                if not q.not_modified
+                for previous in [validators.get((q.component_type, q.component_id, q.shop), {})]
+            ),
+            source='ingestion',
+        )
+        
+        shops = {shop_id: metrics.to_dict() for shop_id, metrics in self.metrics.items()}
+        for shop_id, stats in shops.items():
+            logger.info(
+                f"Price ingestion {shop_id}: {stats['requests']} requests, {stats['throughput_rps']} rps, "
+                f"{stats['not_modified']} not modified, {stats['errors']} errors, {stats['retries']} retries"
+            )
+        
+        report = {
+            'components': len(components),
+            'quotes': len(quotes),
+            'saved': saved,
+            'shops': shops,
+            'finished_at': time.time(),
+        }
+        cache.set(METRICS_CACHE_KEY, report, None)
+        return report
+
+
+def load_validators(components: Iterable[PriceTarget], shops: Iterable[str]) -> Dict[Tuple[str, int, str], Dict]:
+
+    from .price_service import PriceCache
+    
+    ids_by_type: Dict[str, List[int]] = {}
+    for component in components:
+        ids_by_type.setdefault(component.component_type, []).append(component.component_id)
+    
+    validators = {}
+    for component_type, ids in ids_by_type.items():
+        rows = PriceCache.objects.filter(
+            component_type=component_type,
+            component_id__in=ids,
+            shop__in=list(shops),
+        ).values('component_type', 'component_id', 'shop', 'price', 'url', 'in_stock', 'etag', 'last_modified')
+        
+        for row in rows:
+            validators[(row['component_type'], row['component_id'], row['shop'])] = row
+    return validators
+
+
+def upsert_rows(model, rows: List[Any], unique_fields: List[str], update_fields: List[str], batch_size: int = 500) -> None:
+
+    from django.db import connections, router
+    
+    if not rows:
+        return
+    
+    features = connections[router.db_for_write(model)].features
+    if features.supports_update_conflicts_with_target:
+        model.objects.bulk_create(
+            rows, batch_size=batch_size, update_conflicts=True,
+            unique_fields=unique_fields, update_fields=update_fields,
+        )
+        return
+    if features.supports_update_conflicts:
+        # MySQL's ON DUPLICATE KEY UPDATE takes no conflict target; the
+        # unique_together key on these tables is the only one rows can hit
+        model.objects.bulk_create(rows, batch_size=batch_size, update_conflicts=True, update_fields=update_fields)
+        return
+    
+    # No native upsert: update the rows that exist, create the rest
+    def key(obj):
+        return tuple(getattr(obj, name) for name in unique_fields)
+    
+    existing = {}
+    candidates = model.objects.filter(
+        **{f'{name}__in': {getattr(row, name) for row in rows} for name in unique_fields}
+    ).only('pk', *unique_fields)
+    for obj in candidates:
+        existing[key(obj)] = obj.pk
+    
+    updated, created = [], []
+    for row in rows:
+        pk = existing.get(key(row))
+        if pk is None:
+            created.append(row)
+            continue
+        row.pk = pk
+        for name in update_fields:
+            # bulk_update skips pre_save, which is what fills auto_now fields
+            model._meta.get_field(name).pre_save(row, add=False)
+        updated.append(row)
+    
+    if updated:
+        model.objects.bulk_update(updated, update_fields, batch_size=batch_size)
+    if created:
+        model.objects.bulk_create(created, batch_size=batch_size)
+
+
+def save_quotes(quotes: List[PriceQuote]) -> int:
+
+    from .price_service import PriceCache
+    
+    if not quotes:
+        return 0
+    
+    upsert_rows(
+        PriceCache,
+        [
+            PriceCache(
+                component_type=q.component_type,
+                component_id=q.component_id,
+                shop=q.shop,
+                price=q.price,
+                url=q.url,
+                in_stock=q.in_stock,
+                etag=q.etag,
+                last_modified=q.last_modified,
+            )
+            for q in quotes
+        ],
+        unique_fields=['component_type', 'component_id', 'shop'],
+        update_fields=['price', 'url', 'in_stock', 'etag', 'last_modified', 'last_updated'],
+    )
+    return len(quotes)
+
+
+def catalog_models() -> Dict[str, Any]:
+
+    from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
+    
+    return {
+        'cpu': CPU,
+        'gpu': GPU,
+        'motherboard': Motherboard,
+        'ram': RAM,
+        'storage': Storage,
+        'psu': PSU,
+        'case': Case,
+        'cooling': Cooling,
+    }
+
+
+def catalog_components(
+    component_type: Optional[str] = None,
+    ids: Optional[List[int]] = None,
+    id_range: Optional[Tuple[int, int]] = None
+) -> List[PriceTarget]:
+
+    component_models = catalog_models()
+    
+    if component_type:
+        if component_type not in component_models:
+            return []
+        component_models = {component_type: component_models[component_type]}
+    
+    targets = []
+    for kind, model in component_models.items():
+        queryset = model.objects.all()
+        if ids is not None:
+            queryset = queryset.filter(id__in=ids)
+        if id_range is not None:
+            queryset = queryset.filter(id__range=id_range)
+        targets.extend(
+            PriceTarget(kind, component_id, name)
+            for component_id, name in queryset.values_list('id', 'name').iterator()
+        )
+    return targets
+
+
+def ingest_prices(component_type: Optional[str] = None) -> Dict[str, Any]:
+
+    return PriceIngestionEngine().run(catalog_components(component_type))
+
+
+def get_ingestion_metrics() -> Optional[Dict]:
+    return cache.get(METRICS_CACHE_KEY)
@@ -0,0 +1,147 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .price_ingestion import PriceIngestionEngine, catalog_components, catalog_models
+from .price_service import PriceUpdateChunk, PriceUpdateRun
+
+logger = logging.getLogger(__name__)
+
+
+def plan_chunks(component_type: Optional[str] = None, chunk_size: Optional[int] = None) -> List[Dict[str, Any]]:
+
+    chunk_size = chunk_size or getattr(settings, 'PRICE_PIPELINE_CHUNK_SIZE', 200)
+    models = catalog_models()
+    if component_type:
+        models = {component_type: models[component_type]} if component_type in models else {}
+    
+    chunks = []
+    for kind, model in models.items():
+        ids = list(model.objects.order_by('id').values_list('id', flat=True))
+        for start in range(0, len(ids), chunk_size):
+            batch = ids[start:start + chunk_size]
+            chunks.append({'component_type': kind, 'start_id': batch[0], 'end_id': batch[-1]})
+    return chunks
+
+
+def create_run(component_type: Optional[str] = None, chunk_size: Optional[int] = None) -> PriceUpdateRun:
+
+    chunks = plan_chunks(component_type, chunk_size)
+    run = PriceUpdateRun.objects.create(component_type=component_type or '', chunks_total=len(chunks))
+    PriceUpdateChunk.objects.bulk_create([PriceUpdateChunk(run=run, **chunk) for chunk in chunks])
+    return run
+
+
+def resumable_chunk_ids(run_id: int) -> List[int]:
+
+    return list(
+        PriceUpdateChunk.objects
+        .filter(run_id=run_id)
+        .exclude(status='done')
+        .order_by('id')
+        .values_list('id', flat=True)
+    )
+
+
+def chunk_shops(parallel_chunks: int) -> Dict[str, Dict]:
+
+    # Chunks run side by side, so each one gets an equal share of a shop's limits
+    workers = max(1, min(parallel_chunks, getattr(settings, 'PRICE_PIPELINE_WORKERS', 4)))
+    shops = {}
+    for shop_id, config in getattr(settings, 'PRICE_SHOP_APIS', {}).items():
+        shops[shop_id] = {
+            **config,
+            'rate': config.get('rate', 5) / workers,
+            'burst': max(1, int(config.get('burst', 10)) // workers),
+            'connections': max(1, int(config.get('connections', 4)) // workers),
+            'retry_budget': max(1, int(config.get('retry_budget', 20)) // workers),
+        }
+    return shops
+
+
+def failed_chunk(chunk_id: int) -> Dict[str, Any]:
+    return {'chunk_id': chunk_id, 'status': 'failed', 'saved': 0, 'errors': 0}
+
+
+def run_chunk(chunk_id: int, engine: Optional[PriceIngestionEngine] = None) -> Dict[str, Any]:
+
+    # The chunk is a chord header task: it has to return even when the row
+    # cannot be read, or the run would never reach finish_run
+    try:
+        chunk = PriceUpdateChunk.objects.select_related('run').get(id=chunk_id)
+    except Exception as e:
+        logger.exception(f"Price update chunk {chunk_id} could not be loaded: {e}")
+        return failed_chunk(chunk_id)
+    
+    if chunk.status == 'done':
+        return {'chunk_id': chunk.id, 'status': 'done', 'saved': chunk.saved, 'errors': chunk.errors}
+    
+    try:
+        PriceUpdateChunk.objects.filter(id=chunk.id).update(
+            status='running', attempts=chunk.attempts + 1, started_at=timezone.now(), error='',
+        )
+        engine = engine or PriceIngestionEngine(chunk_shops(chunk.run.chunks_total))
+        targets = catalog_components(chunk.component_type, id_range=(chunk.start_id, chunk.end_id))
+        report = engine.run(targets)
+        errors = sum(shop['errors'] for shop in report['shops'].values())
+        status = 'done'
+        error = ''
+    except Exception as e:
+        logger.exception(f"Price update chunk {chunk.id} failed: {e}")
+        targets, report, errors, status, error = [], {'saved': 0}, 0, 'failed', str(e)
+    
+    PriceUpdateChunk.objects.filter(id=chunk.id).update(
+        status=status,
+        components=len(targets),
+        saved=report['saved'],
+        errors=errors,
+        error=error,
+        finished_at=timezone.now(),
+    )
+    return {'chunk_id': chunk.id, 'status': status, 'saved': report['saved'], 'errors': errors}
+
+
+def run_progress(run: PriceUpdateRun) -> Dict[str, Any]:
+
+    by_status = dict(
+        PriceUpdateChunk.objects.filter(run=run).values_list('status').annotate(count=Count('id'))
+    )
+    totals = PriceUpdateChunk.objects.filter(run=run).aggregate(
+        components=Sum('components'), saved=Sum('saved'), errors=Sum('errors'),
+    )
+    finished = by_status.get('done', 0) + by_status.get('failed', 0)
+    
+    return {
+        'run_id': run.id,
+        'status': run.status,
+        'component_type': run.component_type or None,
+        'chunks_total': run.chunks_total,
+        'chunks': {status: by_status.get(status, 0) for status, _ in PriceUpdateChunk.STATUS_CHOICES},
+        'progress': round(finished / run.chunks_total * 100, 1) if run.chunks_total else 100.0,
+        'components': totals['components'] or 0,
+        'saved': totals['saved'] or 0,
+        'errors': totals['errors'] or 0,
+        'created_at': run.created_at.isoformat(),
+        'finished_at': run.finished_at.isoformat() if run.finished_at else None,
+    }
+
+
+def finish_run(run_id: int) -> Dict[str, Any]:
+
+    run = PriceUpdateRun.objects.get(id=run_id)
+    progress = run_progress(run)
+    
+    # Chunks left pending or running never finished, so they count against the run too
+    run.status = 'complete' if progress['chunks']['done'] == run.chunks_total else 'partial'
+    run.finished_at = timezone.now()
+    run.report = {key: progress[key] for key in ('chunks', 'components', 'saved', 'errors')}
+    run.save(update_fields=['status', 'finished_at', 'report'])
+    
+    logger.info(
+        f"Price update run {run.id} {run.status}: {progress['saved']} saved, "
+        f"{progress['chunks']['failed']} failed chunks of {run.chunks_total}"
+    )
+    return run_progress(run)
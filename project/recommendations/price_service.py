@@ -1,4 +1,5 @@
 
+import asyncio
 import logging
 import requests
 import re
@@ -10,6 +11,8 @@ from datetime import datetime, timedelta
 from django.core.cache import cache
 from django.db import models
 
+from .price_ingestion import PriceIngestionEngine, PriceTarget
+
 logger = logging.getLogger(__name__)
 
 
@@ -21,6 +24,8 @@ class PriceCache(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
     url = models.URLField(max_length=500, blank=True)
     in_stock = models.BooleanField(default=True)
+    etag = models.CharField(max_length=255, blank=True, default='')
+    last_modified = models.CharField(max_length=64, blank=True, default='')
     last_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -31,6 +36,107 @@ class PriceCache(models.Model):
         ]
 
 
+class PriceHistory(models.Model):
+    
+    PERIOD_CHOICES = [
+        ('day', 'День'),
+        ('week', 'Неделя'),
+    ]
+    
+    component_type = models.CharField(max_length=50)
+    component_id = models.IntegerField()
+    shop = models.CharField(max_length=50)
+    day = models.DateField()
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES, default='day')
+    price_open = models.DecimalField(max_digits=10, decimal_places=2)
+    price_min = models.DecimalField(max_digits=10, decimal_places=2)
+    price_max = models.DecimalField(max_digits=10, decimal_places=2)
+    price_close = models.DecimalField(max_digits=10, decimal_places=2)
+    samples = models.PositiveIntegerField(default=1)
+    in_stock = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        app_label = 'recommendations'
+        unique_together = ['component_type', 'component_id', 'shop', 'day']
+        indexes = [
+            models.Index(fields=['component_type', 'component_id', 'day']),
+            models.Index(fields=['period', 'day']),
+        ]
+
+
+class PriceChangeEvent(models.Model):
+    
+    SOURCE_CHOICES = [
+        ('catalog', 'Каталог'),
+        ('ingestion', 'Парсинг цен'),
+    ]
+    
+    component_type = models.CharField(max_length=50)
+    component_id = models.IntegerField()
+    shop = models.CharField(max_length=50, blank=True)
+    old_price = models.DecimalField(max_digits=10, decimal_places=2, null=True)
+    new_price = models.DecimalField(max_digits=10, decimal_places=2)
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        app_label = 'recommendations'
+        indexes = [
+            models.Index(fields=['processed_at', 'created_at']),
+        ]
+
+
+class PriceUpdateRun(models.Model):
+    
+    STATUS_CHOICES = [
+        ('running', 'Выполняется'),
+        ('complete', 'Завершено'),
+        ('partial', 'Завершено с ошибками'),
+    ]
+    
+    component_type = models.CharField(max_length=50, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    chunks_total = models.IntegerField(default=0)
+    report = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        app_label = 'recommendations'
+        ordering = ['-created_at']
+
+
+class PriceUpdateChunk(models.Model):
+    
+    STATUS_CHOICES = [
+        ('pending', 'Ожидает'),
+        ('running', 'Выполняется'),
+        ('done', 'Готово'),
+        ('failed', 'Ошибка'),
+    ]
+    
+    run = models.ForeignKey(PriceUpdateRun, on_delete=models.CASCADE, related_name='chunks')
+    component_type = models.CharField(max_length=50)
+    start_id = models.IntegerField()
+    end_id = models.IntegerField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    components = models.IntegerField(default=0)
+    saved = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        app_label = 'recommendations'
+        indexes = [
+            models.Index(fields=['run', 'status']),
+        ]
+
+
 class PriceParserService:
     SHOPS = {
         'dns': {
@@ -77,9 +183,18 @@ class PriceParserService:
         }
         
 
+        quotes = {}
+        engine = PriceIngestionEngine()
+        if engine.enabled:
+            target = PriceTarget(component_type or '', 0, component_name)
+            quotes = {quote.shop: quote for quote in asyncio.run(engine.fetch([target]))}
+        
         for shop_id, shop_info in self.SHOPS.items():
             try:
-                price_data = self._search_in_shop(shop_id, component_name)
+                if shop_id in quotes:
+                    price_data = self._quote_to_dict(quotes[shop_id], shop_info)
+                else:
+                    price_data = self._search_in_shop(shop_id, component_name)
                 if price_data:
                     results['prices'][shop_id] = price_data
                     
@@ -97,6 +212,58 @@ class PriceParserService:
         
         return results
     
+    def _quote_to_dict(self, quote, shop_info: Dict) -> Dict:
+
+        return {
+            'shop': shop_info['name'],
+            'url': quote.url,
+            'price': float(quote.price) if quote.price is not None else None,
+            'in_stock': quote.in_stock,
+        }
+    
+    def update_component_price(self, component_type: str, component_id: int) -> bool:
+
+        from .price_ingestion import catalog_components
+        
+        engine = PriceIngestionEngine()
+        if not engine.enabled:
+            return False
+        
+        targets = catalog_components(component_type, ids=[component_id])
+        if not targets:
+            return False
+        
+        return engine.run(targets)['saved'] > 0
+    
+    def get_component_prices(self, component_type: str, component_id: int, refresh: bool = False) -> Dict[str, Any]:
+
+        from .price_comparison import BasketItem, compare_basket
+        from .price_ingestion import catalog_models
+        
+        model = catalog_models().get(component_type)
+        component = model.objects.filter(pk=component_id).first() if model else None
+        if component is None:
+            return {'error': 'Компонент не найден'}
+        
+        item = BasketItem(component_type, component_type, component.id, component.name, component.price)
+        result = compare_basket([item], refresh=refresh)
+        
+        return {
+            **result['components'][0],
+            'best': result['cheapest_per_component']['items'][0] if result['cheapest_per_component']['items'] else None,
+            'links': self.get_component_links(component.name),
+        }
+    
+    def compare_prices(self, configuration=None, workspace=None, refresh: bool = True) -> Dict[str, Any]:
+
+        from .price_comparison import basket_items, compare_basket
+        
+        items = basket_items(configuration, workspace)
+        result = compare_basket(items, refresh=refresh)
+        result['configuration_id'] = configuration.id if configuration is not None else None
+        result['workspace_id'] = workspace.id if workspace is not None else None
+        return result
+    
     def _search_in_shop(self, shop_id: str, query: str) -> Optional[Dict]:
 
         if shop_id == 'dns':
@@ -0,0 +1,127 @@
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import PrimaryKeyRelatedField, RelatedField
+
+logger = logging.getLogger(__name__)
+
+
+class FirstRelatedField(serializers.Field):
+
+    # Serializes the first row of a reverse relation. The planner prefetches
+    # that single row into `<relation>_first` for every object in one query.
+    
+    def __init__(self, relation: str, serializer_class, **kwargs):
+        self.relation = relation
+        self.serializer_class = serializer_class
+        self.cache_attr = f'{relation}_first'
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+    
+    def to_representation(self, obj):
+
+        prefetched = getattr(obj, self.cache_attr, None)
+        if prefetched is None:
+            item = getattr(obj, self.relation).first()
+        else:
+            item = prefetched[0] if prefetched else None
+        
+        if item is None:
+            return None
+        return self.serializer_class(item, context=self.context).data
+
+
+@dataclass
+class QueryPlan:
+
+    select: List[str] = field(default_factory=list)
+    prefetch: List[Prefetch] = field(default_factory=list)
+    # None means some field reads something the planner cannot see, so nothing is deferred
+    only: Optional[List[str]] = field(default_factory=list)
+    
+    def merge(self, other: 'QueryPlan') -> None:
+
+        self.select.extend(other.select)
+        self.prefetch.extend(other.prefetch)
+        if self.only is not None:
+            self.only = None if other.only is None else self.only + other.only
+    
+    def column(self, lookup: str) -> None:
+
+        if self.only is not None:
+            self.only.append(lookup)
+
+
+def _plan(serializer, model, prefix: str = '') -> QueryPlan:
+
+    plan = QueryPlan()
+    
+    for serializer_field in serializer.fields.values():
+        if isinstance(serializer_field, FirstRelatedField):
+            relation = model._meta.get_field(serializer_field.relation)
+            queryset = plan_queryset(
+                relation.related_model._default_manager.all(),
+                serializer_field.serializer_class(context=serializer.context),
+                required=[relation.field.name],
+            )
+            plan.prefetch.append(
+                Prefetch(f'{prefix}{serializer_field.relation}', queryset=queryset[:1], to_attr=serializer_field.cache_attr)
+            )
+            continue
+        
+        source = serializer_field.source
+        if source == '*' and isinstance(serializer_field, serializers.BaseSerializer):
+            plan.merge(_plan(serializer_field, model, prefix))
+            continue
+        if not source or source == '*' or '.' in source:
+            plan.only = None
+            continue
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            plan.only = None
+            continue
+        
+        lookup = f'{prefix}{source}'
+        if not model_field.is_relation:
+            plan.column(lookup)
+        elif isinstance(serializer_field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            child = getattr(serializer_field, 'child', None) or getattr(serializer_field, 'child_relation', None)
+            queryset = model_field.related_model._default_manager.all()
+            if isinstance(child, serializers.BaseSerializer) and model_field.one_to_many:
+                queryset = plan_queryset(queryset, child, required=[model_field.field.name])
+            plan.prefetch.append(Prefetch(lookup, queryset=queryset))
+        elif isinstance(serializer_field, serializers.BaseSerializer) and model_field.concrete:
+            plan.select.append(lookup)
+            plan.column(lookup)
+            plan.merge(_plan(serializer_field, model_field.related_model, f'{lookup}__'))
+        elif model_field.concrete:
+            if isinstance(serializer_field, RelatedField) and not isinstance(serializer_field, PrimaryKeyRelatedField):
+                plan.select.append(lookup)
+                plan.only = None
+            plan.column(lookup)
+        else:
+            plan.only = None
+    
+    return plan
+
+
+def plan_queryset(queryset, serializer, required: Sequence[str] = ()):
+
+    # Accepts a serializer class or an already built (nested) serializer
+    if isinstance(serializer, type):
+        serializer = serializer()
+    
+    plan = _plan(serializer, queryset.model)
+    if plan.select:
+        queryset = queryset.select_related(*plan.select)
+    if plan.prefetch:
+        queryset = queryset.prefetch_related(*plan.prefetch)
+    if plan.only is not None:
+        queryset = queryset.only(*dict.fromkeys([*required, *plan.only]))
+    return queryset
@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from .models import PCConfiguration, WorkspaceSetup, Recommendation
+from .fieldsets import SparseFieldsetMixin
+from .query_planner import FirstRelatedField
 from computers.serializers import (
     CPUSerializer, GPUSerializer, MotherboardSerializer, RAMSerializer,
     StorageSerializer, PSUSerializer, CaseSerializer, CoolingSerializer
@@ -19,6 +21,48 @@ class RecommendationSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class ComponentSummarySerializer(serializers.Serializer):
+
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField(read_only=True)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+
+class ConfigurationComponentsSerializer(serializers.Serializer):
+
+    cpu = ComponentSummarySerializer(read_only=True)
+    gpu = ComponentSummarySerializer(read_only=True)
+    motherboard = ComponentSummarySerializer(read_only=True)
+    ram = ComponentSummarySerializer(read_only=True)
+    storage_primary = ComponentSummarySerializer(read_only=True)
+    storage_secondary = ComponentSummarySerializer(read_only=True)
+    psu = ComponentSummarySerializer(read_only=True)
+    case = ComponentSummarySerializer(read_only=True)
+    cooling = ComponentSummarySerializer(read_only=True)
+
+
+class WorkspacePeripheralsSerializer(serializers.Serializer):
+
+    monitor_primary = ComponentSummarySerializer(read_only=True)
+    monitor_secondary = ComponentSummarySerializer(read_only=True)
+    keyboard = ComponentSummarySerializer(read_only=True)
+    mouse = ComponentSummarySerializer(read_only=True)
+    headset = ComponentSummarySerializer(read_only=True)
+    webcam = ComponentSummarySerializer(read_only=True)
+    microphone = ComponentSummarySerializer(read_only=True)
+    desk = ComponentSummarySerializer(read_only=True)
+    chair = ComponentSummarySerializer(read_only=True)
+    speakers = ComponentSummarySerializer(read_only=True)
+    mousepad = ComponentSummarySerializer(read_only=True)
+    monitor_arm = ComponentSummarySerializer(read_only=True)
+    usb_hub = ComponentSummarySerializer(read_only=True)
+    lighting = ComponentSummarySerializer(read_only=True)
+    stream_deck = ComponentSummarySerializer(read_only=True)
+    capture_card = ComponentSummarySerializer(read_only=True)
+    gamepad = ComponentSummarySerializer(read_only=True)
+    headphone_stand = ComponentSummarySerializer(read_only=True)
+
+
 class WorkspaceSetupDetailSerializer(serializers.ModelSerializer):
 
     monitor_primary_detail = MonitorSerializer(source='monitor_primary', read_only=True)
@@ -53,7 +97,7 @@ class WorkspaceSetupDetailSerializer(serializers.ModelSerializer):
         ]
 
 
-class PCConfigurationSerializer(serializers.ModelSerializer):
+class PCConfigurationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     cpu_detail = CPUSerializer(source='cpu', read_only=True)
     gpu_detail = GPUSerializer(source='gpu', read_only=True)
     motherboard_detail = MotherboardSerializer(source='motherboard', read_only=True)
@@ -66,19 +110,17 @@ class PCConfigurationSerializer(serializers.ModelSerializer):
     recommendations = RecommendationSerializer(many=True, read_only=True)
     
 
-    workspace = serializers.SerializerMethodField()
+    workspace = FirstRelatedField('workspace_setups', WorkspaceSetupDetailSerializer)
+    components = ConfigurationComponentsSerializer(source='*', read_only=True)
     
     class Meta:
         model = PCConfiguration
         fields = '__all__'
         read_only_fields = ['total_price', 'created_at', 'updated_at']
-    
-    def get_workspace(self, obj):
-
-        workspace = obj.workspace_setups.first()
-        if workspace:
-            return WorkspaceSetupDetailSerializer(workspace).data
-        return None
+        compact_fields = [
+            'id', 'name', 'total_price', 'is_saved', 'is_public', 'share_code',
+            'compatibility_check', 'created_at', 'updated_at', 'components',
+        ]
     
     def create(self, validated_data):
         configuration = super().create(validated_data)
@@ -93,7 +135,7 @@ class PCConfigurationSerializer(serializers.ModelSerializer):
         return configuration
 
 
-class WorkspaceSetupSerializer(serializers.ModelSerializer):
+class WorkspaceSetupSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     configuration_detail = PCConfigurationSerializer(source='configuration', read_only=True)
     monitor_primary_detail = MonitorSerializer(source='monitor_primary', read_only=True)
     monitor_secondary_detail = MonitorSerializer(source='monitor_secondary', read_only=True)
@@ -115,11 +157,13 @@ class WorkspaceSetupSerializer(serializers.ModelSerializer):
     capture_card_detail = CaptureCardSerializer(source='capture_card', read_only=True)
     gamepad_detail = GamepadSerializer(source='gamepad', read_only=True)
     headphone_stand_detail = HeadphonestandSerializer(source='headphone_stand', read_only=True)
+    peripherals = WorkspacePeripheralsSerializer(source='*', read_only=True)
     
     class Meta:
         model = WorkspaceSetup
         fields = '__all__'
         read_only_fields = ['total_price', 'created_at', 'updated_at']
+        compact_fields = ['id', 'name', 'total_price', 'configuration', 'created_at', 'updated_at', 'peripherals']
     
     def create(self, validated_data):
         workspace = super().create(validated_data)
@@ -394,7 +438,7 @@ class PublicConfigurationSerializer(serializers.ModelSerializer):
     psu_detail = PSUSerializer(source='psu', read_only=True)
     case_detail = CaseSerializer(source='case', read_only=True)
     cooling_detail = CoolingSerializer(source='cooling', read_only=True)
-    workspace = serializers.SerializerMethodField()
+    workspace = FirstRelatedField('workspace_setups', WorkspaceSetupSerializer)
     
     class Meta:
         model = PCConfiguration
@@ -404,12 +448,3 @@ class PublicConfigurationSerializer(serializers.ModelSerializer):
             'storage_primary_detail', 'storage_secondary_detail', 'psu_detail', 
             'case_detail', 'cooling_detail', 'workspace'
         ]
-    
-    def get_workspace(self, obj):
-        try:
-            workspace = WorkspaceSetup.objects.filter(configuration=obj).first()
-            if workspace:
-                return WorkspaceSetupSerializer(workspace).data
-        except:
-            pass
-        return None
@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
 from peripherals.models import Monitor, Keyboard, Mouse, Headset, Webcam, Microphone, Desk, Chair
 from recommendations.models import PCConfiguration, WorkspaceSetup, Recommendation
+from .component_resolver import apply_compatibility
 
 try:
     from .ai_service import AIRecommendationService
@@ -430,32 +431,8 @@ class ConfigurationService:
             raise ConfigurationError(f"Не удалось создать конфигурацию: {str(e)}")
     
     def check_compatibility(self, configuration):
-        
-        issues = []
-        
-        
-        if configuration.cpu and configuration.motherboard:
-            if configuration.cpu.socket != configuration.motherboard.socket:
-                issues.append(f"Процессор (сокет {configuration.cpu.socket}) не совместим с материнской платой (сокет {configuration.motherboard.socket})")
-        
-        
-        if configuration.psu and configuration.cpu and configuration.gpu:
-            total_tdp = configuration.cpu.tdp + (configuration.gpu.tdp if configuration.gpu else 0)
-            if configuration.psu.wattage < total_tdp * 1.3:
-                issues.append(f"Мощность БП ({configuration.psu.wattage}Вт) может быть недостаточной для системы (рекомендуется {int(total_tdp * 1.5)}Вт)")
-        
-        
-        if configuration.cooling and configuration.cpu:
-            if configuration.cooling.max_tdp < configuration.cpu.tdp:
-                issues.append(f"Система охлаждения может не справиться с TDP процессора ({configuration.cpu.tdp}Вт)")
-        
-        
-        if configuration.ram and configuration.motherboard:
-            if configuration.ram.memory_type != configuration.motherboard.memory_type:
-                issues.append(f"Тип оперативной памяти ({configuration.ram.memory_type}) не совместим с материнской платой ({configuration.motherboard.memory_type})")
-        
-        configuration.compatibility_check = len(issues) == 0
-        configuration.compatibility_notes = "\n".join(issues) if issues else "Все компоненты совместимы"
+
+        issues = apply_compatibility(configuration)
         configuration.save()
         
         return configuration.compatibility_check, issues
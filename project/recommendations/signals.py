@@ -0,0 +1,134 @@
+import logging
+
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from computers.caching import bump_catalog_version
+from computers.models import CPU, GPU
+from .benchmark_data import BenchmarkDataError
+from .ai_analytics import record_log
+from .benchmark_links import link_component
+from .build_index import build_index
+from .models import AILog, PCConfiguration, Wishlist
+from .personalization_service import BuildState, rebuild_preference_profiles, record_build_change
+from .price_events import emit_price_changes
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(pre_save, sender=CPU, dispatch_uid='link_cpu_benchmark')
+@receiver(pre_save, sender=GPU, dispatch_uid='link_gpu_benchmark')
+def link_component_benchmark(sender, instance, raw=False, update_fields=None, **kwargs):
+
+    if raw or (update_fields is not None and 'name' not in update_fields):
+        return
+    
+    try:
+        changed = link_component(instance, 'cpu' if sender is CPU else 'gpu')
+    except BenchmarkDataError as e:
+        logger.warning(f"Benchmark link skipped for {sender.__name__} {instance.pk}: {e}")
+        return
+    
+    # A save limited to update_fields would not write the new link
+    if changed and update_fields is not None:
+        instance._benchmark_link_changed = True
+
+
+@receiver(post_save, sender=CPU, dispatch_uid='save_cpu_benchmark_link')
+@receiver(post_save, sender=GPU, dispatch_uid='save_gpu_benchmark_link')
+def save_component_benchmark_link(sender, instance, raw=False, **kwargs):
+
+    if raw or not instance.__dict__.pop('_benchmark_link_changed', False):
+        return
+    
+    sender.objects.filter(pk=instance.pk).update(
+        benchmark_key=instance.benchmark_key,
+        benchmark_confidence=instance.benchmark_confidence,
+        benchmark_version=instance.benchmark_version,
+    )
+    bump_catalog_version(sender)
+
+
+def remember_price(sender, instance, **kwargs):
+
+    # Read from __dict__ so deferred price fields never trigger a query
+    instance._original_price = instance.__dict__.get('price')
+
+
+def emit_catalog_price_change(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+
+    if raw or created or 'price' not in instance.__dict__:
+        return
+    if update_fields is not None and 'price' not in update_fields:
+        return
+    
+    old_price = getattr(instance, '_original_price', None)
+    instance._original_price = instance.price
+    if old_price is None or old_price == instance.price:
+        return
+    
+    emit_price_changes(
+        [(COMPONENT_TYPES[sender], instance.pk, '', old_price, instance.price)],
+        source='catalog',
+    )
+
+
+COMPONENT_TYPES = {model: component_type for component_type, model in Wishlist.component_models().items()}
+
+for model, component_type in COMPONENT_TYPES.items():
+    post_init.connect(remember_price, sender=model, dispatch_uid=f'remember_{component_type}_price')
+    post_save.connect(emit_catalog_price_change, sender=model, dispatch_uid=f'emit_{component_type}_price_change')
+
+
+@receiver(post_init, sender=PCConfiguration, dispatch_uid='remember_build_state')
+def remember_build_state(sender, instance, **kwargs):
+    instance._build_state = BuildState.of(instance)
+
+
+@receiver(post_save, sender=PCConfiguration, dispatch_uid='update_preference_profile_on_save')
+def update_preference_profile_on_save(sender, instance, created=False, raw=False, **kwargs):
+
+    if raw:
+        return
+    
+    old = None if created else getattr(instance, '_build_state', None)
+    new = BuildState.of(instance)
+    instance._build_state = new
+    
+    if new is None or (old is None and not created):
+        # Saved from a partially loaded row, so the delta is unknown
+        rebuild_preference_profiles([instance.user_id])
+    elif old is not None and old.user_id != new.user_id:
+        record_build_change(old, None, old.user_id)
+        record_build_change(None, new, new.user_id)
+    elif old != new:
+        record_build_change(old, new, new.user_id)
+
+
+@receiver(post_delete, sender=PCConfiguration, dispatch_uid='update_preference_profile_on_delete')
+def update_preference_profile_on_delete(sender, instance, **kwargs):
+
+    old = getattr(instance, '_build_state', None)
+    if old is not None:
+        record_build_change(old, None, old.user_id)
+    elif 'user_id' in instance.__dict__:
+        rebuild_preference_profiles([instance.user_id], create=False)
+
+
+@receiver(post_save, sender=PCConfiguration, dispatch_uid='mark_build_index_row')
+def mark_build_index_row(sender, instance, raw=False, **kwargs):
+
+    if not raw:
+        build_index.mark_changed(instance.pk)
+
+
+@receiver(post_delete, sender=PCConfiguration, dispatch_uid='discard_build_index_row')
+def discard_build_index_row(sender, instance, **kwargs):
+    build_index.discard(instance.pk)
+
+
+@receiver(post_save, sender=AILog, dispatch_uid='roll_up_ai_log')
+def roll_up_ai_log(sender, instance, created=False, raw=False, **kwargs):
+
+    if created and not raw:
+        record_log(instance)
@@ -2,12 +2,17 @@
 
 import asyncio
 import aiohttp
+import atexit
 import hashlib
 import json
 import logging
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Tuple
 from urllib.parse import urlencode, quote_plus
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -19,6 +24,9 @@ from django.db import models
 logger = logging.getLogger(__name__)
 
 
+STORE_SEARCH_CACHE_TIMEOUT = getattr(settings, 'STORE_SEARCH_CACHE_TIMEOUT', 900)
+
+
 class Store(Enum):
     DNS = "dns"
     CITILINK = "citilink"
@@ -68,6 +76,26 @@ class PriceHistoryPoint:
         }
 
 
+def create_store_session() -> aiohttp.ClientSession:
+
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=30),
+        connector=aiohttp.TCPConnector(limit=getattr(settings, 'STORE_SEARCH_CONNECTIONS', 50)),
+        headers={
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            'Accept': 'application/json, text/html',
+            'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
+        }
+    )
+
+
+def store_search_key(query: str, stores: Iterable[Store], category: Optional[str] = None) -> str:
+
+    stores_part = ','.join(sorted(store.value for store in stores))
+    digest = hashlib.md5(f'{query.strip().lower()}|{stores_part}|{category or ""}'.encode()).hexdigest()
+    return f"store_search_{digest}"
+
+
 class StoreIntegrationService:
 
     AFFILIATE_CONFIG = {
@@ -133,24 +161,20 @@ class StoreIntegrationService:
         },
     }
     
-    def __init__(self):
-        self.session: Optional[aiohttp.ClientSession] = None
+    DEFAULT_STORES = [Store.DNS, Store.CITILINK, Store.REGARD]
+    
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+        self.session: Optional[aiohttp.ClientSession] = session
+        self.owns_session = session is None
         
     async def _get_session(self) -> aiohttp.ClientSession:
         if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
-            self.session = aiohttp.ClientSession(
-                timeout=timeout,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                    'Accept': 'application/json, text/html',
-                    'Accept-Language': 'ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7',
-                }
-            )
+            self.session = create_store_session()
+            self.owns_session = True
         return self.session
     
     async def close(self):
-        if self.session and not self.session.closed:
+        if self.owns_session and self.session and not self.session.closed:
             await self.session.close()
     
     def generate_affiliate_url(self, store: Store, product_url: str) -> str:
@@ -188,14 +212,25 @@ class StoreIntegrationService:
     ) -> Dict[str, List[StoreProduct]]:
 
         if stores is None:
-            stores = [Store.DNS, Store.CITILINK, Store.REGARD]
+            stores = self.DEFAULT_STORES
         
-
-        cache_key = f"store_search_{hashlib.md5(f'{query}_{stores}'.encode()).hexdigest()}"
+        cache_key = store_search_key(query, stores, category)
         cached = cache.get(cache_key)
         if cached:
             return cached
         
+        results = await self.fan_out(query, stores, category)
+        cache.set(cache_key, results, STORE_SEARCH_CACHE_TIMEOUT)
+        
+        return results
+    
+    async def fan_out(
+        self,
+        query: str,
+        stores: List[Store],
+        category: Optional[str] = None
+    ) -> Dict[str, List[StoreProduct]]:
+        
         results = {}
         tasks = []
         
@@ -211,9 +246,6 @@ class StoreIntegrationService:
             else:
                 results[store.value] = result
         
-
-        cache.set(cache_key, results, 900)
-        
         return results
     
     async def _search_in_store(
@@ -354,72 +386,63 @@ class PriceHistoryService:
     
     def get_price_history(
         self, 
-        component_name: str,
+        component_type: str,
+        component_id: int,
         days: int = 30
     ) -> List[PriceHistoryPoint]:
 
-        from datetime import date
-        import random
+        from .price_history import history_queryset
         
-        history = []
-        base_price = self.store_service._estimate_price(component_name, Store.DNS)
+        rows = history_queryset(component_type, component_id, days).order_by('day', 'shop')
         
-        for i in range(days, -1, -1):
-            point_date = datetime.now() - timedelta(days=i)
-            
-            variation = random.uniform(-0.1, 0.1)
-            price = base_price * (1 + variation)
-            
-
-            price *= (1 - i * 0.001)
-            
-            history.append(PriceHistoryPoint(
-                date=point_date,
-                price=round(price, -2),
-                store=Store.DNS.value,
-                in_stock=random.random() > 0.1  
-            ))
-        
-        return history
+        return [
+            PriceHistoryPoint(
+                date=datetime.combine(row.day, datetime.min.time()),
+                price=float(row.price_close),
+                store=row.shop,
+                in_stock=row.in_stock
+            )
+            for row in rows
+        ]
     
     def get_price_chart_data(
         self, 
-        component_name: str,
+        component_type: str,
+        component_id: int,
         days: int = 30
     ) -> Dict:
 
-        history = self.get_price_history(component_name, days)
+        from .price_history import get_price_series
         
-        if not history:
-            return {'data': [], 'stats': {}}
-        
-        prices = [p.price for p in history]
-        
-        return {
-            'data': [p.to_dict() for p in history],
-            'stats': {
-                'min_price': min(prices),
-                'max_price': max(prices),
-                'avg_price': sum(prices) / len(prices),
-                'current_price': prices[-1] if prices else 0,
-                'price_change_30d': ((prices[-1] - prices[0]) / prices[0] * 100) if prices[0] > 0 else 0,
-                'best_time_to_buy': min(prices) == prices[-1],
-            }
-        }
+        return get_price_series(component_type, component_id, days)
     
     def get_price_alerts(
         self,
-        component_name: str,
+        component_type: str,
+        component_id: int,
         target_price: float
     ) -> Dict:
 
-        history = self.get_price_history(component_name, 7)
-        current_price = history[-1].price if history else 0
+        from .price_history import get_current_price
+        
+        latest = get_current_price(component_type, component_id)
+        current_price = latest['price'] if latest else None
+        
+        if current_price is None:
+            return {
+                'component_type': component_type,
+                'component_id': component_id,
+                'target_price': target_price,
+                'current_price': None,
+                'target_reached': False,
+            }
         
         return {
-            'component': component_name,
+            'component_type': component_type,
+            'component_id': component_id,
             'target_price': target_price,
             'current_price': current_price,
+            'shop': latest['shop'],
             'target_reached': current_price <= target_price,
             'difference': current_price - target_price,
             'difference_percent': ((current_price - target_price) / target_price * 100) if target_price > 0 else 0,
@@ -427,6 +450,213 @@ class PriceHistoryService:
 
 
 
+class LocalTTLCache:
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class StoreSearchService:
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout or getattr(settings, 'STORE_SEARCH_TIMEOUT', 10)
+        self.local = LocalTTLCache(
+            maxsize=getattr(settings, 'STORE_SEARCH_LOCAL_CACHE_SIZE', 256),
+            ttl=getattr(settings, 'STORE_SEARCH_LOCAL_CACHE_TTL', 60),
+        )
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'fetched': 0, 'coalesced': 0}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._service: Optional[StoreIntegrationService] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+
+        with self._lock:
+            # A forked worker inherits the loop object but not its thread
+            if self._loop is None or self._pid != os.getpid():
+                self._loop = asyncio.new_event_loop()
+                self._inflight = {}
+                self._service = None
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name='store-search', daemon=True
+                )
+                self._thread.start()
+                self._pid = os.getpid()
+            return self._loop
+    
+    async def _get_service(self) -> StoreIntegrationService:
+        if self._service is None or self._service.session.closed:
+            self._service = StoreIntegrationService(session=create_store_session())
+        return self._service
+    
+    async def _fetch(self, key: str, query: str, stores: List[Store], category: Optional[str]):
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            service = await self._get_service()
+            results = await service.fan_out(query, stores, category)
+            self.stats['fetched'] += 1
+            future.set_result(results)
+            return results
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+    
+    async def _fetch_many(self, misses: List[Tuple[str, str, List[Store], Optional[str]]]):
+        return await asyncio.gather(*[self._fetch(*miss) for miss in misses], return_exceptions=True)
+    
+    def _cached(self, key: str) -> Optional[Dict]:
+
+        results = self.local.get(key)
+        if results is not None:
+            self.stats['local_hits'] += 1
+            return results
+        
+        results = cache.get(key)
+        if results is not None:
+            self.stats['shared_hits'] += 1
+            self.local.set(key, results)
+        return results
+    
+    def search(
+        self,
+        query: str,
+        stores: Optional[List[Store]] = None,
+        category: Optional[str] = None
+    ) -> Dict[str, List[StoreProduct]]:
+    
+        return self.search_many([query], stores, category)[query]
+    
+    def search_many(
+        self,
+        queries: Iterable[str],
+        stores: Optional[List[Store]] = None,
+        category: Optional[str] = None
+    ) -> Dict[str, Dict[str, List[StoreProduct]]]:
+    
+        stores = stores or StoreIntegrationService.DEFAULT_STORES
+        results = {}
+        misses = []
+        
+        for query in dict.fromkeys(queries):
+            key = store_search_key(query, stores, category)
+            cached = self._cached(key)
+            if cached is not None:
+                results[query] = cached
+            else:
+                misses.append((key, query, stores, category))
+        
+        if not misses:
+            return results
+        
+        future = asyncio.run_coroutine_threadsafe(self._fetch_many(misses), self._ensure_loop())
+        try:
+            fetched = future.result(self.timeout)
+        except Exception as e:
+            future.cancel()
+            logger.warning(f"Store search fan-out failed for {len(misses)} queries: {e!r}")
+            fetched = [e] * len(misses)
+        
+        for (key, query, _, _), result in zip(misses, fetched):
+            if isinstance(result, Exception):
+                logger.error(f"Store search failed for '{query}': {result}")
+                results[query] = {store.value: [] for store in stores}
+                continue
+            
+            cache.set(key, result, STORE_SEARCH_CACHE_TIMEOUT)
+            self.local.set(key, result)
+            results[query] = result
+        
+        return results
+    
+    def shutdown(self) -> None:
+
+        with self._lock:
+            loop, self._loop = self._loop, None
+            service, self._service = self._service, None
+        
+        if loop is None or self._pid != os.getpid() or not loop.is_running():
+            return
+        
+        if service is not None:
+            asyncio.run_coroutine_threadsafe(service.close(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(5)
+
+
+_store_search: Optional[StoreSearchService] = None
+_store_search_lock = threading.Lock()
+
+
+def get_store_search() -> StoreSearchService:
+
+    global _store_search
+    
+    if _store_search is None:
+        with _store_search_lock:
+            if _store_search is None:
+                _store_search = StoreSearchService()
+                atexit.register(_store_search.shutdown)
+    return _store_search
+
+
+def get_store_offers_for_configuration(configuration) -> Dict[str, List[Dict]]:
+
+    components = {
+        comp_type: getattr(configuration, comp_type, None)
+        for comp_type in ('cpu', 'gpu', 'motherboard', 'ram', 'storage_primary', 'psu', 'case', 'cooling')
+    }
+    names = {comp_type: component.name for comp_type, component in components.items() if component}
+    found = get_store_search().search_many(names.values())
+    
+    return {
+        comp_type: [
+            product.to_dict()
+            for products in found[name].values()
+            for product in products
+        ]
+        for comp_type, name in names.items()
+    }
+
+
 def get_store_links_for_component(component) -> Dict[str, str]:
 
     service = StoreIntegrationService()
@@ -439,7 +669,7 @@ def get_store_links_for_configuration(configuration) -> Dict:
     return service.get_configuration_store_links(configuration)
 
 
-def get_price_history_data(component_name: str, days: int = 30) -> Dict:
+def get_price_history_data(component_type: str, component_id: int, days: int = 30) -> Dict:
 
     service = PriceHistoryService()
-    return service.get_price_chart_data(component_name, days)
+    return service.get_price_chart_data(component_type, component_id, days)
@@ -19,6 +19,7 @@ def generate_ai_configuration(self, user_id: int, config_params: dict):
     from accounts.models import User
     from .models import PCConfiguration, AILog
     from .ai_full_config_service import AIFullConfigService
+    from .ai_timing import generation_trace
     
     logger.info(f"[CELERY] Starting AI generation for user {user_id}")
     
@@ -40,15 +41,14 @@ def generate_ai_configuration(self, user_id: int, config_params: dict):
         )
         
 
-        import time
-        start_time = time.time()
+        with generation_trace() as trace:
+            configuration, workspace, ai_info = ai_service.generate_full_configuration(user)
         
-        configuration, workspace, ai_info = ai_service.generate_full_configuration(user)
-        
-        response_time = int((time.time() - start_time) * 1000)
+        response_time = round(trace.total_ms)
+        logger.info(f"[CELERY] AI generation stages (ms): {trace.timings()}, tokens/s: {trace.tokens_per_second}")
         
         if configuration:
-
+        
             AILog.log_response(
                 user=user,
                 prompt=str(config_params),
@@ -56,7 +56,8 @@ def generate_ai_configuration(self, user_id: int, config_params: dict):
                 parsed_response={'configuration_id': configuration.id},
                 status='success',
                 response_time_ms=response_time,
-                configuration_id=configuration.id
+                configuration_id=configuration.id,
+                trace=trace
             )
             
             logger.info(f"[CELERY] AI generation complete: config #{configuration.id}")
@@ -66,10 +67,11 @@ def generate_ai_configuration(self, user_id: int, config_params: dict):
                 'configuration_id': configuration.id,
                 'workspace_id': workspace.id if workspace else None,
                 'total_price': float(configuration.total_price),
-                'response_time_ms': response_time
+                'response_time_ms': response_time,
+                'stage_timings_ms': trace.timings()
             }
         else:
-
+        
             AILog.log_response(
                 user=user,
                 prompt=str(config_params),
@@ -77,21 +79,22 @@ def generate_ai_configuration(self, user_id: int, config_params: dict):
                 parsed_response={},
                 status='error',
                 response_time_ms=response_time,
-                fallback_reason=ai_info.get('error', 'Unknown error')
+                fallback_reason=ai_info.get('error', 'Unknown error'),
+                trace=trace
             )
             
             return {
                 'status': 'error',
                 'error': ai_info.get('error', 'AI generation failed')
             }
-            
+    
     except SoftTimeLimitExceeded:
         logger.error(f"[CELERY] AI generation timeout for user {user_id}")
         return {
             'status': 'timeout',
             'error': 'AI generation timed out after 4 minutes'
         }
-        
+    
     except Exception as e:
         logger.exception(f"[CELERY] AI generation error: {e}")
         
@@ -106,49 +109,70 @@ def generate_ai_configuration(self, user_id: int, config_params: dict):
 
 
 
-@shared_task(bind=True)
-def update_all_prices(self):
+@shared_task
+def update_all_prices(component_type: str = None):
 
-    from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
-    from .price_service import PriceParserService
+    from .price_pipeline import create_run
     
-    logger.info("[CELERY] Starting scheduled price update")
+    run = create_run(component_type)
+    logger.info(f"[CELERY] Starting price update run {run.id}: {run.chunks_total} chunks")
     
-    service = PriceParserService()
-    updated_count = 0
-    error_count = 0
-    
-
-    component_models = [
-        ('cpu', CPU),
-        ('gpu', GPU),
-        ('motherboard', Motherboard),
-        ('ram', RAM),
-        ('storage', Storage),
-        ('psu', PSU),
-        ('case', Case),
-        ('cooling', Cooling),
-    ]
-    
-    for component_type, model in component_models:
-        components = model.objects.all()[:50]  
-        
-        for component in components:
-            try:
-                updated = service.update_component_price(component_type, component.id)
-                if updated:
-                    updated_count += 1
-            except Exception as e:
-                logger.warning(f"[CELERY] Price update failed for {component_type} #{component.id}: {e}")
-                error_count += 1
+    dispatch_price_chunks(run.id, list(run.chunks.values_list('id', flat=True)))
     
-    logger.info(f"[CELERY] Price update complete: {updated_count} updated, {error_count} errors")
+    return {'status': 'dispatched', 'run_id': run.id, 'chunks': run.chunks_total}
+
+
+@shared_task
+def resume_price_update(run_id: int):
+
+    from .price_pipeline import resumable_chunk_ids
+    from .price_service import PriceUpdateRun
     
-    return {
-        'status': 'complete',
-        'updated': updated_count,
-        'errors': error_count
-    }
+    chunk_ids = resumable_chunk_ids(run_id)
+    if chunk_ids:
+        PriceUpdateRun.objects.filter(id=run_id).update(status='running', finished_at=None)
+        dispatch_price_chunks(run_id, chunk_ids)
+    
+    logger.info(f"[CELERY] Resuming price update run {run_id}: {len(chunk_ids)} chunks")
+    return {'status': 'dispatched' if chunk_ids else 'complete', 'run_id': run_id, 'chunks': len(chunk_ids)}
+
+
+def dispatch_price_chunks(run_id: int, chunk_ids: list):
+
+    from celery import chord
+    
+    if not chunk_ids:
+        return finish_price_update.delay([], run_id)
+    return chord(update_price_chunk.s(chunk_id) for chunk_id in chunk_ids)(finish_price_update.s(run_id))
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=60)
+def update_price_chunk(self, chunk_id: int):
+
+    from .price_pipeline import failed_chunk, run_chunk
+    
+    try:
+        result = run_chunk(chunk_id)
+    except Exception as e:
+        logger.exception(f"[CELERY] Price update chunk {chunk_id} crashed: {e}")
+        result = failed_chunk(chunk_id)
+    
+    if result['status'] == 'failed' and self.request.retries < self.max_retries:
+        raise self.retry()
+    return result
+
+
+@shared_task
+def finish_price_update(results: list, run_id: int):
+
+    from .price_pipeline import finish_run
+    
+    progress = finish_run(run_id)
+    logger.info(
+        f"[CELERY] Price update run {run_id} {progress['status']}: {progress['saved']} saved, "
+        f"{progress['errors']} errors, {progress['chunks']['failed']} failed chunks"
+    )
+    return progress
 
 
 @shared_task
@@ -167,40 +191,121 @@ def update_component_price(component_type: str, component_id: int):
 
 
 
+@shared_task
+def snapshot_catalog_prices():
+
+    from .price_history import snapshot_catalog_prices as snapshot
+    
+    recorded = snapshot()
+    logger.info(f"[CELERY] Catalog prices recorded: {recorded}")
+    
+    return {'recorded': recorded}
+
+
+@shared_task
+def compact_price_history():
+
+    from .price_history import compact_price_history as compact
+    
+    return compact()
+
+
 @shared_task
 def check_price_alerts():
 
-    from .models import Wishlist
-    from accounts.models import User
+    from .price_alerts import evaluate_price_alerts
     
     logger.info("[CELERY] Checking price alerts")
     
-    alerts_sent = 0
+    digests = evaluate_price_alerts()
     
+    for user_id, items in digests.items():
+        send_price_alert_digest.delay(user_id=user_id, items=items)
+    
+    alerts_sent = sum(len(items) for items in digests.values())
+    logger.info(f"[CELERY] Price alerts sent: {alerts_sent} in {len(digests)} digests")
+    
+    return {'alerts_sent': alerts_sent, 'digests': len(digests)}
+
+
+@shared_task
+def process_price_changes(components=None):
+
+    from .price_events import process_price_changes as process
+    
+    digests = process(components)
+    
+    for user_id, items in digests.items():
+        send_price_alert_digest.delay(user_id=user_id, items=items)
+    
+    alerts_sent = sum(len(items) for items in digests.values())
+    if alerts_sent:
+        logger.info(f"[CELERY] Price change alerts sent: {alerts_sent} in {len(digests)} digests")
+    
+    return {'alerts_sent': alerts_sent, 'digests': len(digests)}
+
+
+@shared_task
+def send_price_alert_digest(user_id: int, items: list):
 
-    wishlists = Wishlist.objects.filter(
-        price_alert_threshold__isnull=False,
-        notifications_enabled=True
-    ).select_related('user')
+    from accounts.models import User
     
-    for wishlist_item in wishlists:
-        price_info = wishlist_item.check_price_change()
+    try:
+        user = User.objects.get(id=user_id)
         
-        if price_info and price_info.get('below_threshold'):
-            
-            send_price_alert_email.delay(
-                user_id=wishlist_item.user.id,
-                component_type=wishlist_item.component_type,
-                component_id=wishlist_item.component_id,
-                current_price=price_info['current_price'],
-                threshold_price=float(wishlist_item.price_alert_threshold),
-                original_price=price_info['price_at_add']
+        if not user.email:
+            logger.warning(f"[CELERY] User {user_id} has no email")
+            return {'status': 'skipped', 'reason': 'no email'}
+        
+        lines = []
+        for item in items:
+            discount = (
+                (item['original_price'] - item['current_price']) / item['original_price'] * 100
+                if item['original_price'] else 0
             )
-            alerts_sent += 1
-    
-    logger.info(f"[CELERY] Price alerts sent: {alerts_sent}")
+            lines.append(
+                f"📦 {item['component_name']}\n"
+                f"💰 Текущая цена: {item['current_price']:,.0f} ₽ "
+                f"(порог {item['threshold_price']:,.0f} ₽, было {item['original_price']:,.0f} ₽, -{discount:.1f}%)"
+            )
+        
+        if len(items) == 1:
+            subject = f"🔔 Цена снизилась! {items[0]['component_name']}"
+        else:
+            subject = f"🔔 Цены снизились на {len(items)} товара из вашего списка желаний"
+        
+        body = "\n\n".join(lines)
+        message = f"""
+Привет, {user.username}!
+
+Отличные новости! Цены на компоненты из вашего списка желаний снизились:
+
+{body}
+
+Поспешите - цены могут измениться!
+
+---
+PC Configurator
+https://pckonfai.ru
+        """
+        
+        send_mail(
+            subject=subject,
+            message=message,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[user.email],
+            fail_silently=True
+        )
+        
+        logger.info(f"[CELERY] Price alert digest ({len(items)} items) sent to {user.email}")
+        return {'status': 'sent', 'email': user.email, 'items': len(items)}
     
-    return {'alerts_sent': alerts_sent}
+    except User.DoesNotExist:
+        logger.error(f"[CELERY] User {user_id} not found")
+        return {'status': 'error', 'reason': 'user not found'}
+    except Exception as e:
+        logger.exception(f"[CELERY] Email send error: {e}")
+        return {'status': 'error', 'reason': str(e)}
 
 
 @shared_task
@@ -216,7 +321,7 @@ def send_price_alert_email(user_id: int, component_type: str, component_id: int,
             logger.warning(f"[CELERY] User {user_id} has no email")
             return {'status': 'skipped', 'reason': 'no email'}
         
-        
+
         component_name = f"{component_type.upper()} #{component_id}"
         
         subject = f"🔔 Цена снизилась! {component_name}"
@@ -249,7 +354,7 @@ https://pckonfai.ru
         
         logger.info(f"[CELERY] Price alert sent to {user.email}")
         return {'status': 'sent', 'email': user.email}
-        
+    
     except User.DoesNotExist:
         logger.error(f"[CELERY] User {user_id} not found")
         return {'status': 'error', 'reason': 'user not found'}
@@ -260,6 +365,52 @@ https://pckonfai.ru
 
 
 
+@shared_task
+def link_catalog_benchmarks(force: bool = False):
+
+    from .benchmark_links import link_catalog
+    
+    results = link_catalog(force=force)
+    
+    logger.info(
+        "[CELERY] Benchmark links updated: "
+        + ", ".join(f"{kind} {stats['updated']}/{stats['checked']}" for kind, stats in results.items())
+    )
+    
+    return results
+
+
+@shared_task
+def warm_performance_cache(limit: int = None):
+
+    from computers.models import CPU, GPU
+    from .models import PCConfiguration
+    from .benchmark_service import warm_performance_cache as warm
+    
+    limit = limit or settings.BENCHMARK_WARMUP_PAIRS
+    
+    popular = list(
+        PCConfiguration.objects
+        .filter(cpu__isnull=False, gpu__isnull=False)
+        .values('cpu_id', 'gpu_id')
+        .annotate(builds=db_models.Count('id'))
+        .order_by('-builds')[:limit]
+    )
+    
+    cpus = CPU.objects.in_bulk({row['cpu_id'] for row in popular})
+    gpus = GPU.objects.in_bulk({row['gpu_id'] for row in popular})
+    
+    warmed = warm(
+        (cpus[row['cpu_id']], gpus[row['gpu_id']])
+        for row in popular
+        if row['cpu_id'] in cpus and row['gpu_id'] in gpus
+    )
+    
+    logger.info(f"[CELERY] Performance cache warmed for {warmed} CPU/GPU pairs")
+    
+    return {'warmed': warmed}
+
+
 @shared_task
 def cleanup_old_logs(days: int = 30):
 
@@ -281,35 +432,23 @@ def cleanup_old_logs(days: int = 30):
 @shared_task
 def generate_ai_analytics_report():
 
-    from .models import AILog
+    from .ai_analytics import status_breakdown
     
-
-    yesterday = timezone.now() - timedelta(days=1)
+    yesterday = timezone.localtime() - timedelta(days=1)
     today_start = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
     today_end = today_start + timedelta(days=1)
     
-    logs = AILog.objects.filter(
-        created_at__gte=today_start,
-        created_at__lt=today_end
-    )
-    
-    total = logs.count()
-    success = logs.filter(status='success').count()
-    errors = logs.filter(status='error').count()
-    fallbacks = logs.filter(status='fallback_used').count()
-    
-    avg_time = logs.exclude(response_time_ms__isnull=True).aggregate(
-        avg=db_models.Avg('response_time_ms')
-    )['avg'] or 0
+    breakdown = status_breakdown(today_start, today_end)
+    by_status = breakdown['by_status']
     
     report = {
         'date': today_start.date().isoformat(),
-        'total_requests': total,
-        'success_count': success,
-        'error_count': errors,
-        'fallback_count': fallbacks,
-        'success_rate': round(success / total * 100, 2) if total > 0 else 0,
-        'avg_response_time_ms': round(avg_time, 2)
+        'total_requests': breakdown['total_requests'],
+        'success_count': by_status['success'],
+        'error_count': by_status['error'],
+        'fallback_count': by_status['fallback_used'],
+        'success_rate': breakdown['success_rate'] or 0,
+        'avg_response_time_ms': breakdown['avg_response_time_ms'] or 0
     }
     
     logger.info(f"[CELERY] Daily AI report: {report}")
@@ -0,0 +1,271 @@
+import logging
+import math
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import product
+from typing import Dict, List, Optional, Tuple
+
+from computers.catalog_export import get_snapshot
+from computers.models import CPU, GPU, PSU, RAM, Storage
+from computers.serializers import CPUSerializer, GPUSerializer, PSUSerializer, RAMSerializer, StorageSerializer
+from .benchmark_data import BenchmarkDataset, get_benchmark_dataset
+
+logger = logging.getLogger(__name__)
+
+CATALOG = {
+    'cpu': (CPU, CPUSerializer),
+    'gpu': (GPU, GPUSerializer),
+    'ram': (RAM, RAMSerializer),
+    'storage_primary': (Storage, StorageSerializer),
+    'psu': (PSU, PSUSerializer),
+}
+UPGRADE_SLOTS = ('cpu', 'gpu', 'ram', 'storage_primary')
+
+# Same margin compatibility_issues() uses for CPU + GPU TDP
+PSU_HEADROOM = 1.3
+
+# RAM and storage have no benchmark entries: doubling capacity or read speed
+# is valued as this fraction of a CPU/GPU doubling
+RAM_DOUBLING_GAIN = 0.1
+STORAGE_DOUBLING_GAIN = 0.05
+
+OPTIONS_PER_SLOT = 3
+BUNDLE_CANDIDATES_PER_SLOT = 8
+
+
+def _price(row: Dict) -> Decimal:
+    return Decimal(str(row.get('price') or 0))
+
+
+@dataclass
+class UpgradeOption:
+
+    slot: str
+    row: Dict
+    gain: float
+    psu: Optional[Dict] = None
+    
+    @property
+    def price(self) -> Decimal:
+        return _price(self.row) + (_price(self.psu) if self.psu else 0)
+    
+    @property
+    def value(self) -> float:
+        # Performance gain in percent per 1000 rubles
+        return self.gain * 100 / (float(self.price) / 1000) if self.price else 0.0
+    
+    def to_dict(self) -> Dict:
+
+        result = {
+            'id': self.row['id'],
+            'name': self.row['name'],
+            'price': float(_price(self.row)),
+            'gain_percent': round(self.gain * 100, 1),
+            'gain_per_1000_rub': round(self.value, 2),
+            'improvement': f"+{self.gain * 100:.0f}% производительности",
+        }
+        if self.psu:
+            result['requires'] = [{'component': 'psu', 'id': self.psu['id'], 'name': self.psu['name'],
+                                   'price': float(_price(self.psu))}]
+            result['total_price'] = float(self.price)
+        return result
+
+
+@dataclass
+class UpgradeBundle:
+
+    options: List[UpgradeOption] = field(default_factory=list)
+    psu: Optional[Dict] = None
+    
+    @property
+    def price(self) -> Decimal:
+        return sum((_price(option.row) for option in self.options), Decimal(0)) + (_price(self.psu) if self.psu else 0)
+    
+    @property
+    def gain(self) -> float:
+        return sum(option.gain for option in self.options)
+    
+    def to_dict(self) -> Dict:
+
+        parts = [{'component': option.slot, 'id': option.row['id'], 'name': option.row['name'],
+                  'price': float(_price(option.row))} for option in self.options]
+        if self.psu:
+            parts.append({'component': 'psu', 'id': self.psu['id'], 'name': self.psu['name'],
+                          'price': float(_price(self.psu))})
+        return {
+            'parts': parts,
+            'total_price': float(self.price),
+            'gain_percent': round(self.gain * 100, 1),
+        }
+
+
+class UpgradePlanner:
+
+    # Works on the versioned catalog snapshots, so planning costs no queries
+    # once they are warm; only the configuration itself is read from the table
+    
+    def __init__(self, configuration, dataset: Optional[BenchmarkDataset] = None):
+        self.configuration = configuration
+        self.dataset = dataset or get_benchmark_dataset()
+        self.catalog = {
+            slot: get_snapshot(model, serializer_class, model.objects.all()).rows
+            for slot, (model, serializer_class) in CATALOG.items()
+        }
+        self.current = {slot: self._current_row(slot) for slot in CATALOG}
+        self._psus = sorted(self.catalog['psu'], key=lambda row: (row['wattage'], _price(row)))
+        self._psu_wattages = [row['wattage'] for row in self._psus]
+    
+    def _current_row(self, slot: str) -> Optional[Dict]:
+
+        component_id = getattr(self.configuration, f'{slot}_id')
+        if component_id is None:
+            return None
+        return next((row for row in self.catalog[slot] if row['id'] == component_id), None)
+    
+    def _benchmark(self, kind: str, row: Dict) -> Optional[Dict]:
+
+        entries = getattr(self.dataset, kind)
+        if row.get('benchmark_version') == self.dataset.version and row.get('benchmark_key') in entries:
+            return entries[row['benchmark_key']]
+        key = self.dataset.index.find_match(kind, row['name'])
+        return entries.get(key) if key else None
+    
+    def _ratio(self, kind: str, current: Dict, candidate: Dict) -> Optional[float]:
+
+        old, new = self._benchmark(kind, current), self._benchmark(kind, candidate)
+        if old and new:
+            if kind == 'cpu':
+                return math.sqrt(new['single'] / old['single'] * new['multi'] / old['multi'])
+            return new['timespy'] / old['timespy']
+        if current.get('performance_score') and candidate.get('performance_score'):
+            return candidate['performance_score'] / current['performance_score']
+        return None
+    
+    def gain(self, slot: str, candidate: Dict) -> Optional[float]:
+
+        current = self.current[slot]
+        if slot in ('cpu', 'gpu'):
+            ratio = self._ratio(slot, current, candidate)
+            return ratio - 1 if ratio else None
+        if slot == 'ram':
+            if not current.get('capacity'):
+                return None
+            return math.log2(candidate['capacity'] / current['capacity']) * RAM_DOUBLING_GAIN
+        if not current.get('read_speed') or not candidate.get('read_speed'):
+            return None
+        return math.log2(candidate['read_speed'] / current['read_speed']) * STORAGE_DOUBLING_GAIN
+    
+    def fits(self, slot: str, candidate: Dict) -> bool:
+
+        configuration = self.configuration
+        motherboard = configuration.motherboard
+        if slot == 'cpu':
+            if motherboard and candidate['socket'] != motherboard.socket:
+                return False
+            if configuration.cooling and configuration.cooling.max_tdp < candidate['tdp']:
+                return False
+        elif slot == 'ram':
+            if motherboard and (candidate['memory_type'] != motherboard.memory_type
+                                or candidate['capacity'] > motherboard.max_memory):
+                return False
+        elif slot == 'storage_primary':
+            if candidate['capacity'] < self.current[slot]['capacity']:
+                return False
+        return True
+    
+    def required_wattage(self, cpu: Optional[Dict], gpu: Optional[Dict]) -> int:
+
+        if not cpu or not gpu:
+            return 0
+        return max(gpu.get('recommended_psu') or 0, math.ceil((cpu['tdp'] + gpu['tdp']) * PSU_HEADROOM))
+    
+    def psu_for(self, cpu: Optional[Dict], gpu: Optional[Dict]) -> Tuple[bool, Optional[Dict]]:
+
+        # (fits, replacement): the current PSU is kept when it has the headroom,
+        # otherwise the cheapest catalog PSU that has it is added to the plan.
+        # Builds without a PSU have nothing to check against.
+        wattage = self.required_wattage(cpu, gpu)
+        current = self.current['psu']
+        if not wattage or current is None or current['wattage'] >= wattage:
+            return True, None
+        candidates = self._psus[bisect_left(self._psu_wattages, wattage):]
+        if not candidates:
+            return False, None
+        return True, min(candidates, key=_price)
+    
+    def options(self, slot: str) -> List[UpgradeOption]:
+
+        if self.current[slot] is None:
+            return []
+        
+        options = []
+        for candidate in self.catalog[slot]:
+            price = _price(candidate)
+            if candidate['id'] == self.current[slot]['id'] or price <= 0 or not self.fits(slot, candidate):
+                continue
+            gain = self.gain(slot, candidate)
+            if not gain or gain <= 0:
+                continue
+            
+            psu = None
+            if slot in ('cpu', 'gpu'):
+                parts = {'cpu': self.current['cpu'], 'gpu': self.current['gpu'], slot: candidate}
+                fits, psu = self.psu_for(parts['cpu'], parts['gpu'])
+                if not fits:
+                    continue
+            options.append(UpgradeOption(slot, candidate, gain, psu))
+        
+        options.sort(key=lambda option: (-option.value, option.price))
+        return options
+    
+    def plan(self, budget: Optional[Decimal] = None) -> Dict:
+
+        by_slot = {slot: self.options(slot) for slot in UPGRADE_SLOTS}
+        current = self.current
+        result = {
+            'upgrades': [
+                {
+                    'component': slot,
+                    'current': current[slot]['name'],
+                    'current_price': float(_price(current[slot])),
+                    'recommendations': [option.to_dict() for option in options[:OPTIONS_PER_SLOT]],
+                }
+                for slot, options in by_slot.items() if options
+            ],
+        }
+        result['total_upgrade_options'] = len(result['upgrades'])
+        if budget is not None:
+            bundle = self.bundle(by_slot, budget)
+            result['budget'] = float(budget)
+            result['bundle'] = bundle.to_dict() if bundle else None
+        return result
+    
+    def bundle(self, by_slot: Dict[str, List[UpgradeOption]], budget: Decimal) -> Optional[UpgradeBundle]:
+
+        # At most one part per slot. Only each slot's price/gain frontier can
+        # be in the best bundle, which keeps the exhaustive search small.
+        frontiers = []
+        for options in by_slot.values():
+            frontier, best_gain = [], 0.0
+            for option in sorted(options, key=lambda option: (option.price, -option.gain)):
+                if option.gain > best_gain and _price(option.row) <= budget:
+                    frontier.append(option)
+                    best_gain = option.gain
+            frontiers.append([None] + frontier[-BUNDLE_CANDIDATES_PER_SLOT:])
+        
+        best = None
+        for combination in product(*frontiers):
+            chosen = [option for option in combination if option is not None]
+            if not chosen:
+                continue
+            parts = {option.slot: option.row for option in chosen}
+            fits, psu = self.psu_for(parts.get('cpu', self.current['cpu']), parts.get('gpu', self.current['gpu']))
+            if not fits:
+                continue
+            bundle = UpgradeBundle(chosen, psu)
+            if bundle.price > budget:
+                continue
+            if best is None or (bundle.gain, -bundle.price) > (best.gain, -best.price):
+                best = bundle
+        return best
@@ -1,5 +1,7 @@
 import logging
+import os
 import secrets
+from decimal import Decimal, InvalidOperation
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -8,7 +10,7 @@ from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
 from django.core.cache import cache, caches
 from django.http import HttpResponse
-from django.db import models as db_models
+from django.db import models as db_models, transaction
 from .models import PCConfiguration, WorkspaceSetup, Recommendation, Wishlist, AILog
 from .serializers import (
     PCConfigurationSerializer, WorkspaceSetupSerializer, 
@@ -16,6 +18,14 @@ from .serializers import (
     BuilderConfigurationSerializer, PublicConfigurationSerializer
 )
 from .services import ConfigurationService
+from .build_gallery import filter_gallery
+from .fieldsets import SparseFieldsetViewMixin
+from .pagination import BuildCursorPagination, GalleryCursorPagination
+from .query_planner import plan_queryset
+from .build_comparison import MAX_BUILDS as MAX_COMPARED_BUILDS, get_comparison, load_builds
+from .component_resolver import (
+    CONFIGURATION_SLOTS, WORKSPACE_SLOTS, ComponentResolutionError, apply_compatibility, resolve_components
+)
 from computers.models import CPU, GPU, Motherboard, RAM, Storage, PSU, Case, Cooling
 from peripherals.models import (
     Monitor, Keyboard, Mouse, Headset, Webcam, Microphone, Desk, Chair,
@@ -32,7 +42,10 @@ except ImportError:
 
 
 try:
-    from .price_service import PriceParserService
+    from .price_service import PriceParserService, PriceUpdateRun
+    from .price_ingestion import get_ingestion_metrics
+    from .price_pipeline import run_progress
+    from .price_history import get_price_series, get_price_stats
     PRICE_SERVICE_AVAILABLE = True
 except ImportError:
     PRICE_SERVICE_AVAILABLE = False
@@ -60,7 +73,8 @@ except ImportError:
 try:
     from .store_integration import (
         StoreIntegrationService, PriceHistoryService,
-        get_store_links_for_configuration, get_price_history_data
+        get_store_links_for_configuration, get_price_history_data,
+        get_store_offers_for_configuration, get_store_search
     )
     STORE_SERVICE_AVAILABLE = True
 except ImportError:
@@ -70,8 +84,9 @@ try:
     from .benchmark_service import (
         BenchmarkService, FPSPredictionService, ConfigurationPerformanceAnalyzer,
         get_benchmarks_for_cpu, get_benchmarks_for_gpu, predict_game_fps,
-        get_available_games, analyze_configuration_performance
+        predict_fps_table, get_available_games, analyze_configuration_performance, performance_cache
     )
+    from .benchmark_data import get_benchmark_dataset
     BENCHMARK_SERVICE_AVAILABLE = True
 except ImportError:
     BENCHMARK_SERVICE_AVAILABLE = False
@@ -98,26 +113,17 @@ except ImportError:
     logger.warning("AIFullConfigService not available")
 
 
-class PCConfigurationViewSet(viewsets.ModelViewSet):
+class PCConfigurationViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
 
     queryset = PCConfiguration.objects.all()
     serializer_class = PCConfigurationSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = BuildCursorPagination
+    compact_actions = ('list', 'my_builds', 'gallery')
     
     def get_queryset(self):
 
-        base_queryset = PCConfiguration.objects.select_related(
-            'user',
-            'cpu',
-            'gpu',
-            'motherboard',
-            'ram',
-            'storage_primary',
-            'storage_secondary',
-            'psu',
-            'case',
-            'cooling'
-        ).prefetch_related('recommendations')
+        base_queryset = plan_queryset(PCConfiguration.objects.all(), self.get_planning_serializer())
         
         if self.request.user.is_staff:
             return base_queryset
@@ -380,108 +386,45 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
         data = serializer.validated_data
         
         try:
-            
-            config_data = {
-                'user': request.user,
-                'name': data.get('name', 'Моя сборка'),
-                'is_saved': True,
-                'is_public': data.get('is_public', False),
-            }
-            
-            
-            if data.get('cpu'):
-                config_data['cpu'] = CPU.objects.get(id=data['cpu'])
-            if data.get('gpu'):
-                config_data['gpu'] = GPU.objects.get(id=data['gpu'])
-            if data.get('motherboard'):
-                config_data['motherboard'] = Motherboard.objects.get(id=data['motherboard'])
-            if data.get('ram'):
-                config_data['ram'] = RAM.objects.get(id=data['ram'])
-            if data.get('storage_primary'):
-                config_data['storage_primary'] = Storage.objects.get(id=data['storage_primary'])
-            if data.get('storage_secondary'):
-                config_data['storage_secondary'] = Storage.objects.get(id=data['storage_secondary'])
-            if data.get('psu'):
-                config_data['psu'] = PSU.objects.get(id=data['psu'])
-            if data.get('case'):
-                config_data['case'] = Case.objects.get(id=data['case'])
-            if data.get('cooling'):
-                config_data['cooling'] = Cooling.objects.get(id=data['cooling'])
-            
-            
-            configuration = PCConfiguration.objects.create(**config_data)
-            configuration.calculate_total_price()
-            
-            
-            if data.get('is_public'):
-                configuration.share_code = secrets.token_urlsafe(16)
-            
-            configuration.save()
-            
-            
-            has_peripherals = any([
-                data.get('monitor_primary'), data.get('monitor_secondary'),
-                data.get('keyboard'), data.get('mouse'), data.get('headset'),
-                data.get('webcam'), data.get('microphone'), data.get('desk'),
-                data.get('chair'), data.get('speakers'), data.get('mousepad'),
-                data.get('monitor_arm'), data.get('usb_hub'), data.get('lighting'),
-                data.get('stream_deck'), data.get('capture_card'), data.get('gamepad'),
-                data.get('headphone_stand')
-            ])
-            
-            workspace = None
-            if has_peripherals:
-                workspace_data = {
-                    'user': request.user,
-                    'configuration': configuration,
-                    'name': f"Рабочее место: {data.get('name', 'Моя сборка')}",
-                }
-                
+            components = resolve_components({slot: data.get(slot) for slot in CONFIGURATION_SLOTS + WORKSPACE_SLOTS})
+        except ComponentResolutionError as e:
+            return Response(
+                {'error': 'Компоненты не найдены', 'missing': e.missing},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            with transaction.atomic():
+                configuration = PCConfiguration(
+                    user=request.user,
+                    name=data.get('name', 'Моя сборка'),
+                    is_saved=True,
+                    is_public=data.get('is_public', False),
+                    **{slot: components[slot] for slot in CONFIGURATION_SLOTS if slot in components}
+                )
+                configuration.calculate_total_price()
+                apply_compatibility(configuration)
                 
-                if data.get('monitor_primary'):
-                    workspace_data['monitor_primary'] = Monitor.objects.get(id=data['monitor_primary'])
-                if data.get('monitor_secondary'):
-                    workspace_data['monitor_secondary'] = Monitor.objects.get(id=data['monitor_secondary'])
-                if data.get('keyboard'):
-                    workspace_data['keyboard'] = Keyboard.objects.get(id=data['keyboard'])
-                if data.get('mouse'):
-                    workspace_data['mouse'] = Mouse.objects.get(id=data['mouse'])
-                if data.get('headset'):
-                    workspace_data['headset'] = Headset.objects.get(id=data['headset'])
-                if data.get('webcam'):
-                    workspace_data['webcam'] = Webcam.objects.get(id=data['webcam'])
-                if data.get('microphone'):
-                    workspace_data['microphone'] = Microphone.objects.get(id=data['microphone'])
-                if data.get('desk'):
-                    workspace_data['desk'] = Desk.objects.get(id=data['desk'])
-                if data.get('chair'):
-                    workspace_data['chair'] = Chair.objects.get(id=data['chair'])
+                if data.get('is_public'):
+                    configuration.share_code = secrets.token_urlsafe(16)
                 
+                configuration.save()
                 
-                if data.get('speakers'):
-                    workspace_data['speakers'] = Speakers.objects.get(id=data['speakers'])
-                if data.get('mousepad'):
-                    workspace_data['mousepad'] = Mousepad.objects.get(id=data['mousepad'])
-                if data.get('monitor_arm'):
-                    workspace_data['monitor_arm'] = MonitorArm.objects.get(id=data['monitor_arm'])
-                if data.get('usb_hub'):
-                    workspace_data['usb_hub'] = USBHub.objects.get(id=data['usb_hub'])
-                if data.get('lighting'):
-                    workspace_data['lighting'] = DeskLighting.objects.get(id=data['lighting'])
-                if data.get('stream_deck'):
-                    workspace_data['stream_deck'] = StreamDeck.objects.get(id=data['stream_deck'])
-                if data.get('capture_card'):
-                    workspace_data['capture_card'] = CaptureCard.objects.get(id=data['capture_card'])
-                if data.get('gamepad'):
-                    workspace_data['gamepad'] = Gamepad.objects.get(id=data['gamepad'])
-                if data.get('headphone_stand'):
-                    workspace_data['headphone_stand'] = Headphonestand.objects.get(id=data['headphone_stand'])
+
+                peripherals = {slot: components[slot] for slot in WORKSPACE_SLOTS if slot in components}
                 
-                workspace = WorkspaceSetup.objects.create(**workspace_data)
-                workspace.calculate_total_price()
-                workspace.save()
-            
+                workspace = None
+                if peripherals:
+                    workspace = WorkspaceSetup(
+                        user=request.user,
+                        configuration=configuration,
+                        name=f"Рабочее место: {data.get('name', 'Моя сборка')}",
+                        **peripherals
+                    )
+                    workspace.calculate_total_price()
+                    workspace.save()
             
+
             result = PCConfigurationSerializer(configuration).data
             if workspace:
                 result['workspace'] = WorkspaceSetupSerializer(workspace).data
@@ -501,10 +444,9 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
     def public_build(self, request, share_code=None):
         
         try:
-            configuration = PCConfiguration.objects.select_related(
-                'cpu', 'gpu', 'motherboard', 'ram', 'storage_primary',
-                'storage_secondary', 'psu', 'case', 'cooling'
-            ).get(share_code=share_code, is_public=True)
+            configuration = plan_queryset(PCConfiguration.objects.all(), PublicConfigurationSerializer).get(
+                share_code=share_code, is_public=True
+            )
             
             return Response(PublicConfigurationSerializer(configuration).data)
             
@@ -516,15 +458,25 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def my_builds(self, request):
+
+        configurations = plan_queryset(
+            PCConfiguration.objects.filter(user=request.user, is_saved=True),
+            self.get_planning_serializer()
+        )
         
-        configurations = PCConfiguration.objects.filter(
-            user=request.user, is_saved=True
-        ).select_related(
-            'cpu', 'gpu', 'motherboard', 'ram', 'storage_primary',
-            'storage_secondary', 'psu', 'case', 'cooling'
-        ).order_by('-created_at')
+        page = self.paginate_queryset(configurations)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+    
+    @action(detail=False, methods=['get'], permission_classes=[AllowAny], pagination_class=GalleryCursorPagination)
+    def gallery(self, request):
+
+        configurations = filter_gallery(
+            plan_queryset(PCConfiguration.objects.filter(is_public=True), self.get_planning_serializer()),
+            request.query_params
+        )
         
-        return Response(PCConfigurationSerializer(configurations, many=True).data)
+        page = self.paginate_queryset(configurations)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
     
     @action(detail=True, methods=['get'], url_path='store-links')
     def store_links(self, request, pk=None):
@@ -541,7 +493,8 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
             links = get_store_links_for_configuration(configuration)
             return Response({
                 'configuration_id': configuration.id,
-                'components': links
+                'components': links,
+                'offers': get_store_offers_for_configuration(configuration),
             })
         except Exception as e:
             logger.exception(f"Error getting store links: {e}")
@@ -595,11 +548,11 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
             
             if configuration.cpu:
                 result['cpu_name'] = configuration.cpu.name
-                result['cpu_benchmarks'] = get_benchmarks_for_cpu(configuration.cpu.name)
+                result['cpu_benchmarks'] = get_benchmarks_for_cpu(configuration.cpu)
             
             if configuration.gpu:
                 result['gpu_name'] = configuration.gpu.name
-                result['gpu_benchmarks'] = get_benchmarks_for_gpu(configuration.gpu.name)
+                result['gpu_benchmarks'] = get_benchmarks_for_gpu(configuration.gpu)
             
             return Response(result)
         except Exception as e:
@@ -623,22 +576,13 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
         
         try:
 
-            games = get_available_games()
-            predictions = []
-            
-            gpu_name = configuration.gpu.name if configuration.gpu else None
-            cpu_name = configuration.cpu.name if configuration.cpu else None
-            
-            if not gpu_name or not cpu_name:
+            if not configuration.gpu or not configuration.cpu:
                 return Response(
                     {'error': 'Для предсказания FPS нужны CPU и GPU'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            for game in games:
-                fps_data = predict_game_fps(gpu_name, cpu_name, game, resolution)
-                if fps_data:
-                    predictions.append(fps_data)
+            predictions = predict_fps_table(configuration.gpu, configuration.cpu).get(resolution, [])
             
             return Response({
                 'configuration_id': configuration.id,
@@ -661,128 +605,42 @@ class PCConfigurationViewSet(viewsets.ModelViewSet):
         if len(ids) == 1 and ',' in ids[0]:
             ids = ids[0].split(',')
         
+        try:
+            ids = list(dict.fromkeys(int(build_id) for build_id in ids))
+        except ValueError:
+            return Response({'error': 'ID сборок должны быть числами'}, status=status.HTTP_400_BAD_REQUEST)
+        
         if not ids or len(ids) < 2:
             return Response(
                 {'error': 'Укажите минимум 2 ID для сравнения (параметр ids)'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if len(ids) > 5:
+        if len(ids) > MAX_COMPARED_BUILDS:
             return Response(
-                {'error': 'Максимум 5 сборок для сравнения'},
+                {'error': f'Максимум {MAX_COMPARED_BUILDS} сборок для сравнения'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-
-        cache_key = f"compare_{'_'.join(sorted(ids))}"
-        cached_result = cache.get(cache_key)
-        if cached_result:
-            return Response(cached_result)
-        
         try:
-            configurations = PCConfiguration.objects.filter(
-                id__in=ids
-            ).select_related(
-                'cpu', 'gpu', 'motherboard', 'ram', 'storage_primary',
-                'storage_secondary', 'psu', 'case', 'cooling'
-            )
+            configurations = load_builds(ids)
             
 
             for config in configurations:
-                if config.user != request.user and not config.is_public and not request.user.is_staff:
+                if config.user_id != request.user.id and not config.is_public and not request.user.is_staff:
                     return Response(
                         {'error': f'Нет доступа к сборке {config.id}'},
                         status=status.HTTP_403_FORBIDDEN
                     )
             
-
-            builds = []
-            for config in configurations:
-                build_data = {
-                    'id': config.id,
-                    'name': config.name,
-                    'total_price': float(config.total_price) if config.total_price else 0,
-                    'performance_score': float(config.performance_score) if hasattr(config, 'performance_score') and config.performance_score else 0,
-                    'components': {
-                        'cpu': {
-                            'name': config.cpu.name if config.cpu else None,
-                            'cores': config.cpu.cores if config.cpu else None,
-                            'threads': config.cpu.threads if config.cpu else None,
-                            'base_clock': float(config.cpu.base_clock) if config.cpu and config.cpu.base_clock else None,
-                            'boost_clock': float(config.cpu.boost_clock) if config.cpu and config.cpu.boost_clock else None,
-                            'price': float(config.cpu.price) if config.cpu else None,
-                            'performance_score': float(config.cpu.performance_score) if config.cpu and config.cpu.performance_score else None,
-                        } if config.cpu else None,
-                        'gpu': {
-                            'name': config.gpu.name if config.gpu else None,
-                            'memory': config.gpu.memory if config.gpu else None,
-                            'memory_type': config.gpu.memory_type if config.gpu else None,
-                            'price': float(config.gpu.price) if config.gpu else None,
-                            'performance_score': float(config.gpu.performance_score) if config.gpu and config.gpu.performance_score else None,
-                        } if config.gpu else None,
-                        'ram': {
-                            'name': config.ram.name if config.ram else None,
-                            'capacity': config.ram.capacity if config.ram else None,
-                            'speed': config.ram.speed if config.ram else None,
-                            'price': float(config.ram.price) if config.ram else None,
-                        } if config.ram else None,
-                        'storage_primary': {
-                            'name': config.storage_primary.name if config.storage_primary else None,
-                            'capacity': config.storage_primary.capacity if config.storage_primary else None,
-                            'storage_type': config.storage_primary.storage_type if config.storage_primary else None,
-                            'price': float(config.storage_primary.price) if config.storage_primary else None,
-                        } if config.storage_primary else None,
-                    }
-                }
-                builds.append(build_data)
-            
-
-            comparison = {
-                'builds': builds,
-                'summary': {
-                    'cheapest': min(builds, key=lambda x: x['total_price'])['name'] if builds else None,
-                    'most_expensive': max(builds, key=lambda x: x['total_price'])['name'] if builds else None,
-                    'price_difference': max(b['total_price'] for b in builds) - min(b['total_price'] for b in builds) if builds else 0,
-                    'best_cpu_performance': max(
-                        (b for b in builds if b['components']['cpu'] and b['components']['cpu'].get('performance_score')),
-                        key=lambda x: x['components']['cpu']['performance_score'],
-                        default=None
-                    ),
-                    'best_gpu_performance': max(
-                        (b for b in builds if b['components']['gpu'] and b['components']['gpu'].get('performance_score')),
-                        key=lambda x: x['components']['gpu']['performance_score'],
-                        default=None
-                    ),
-                },
-                'criteria': {
-                    'cpu_cores': {b['name']: b['components']['cpu']['cores'] if b['components']['cpu'] else None for b in builds},
-                    'gpu_memory': {b['name']: b['components']['gpu']['memory'] if b['components']['gpu'] else None for b in builds},
-                    'ram_capacity': {b['name']: b['components']['ram']['capacity'] if b['components']['ram'] else None for b in builds},
-                    'storage_capacity': {b['name']: b['components']['storage_primary']['capacity'] if b['components']['storage_primary'] else None for b in builds},
-                    'total_price': {b['name']: b['total_price'] for b in builds},
-                }
-            }
-            
-            return Response(comparison)
-            
+            return Response(get_comparison(configurations))
+        
         except Exception as e:
             logger.exception(f"Error comparing configurations: {e}")
             return Response(
                 {'error': f'Ошибка при сравнении сборок: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-            
-
-            cache.set(cache_key, comparison, 300)
-            
-            return Response(comparison)
-            
-        except Exception as e:
-            logger.exception(f"Compare error: {str(e)}")
-            return Response(
-                {'error': str(e)},
-                status=status.HTTP_400_BAD_REQUEST
-            )
     
     @action(detail=True, methods=['get'], url_path='export/(?P<export_format>csv|excel|pdf)')
     def export(self, request, pk=None, export_format='csv'):
@@ -1032,31 +890,41 @@ class WishlistViewSet(viewsets.ModelViewSet):
         
         if build_id:
             try:
-                configuration = PCConfiguration.objects.get(id=build_id, user=request.user)
+                configuration = PCConfiguration.objects.select_related(*CONFIGURATION_SLOTS).get(
+                    id=build_id, user=request.user
+                )
             except PCConfiguration.DoesNotExist:
                 return Response({'error': 'Сборка не найдена'}, status=status.HTTP_404_NOT_FOUND)
         else:
-            configuration = PCConfiguration.objects.create(
+            configuration = PCConfiguration(
                 user=request.user,
                 name='Сборка из избранного',
                 is_saved=True
             )
         
+
+        field_map = {
+            'cpu': 'cpu', 'gpu': 'gpu', 'motherboard': 'motherboard',
+            'ram': 'ram', 'storage': 'storage_primary',
+            'psu': 'psu', 'case': 'case', 'cooling': 'cooling'
+        }
+        items = [
+            item for item in Wishlist.objects.filter(id__in=wishlist_ids, user=request.user)
+            if item.component_type in field_map
+        ]
+        components = resolve_components(
+            {field_map[item.component_type]: item.component_id for item in items}, strict=False
+        )
         
         added = []
-        for item in Wishlist.objects.filter(id__in=wishlist_ids, user=request.user):
-            component = item.get_component()
-            if component:
-                field_map = {
-                    'cpu': 'cpu', 'gpu': 'gpu', 'motherboard': 'motherboard',
-                    'ram': 'ram', 'storage': 'storage_primary',
-                    'psu': 'psu', 'case': 'case', 'cooling': 'cooling'
-                }
-                field = field_map.get(item.component_type)
-                if field:
-                    setattr(configuration, field, component)
-                    added.append(item.component_type)
-        
+        for item in items:
+            field = field_map[item.component_type]
+            component = components.get(field)
+            if component and component.id == item.component_id:
+                setattr(configuration, field, component)
+                added.append(item.component_type)
+        
+        apply_compatibility(configuration)
         configuration.calculate_total_price()
         configuration.save()
         
@@ -1093,6 +961,7 @@ class WishlistViewSet(viewsets.ModelViewSet):
             'configuration_id': config.id,
             'configuration_name': config.name,
             'components': links,
+            'offers': get_store_offers_for_configuration(config),
             'stores': ['dns', 'citilink', 'regard', 'mvideo'],
         })
     
@@ -1116,7 +985,6 @@ class WishlistViewSet(viewsets.ModelViewSet):
         days = int(request.query_params.get('days', 30))
         component_filter = request.query_params.get('component')
         
-        result = {}
         components = {
             'cpu': config.cpu,
             'gpu': config.gpu,
@@ -1128,13 +996,26 @@ class WishlistViewSet(viewsets.ModelViewSet):
             'cooling': config.cooling,
         }
         
+        components = {
+            comp_type: comp
+            for comp_type, comp in components.items()
+            if comp and (not component_filter or component_filter == comp_type)
+        }
+        offers = get_store_search().search_many(comp.name for comp in components.values())
+        
+        result = {}
         for comp_type, comp in components.items():
-            if comp and (not component_filter or component_filter == comp_type):
-                result[comp_type] = {
-                    'name': comp.name,
-                    'current_price': float(comp.price) if comp.price else 0,
-                    'history': get_price_history_data(comp.name, days),
-                }
+            result[comp_type] = {
+                'name': comp.name,
+                'current_price': float(comp.price) if comp.price else 0,
+                'history': get_price_history_data(
+                    'storage' if comp_type == 'storage_primary' else comp_type, comp.id, days
+                ),
+                'store_offers': {
+                    store: [product.to_dict() for product in products]
+                    for store, products in offers[comp.name].items()
+                },
+            }
         
         return Response({
             'configuration_id': config.id,
@@ -1167,11 +1048,11 @@ class WishlistViewSet(viewsets.ModelViewSet):
         }
         
         if config.cpu:
-            result['cpu_benchmarks'] = get_benchmarks_for_cpu(config.cpu.name)
+            result['cpu_benchmarks'] = get_benchmarks_for_cpu(config.cpu)
             result['cpu_name'] = config.cpu.name
         
         if config.gpu:
-            result['gpu_benchmarks'] = get_benchmarks_for_gpu(config.gpu.name)
+            result['gpu_benchmarks'] = get_benchmarks_for_gpu(config.gpu)
             result['gpu_name'] = config.gpu.name
         
         return Response(result)
@@ -1203,15 +1084,14 @@ class WishlistViewSet(viewsets.ModelViewSet):
         resolution = request.query_params.get('resolution', '1080p')
         ray_tracing = request.query_params.get('ray_tracing', 'false').lower() == 'true'
         
-        fps_service = FPSPredictionService()
-        
         if game:
             
             prediction = predict_game_fps(
-                config.gpu.name,
-                config.cpu.name,
+                config.gpu,
+                config.cpu,
                 game,
-                resolution
+                resolution,
+                ray_tracing
             )
             
             if not prediction:
@@ -1227,18 +1107,14 @@ class WishlistViewSet(viewsets.ModelViewSet):
             })
         else:
             
-            predictions = fps_service.predict_all_games(
-                config.gpu.name,
-                config.cpu.name,
-                resolution
-            )
+            predictions = predict_fps_table(config.gpu, config.cpu, ray_tracing=None).get(resolution, [])
             
             return Response({
                 'cpu': config.cpu.name,
                 'gpu': config.gpu.name,
                 'resolution': resolution,
-                'predictions': [p.to_dict() for p in predictions],
-                'available_games': fps_service.get_game_list(),
+                'predictions': predictions,
+                'available_games': get_available_games(),
             })
     
     @action(detail=True, methods=['get'], url_path='performance-analysis')
@@ -1277,26 +1153,14 @@ class WishlistViewSet(viewsets.ModelViewSet):
         })
 
 
-class WorkspaceSetupViewSet(viewsets.ModelViewSet):
-    
+class WorkspaceSetupViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
+
     queryset = WorkspaceSetup.objects.all()
     serializer_class = WorkspaceSetupSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        base_queryset = WorkspaceSetup.objects.select_related(
-            'user',
-            'configuration',
-            'monitor_primary',
-            'monitor_secondary',
-            'keyboard',
-            'mouse',
-            'headset',
-            'webcam',
-            'microphone',
-            'desk',
-            'chair'
-        )
+        base_queryset = plan_queryset(WorkspaceSetup.objects.all(), self.get_planning_serializer())
         
         if self.request.user.is_staff:
             return base_queryset
@@ -1426,8 +1290,10 @@ class PriceParserViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        refresh = request.query_params.get('refresh', 'false').lower() == 'true'
+        
         service = PriceParserService()
-        prices = service.get_component_prices(component_type, int(component_id))
+        prices = service.get_component_prices(component_type, int(component_id), refresh=refresh)
         
         return Response(prices)
     
@@ -1473,27 +1339,159 @@ class PriceParserViewSet(viewsets.ViewSet):
             )
         
         config_id = request.query_params.get('configuration_id')
-        if not config_id:
+        workspace_id = request.query_params.get('workspace_id')
+        if not config_id and not workspace_id:
             return Response(
-                {'error': 'Укажите configuration_id'},
+                {'error': 'Укажите configuration_id или workspace_id'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        configuration = workspace = None
         try:
-            configuration = PCConfiguration.objects.get(
-                id=config_id,
-                user=request.user
-            )
-        except PCConfiguration.DoesNotExist:
+            if workspace_id:
+                workspace = WorkspaceSetup.objects.select_related(
+                    'configuration', *[f'configuration__{slot}' for slot in CONFIGURATION_SLOTS], *WORKSPACE_SLOTS
+                ).get(id=workspace_id, user=request.user)
+                configuration = workspace.configuration
+            else:
+                configuration = PCConfiguration.objects.select_related(*CONFIGURATION_SLOTS).get(
+                    id=config_id,
+                    user=request.user
+                )
+        except (PCConfiguration.DoesNotExist, WorkspaceSetup.DoesNotExist):
             return Response(
                 {'error': 'Конфигурация не найдена'},
                 status=status.HTTP_404_NOT_FOUND
             )
         
+        refresh = request.query_params.get('refresh', 'true').lower() != 'false'
+        
         service = PriceParserService()
-        comparison = service.compare_prices(configuration)
+        comparison = service.compare_prices(configuration, workspace, refresh=refresh)
         
         return Response(comparison)
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+
+        if not PRICE_SERVICE_AVAILABLE:
+            return Response(
+                {'error': 'Сервис парсинга цен недоступен'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        component_type = request.query_params.get('component_type')
+        component_id = request.query_params.get('component_id')
+        
+        if not component_type or not component_id:
+            return Response(
+                {'error': 'Укажите component_type и component_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        days = min(int(request.query_params.get('days', 30)), 730)
+        shop = request.query_params.get('shop')
+        
+        return Response({
+            'component_type': component_type,
+            'component_id': int(component_id),
+            'days': days,
+            **get_price_series(component_type, int(component_id), days, shop),
+        })
+    
+    @action(detail=False, methods=['get'], url_path='history-stats')
+    def history_stats(self, request):
+
+        if not PRICE_SERVICE_AVAILABLE:
+            return Response(
+                {'error': 'Сервис парсинга цен недоступен'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        component_type = request.query_params.get('component_type')
+        component_id = request.query_params.get('component_id')
+        
+        if not component_type or not component_id:
+            return Response(
+                {'error': 'Укажите component_type и component_id'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        periods = {}
+        for days in (7, 30, 90, 365):
+            periods[f'{days}d'] = get_price_stats(component_type, int(component_id), days)
+        
+        return Response({
+            'component_type': component_type,
+            'component_id': int(component_id),
+            'periods': periods,
+        })
+    
+    @action(detail=False, methods=['get'], url_path='ingestion-stats')
+    def ingestion_stats(self, request):
+
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not PRICE_SERVICE_AVAILABLE:
+            return Response(
+                {'error': 'Сервис парсинга цен недоступен'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        return Response(get_ingestion_metrics() or {'shops': {}})
+    
+    @action(detail=False, methods=['get'], url_path='update-runs')
+    def update_runs(self, request):
+
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not PRICE_SERVICE_AVAILABLE:
+            return Response(
+                {'error': 'Сервис парсинга цен недоступен'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        runs = PriceUpdateRun.objects.all()
+        run_id = request.query_params.get('run_id')
+        if run_id:
+            runs = runs.filter(id=run_id)
+        
+        return Response({'runs': [run_progress(run) for run in runs[:10]]})
+    
+    @action(detail=False, methods=['post'], url_path='update-runs/resume')
+    def resume_update_run(self, request):
+
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not PRICE_SERVICE_AVAILABLE:
+            return Response(
+                {'error': 'Сервис парсинга цен недоступен'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        run_id = request.data.get('run_id')
+        if not run_id or not PriceUpdateRun.objects.filter(id=run_id).exists():
+            return Response(
+                {'error': 'Запуск обновления цен не найден'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        from .tasks import resume_price_update
+        
+        task = resume_price_update.delay(int(run_id))
+        return Response({'run_id': int(run_id), 'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
 
 
 
@@ -1511,7 +1509,7 @@ class PersonalizationViewSet(viewsets.ViewSet):
             )
         
         service = PersonalizationService(request.user)
-        preferences = service.analyze_user_preferences()
+        preferences = service.get_user_preferences()
         
         return Response(preferences)
     
@@ -1531,19 +1529,28 @@ class PersonalizationViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        budget = request.query_params.get('budget')
         try:
-            configuration = PCConfiguration.objects.get(
-                id=config_id,
-                user=request.user
+            config_id = int(config_id)
+            budget = Decimal(budget) if budget else None
+        except (ValueError, InvalidOperation):
+            return Response(
+                {'error': 'Некорректные параметры'},
+                status=status.HTTP_400_BAD_REQUEST
             )
-        except PCConfiguration.DoesNotExist:
+        if budget is not None and (not budget.is_finite() or budget <= 0):
             return Response(
-                {'error': 'Конфигурация не найдена'},
-                status=status.HTTP_404_NOT_FOUND
+                {'error': 'Бюджет должен быть положительным'},
+                status=status.HTTP_400_BAD_REQUEST
             )
         
         service = PersonalizationService(request.user)
-        upgrades = service.suggest_upgrades(configuration)
+        upgrades = service.get_upgrade_recommendations(config_id, budget=budget)
+        if 'error' in upgrades:
+            return Response(
+                {'error': 'Конфигурация не найдена'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
         return Response(upgrades)
     
@@ -1556,8 +1563,24 @@ class PersonalizationViewSet(viewsets.ViewSet):
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         
+        params = request.query_params
+        try:
+            config_id = int(params['configuration_id']) if params.get('configuration_id') else None
+            budget = float(params['budget']) if params.get('budget') else None
+            limit = min(int(params.get('limit', 10)), 50)
+        except ValueError:
+            return Response(
+                {'error': 'Некорректные параметры поиска'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         service = PersonalizationService(request.user)
-        similar = service.find_similar_users_builds()
+        similar = service.get_similar_builds(
+            config_id=config_id,
+            budget=budget,
+            user_type=params.get('user_type'),
+            limit=limit
+        )
         
         return Response({'similar_builds': similar})
     
@@ -1604,32 +1627,81 @@ class AIAnalyticsViewSet(viewsets.ViewSet):
         
         days = int(request.query_params.get('days', 7))
         
-        success_rate = AILog.get_success_rate(days=days)
-        common_errors = AILog.get_common_errors(days=days)
+        from .ai_analytics import common_errors, status_breakdown, window_start
+        
+        since = window_start(days)
+        breakdown = status_breakdown(since)
         
+        return Response({
+            'period_days': days,
+            'success_rate': 100.0 if breakdown['success_rate'] is None else breakdown['success_rate'],
+            'total_requests': breakdown['total_requests'],
+            'by_status': breakdown['by_status'],
+            'common_errors': common_errors(since),
+            'avg_response_time_ms': breakdown['avg_response_time_ms']
+        })
+    
+    @action(detail=False, methods=['get'])
+    def latency(self, request):
 
-        from datetime import timedelta
-        from django.utils import timezone
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        since = timezone.now() - timedelta(days=days)
-        logs = AILog.objects.filter(created_at__gte=since)
+        days = int(request.query_params.get('days', 7))
+        
+        from .ai_analytics import latency_summary, window_start
+        
+        return Response({'period_days': days, **latency_summary(window_start(days))})
+    
+    @action(detail=False, methods=['get'])
+    def metrics(self, request):
+
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        from .ai_analytics import prometheus_text
+        
+        return HttpResponse(prometheus_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    @action(detail=False, methods=['get'], url_path='benchmark-cache')
+    def benchmark_cache(self, request):
+
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        if not BENCHMARK_SERVICE_AVAILABLE:
+            return Response(
+                {'error': 'Сервис бенчмарков недоступен'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
         
         return Response({
-            'period_days': days,
-            'success_rate': success_rate,
-            'total_requests': logs.count(),
-            'by_status': {
-                'success': logs.filter(status='success').count(),
-                'validation_failed': logs.filter(status='validation_failed').count(),
-                'fallback_used': logs.filter(status='fallback_used').count(),
-                'error': logs.filter(status='error').count(),
-            },
-            'common_errors': common_errors,
-            'avg_response_time_ms': logs.aggregate(
-                avg=db_models.Avg('response_time_ms')
-            )['avg']
+            'benchmark_version': get_benchmark_dataset().version,
+            'cache': performance_cache.stats(),
         })
     
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+
+        if not request.user.is_staff:
+            return Response(
+                {'error': 'Доступ запрещён'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        from config.cache_backends import cache_stats
+        
+        return Response({'pid': os.getpid(), 'caches': cache_stats()})
+    
     @action(detail=False, methods=['get'])
     def recent_logs(self, request):
   
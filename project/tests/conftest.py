@@ -12,6 +12,17 @@ from django.test import Client
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
 
+@pytest.fixture(autouse=True)
+def clear_local_caches():
+    
+    # The in-process cache tier outlives test transactions
+    from config.cache_backends import clear_local_caches
+    from recommendations.build_index import build_index
+    clear_local_caches()
+    build_index.reset()
+    yield
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
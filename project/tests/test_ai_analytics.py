@@ -0,0 +1,60 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from recommendations.ai_analytics import AIErrorCount, AILogRollup, status_breakdown, window_start
+from recommendations.models import AILog
+
+
+class TestAIAnalytics(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+        logs = [
+            ('success', [], 1000),
+            ('success', [], 3000),
+            ('success', [], None),
+            ('validation_failed', ['CPU не найден', 'Бюджет превышен'], 5000),
+            ('fallback_used', ['CPU не найден'], 8000),
+            ('error', [], None),
+        ]
+        for status, errors, elapsed in logs:
+            AILog.log_response(
+                self.staff, 'prompt', '', {}, status=status, validation_errors=errors, response_time_ms=elapsed,
+            )
+    
+    def test_rollups_follow_writes(self):
+
+        with self.assertNumQueries(1):
+            breakdown = status_breakdown(window_start(7))
+        
+        self.assertEqual(breakdown['total_requests'], 6)
+        self.assertEqual(breakdown['by_status'], {'success': 3, 'validation_failed': 1, 'fallback_used': 1, 'error': 1})
+        self.assertEqual(breakdown['success_rate'], 50.0)
+        self.assertEqual(breakdown['avg_response_time_ms'], 4250)
+        self.assertEqual(AILog.get_common_errors(), [('CPU не найден', 2), ('Бюджет превышен', 1)])
+        self.assertEqual(AILog.get_success_rate(), 50.0)
+        
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/recommendations/ai-analytics/stats/', {'days': 7})
+        self.assertEqual(response.data['by_status']['fallback_used'], 1)
+        self.assertEqual(response.data['common_errors'][0], ('CPU не найден', 2))
+    
+    def test_rebuild_matches_incremental(self):
+
+        expected = status_breakdown(window_start(7))
+        AILog.objects.filter(status='error').update(created_at=timezone.now() - timedelta(days=3))
+        AILogRollup.objects.all().delete()
+        AIErrorCount.objects.all().delete()
+        
+        call_command('rebuild_ai_analytics', stdout=StringIO())
+        
+        self.assertEqual(AILogRollup.objects.count(), 4)
+        self.assertEqual(status_breakdown(window_start(1))['by_status']['error'], 0)
+        self.assertEqual(status_breakdown(window_start(7)), expected)
+        self.assertEqual(AILog.get_common_errors(), [('CPU не найден', 2), ('Бюджет превышен', 1)])
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from recommendations import ai_timing
+from recommendations.ai_analytics import (
+    AIStageRollup, AITokenRollup, LATENCY_BUCKETS_MS, histogram_percentile, latency_summary, prometheus_text,
+    record_trace, window_start,
+)
+from recommendations.ai_timing import generation_trace, record_ollama, stage
+from recommendations.models import AILog
+
+
+class TestAITiming(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username='staff', password='testpass123', is_staff=True)
+    
+    def test_trace_accumulates_stages_and_tokens(self):
+
+        clock = iter([0.0, 1.0, 1.5, 2.0, 2.25, 10.0, 10.0])
+        with mock.patch.object(ai_timing.time, 'perf_counter', lambda: next(clock)):
+            with generation_trace() as trace:
+                with stage('validation'):
+                    pass
+                with stage('validation'):
+                    pass
+                with generation_trace() as inner:
+                    record_ollama({'eval_count': 200, 'eval_duration': 4_000_000_000, 'prompt_eval_count': 50})
+        
+        self.assertIs(inner, trace)
+        self.assertEqual(trace.timings(), {'validation': 750, 'total': 10000})
+        self.assertEqual(trace.tokens_per_second, 50.0)
+        self.assertIsNone(ai_timing.current_trace())
+        
+        self.assertEqual(AIStageRollup.objects.count(), 2)
+        tokens = AITokenRollup.objects.get()
+        self.assertEqual((tokens.generations, tokens.eval_tokens, tokens.eval_ms, tokens.prompt_tokens), (1, 200, 4000, 50))
+        
+        log = AILog.log_response(self.staff, 'prompt', '', {}, response_time_ms=10000, trace=trace)
+        log.refresh_from_db()
+        self.assertEqual(log.stage_timings, {'validation': 750, 'total': 10000})
+        self.assertEqual((log.tokens_used, log.tokens_per_second), (200, 50.0))
+    
+    def test_stage_without_trace_is_a_no_op(self):
+
+        with stage('ollama'):
+            record_ollama({'eval_count': 10, 'eval_duration': 1})
+        self.assertFalse(AIStageRollup.objects.exists())
+    
+    def test_histogram_percentile(self):
+
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.assertIsNone(histogram_percentile(counts, 0.5))
+        
+        # 10 samples in (1000, 2500], 10 in (2500, 5000]
+        counts[LATENCY_BUCKETS_MS.index(2500)] = 10
+        counts[LATENCY_BUCKETS_MS.index(5000)] = 10
+        self.assertEqual(histogram_percentile(counts, 0.5), 2500)
+        self.assertEqual(histogram_percentile(counts, 0.25), 1750)
+        self.assertEqual(histogram_percentile(counts, 0.95), 4750)
+        
+        counts[-1] = 20
+        self.assertEqual(histogram_percentile(counts, 0.99), LATENCY_BUCKETS_MS[-1])
+    
+    def test_latency_summary_and_metrics(self):
+
+        for elapsed in [0.2] * 19 + [40.0]:
+            trace = ai_timing.GenerationTrace()
+            trace.stages['ollama'] = elapsed * 1000
+            trace.eval_count, trace.eval_duration_ms = 100, 2000.0
+            record_trace(trace)
+        
+        summary = latency_summary(window_start(1))
+        ollama = summary['stages']['ollama']
+        self.assertEqual(ollama['count'], 20)
+        self.assertEqual(ollama['avg_ms'], 2190.0)
+        self.assertTrue(100 < ollama['p50_ms'] <= 250)
+        self.assertTrue(30000 < ollama['p99_ms'] <= 60000)
+        self.assertEqual(summary['tokens']['tokens_per_second'], 50.0)
+        
+        text = prometheus_text()
+        self.assertIn('ai_generation_stage_seconds_bucket{stage="ollama",le="0.25"} 19', text)
+        self.assertIn('ai_generation_stage_seconds_bucket{stage="ollama",le="+Inf"} 20', text)
+        self.assertIn('ai_ollama_eval_tokens_total 2000', text)
+        
+        client = APIClient()
+        client.force_authenticate(self.staff)
+        response = client.get('/api/recommendations/ai-analytics/latency/', {'days': 1})
+        self.assertEqual(response.data['stages']['ollama']['count'], 20)
+        response = client.get('/api/recommendations/ai-analytics/metrics/')
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
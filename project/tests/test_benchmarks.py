@@ -0,0 +1,229 @@
+import json
+import os
+import tempfile
+
+import pytest
+from django.test import TestCase
+from accounts.models import User
+from computers.caching import catalog_version
+from computers.models import CPU, GPU
+from computers.serializers import GPUSerializer
+from recommendations.models import PCConfiguration
+from recommendations.benchmark_links import link_components
+from recommendations.benchmark_service import (
+    BenchmarkService, FPSPredictionService, analyze_configuration_performance, performance_cache,
+    predict_fps_table, predict_game_fps,
+)
+from recommendations.tasks import warm_performance_cache
+from recommendations.benchmark_data import (
+    BenchmarkIndex, BenchmarkDataset, BenchmarkDataError, BenchmarkDatasetRegistry, GameCoefficientMatrix,
+    get_benchmark_dataset,
+)
+
+
+class TestFPSPredictionGrid(TestCase):
+    def setUp(self):
+        self.service = FPSPredictionService()
+    
+    def test_grid_matches_single_predictions(self):
+
+        modes = (None, 'DLSS Quality', 'FSR Performance')
+        for gpu in ['NVIDIA GeForce RTX 4070', 'AMD Radeon RX 7800 XT']:
+            for cpu in ['AMD Ryzen 7 7800X3D', 'Unknown CPU']:
+                grid = self.service.predict_fps_grid(gpu, cpu, upscaling=modes)
+                self.assertIsNotNone(grid)
+                
+                for game in self.service.get_game_list():
+                    for resolution in ['1080p', '1440p', '4k']:
+                        for rt in (False, True):
+                            for mode in modes:
+                                expected = self.service.predict_fps(gpu, cpu, game, resolution, rt, mode)
+                                actual = grid.get(game, resolution, rt, mode)
+                                self.assertEqual(expected.to_dict(), actual.to_dict())
+    
+    def test_unknown_gpu_returns_none(self):
+
+        self.assertIsNone(self.service.predict_fps_grid('Unknown GPU', 'AMD Ryzen 7 7800X3D'))
+        self.assertEqual(self.service.predict_all_games('Unknown GPU', 'AMD Ryzen 7 7800X3D'), [])
+    
+    def test_games_without_rt_penalty_have_no_rt(self):
+
+        matrix = GameCoefficientMatrix.from_games({'Dota 2': {'1080p': 200}, 'Cyberpunk 2077': {'1080p': 80, 'rt_penalty': 0.45}})
+        self.assertEqual(list(matrix.rt_penalty), [1.0, 0.45])
+
+
+class TestBenchmarkIndex(TestCase):
+    def setUp(self):
+        dataset = get_benchmark_dataset()
+        self.index = BenchmarkIndex(dataset.cpu, dataset.gpu)
+    
+    def test_model_key_lookup(self):
+
+        self.assertEqual(self.index.find_match('gpu', 'MSI GeForce RTX 4070 Ti SUPER VENTUS'), 'NVIDIA GeForce RTX 4070 Ti Super')
+        self.assertEqual(self.index.find_match('gpu', 'Sapphire Radeon RX 7900 XT Pulse'), 'AMD Radeon RX 7900 XT')
+        self.assertEqual(self.index.find_match('cpu', 'Ryzen 9 7950X3D'), 'AMD Ryzen 9 7950X3D')
+        self.assertEqual(self.index.find_match('cpu', 'Intel Core i9-14900KF'), 'Intel Core i9-14900K')
+        self.assertIsNone(self.index.find_match('gpu', 'GeForce GT 710'))
+    
+    def test_percentile_matches_linear_scan(self):
+
+        for category, (kind, field) in BenchmarkIndex.PERCENTILE_FIELDS.items():
+            scores = [v[field] for v in self.index.databases[kind].values()]
+            for score in scores + [0, 10 ** 6]:
+                expected = round(sum(1 for s in scores if s < score) / len(scores) * 100, 1)
+                self.assertEqual(self.index.percentile(score, category), expected)
+
+
+class TestBenchmarkDatasetRegistry(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'benchmarks.json')
+        self.data = get_benchmark_dataset().to_dict()
+        BenchmarkDataset.from_dict(self.data).save(self.path)
+        self.registry = BenchmarkDatasetRegistry(self.path, check_interval=0)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def _write(self, data, mtime):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.utime(self.path, (mtime, mtime))
+    
+    def test_reloads_new_version(self):
+
+        self.assertEqual(self.registry.get().version, self.data['version'])
+        self._write({**self.data, 'version': 'next'}, mtime=os.path.getmtime(self.path) + 10)
+        self.assertEqual(self.registry.get().version, 'next')
+    
+    def test_keeps_previous_version_on_invalid_file(self):
+
+        old = self.registry.get()
+        self._write({'version': 'broken', 'cpu': {}}, mtime=os.path.getmtime(self.path) + 10)
+        self.assertIs(self.registry.get(), old)
+        
+        with self.assertRaises(BenchmarkDataError):
+            BenchmarkDataset.from_dict({'version': 'broken', 'cpu': {}})
+
+
+class TestBenchmarkLinks(TestCase):
+    def setUp(self):
+        self.version = get_benchmark_dataset().version
+        self.cpu = CPU.objects.create(
+            name='Intel Core i9-14900KF', manufacturer='Intel', socket='LGA1700',
+            cores=24, threads=32, base_clock=3.2, tdp=125, price=55000,
+        )
+        self.gpu = GPU.objects.create(
+            name='Palit GeForce GT 710', manufacturer='NVIDIA', chipset='GT 710',
+            memory=2, memory_type='DDR3', core_clock=954, tdp=19, recommended_psu=300, price=4000,
+        )
+    
+    def test_link_on_save(self):
+
+        self.assertEqual(self.cpu.benchmark_key, 'Intel Core i9-14900K')
+        self.assertEqual(self.cpu.benchmark_confidence, 0.6)
+        self.assertEqual(self.cpu.benchmark_version, self.version)
+        self.assertEqual(self.gpu.benchmark_key, '')
+        self.assertEqual(self.gpu.benchmark_confidence, 0.0)
+    
+    def test_relink_only_stale_rows(self):
+
+        CPU.objects.filter(pk=self.cpu.pk).update(benchmark_key='', benchmark_version='old')
+        
+        stats = link_components('cpu')
+        self.assertEqual((stats['checked'], stats['updated']), (1, 1))
+        self.assertEqual(CPU.objects.get(pk=self.cpu.pk).benchmark_key, 'Intel Core i9-14900K')
+        
+        stats = link_components('cpu')
+        self.assertEqual(stats['checked'], 0)
+    
+    def test_relink_bumps_catalog_version(self):
+
+        CPU.objects.filter(pk=self.cpu.pk).update(benchmark_version='old')
+        version = catalog_version(CPU)
+        
+        link_components('cpu')
+        self.assertGreater(catalog_version(CPU), version)
+    
+    def test_rename_with_update_fields_saves_link(self):
+
+        self.gpu.name = 'Palit GeForce RTX 4070'
+        self.gpu.save(update_fields=['name'])
+        
+        gpu = GPU.objects.get(pk=self.gpu.pk)
+        self.assertEqual((gpu.benchmark_key, gpu.benchmark_confidence), ('NVIDIA GeForce RTX 4070', 0.9))
+    
+    def test_link_fields_are_read_only(self):
+
+        serializer = GPUSerializer(self.gpu, data={'benchmark_key': 'NVIDIA GeForce RTX 5090'}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        self.assertEqual(GPU.objects.get(pk=self.gpu.pk).benchmark_key, '')
+    
+    def test_service_uses_stored_key(self):
+
+        CPU.objects.filter(pk=self.cpu.pk).update(benchmark_key='AMD Ryzen 7 7800X3D')
+        cpu = CPU.objects.get(pk=self.cpu.pk)
+        
+        benchmarks = BenchmarkService().get_cpu_benchmarks(cpu)
+        self.assertEqual(benchmarks['cinebench_single'].component_name, 'AMD Ryzen 7 7800X3D')
+        self.assertEqual(BenchmarkService().get_gpu_benchmarks(self.gpu), {})
+
+
+class TestPerformanceCache(TestCase):
+    def setUp(self):
+        performance_cache.backend.clear()
+        performance_cache.reset_stats()
+        
+        user = User.objects.create_user(username='perf', password='testpass123')
+        self.cpu = CPU.objects.create(
+            name='AMD Ryzen 7 7800X3D', manufacturer='AMD', socket='AM5',
+            cores=8, threads=16, base_clock=4.2, tdp=120, price=42000,
+        )
+        self.gpu = GPU.objects.create(
+            name='NVIDIA GeForce RTX 4070', manufacturer='NVIDIA', chipset='AD104',
+            memory=12, memory_type='GDDR6X', core_clock=1920, tdp=200, recommended_psu=650, price=60000,
+        )
+        self.configs = [
+            PCConfiguration.objects.create(user=user, name=f'Build {i}', cpu=self.cpu, gpu=self.gpu)
+            for i in range(2)
+        ]
+    
+    def test_configurations_share_pair_result(self):
+
+        first = analyze_configuration_performance(self.configs[0])
+        second = analyze_configuration_performance(self.configs[1])
+        
+        self.assertEqual(first, second)
+        self.assertEqual(first['benchmark_version'], get_benchmark_dataset().version)
+        self.assertEqual(performance_cache.stats()['analysis'], {'hits': 1, 'misses': 1, 'hit_rate': 50.0})
+    
+    def test_relinked_component_gets_new_entry(self):
+
+        analyze_configuration_performance(self.configs[0])
+        CPU.objects.filter(pk=self.cpu.pk).update(benchmark_key='Intel Core i5-12600K')
+        
+        config = PCConfiguration.objects.select_related('cpu', 'gpu').get(pk=self.configs[0].pk)
+        analysis = analyze_configuration_performance(config)
+        
+        self.assertEqual(analysis['cpu_benchmarks']['cinebench_single']['component_name'], 'Intel Core i5-12600K')
+        self.assertEqual(performance_cache.stats()['analysis']['misses'], 2)
+    
+    def test_warmup_precomputes_popular_pairs(self):
+
+        self.assertEqual(warm_performance_cache(), {'warmed': 1})
+        
+        analyze_configuration_performance(self.configs[0])
+        stats = performance_cache.stats()
+        self.assertEqual(stats['analysis'], {'hits': 1, 'misses': 0, 'hit_rate': 100.0})
+    
+    def test_game_predictions_come_from_cached_table(self):
+
+        service = FPSPredictionService()
+        expected = [p.to_dict() for p in service.predict_all_games(self.gpu, self.cpu, '1440p')]
+        self.assertEqual(predict_fps_table(self.gpu, self.cpu, ray_tracing=None)['1440p'], expected)
+        
+        prediction = predict_game_fps(self.gpu, self.cpu, 'cyberpunk', '1440p', ray_tracing=True)
+        self.assertEqual(prediction, service.predict_fps(self.gpu, self.cpu, 'cyberpunk', '1440p', True).to_dict())
+        self.assertIsNone(predict_game_fps(self.gpu, self.cpu, 'Unknown Game'))
+        self.assertEqual(performance_cache.stats()['fps'], {'hits': 2, 'misses': 1, 'hit_rate': 66.7})
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU, GPU
+from recommendations.build_comparison import rank_metric
+from recommendations.models import PCConfiguration
+
+
+class TestBuildComparison(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='compare', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        
+        gpu = GPU.objects.create(
+            name='GeForce RTX 4070', manufacturer='NVIDIA', chipset='AD104', memory=12, memory_type='GDDR6X',
+            core_clock=1920, tdp=200, recommended_psu=650, price=60000, performance_score=70,
+        )
+        self.builds = []
+        for cores, price in ((6, 20000), (8, 30000)):
+            cpu = CPU.objects.create(
+                name=f'Ryzen {cores} 7600', manufacturer='AMD', socket='AM5', cores=cores, threads=cores * 2,
+                base_clock=3.8, tdp=65, price=price, performance_score=cores * 10,
+            )
+            build = PCConfiguration.objects.create(user=self.user, name=f'Build {cores}', cpu=cpu, gpu=gpu)
+            build.calculate_total_price()
+            build.save()
+            self.builds.append(build)
+        self.ids = ','.join(str(build.id) for build in self.builds)
+    
+    def test_rankings_and_deltas(self):
+
+        response = self.client.get('/api/recommendations/configurations/compare/', {'ids': self.ids})
+        self.assertEqual(response.status_code, 200)
+        
+        first, second = self.builds
+        price = response.data['metrics']['total_price']
+        self.assertEqual(price['ranking'], [first.id, second.id])
+        self.assertEqual(price['deltas'][second.id]['absolute'], 10000)
+        
+        cores = response.data['metrics']['cpu_cores']
+        self.assertEqual(cores['best'], [second.id])
+        self.assertEqual(response.data['summary']['cheapest'], 'Build 6')
+        self.assertEqual(response.data['criteria']['cpu_cores'], {'Build 6': 6, 'Build 8': 8})
+    
+    def test_cached_until_a_build_changes(self):
+
+        self.client.get('/api/recommendations/configurations/compare/', {'ids': self.ids})
+        
+        with CaptureQueriesContext(connection) as queries, \
+                mock.patch('recommendations.build_comparison.compare_builds') as compare_builds:
+            self.client.get('/api/recommendations/configurations/compare/', {'ids': self.ids})
+        compare_builds.assert_not_called()
+        build_queries = [query for query in queries if 'recommendations_pcconfiguration' in query['sql']]
+        self.assertEqual(len(build_queries), 1)
+        
+        self.builds[0].name = 'Renamed'
+        self.builds[0].save()
+        
+        response = self.client.get('/api/recommendations/configurations/compare/', {'ids': self.ids})
+        self.assertEqual(response.data['builds'][0]['name'], 'Renamed')
+    
+    def test_rank_ties_share_a_place(self):
+
+        ranked = rank_metric({1: 10, 2: 12, 3: 12, 4: None}, higher_is_better=True)
+        self.assertEqual(ranked['ranks'], {2: 1, 3: 1, 1: 3})
+        self.assertEqual(ranked['best'], [2, 3])
+        self.assertEqual(ranked['deltas'][1]['percent'], -16.7)
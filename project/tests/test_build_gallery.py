@@ -0,0 +1,67 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU, GPU
+from recommendations.models import PCConfiguration
+
+
+class TestBuildGallery(TestCase):
+    def setUp(self):
+        gamer = User.objects.create_user(username='gamer', password='testpass123', user_type='gamer')
+        designer = User.objects.create_user(username='designer', password='testpass123', user_type='designer')
+        ryzen = CPU.objects.create(
+            name='Ryzen 7 7800X3D', manufacturer='AMD', socket='AM5', cores=8, threads=16, base_clock=4.2, tdp=120, price=40000,
+        )
+        core = CPU.objects.create(
+            name='Core i5-14600K', manufacturer='Intel', socket='LGA1700', cores=14, threads=20, base_clock=3.5, tdp=125, price=30000,
+        )
+        rtx = GPU.objects.create(
+            name='GeForce RTX 4070', manufacturer='NVIDIA', chipset='AD104', memory=12, memory_type='GDDR6X',
+            core_clock=1920, tdp=200, recommended_psu=650, price=60000,
+        )
+        builds = [
+            (gamer, ryzen, rtx, 150000, True),
+            (gamer, core, rtx, 90000, True),
+            (designer, ryzen, None, 55000, True),
+            (designer, core, None, 70000, False),
+        ]
+        for i, (user, cpu, gpu, price, public) in enumerate(builds):
+            PCConfiguration.objects.create(
+                user=user, name=f'Build {i}', cpu=cpu, gpu=gpu, total_price=price, is_public=public, is_saved=True,
+            )
+        self.client = APIClient()
+        self.gamer = gamer
+    
+    def gallery(self, **params):
+
+        response = self.client.get('/api/recommendations/configurations/gallery/', params)
+        self.assertEqual(response.status_code, 200)
+        return [row['name'] for row in response.data['results']]
+    
+    def test_filters(self):
+
+        self.assertEqual(self.gallery(ordering='total_price'), ['Build 2', 'Build 1', 'Build 0'])
+        self.assertEqual(self.gallery(price_band='mid'), ['Build 1'])
+        self.assertEqual(self.gallery(user_type='designer'), ['Build 2'])
+        self.assertEqual(self.gallery(cpu_family='ryzen 7', ordering='-total_price'), ['Build 0', 'Build 2'])
+        self.assertEqual(self.gallery(gpu_family='RTX 40', max_price=100000), ['Build 1'])
+        
+        response = self.client.get('/api/recommendations/configurations/gallery/', {'price_band': 'cheap'})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_my_builds_cursor_pages(self):
+
+        self.client.force_authenticate(self.gamer)
+        for i in range(3):
+            PCConfiguration.objects.create(user=self.gamer, name=f'Extra {i}', is_saved=True)
+        
+        seen = []
+        response = self.client.get('/api/recommendations/configurations/my_builds/', {'page_size': 2})
+        while True:
+            seen.extend(row['name'] for row in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        
+        self.assertEqual(seen, ['Extra 2', 'Extra 1', 'Extra 0', 'Build 1', 'Build 0'])
@@ -0,0 +1,82 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU, GPU, RAM
+from recommendations.build_index import BuildEmbeddingIndex, build_index, encode_budget
+from recommendations.models import PCConfiguration
+
+
+class TestBuildIndex(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='owner', password='testpass123')
+        self.viewer = User.objects.create_user(username='viewer', password='testpass123')
+        am5 = CPU.objects.create(
+            name='Ryzen 7 7800X3D', manufacturer='AMD', socket='AM5', cores=8, threads=16, base_clock=4.2, tdp=120,
+            price=40000, performance_score=9000,
+        )
+        lga = CPU.objects.create(
+            name='Core i3-12100F', manufacturer='Intel', socket='LGA1700', cores=4, threads=8, base_clock=3.3, tdp=58,
+            price=8000, performance_score=3000,
+        )
+        fast = GPU.objects.create(
+            name='GeForce RTX 4080', manufacturer='NVIDIA', chipset='AD103', memory=16, memory_type='GDDR6X',
+            core_clock=2200, tdp=320, recommended_psu=750, price=110000, performance_score=15000,
+        )
+        slow = GPU.objects.create(
+            name='GeForce RTX 3050', manufacturer='NVIDIA', chipset='GA107', memory=8, memory_type='GDDR6',
+            core_clock=1550, tdp=130, recommended_psu=550, price=25000, performance_score=3500,
+        )
+        ram = RAM.objects.create(
+            name='Fury Beast', manufacturer='Kingston', memory_type='DDR5', capacity=32, speed=6000, modules=2, price=10000,
+        )
+        
+        def build(name, cpu, gpu, price, user=None, public=True):
+            return PCConfiguration.objects.create(
+                user=user or self.owner, name=name, cpu=cpu, gpu=gpu, ram=ram, total_price=price, is_public=public,
+            )
+        
+        self.reference = build('Reference', am5, fast, 200000, user=self.viewer, public=False)
+        self.twin = build('Twin', am5, fast, 210000)
+        self.cheap = build('Cheap', lga, slow, 60000)
+        self.mixed = build('Mixed', lga, fast, 190000)
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+    
+    def similar(self, **params):
+
+        response = self.client.get('/api/recommendations/personalization/similar_builds/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['similar_builds']
+    
+    def test_ranks_by_components(self):
+
+        rows = self.similar(configuration_id=self.reference.id)
+        self.assertEqual([row['name'] for row in rows], ['Twin', 'Mixed', 'Cheap'])
+        self.assertGreater(rows[0]['similarity'], rows[1]['similarity'])
+        
+        self.assertEqual(self.similar(budget=65000, limit=1)[0]['name'], 'Cheap')
+        self.assertEqual(self.client.get(
+            '/api/recommendations/personalization/similar_builds/', {'budget': 'много'}
+        ).status_code, 400)
+    
+    def test_incremental_refresh(self):
+
+        self.assertEqual(len(self.similar(configuration_id=self.reference.id)), 3)
+        self.assertEqual(len(build_index), 3)
+        
+        self.twin.is_public = False
+        self.twin.save()
+        self.cheap.delete()
+        self.reference.is_public = True
+        self.reference.save()
+        
+        self.assertEqual([row['name'] for row in self.similar(budget=200000)], ['Mixed'])
+        self.assertEqual(len(build_index), 2)
+        
+        # Another process changed the table: only the periodic sync sees it
+        PCConfiguration.objects.filter(id=self.mixed.id).delete()
+        index = BuildEmbeddingIndex(sync_interval=0)
+        index.load()
+        PCConfiguration.objects.filter(id=self.twin.id).update(is_public=True)
+        self.assertEqual([pk for pk, _ in index.nearest(encode_budget(200000))], [self.reference.id, self.twin.id])
@@ -0,0 +1,64 @@
+from django.test import SimpleTestCase
+
+from config.cache_backends import TieredCache, clear_local_caches
+
+
+def make_cache(name, **options):
+    return TieredCache(name, {
+        'TIMEOUT': 60,
+        'OPTIONS': {
+            'SHARED': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': f'shared-{name}'},
+            **options,
+        },
+    })
+
+
+class TestTieredCache(SimpleTestCase):
+    def setUp(self):
+        clear_local_caches()
+    
+    def test_local_tier_fronts_shared(self):
+
+        cache = make_cache('tiers')
+        cache.set('build', {'cpu': 'Ryzen 5 7600'})
+        
+        self.assertEqual(cache.get('build'), {'cpu': 'Ryzen 5 7600'})
+        self.assertEqual(cache.stats()['local_hits'], 1)
+        
+        clear_local_caches()
+        self.assertEqual(cache.get('build'), {'cpu': 'Ryzen 5 7600'})
+        self.assertEqual(cache.get('missing', 'default'), 'default')
+        
+        stats = cache.stats()
+        self.assertEqual((stats['shared_hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_ratio'], round(2 / 3, 4))
+    
+    def test_delete_invalidates_both_tiers(self):
+
+        cache = make_cache('delete')
+        cache.set_many({'a': 1, 'b': [2]})
+        cache.delete('b')
+        
+        self.assertEqual(cache.get_many(['a', 'b']), {'a': 1})
+        self.assertIsNone(cache.shared.get(cache.make_key('b')))
+    
+    def test_json_serializer_and_compression(self):
+
+        cache = make_cache('compressed', SERIALIZER='json', COMPRESS_MIN_SIZE=100)
+        payload = {'answer': 'Видеокарта ' * 50}
+        cache.set('reply', payload)
+        
+        raw = cache.shared.get(cache.make_key('reply'))
+        self.assertEqual(raw[:2], b'jz')
+        self.assertLess(len(raw), len('Видеокарта ' * 50))
+        
+        clear_local_caches()
+        self.assertEqual(cache.get('reply'), payload)
+    
+    def test_counters_stay_in_shared_tier(self):
+
+        cache = make_cache('counters')
+        self.assertTrue(cache.add('hits', 0))
+        self.assertEqual(cache.incr('hits'), 1)
+        self.assertEqual(cache.incr('hits', 5), 6)
+        self.assertEqual(cache.get('hits'), 6)
@@ -0,0 +1,111 @@
+import gzip
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU
+from peripherals.models import Mousepad
+
+
+class TestCatalogCache(TestCase):
+    def setUp(self):
+        self.cpu = CPU.objects.create(
+            name='Ryzen 5 7600', manufacturer='AMD', socket='AM5', cores=6, threads=12,
+            base_clock=3.8, boost_clock=5.1, tdp=65, price=20000,
+        )
+        self.clients = []
+        for username in ('first', 'second'):
+            client = APIClient()
+            client.force_authenticate(User.objects.create_user(username=username, password='testpass123'))
+            self.clients.append(client)
+    
+    def test_shared_between_users_and_invalidated_on_save(self):
+
+        first = self.clients[0].get('/api/computers/cpu/', {'manufacturer': 'AMD'})
+        self.assertEqual(first.status_code, 200)
+        
+        with CaptureQueriesContext(connection) as queries:
+            second = self.clients[1].get('/api/computers/cpu/', {'manufacturer': 'AMD'})
+        self.assertFalse([query for query in queries if 'computers_cpu' in query['sql']])
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        
+        self.cpu.price = 19000
+        self.cpu.save()
+        
+        third = self.clients[1].get('/api/computers/cpu/', {'manufacturer': 'AMD'})
+        self.assertNotEqual(third['ETag'], first['ETag'])
+        self.assertEqual(third.json()[0]['price'], '19000.00')
+    
+    def test_conditional_requests(self):
+
+        first = self.clients[0].get(f'/api/computers/cpu/{self.cpu.id}/')
+        
+        not_modified = self.clients[1].get(f'/api/computers/cpu/{self.cpu.id}/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        
+        missing = self.clients[0].get('/api/computers/cpu/999999/')
+        self.assertEqual(missing.status_code, 404)
+    
+    def test_peripherals_are_cached(self):
+
+        Mousepad.objects.create(name='Pad', manufacturer='Logitech', size='xl', width=900, height=400, price=1500)
+        self.clients[0].get('/api/peripherals/mousepads/')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.clients[1].get('/api/peripherals/mousepads/')
+        self.assertFalse([query for query in queries if 'peripherals_mousepad' in query['sql']])
+        self.assertEqual(len(response.json()), 1)
+
+
+class TestCatalogExport(TestCase):
+    def setUp(self):
+        self.cpus = [
+            CPU.objects.create(
+                name=f'Ryzen {cores} 7600', manufacturer='AMD' if cores % 2 else 'Intel', socket='AM5',
+                cores=cores, threads=cores * 2, base_clock=3.8, tdp=65, price=10000 + cores * 1000,
+            )
+            for cores in range(4, 12)
+        ]
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username='export', password='testpass123'))
+    
+    def test_matches_serializer_output(self):
+
+        from computers.serializers import CPUSerializer
+        
+        response = self.client.get('/api/computers/cpu/')
+        self.assertEqual(response.json(), json.loads(json.dumps(CPUSerializer(CPU.objects.all(), many=True).data)))
+        
+        compressed = self.client.get('/api/computers/cpu/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), response.content)
+    
+    def test_filters_search_and_ordering_from_snapshot(self):
+
+        self.client.get('/api/computers/cpu/')
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/computers/cpu/', {'manufacturer': 'Intel', 'ordering': '-price'})
+        self.assertFalse([query for query in queries if 'computers_cpu' in query['sql']])
+        self.assertEqual([row['cores'] for row in response.json()], [10, 8, 6, 4])
+        
+        response = self.client.get('/api/computers/cpu/', {'search': 'ryzen 5'})
+        self.assertEqual([row['cores'] for row in response.json()], [5])
+    
+    def test_keyset_pagination(self):
+
+        seen = []
+        params = {'limit': 3, 'ordering': 'price'}
+        while True:
+            page = self.client.get('/api/computers/cpu/', params).json()
+            seen.extend(row['cores'] for row in page['results'])
+            if not page['next']:
+                break
+            params['cursor'] = page['next']
+        
+        self.assertEqual(seen, list(range(4, 12)))
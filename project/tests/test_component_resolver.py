@@ -0,0 +1,71 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU, GPU
+from recommendations.component_resolver import ComponentResolutionError, resolve_components
+from recommendations.models import PCConfiguration, Wishlist
+
+
+class TestComponentResolver(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='resolver', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cpus = [
+            CPU.objects.create(
+                name=f'Ryzen {cores} 7600', manufacturer='AMD', socket='AM5', cores=cores, threads=cores * 2,
+                base_clock=3.8, tdp=65, price=20000,
+            )
+            for cores in (6, 8)
+        ]
+        self.gpu = GPU.objects.create(
+            name='GeForce RTX 4070', manufacturer='NVIDIA', chipset='AD104', memory=12, memory_type='GDDR6X',
+            core_clock=1920, tdp=200, recommended_psu=650, price=60000,
+        )
+    
+    def test_one_query_per_model(self):
+
+        with self.assertNumQueries(2):
+            components = resolve_components({'cpu': self.cpus[0].id, 'gpu': self.gpu.id, 'ram': None})
+        self.assertEqual(components, {'cpu': self.cpus[0], 'gpu': self.gpu})
+        
+        with self.assertRaises(ComponentResolutionError) as error:
+            resolve_components({'cpu': self.cpus[0].id, 'gpu': 999999})
+        self.assertEqual(error.exception.missing, {'gpu': 999999})
+        
+        self.assertEqual(resolve_components({'cpu': self.cpus[0].id, 'gpu': 999999}, strict=False), {'cpu': self.cpus[0]})
+    
+    def test_save_build(self):
+
+        response = self.client.post(
+            '/api/recommendations/configurations/save_build/',
+            {'name': 'Сборка', 'cpu': self.cpus[0].id, 'gpu': self.gpu.id}, format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        configuration = PCConfiguration.objects.get(id=response.data['id'])
+        self.assertEqual(configuration.total_price, 80000)
+        self.assertTrue(configuration.compatibility_check)
+        
+        response = self.client.post(
+            '/api/recommendations/configurations/save_build/',
+            {'name': 'Сборка', 'cpu': self.cpus[0].id, 'keyboard': 999999}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['missing'], {'keyboard': 999999})
+        self.assertEqual(PCConfiguration.objects.count(), 1)
+    
+    def test_add_to_build(self):
+
+        items = [
+            Wishlist.objects.create(user=self.user, component_type='cpu', component_id=self.cpus[1].id, price_at_add=20000),
+            Wishlist.objects.create(user=self.user, component_type='gpu', component_id=self.gpu.id, price_at_add=60000),
+            Wishlist.objects.create(user=self.user, component_type='ram', component_id=999999, price_at_add=5000),
+        ]
+        
+        response = self.client.post(
+            '/api/recommendations/wishlist/add_to_build/', {'wishlist_ids': [item.id for item in items]}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(response.data['added_components']), ['cpu', 'gpu'])
+        self.assertEqual(response.data['total_price'], 80000.0)
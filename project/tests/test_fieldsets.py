@@ -0,0 +1,62 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU
+from recommendations.models import PCConfiguration, WorkspaceSetup
+
+
+class TestSparseFieldsets(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='sparse', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        cpu = CPU.objects.create(
+            name='Ryzen 5 7600', manufacturer='AMD', socket='AM5', cores=6, threads=12,
+            base_clock=3.8, boost_clock=5.1, tdp=65, price=20000,
+        )
+        self.configuration = PCConfiguration.objects.create(
+            user=user, name='Compact', cpu=cpu, total_price=20000, is_saved=True,
+        )
+        WorkspaceSetup.objects.create(user=user, configuration=self.configuration, name='Desk')
+    
+    def test_compact_list_by_default(self):
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/recommendations/configurations/')
+        row = response.data['results'][0]
+        
+        self.assertNotIn('cpu_detail', row)
+        self.assertNotIn('workspace', row)
+        self.assertEqual(row['components']['cpu'], {'id': row['components']['cpu']['id'], 'name': 'Ryzen 5 7600', 'price': '20000.00'})
+        self.assertIsNone(row['components']['gpu'])
+        
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('"socket"', sql)
+        self.assertNotIn('compatibility_notes', sql)
+        self.assertNotIn('recommendations_recommendation', sql)
+    
+    def test_fields_and_expand(self):
+
+        response = self.client.get('/api/recommendations/configurations/', {'fields': 'name,total_price'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'total_price'})
+        
+        response = self.client.get('/api/recommendations/configurations/my_builds/', {'expand': 'cpu_detail,workspace'})
+        self.assertEqual(response.data['results'][0]['cpu_detail']['socket'], 'AM5')
+        self.assertEqual(response.data['results'][0]['workspace']['name'], 'Desk')
+        
+        response = self.client.get('/api/recommendations/configurations/', {'expand': 'all'})
+        self.assertIn('recommendations', response.data['results'][0])
+    
+    def test_detail_stays_complete(self):
+
+        response = self.client.get(f'/api/recommendations/configurations/{self.configuration.id}/')
+        self.assertEqual(response.data['cpu_detail']['socket'], 'AM5')
+        self.assertEqual(response.data['workspace']['name'], 'Desk')
+        
+        response = self.client.get('/api/recommendations/workspace-setups/')
+        self.assertEqual(set(response.data['results'][0]), {
+            'id', 'name', 'total_price', 'configuration', 'created_at', 'updated_at', 'peripherals',
+        })
@@ -0,0 +1,76 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from accounts.models import User
+from computers.models import CPU, GPU
+from recommendations.models import PCConfiguration
+from recommendations.personalization_service import PersonalizationService, UserPreferenceProfile
+
+
+class TestPreferenceProfiles(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='profiled', password='testpass123')
+        self.amd = CPU.objects.create(
+            name='Ryzen 5 7600', manufacturer='AMD', socket='AM5', cores=6, threads=12, base_clock=3.8, tdp=65, price=20000,
+        )
+        self.intel = CPU.objects.create(
+            name='Core i5-14400F', manufacturer='Intel', socket='LGA1700', cores=10, threads=16, base_clock=2.5, tdp=65, price=18000,
+        )
+        self.gpu = GPU.objects.create(
+            name='GeForce RTX 4060', manufacturer='NVIDIA', chipset='AD107', memory=8, memory_type='GDDR6',
+            core_clock=1830, tdp=115, recommended_psu=550, price=30000,
+        )
+    
+    def build(self, cpu, price, gpu=None):
+        return PCConfiguration.objects.create(user=self.user, name='Build', cpu=cpu, gpu=gpu, total_price=price)
+    
+    def preferences(self):
+
+        with self.assertNumQueries(1):
+            return PersonalizationService(self.user).get_user_preferences()
+    
+    def test_incremental_updates(self):
+
+        self.assertFalse(PersonalizationService(self.user).get_user_preferences()['has_history'])
+        
+        first = self.build(self.amd, 100000, self.gpu)
+        second = self.build(self.intel, 60000)
+        third = self.build(self.intel, 0)
+        
+        preferences = self.preferences()
+        self.assertEqual(preferences['total_builds'], 3)
+        self.assertEqual(preferences['avg_budget'], 80000)
+        self.assertEqual(preferences['budget_range'], {'min': 60000, 'max': 100000})
+        self.assertEqual(preferences['preferred_cpu_manufacturer'], 'Intel')
+        self.assertEqual(preferences['preferred_gpu_manufacturer'], 'NVIDIA')
+        
+        third.cpu = self.amd
+        third.total_price = 120000
+        third.save()
+        second.delete()
+        first.delete()
+        
+        preferences = self.preferences()
+        self.assertEqual(preferences['total_builds'], 1)
+        self.assertEqual(preferences['budget_range'], {'min': 120000, 'max': 120000})
+        self.assertEqual(preferences['preferred_cpu_manufacturer'], 'AMD')
+        self.assertIsNone(preferences['preferred_gpu_manufacturer'])
+    
+    def test_backfill_matches_incremental(self):
+
+        self.build(self.amd, 100000, self.gpu)
+        self.build(self.intel, 60000)
+        PCConfiguration.objects.filter(total_price=60000).update(cpu=self.amd)
+        UserPreferenceProfile.objects.all().delete()
+        
+        call_command('backfill_preference_profiles', stdout=StringIO())
+        
+        profile = UserPreferenceProfile.objects.get(user=self.user)
+        self.assertEqual(profile.cpu_manufacturers, {'AMD': 2})
+        self.assertEqual(profile.priced_count, 2)
+        self.assertEqual(self.preferences()['avg_budget'], 80000)
+        
+        self.user.delete()
+        self.assertFalse(UserPreferenceProfile.objects.exists())
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.core import mail
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from computers.models import GPU
+from recommendations.models import Wishlist
+from recommendations.price_alerts import evaluate_price_alerts
+from recommendations.price_service import PriceCache
+from recommendations.tasks import send_price_alert_digest
+
+
+class TestPriceAlerts(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alerts', password='testpass123', email='alerts@example.com')
+        self.gpus = [
+            GPU.objects.create(
+                name=f'GeForce RTX 40{i}0', manufacturer='NVIDIA', chipset='AD10x',
+                memory=8, memory_type='GDDR6', core_clock=2000, tdp=200, recommended_psu=650, price=50000,
+            )
+            for i in (6, 7)
+        ]
+        self.items = [
+            Wishlist.objects.create(
+                user=self.user, component_type='gpu', component_id=gpu.id,
+                price_at_add=50000, price_alert_threshold=45000,
+            )
+            for gpu in self.gpus
+        ]
+    
+    def set_price(self, gpu, price):
+        GPU.objects.filter(pk=gpu.pk).update(price=price)
+    
+    def test_alert_once_per_drop(self):
+
+        self.set_price(self.gpus[0], 44000)
+        
+        digests = evaluate_price_alerts()
+        self.assertEqual([item['wishlist_id'] for item in digests[self.user.id]], [self.items[0].id])
+        self.assertEqual(evaluate_price_alerts(), {})
+        
+        self.set_price(self.gpus[0], 43000)
+        self.assertEqual(digests.keys(), evaluate_price_alerts().keys())
+        
+        self.set_price(self.gpus[0], 47000)
+        self.assertEqual(evaluate_price_alerts(), {})
+        self.assertIsNone(Wishlist.objects.get(pk=self.items[0].pk).last_alert_price)
+        
+        self.set_price(self.gpus[0], 44500)
+        self.assertEqual(len(evaluate_price_alerts()[self.user.id]), 1)
+    
+    def test_shop_price_counts(self):
+
+        PriceCache.objects.create(component_type='gpu', component_id=self.gpus[1].id, shop='dns', price=42000)
+        
+        items = evaluate_price_alerts()[self.user.id]
+        self.assertEqual(items[0]['current_price'], 42000.0)
+        self.assertEqual(items[0]['component_name'], self.gpus[1].name)
+    
+    def test_query_count_does_not_grow_with_wishlists(self):
+
+        with CaptureQueriesContext(connection) as few:
+            evaluate_price_alerts()
+        
+        for i in range(20):
+            gpu = GPU.objects.create(
+                name=f'GPU {i}', manufacturer='AMD', chipset='Navi', memory=8, memory_type='GDDR6',
+                core_clock=2000, tdp=200, recommended_psu=650, price=Decimal('30000'),
+            )
+            Wishlist.objects.create(
+                user=self.user, component_type='gpu', component_id=gpu.id,
+                price_at_add=35000, price_alert_threshold=31000,
+            )
+        
+        with CaptureQueriesContext(connection) as many:
+            digests = evaluate_price_alerts()
+        
+        self.assertEqual(len(digests[self.user.id]), 20)
+        self.assertLessEqual(len(many), len(few) + 1)
+    
+    def test_digest_email(self):
+
+        self.set_price(self.gpus[0], 44000)
+        self.set_price(self.gpus[1], 40000)
+        
+        items = evaluate_price_alerts()[self.user.id]
+        result = send_price_alert_digest(self.user.id, items)
+        
+        self.assertEqual(result['items'], 2)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn(self.gpus[1].name, mail.outbox[0].body)
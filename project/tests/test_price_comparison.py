@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from computers.models import CPU, GPU
+from recommendations.models import PCConfiguration
+from recommendations.price_comparison import basket_items, compare_basket
+from recommendations.price_service import PriceCache
+
+
+SHOPS = {
+    'dns': {'url': '', 'delivery_fee': 0},
+    'citilink': {'url': '', 'delivery_fee': 3000},
+    'regard': {'url': '', 'delivery_fee': 0},
+}
+
+
+@override_settings(PRICE_SHOP_APIS=SHOPS)
+class TestPriceComparison(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='basket', password='testpass123')
+        self.cpu = CPU.objects.create(
+            name='Ryzen 5 7600', manufacturer='AMD', socket='AM5', cores=6, threads=12,
+            base_clock=3.8, boost_clock=5.1, tdp=65, price=20000,
+        )
+        self.gpu = GPU.objects.create(
+            name='GeForce RTX 4070', manufacturer='NVIDIA', chipset='AD104', memory=12, memory_type='GDDR6X',
+            core_clock=1920, tdp=200, recommended_psu=650, price=60000,
+        )
+        self.configuration = PCConfiguration.objects.create(user=user, name='Basket', cpu=self.cpu, gpu=self.gpu)
+        
+        for component_type, component_id, shop, price in [
+            ('cpu', self.cpu.id, 'dns', 18000),
+            ('cpu', self.cpu.id, 'citilink', 17000),
+            ('cpu', self.cpu.id, 'regard', 21000),
+            ('gpu', self.gpu.id, 'dns', 59000),
+            ('gpu', self.gpu.id, 'citilink', 58500),
+            ('gpu', self.gpu.id, 'regard', 57000),
+        ]:
+            PriceCache.objects.create(component_type=component_type, component_id=component_id, shop=shop, price=price)
+    
+    def test_baskets(self):
+
+        with self.assertNumQueries(1):
+            result = compare_basket(basket_items(self.configuration), refresh=False)
+        
+        cheapest = result['cheapest_per_component']
+        self.assertEqual([line['shop'] for line in cheapest['items']], ['citilink', 'regard'])
+        self.assertEqual(cheapest['total'], 17000 + 57000 + 3000)
+        
+        self.assertEqual(result['cheapest_single_shop']['shop'], 'dns')
+        self.assertEqual(result['cheapest_single_shop']['total'], 77000)
+        
+        mixed = result['mixed_optimum']
+        self.assertEqual(mixed['shops'], ['dns', 'regard'])
+        self.assertEqual(mixed['total'], 18000 + 57000)
+    
+    def test_catalog_price_fallback(self):
+
+        PriceCache.objects.filter(component_type='gpu').update(in_stock=False)
+        
+        result = compare_basket(basket_items(self.configuration), refresh=False)
+        
+        self.assertEqual(result['mixed_optimum']['total'], 18000 + 60000)
+        self.assertIsNone(result['cheapest_single_shop'])
+        self.assertEqual(result['shops']['dns']['missing'], ['gpu'])
+        self.assertEqual(result['components'][1]['catalog_price'], float(Decimal('60000')))
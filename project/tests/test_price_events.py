@@ -0,0 +1,92 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+
+from accounts.models import User
+from computers.models import GPU
+from recommendations.models import Wishlist
+from recommendations.price_events import emit_price_changes, process_price_changes
+from recommendations.price_service import PriceChangeEvent
+
+
+class TestPriceChangeEvents(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='events', password='testpass123', email='events@example.com')
+        self.gpus = [
+            GPU.objects.create(
+                name=f'GeForce RTX 40{i}0', manufacturer='NVIDIA', chipset='AD10x',
+                memory=8, memory_type='GDDR6', core_clock=2000, tdp=200, recommended_psu=650, price=50000,
+            )
+            for i in (6, 7)
+        ]
+        self.items = [
+            Wishlist.objects.create(
+                user=self.user, component_type='gpu', component_id=gpu.id,
+                price_at_add=50000, price_alert_threshold=45000,
+            )
+            for gpu in self.gpus
+        ]
+    
+    def test_catalog_save_emits_event(self):
+
+        gpu = GPU.objects.get(pk=self.gpus[0].pk)
+        gpu.name = 'GeForce RTX 4060 Ti'
+        gpu.save()
+        self.assertFalse(PriceChangeEvent.objects.exists())
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            gpu.price = Decimal('44000')
+            gpu.save()
+        
+        event = PriceChangeEvent.objects.get()
+        self.assertEqual(
+            (event.component_type, event.component_id, event.old_price, event.new_price, event.source),
+            ('gpu', gpu.id, Decimal('50000'), Decimal('44000'), 'catalog')
+        )
+        self.assertEqual(len(callbacks), 1)
+        
+        with mock.patch('recommendations.tasks.process_price_changes.delay') as delay:
+            callbacks[0]()
+        delay.assert_called_once_with(components=[('gpu', gpu.id)])
+    
+    def test_only_changed_components_are_evaluated(self):
+
+        GPU.objects.filter(pk__in=[gpu.pk for gpu in self.gpus]).update(price=40000)
+        emit_price_changes([('gpu', self.gpus[1].id, 'dns', Decimal('50000'), Decimal('40000'))], source='ingestion')
+        
+        digests = process_price_changes()
+        
+        self.assertEqual([item['wishlist_id'] for item in digests[self.user.id]], [self.items[1].id])
+        self.assertFalse(PriceChangeEvent.objects.filter(processed_at__isnull=True).exists())
+        self.assertEqual(process_price_changes(), {})
+    
+    def test_unchanged_prices_are_ignored(self):
+
+        self.assertEqual(
+            emit_price_changes([('gpu', self.gpus[0].id, 'dns', Decimal('50000'), Decimal('50000'))], source='ingestion'),
+            []
+        )
+        self.assertFalse(PriceChangeEvent.objects.exists())
+    
+    def test_components_claim_only_their_events(self):
+
+        GPU.objects.filter(pk__in=[gpu.pk for gpu in self.gpus]).update(price=40000)
+        components = emit_price_changes(
+            [('gpu', gpu.id, 'dns', Decimal('50000'), Decimal('40000')) for gpu in self.gpus],
+            source='ingestion',
+        )
+        self.assertEqual(components, sorted(('gpu', gpu.id) for gpu in self.gpus))
+        
+        with mock.patch('recommendations.price_alerts.evaluate_price_alerts', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                process_price_changes([['gpu', self.gpus[0].id]])
+        self.assertEqual(PriceChangeEvent.objects.filter(processed_at__isnull=True).count(), 2)
+        
+        digests = process_price_changes([['gpu', self.gpus[0].id]])
+        self.assertEqual([item['wishlist_id'] for item in digests[self.user.id]], [self.items[0].id])
+        self.assertEqual(
+            list(PriceChangeEvent.objects.filter(processed_at__isnull=True).values_list('component_id', flat=True)),
+            [self.gpus[1].id]
+        )
+        self.assertEqual(process_price_changes([['gpu', self.gpus[0].id]]), {})
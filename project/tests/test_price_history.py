@@ -0,0 +1,101 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from recommendations.price_history import (
+    record_prices, get_current_price, get_price_series, get_price_stats, compact_price_history,
+)
+from recommendations.price_service import PriceHistory
+
+
+class TestPriceHistory(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+    
+    def test_runs_fold_into_daily_row(self):
+
+        record_prices([('gpu', 1, 'dns', Decimal('50000'), True)], self.today)
+        record_prices([('gpu', 1, 'dns', Decimal('48000'), True), ('gpu', 1, 'dns', Decimal('49000'), False)], self.today)
+        
+        row = PriceHistory.objects.get(component_type='gpu', component_id=1, shop='dns')
+        self.assertEqual(
+            (row.price_open, row.price_min, row.price_max, row.price_close, row.samples, row.in_stock),
+            (Decimal('50000'), Decimal('48000'), Decimal('50000'), Decimal('49000'), 3, False)
+        )
+    
+    def test_series_stats_in_one_query(self):
+
+        prices = [100, 90, 120, 80, 95]
+        for offset, price in enumerate(prices):
+            day = self.today - timedelta(days=len(prices) - 1 - offset)
+            record_prices([('cpu', 7, 'dns', Decimal(price), True), ('cpu', 7, 'regard', Decimal(price + 5), True)], day)
+        
+        with self.assertNumQueries(1):
+            series = get_price_series('cpu', 7, days=30)
+        
+        self.assertEqual(len(series['data']), 10)
+        self.assertEqual(series['stats']['min_price'], 80)
+        self.assertEqual(series['stats']['max_price'], 125)
+        self.assertEqual(series['stats']['current_price'], 95)
+        self.assertEqual(series['stats']['price_change_30d'], -5.0)
+        
+        self.assertEqual(get_price_stats('cpu', 7, days=2)['min_price'], 80)
+        self.assertEqual(get_price_series('cpu', 8), {'data': [], 'stats': {}})
+    
+    def test_catalog_prices_stay_out_of_shop_stats(self):
+
+        for offset, (shop_price, catalog_price) in enumerate([(100, 150), (90, 60), (95, 50)]):
+            day = self.today - timedelta(days=2 - offset)
+            record_prices([('cpu', 7, 'dns', Decimal(shop_price), True), ('cpu', 7, 'catalog', Decimal(catalog_price), True)], day)
+        record_prices([('cpu', 8, 'catalog', Decimal('70'), True)], self.today)
+        
+        series = get_price_series('cpu', 7, days=30)
+        self.assertEqual(len(series['data']), 6)
+        self.assertEqual(
+            {name: series['stats'][name] for name in ('min_price', 'max_price', 'avg_price', 'current_price', 'price_change_30d')},
+            {'min_price': 90, 'max_price': 100, 'avg_price': 95, 'current_price': 95, 'price_change_30d': -5.0}
+        )
+        self.assertEqual(get_price_stats('cpu', 7)['max_price'], 100)
+        
+        # Without shop quotes the catalog price is all there is
+        self.assertEqual(get_price_series('cpu', 8)['stats']['min_price'], 70)
+        self.assertEqual(get_price_stats('cpu', 8)['avg_price'], 70)
+        
+        self.assertEqual(get_current_price('cpu', 7)['shop'], 'dns')
+        self.assertEqual(get_current_price('cpu', 8)['shop'], 'catalog')
+    
+    def test_compaction_and_retention(self):
+
+        old_monday = self.today - timedelta(days=200)
+        old_monday -= timedelta(days=old_monday.weekday())
+        for offset, price in enumerate([100, 80, 90]):
+            record_prices([('ram', 3, 'dns', Decimal(price), True)], old_monday + timedelta(days=offset))
+        record_prices([('ram', 3, 'dns', Decimal('70'), True)], self.today - timedelta(days=1000))
+        record_prices([('ram', 3, 'dns', Decimal('60'), True)], self.today)
+        
+        result = compact_price_history(daily_days=90, retention_days=730, batch_size=2)
+        
+        self.assertEqual(result, {'compacted': 3, 'deleted': 1})
+        week = PriceHistory.objects.get(day=old_monday)
+        self.assertEqual(
+            (week.period, week.price_open, week.price_min, week.price_max, week.price_close, week.samples),
+            ('week', Decimal('100'), Decimal('80'), Decimal('100'), Decimal('90'), 3)
+        )
+        self.assertTrue(PriceHistory.objects.filter(day=self.today, period='day').exists())
+
+
+class TestPriceHistoryWithoutUpsert(TestPriceHistory):
+
+    # Same scenarios on a backend with no native upsert, which takes the
+    # read, bulk_update and bulk_create path
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.multiple(
+            connection.features, supports_update_conflicts=False, supports_update_conflicts_with_target=False,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
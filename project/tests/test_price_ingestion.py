@@ -0,0 +1,173 @@
+import asyncio
+import threading
+import time
+from collections import Counter
+from decimal import Decimal
+from unittest import mock
+
+from aiohttp import web
+from django.db import connection
+from django.test import TestCase
+
+from computers.models import GPU
+from recommendations.price_ingestion import PriceIngestionEngine, PriceQuote, TokenBucket, catalog_components, save_quotes
+from recommendations.price_service import PriceCache
+
+
+class FakeShopServer:
+
+    def __init__(self):
+        self.prices = {}
+        self.hits = Counter()
+        self.fail_first = set()
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+    
+    async def handle(self, request):
+        shop = request.match_info['shop']
+        query = request.query['q']
+        self.hits[(shop, query)] += 1
+        
+        if (shop, query) in self.fail_first and self.hits[(shop, query)] == 1:
+            return web.Response(status=429)
+        
+        price = self.prices.get((shop, query))
+        if price is None:
+            return web.Response(status=404)
+        
+        etag = f'"{shop}-{price}"'
+        if request.headers.get('If-None-Match') == etag:
+            return web.Response(status=304)
+        
+        return web.json_response(
+            {'price': price, 'in_stock': True, 'url': f'https://{shop}.example/{query}'},
+            headers={'ETag': etag},
+        )
+    
+    def start(self):
+        self.thread.start()
+        app = web.Application()
+        app.router.add_get('/{shop}/price', self.handle)
+        self.runner = web.AppRunner(app)
+        asyncio.run_coroutine_threadsafe(self.runner.setup(), self.loop).result()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        asyncio.run_coroutine_threadsafe(site.start(), self.loop).result()
+        self.port = site._server.sockets[0].getsockname()[1]
+    
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.runner.cleanup(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+    
+    def shops(self, *names, **overrides):
+        return {
+            name: {
+                'url': f'http://127.0.0.1:{self.port}/{name}/price?q={{query}}',
+                'rate': 1000,
+                'burst': 100,
+                'backoff': 0.01,
+                **overrides,
+            }
+            for name in names
+        }
+
+
+class TestPriceIngestion(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeShopServer()
+        cls.server.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+    
+    def setUp(self):
+        self.server.prices.clear()
+        self.server.hits.clear()
+        self.server.fail_first.clear()
+        
+        self.gpus = [
+            GPU.objects.create(
+                name=f'GeForce RTX 40{i}0', manufacturer='NVIDIA', chipset='AD10x',
+                memory=8, memory_type='GDDR6', core_clock=2000, tdp=200, recommended_psu=650, price=50000,
+            )
+            for i in (6, 7, 8)
+        ]
+        for gpu in self.gpus[:2]:
+            self.server.prices[('dns', gpu.name)] = 40000
+            self.server.prices[('regard', gpu.name)] = 41000.5
+    
+    def test_fan_out_and_bulk_upsert(self):
+
+        engine = PriceIngestionEngine(self.server.shops('dns', 'regard'))
+        report = engine.run(catalog_components('gpu'))
+        
+        self.assertEqual(report['saved'], 4)
+        self.assertEqual(PriceCache.objects.filter(component_type='gpu').count(), 4)
+        self.assertEqual(
+            PriceCache.objects.get(component_id=self.gpus[0].id, shop='regard').price,
+            Decimal('41000.50')
+        )
+        self.assertEqual(report['shops']['dns']['requests'], 3)
+        self.assertEqual(report['shops']['dns']['not_found'], 1)
+    
+    def test_upsert_without_conflict_target(self):
+
+        def quotes(price):
+            return [
+                PriceQuote('gpu', gpu.id, 'dns', Decimal(price), f'https://dns.test/{gpu.id}', True, etag=str(price))
+                for gpu in self.gpus[:2]
+            ]
+        
+        save_quotes(quotes(40000)[:1])
+        
+        # No native upsert at all: existing rows are updated, new ones created
+        with mock.patch.object(connection.features, 'supports_update_conflicts', False), \
+                mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self.assertEqual(save_quotes(quotes(39000)), 2)
+        
+        rows = PriceCache.objects.filter(shop='dns').order_by('component_id')
+        self.assertEqual([(row.price, row.etag) for row in rows], [(Decimal('39000'), '39000')] * 2)
+        
+        # MySQL's ON DUPLICATE KEY UPDATE cannot be given a conflict target
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False), \
+                mock.patch.object(PriceCache.objects, 'bulk_create') as bulk_create:
+            save_quotes(quotes(38000))
+        self.assertNotIn('unique_fields', bulk_create.call_args.kwargs)
+        self.assertTrue(bulk_create.call_args.kwargs['update_conflicts'])
+    
+    def test_conditional_requests_keep_cached_price(self):
+
+        engine = PriceIngestionEngine(self.server.shops('dns'))
+        engine.run(catalog_components('gpu'))
+        report = engine.run(catalog_components('gpu'))
+        
+        self.assertEqual(report['shops']['dns']['not_modified'], 2)
+        self.assertEqual(report['saved'], 2)
+        self.assertEqual(PriceCache.objects.get(component_id=self.gpus[1].id, shop='dns').price, Decimal('40000'))
+    
+    def test_retry_budget(self):
+
+        self.server.fail_first = {('dns', gpu.name) for gpu in self.gpus[:2]}
+        
+        report = PriceIngestionEngine(self.server.shops('dns', retry_budget=1)).run(catalog_components('gpu'))
+        
+        self.assertEqual(report['shops']['dns']['rate_limited'], 2)
+        self.assertEqual(report['shops']['dns']['retries'], 1)
+        self.assertEqual(report['shops']['dns']['errors'], 1)
+        self.assertEqual(report['saved'], 1)
+    
+    def test_token_bucket_limits_rate(self):
+
+        async def take(bucket, count):
+            for _ in range(count):
+                await bucket.acquire()
+        
+        bucket = TokenBucket(rate=50, capacity=1)
+        started = time.monotonic()
+        asyncio.run(take(bucket, 6))
+        
+        self.assertGreaterEqual(time.monotonic() - started, 0.09)
@@ -0,0 +1,94 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase
+
+from computers.models import GPU
+from recommendations.price_ingestion import PriceIngestionEngine
+from recommendations.price_pipeline import create_run, finish_run, resumable_chunk_ids, run_chunk
+from recommendations.price_service import PriceCache, PriceUpdateChunk
+from recommendations.tasks import update_price_chunk
+from tests.test_price_ingestion import FakeShopServer
+
+
+class BrokenEngine:
+
+    def run(self, components):
+        raise RuntimeError('shop API is down')
+
+
+class TestPricePipeline(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeShopServer()
+        cls.server.start()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+        super().tearDownClass()
+    
+    def setUp(self):
+        self.gpus = [
+            GPU.objects.create(
+                name=f'GeForce RTX 40{i}0', manufacturer='NVIDIA', chipset='AD10x',
+                memory=8, memory_type='GDDR6', core_clock=2000, tdp=200, recommended_psu=650, price=50000,
+            )
+            for i in range(5)
+        ]
+        for gpu in self.gpus:
+            self.server.prices[('dns', gpu.name)] = 40000
+    
+    def test_chunks_cover_catalog_by_id_range(self):
+
+        run = create_run('gpu', chunk_size=2)
+        chunks = list(run.chunks.order_by('id').values_list('start_id', 'end_id'))
+        
+        self.assertEqual(run.chunks_total, 3)
+        self.assertEqual(chunks[0], (self.gpus[0].id, self.gpus[1].id))
+        self.assertEqual(chunks[-1], (self.gpus[4].id, self.gpus[4].id))
+    
+    def test_failed_chunks_are_resumed(self):
+
+        run = create_run('gpu', chunk_size=2)
+        engine = PriceIngestionEngine(self.server.shops('dns'))
+        first, second, third = resumable_chunk_ids(run.id)
+        
+        run_chunk(first, engine)
+        self.assertEqual(run_chunk(second, BrokenEngine())['status'], 'failed')
+        run_chunk(third, engine)
+        
+        progress = finish_run(run.id)
+        self.assertEqual(progress['status'], 'partial')
+        self.assertEqual(progress['chunks']['failed'], 1)
+        self.assertEqual(progress['saved'], 3)
+        self.assertEqual(resumable_chunk_ids(run.id), [second])
+        
+        run_chunk(second, engine)
+        self.assertEqual(run_chunk(first, BrokenEngine())['status'], 'done')
+        
+        progress = finish_run(run.id)
+        self.assertEqual(progress['status'], 'complete')
+        self.assertEqual(progress['progress'], 100.0)
+        self.assertEqual(PriceCache.objects.filter(component_type='gpu', shop='dns').count(), 5)
+    
+    def test_chunk_that_cannot_start_still_finishes_run(self):
+
+        run = create_run('gpu', chunk_size=2)
+        first, second, third = resumable_chunk_ids(run.id)
+        
+        with mock.patch.object(PriceUpdateChunk.objects, 'select_related', side_effect=OperationalError('gone away')):
+            self.assertEqual(run_chunk(first)['status'], 'failed')
+        
+        with mock.patch('recommendations.price_pipeline.run_chunk', side_effect=OperationalError('gone away')):
+            result = update_price_chunk.apply(args=[second]).get()
+        self.assertEqual(result, {'chunk_id': second, 'status': 'failed', 'saved': 0, 'errors': 0})
+        
+        # A chunk stuck in running never finished
+        PriceUpdateChunk.objects.filter(id=second).update(status='running')
+        run_chunk(third, PriceIngestionEngine(self.server.shops('dns')))
+        
+        progress = finish_run(run.id)
+        self.assertEqual(progress['status'], 'partial')
+        self.assertEqual(resumable_chunk_ids(run.id), [first, second])
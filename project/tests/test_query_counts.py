@@ -0,0 +1,81 @@
+import itertools
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU, GPU
+from peripherals.models import Mousepad
+from recommendations.models import PCConfiguration, Recommendation, WorkspaceSetup
+
+
+class ConstantQueryTestCase(TestCase):
+
+    # Fetches an endpoint, adds more rows and fetches it again: the number of
+    # queries must not grow with the number of rows returned.
+    
+    def count_queries(self, url, **params):
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+    
+    def assertConstantQueries(self, url, add_rows, rounds=3, **params):
+
+        baseline, _ = self.count_queries(url, **params)
+        for _ in range(rounds):
+            add_rows()
+            count, _ = self.count_queries(url, **params)
+            self.assertEqual(count, baseline, f'{url} issued {count} queries instead of {baseline}')
+
+
+class TestListQueryCounts(ConstantQueryTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='lister', password='testpass123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.sequence = itertools.count()
+        self.add_build()
+    
+    def add_build(self):
+
+        n = next(self.sequence)
+        cpu = CPU.objects.create(
+            name=f'Ryzen {n}', manufacturer='AMD', socket='AM5', cores=6, threads=12, base_clock=3.8, tdp=65, price=20000,
+        )
+        gpu = GPU.objects.create(
+            name=f'GeForce {n}', manufacturer='NVIDIA', chipset='AD104', memory=12, memory_type='GDDR6X',
+            core_clock=1920, tdp=200, recommended_psu=650, price=60000,
+        )
+        configuration = PCConfiguration.objects.create(
+            user=self.user, name=f'Build {n}', cpu=cpu, gpu=gpu, is_saved=True, is_public=True, share_code=f'code{n}',
+        )
+        Recommendation.objects.create(configuration=configuration, component_type='cpu', component_id=cpu.id, reason='Быстрый')
+        mousepad = Mousepad.objects.create(name=f'Pad {n}', manufacturer='Logitech', size='xl', width=900, height=400, price=1500)
+        for name in ('first', 'second'):
+            WorkspaceSetup.objects.create(
+                user=self.user, configuration=configuration, name=f'{name} {n}', mousepad=mousepad,
+            )
+        return configuration
+    
+    def test_configuration_list(self):
+        self.assertConstantQueries('/api/recommendations/configurations/', self.add_build)
+    
+    def test_my_builds(self):
+        self.assertConstantQueries('/api/recommendations/configurations/my_builds/', self.add_build)
+    
+    def test_workspace_list(self):
+        self.assertConstantQueries('/api/recommendations/workspace-setups/', self.add_build)
+    
+    def test_prefetched_workspace_is_the_latest(self):
+
+        configuration = PCConfiguration.objects.get(name='Build 0')
+        _, response = self.count_queries(f'/api/recommendations/configurations/{configuration.id}/')
+        self.assertEqual(response.data['workspace']['name'], 'second 0')
+        
+        public = self.client.get(f'/api/recommendations/configurations/public/{configuration.share_code}/')
+        self.assertEqual(public.data['workspace']['name'], 'second 0')
+        self.assertEqual(public.data['workspace']['configuration_detail']['workspace']['name'], 'second 0')
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from recommendations.store_integration import StoreIntegrationService, StoreSearchService, store_search_key
+
+
+class TestStoreSearchService(TestCase):
+    def setUp(self):
+        self.search = StoreSearchService(timeout=5)
+        self.calls = []
+        self.release = None
+        
+        original = StoreIntegrationService.fan_out
+        
+        async def fan_out(service, query, stores, category=None):
+            self.calls.append(query)
+            if self.release is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self.release.wait, 5)
+            return await original(service, query, stores, category)
+        
+        StoreIntegrationService.fan_out = fan_out
+        self.addCleanup(setattr, StoreIntegrationService, 'fan_out', original)
+        self.addCleanup(self.search.shutdown)
+        self.addCleanup(cache.clear)
+    
+    def test_two_tier_cache(self):
+
+        first = self.search.search('RTX 4070')
+        self.assertEqual(sorted(first), ['citilink', 'dns', 'regard'])
+        
+        self.search.search('rtx 4070 ')
+        self.assertEqual(self.search.stats['local_hits'], 1)
+        
+        self.search.local.clear()
+        self.search.search('RTX 4070')
+        self.assertEqual(self.search.stats['shared_hits'], 1)
+        self.assertEqual(self.calls, ['RTX 4070'])
+    
+    def test_concurrent_queries_are_coalesced(self):
+
+        self.release = threading.Event()
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.search.search('Ryzen 7 7800X3D')))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        deadline = time.monotonic() + 5
+        while self.search.stats['coalesced'] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        self.assertEqual(len(results), 4)
+        self.assertEqual(self.calls, ['Ryzen 7 7800X3D'])
+        self.assertEqual(self.search.stats['coalesced'], 3)
+    
+    def test_search_many_fans_out_once(self):
+
+        found = self.search.search_many(['Core i5-14600K', 'RTX 4060', 'Core i5-14600K'])
+        
+        self.assertEqual(sorted(found), ['Core i5-14600K', 'RTX 4060'])
+        self.assertEqual(sorted(self.calls), ['Core i5-14600K', 'RTX 4060'])
+        self.assertIsNotNone(cache.get(store_search_key('RTX 4060', StoreIntegrationService.DEFAULT_STORES)))
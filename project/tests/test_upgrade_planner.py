@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from computers.models import CPU, GPU, PSU, RAM, Cooling, Motherboard
+from recommendations.models import PCConfiguration
+from recommendations.personalization_service import PersonalizationService
+
+
+class TestUpgradePlanner(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='upgrader', password='testpass123')
+        
+        def cpu(name, socket, tdp, price):
+            return CPU.objects.create(
+                name=name, manufacturer='AMD', socket=socket, cores=8, threads=16, base_clock=4.0, tdp=tdp, price=price,
+            )
+        
+        def gpu(name, tdp, psu, price):
+            return GPU.objects.create(
+                name=name, manufacturer='NVIDIA', chipset='AD10x', memory=12, memory_type='GDDR6X',
+                core_clock=2000, tdp=tdp, recommended_psu=psu, price=price,
+            )
+        
+        def ram(memory_type, capacity, price):
+            return RAM.objects.create(
+                name=f'{memory_type} kit', manufacturer='Kingston', memory_type=memory_type, capacity=capacity,
+                speed=6000, modules=2, price=price,
+            )
+        
+        def psu(wattage, price):
+            return PSU.objects.create(
+                name=f'Focus {wattage}', manufacturer='Seasonic', wattage=wattage, efficiency_rating='Gold', price=price,
+            )
+        
+        self.x3d = cpu('AMD Ryzen 7 7800X3D', 'AM5', 120, 40000)
+        cpu('Intel Core i5-14600K', 'LGA1700', 125, 30000)
+        cpu('AMD Ryzen 9 7950X', 'AM5', 170, 55000)
+        self.rtx4070 = gpu('NVIDIA GeForce RTX 4070', 200, 650, 60000)
+        gpu('NVIDIA GeForce RTX 4080', 320, 750, 110000)
+        self.ddr5 = ram('DDR5', 32, 10000)
+        ram('DDR4', 32, 7000)
+        self.psu650 = psu(650, 8000)
+        psu(850, 12000)
+        
+        self.configuration = PCConfiguration.objects.create(
+            user=self.user,
+            name='Starter',
+            cpu=cpu('AMD Ryzen 5 7600', 'AM5', 65, 20000),
+            gpu=gpu('NVIDIA GeForce RTX 4060', 115, 550, 30000),
+            ram=ram('DDR5', 16, 5000),
+            psu=psu(550, 5000),
+            motherboard=Motherboard.objects.create(
+                name='B650', manufacturer='MSI', socket='AM5', chipset='B650', form_factor='ATX',
+                memory_slots=4, max_memory=128, memory_type='DDR5', pcie_slots=2, price=15000,
+            ),
+            cooling=Cooling.objects.create(
+                name='AK400', manufacturer='DeepCool', cooling_type='air', socket_compatibility='AM5', max_tdp=150,
+                price=3000,
+            ),
+            total_price=75000,
+        )
+    
+    def test_compatible_options_ranked_per_ruble(self):
+
+        plan = PersonalizationService(self.user).get_upgrade_recommendations(self.configuration.id)
+        upgrades = {upgrade['component']: upgrade['recommendations'] for upgrade in plan['upgrades']}
+        
+        self.assertEqual([option['id'] for option in upgrades['cpu']], [self.x3d.id])
+        self.assertEqual([option['id'] for option in upgrades['ram']], [self.ddr5.id])
+        gpus = {option['name']: option for option in upgrades['gpu']}
+        self.assertEqual(gpus['NVIDIA GeForce RTX 4070']['requires'][0]['id'], self.psu650.id)
+        self.assertEqual(gpus['NVIDIA GeForce RTX 4070']['total_price'], 68000)
+        self.assertEqual(gpus['NVIDIA GeForce RTX 4080']['requires'][0]['name'], 'Focus 850')
+        for options in upgrades.values():
+            values = [option['gain_per_1000_rub'] for option in options]
+            self.assertEqual(values, sorted(values, reverse=True))
+        
+        # Catalog snapshots are warm now, only the configuration is read
+        with CaptureQueriesContext(connection) as queries:
+            PersonalizationService(self.user).get_upgrade_recommendations(self.configuration.id)
+        tables = [query['sql'] for query in queries if 'cache_table' not in query['sql']]
+        self.assertEqual(len(tables), 1)
+        self.assertIn('recommendations_pcconfiguration', tables[0])
+    
+    def test_bundle_fits_budget(self):
+
+        service = PersonalizationService(self.user)
+        bundle = service.get_upgrade_recommendations(self.configuration.id, budget=Decimal(75000))['bundle']
+        self.assertLessEqual(bundle['total_price'], 75000)
+        self.assertEqual(
+            {(part['component'], part['id']) for part in bundle['parts']},
+            {('gpu', self.rtx4070.id), ('psu', self.psu650.id)},
+        )
+        
+        bundle = service.get_upgrade_recommendations(self.configuration.id, budget=Decimal(120000))['bundle']
+        self.assertEqual({part['component'] for part in bundle['parts']}, {'cpu', 'gpu', 'ram', 'psu'})
+        
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = '/api/recommendations/personalization/suggested_upgrades/'
+        response = client.get(url, {'configuration_id': self.configuration.id, 'budget': '5000'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.data['bundle'])
+        self.assertEqual(client.get(url, {'configuration_id': self.configuration.id, 'budget': '-1'}).status_code, 400)
+        self.assertEqual(client.get(url, {'configuration_id': 0}).status_code, 404)